@@ -16,6 +16,8 @@ class, used in the Bio.AlignIO module.
 
 import warnings
 
+import numpy
+
 from Bio import BiopythonDeprecationWarning
 from Bio.Align import _aligners
 from Bio.Align import substitution_matrices
@@ -27,6 +29,10 @@ from Bio.SeqRecord import SeqRecord, _RestrictedDict
 # importing from within the Biopython source tree, see PR #2007:
 # https://github.com/biopython/biopython/pull/2007
 
+# Number of letters counted at a time by ArrayAlignment; this bounds the
+# memory used by the intermediate arrays.
+_COUNT_BLOCK_SIZE = 1 << 22
+
 
 class MultipleSeqAlignment:
     """Represents a classical multiple sequence alignment (MSA).
@@ -984,6 +990,421 @@ class MultipleSeqAlignment:
         return m
 
 
+def _count_columns(array, size, weights=None):
+    """Count the values in each column of a 2D integer array (PRIVATE).
+
+    Returns an array of shape (ncol, size) with the number of times each
+    value in range(size) appears in each column.  The rows are processed in
+    blocks to limit the memory used for the intermediate index array.  If
+    weights are given, each row contributes its weight instead of one.
+    """
+    nseq, ncol = array.shape
+    offsets = numpy.arange(ncol, dtype=numpy.intp) * size
+    if weights is None:
+        counts = numpy.zeros(ncol * size, numpy.int64)
+    else:
+        weights = numpy.asarray(weights, float)
+        if weights.shape != (nseq,):
+            raise ValueError("expected one weight for each sequence")
+        counts = numpy.zeros(ncol * size, float)
+    step = max(1, _COUNT_BLOCK_SIZE // max(ncol, 1))
+    for start in range(0, nseq, step):
+        block = array[start : start + step]
+        indices = (block + offsets).ravel()
+        if weights is None:
+            counts += numpy.bincount(indices, minlength=ncol * size)
+        else:
+            block_weights = numpy.repeat(weights[start : start + step], ncol)
+            counts += numpy.bincount(
+                indices, weights=block_weights, minlength=ncol * size
+            )
+    return counts.reshape(ncol, size)
+
+
+def _select_letters(values, index):
+    """Return the per-letter annotation values in the selected columns (PRIVATE).
+
+    The index can be a slice, a list or array of column numbers, or a boolean
+    mask, as for NumPy arrays.
+    """
+    if isinstance(index, slice):
+        return values[index]
+    selected = numpy.asarray(list(values), dtype=object)[index]
+    if isinstance(values, str):
+        return "".join(selected)
+    return list(selected)
+
+
+class ArrayAlignment:
+    """Multiple sequence alignment stored as a two-dimensional NumPy array.
+
+    The letters of the alignment are stored as an ``(nseq, ncol)`` array of
+    unsigned bytes, with one row per sequence, in the ``array`` attribute.
+    This makes column access and column-wise statistics fast even for
+    alignments with tens of thousands of sequences, as they are calculated
+    by NumPy instead of by looping over the rows in Python.
+
+    An ArrayAlignment is typically created from a MultipleSeqAlignment (or
+    from any list or iterator of SeqRecord objects of equal length):
+
+    >>> from Bio import AlignIO
+    >>> from Bio.Align import ArrayAlignment
+    >>> msa = AlignIO.read("Clustalw/opuntia.aln", "clustal")
+    >>> align = ArrayAlignment(msa)
+    >>> print(align)
+    ArrayAlignment with 7 rows and 156 columns
+    TATACATTAAAGAAGGGGGATGCGGATAAATGGAAAGGCGAAAG...AGA gi|6273285|gb|AF191659.1|AF191
+    TATACATTAAAGAAGGGGGATGCGGATAAATGGAAAGGCGAAAG...AGA gi|6273284|gb|AF191658.1|AF191
+    TATACATTAAAGAAGGGGGATGCGGATAAATGGAAAGGCGAAAG...AGA gi|6273287|gb|AF191661.1|AF191
+    TATACATAAAAGAAGGGGGATGCGGATAAATGGAAAGGCGAAAG...AGA gi|6273286|gb|AF191660.1|AF191
+    TATACATTAAAGGAGGGGGATGCGGATAAATGGAAAGGCGAAAG...AGA gi|6273290|gb|AF191664.1|AF191
+    TATACATTAAAGGAGGGGGATGCGGATAAATGGAAAGGCGAAAG...AGA gi|6273289|gb|AF191663.1|AF191
+    TATACATTAAAGGAGGGGGATGCGGATAAATGGAAAGGCGAAAG...AGA gi|6273291|gb|AF191665.1|AF191
+
+    Indexing follows the MultipleSeqAlignment conventions. Rows are created
+    as SeqRecord objects only when they are accessed, columns are returned
+    as strings, and slicing returns a new ArrayAlignment sharing the same
+    data:
+
+    >>> print(align[0].id)
+    gi|6273285|gb|AF191659.1|AF191
+    >>> align[:, 1]
+    'AAAAAAA'
+    >>> print(align[2:4, :10])
+    ArrayAlignment with 2 rows and 10 columns
+    TATACATTAA gi|6273287|gb|AF191661.1|AF191
+    TATACATAAA gi|6273286|gb|AF191660.1|AF191
+
+    Column-wise statistics are calculated directly on the array:
+
+    >>> print(align.column_counts("ACGT-")[:3])
+    [[0 0 0 7 0]
+     [7 0 0 0 0]
+     [0 0 0 7 0]]
+
+    Use the to_multiple_seq_alignment method to convert back to a
+    MultipleSeqAlignment:
+
+    >>> print(align[:2, :10].to_multiple_seq_alignment())
+    Alignment with 2 rows and 10 columns
+    TATACATTAA gi|6273285|gb|AF191659.1|AF191
+    TATACATTAA gi|6273284|gb|AF191658.1|AF191
+
+    Letters must be ASCII characters, and all sequences must have the same
+    length.
+    """
+
+    def __init__(self, records, annotations=None, column_annotations=None):
+        """Initialize a new ArrayAlignment object.
+
+        Arguments:
+         - records - A MultipleSeqAlignment, or a list (or iterator) of
+                     SeqRecord objects whose sequences are all the same
+                     length.
+         - annotations - Information about the whole alignment (dictionary).
+                     By default, the annotations of a MultipleSeqAlignment
+                     are used.
+         - column_annotations - Per column annotation (restricted dictionary).
+                     By default, the column annotations of a
+                     MultipleSeqAlignment are used.
+
+        """
+        if isinstance(records, MultipleSeqAlignment):
+            if annotations is None:
+                annotations = dict(records.annotations)
+            if column_annotations is None:
+                column_annotations = dict(records.column_annotations)
+        records = list(records)
+        length = len(records[0]) if records else 0
+        for record in records:
+            if not isinstance(record, SeqRecord):
+                raise TypeError("New sequence is not a SeqRecord object")
+            if len(record) != length:
+                raise ValueError("Sequences must all be the same length")
+        data = "".join(str(record.seq) for record in records)
+        try:
+            data = data.encode("ASCII")
+        except UnicodeEncodeError:
+            raise ValueError("Sequences must consist of ASCII letters") from None
+        array = numpy.frombuffer(data, dtype=numpy.uint8)
+        array = array.reshape(len(records), length)
+        headers = [
+            (
+                record.id,
+                record.name,
+                record.description,
+                record.dbxrefs,
+                record.annotations,
+                dict(record.letter_annotations),
+            )
+            for record in records
+        ]
+        self._init(array, headers, annotations, column_annotations)
+
+    def _init(self, array, headers, annotations, column_annotations):
+        """Store the array and row information (PRIVATE)."""
+        self.array = array
+        self._headers = headers
+        if annotations is None:
+            annotations = {}
+        elif not isinstance(annotations, dict):
+            raise TypeError("annotations argument should be a dict")
+        self.annotations = annotations
+        self.column_annotations = _RestrictedDict(length=array.shape[1])
+        if column_annotations:
+            self.column_annotations.update(column_annotations)
+
+    @classmethod
+    def from_array(cls, array, ids=None, annotations=None, column_annotations=None):
+        """Create an ArrayAlignment from a two-dimensional array of letters.
+
+        Arguments:
+         - array - An ``(nseq, ncol)`` array (or any object that NumPy can
+                   convert to an array of unsigned bytes) with the ASCII
+                   codes of the aligned letters, or a list of aligned
+                   sequences as strings or bytes.
+         - ids - A list of identifiers for the rows (optional).
+         - annotations, column_annotations - as for the constructor.
+
+        >>> import numpy
+        >>> from Bio.Align import ArrayAlignment
+        >>> array = numpy.frombuffer(b"ACGTA-GT", dtype="u1").reshape(2, 4)
+        >>> print(ArrayAlignment.from_array(array, ["Alpha", "Beta"]))
+        ArrayAlignment with 2 rows and 4 columns
+        ACGT Alpha
+        A-GT Beta
+
+        """
+        if not isinstance(array, numpy.ndarray) and isinstance(array[0], (str, bytes)):
+            rows = [
+                row.encode("ASCII") if isinstance(row, str) else row for row in array
+            ]
+            if len({len(row) for row in rows}) != 1:
+                raise ValueError("Sequences must all be the same length")
+            array = numpy.frombuffer(b"".join(rows), dtype=numpy.uint8)
+            array = array.reshape(len(rows), -1)
+        array = numpy.asarray(array, dtype=numpy.uint8)
+        if array.ndim != 2:
+            raise ValueError("array should be two-dimensional")
+        if ids is None:
+            ids = ["<unknown id>"] * len(array)
+        elif len(ids) != len(array):
+            raise ValueError(
+                "number of identifiers (%d) does not match the number of rows (%d)"
+                % (len(ids), len(array))
+            )
+        headers = [
+            (identifier, "<unknown name>", "<unknown description>", [], {}, {})
+            for identifier in ids
+        ]
+        alignment = cls.__new__(cls)
+        alignment._init(array, headers, annotations, column_annotations)
+        return alignment
+
+    def _record(self, index):
+        """Create the SeqRecord for one row of the alignment (PRIVATE)."""
+        identifier, name, description, dbxrefs, annotations, letters = self._headers[
+            index
+        ]
+        seq = Seq(self.array[index].tobytes().decode("ASCII"))
+        return SeqRecord(
+            seq,
+            id=identifier,
+            name=name,
+            description=description,
+            dbxrefs=list(dbxrefs),
+            annotations=dict(annotations),
+            letter_annotations=letters,
+        )
+
+    def _subset(self, row_index, col_index):
+        """Return a new ArrayAlignment for the selected rows and columns (PRIVATE)."""
+        array = self.array[row_index, col_index]
+        rows = range(len(self._headers))
+        if isinstance(row_index, slice):
+            rows = rows[row_index]
+        else:
+            rows = numpy.arange(len(rows))[row_index]
+        headers = [self._headers[row] for row in rows]
+        if not (isinstance(col_index, slice) and col_index == slice(None)):
+            headers = [
+                header[:5]
+                + ({k: _select_letters(v, col_index) for k, v in header[5].items()},)
+                for header in headers
+            ]
+        column_annotations = None
+        if len(headers) == len(self._headers):
+            # All rows kept; preserve the column annotations too
+            column_annotations = {
+                k: _select_letters(v, col_index)
+                for k, v in self.column_annotations.items()
+            }
+        alignment = self.__class__.__new__(self.__class__)
+        alignment._init(array, headers, dict(self.annotations), column_annotations)
+        return alignment
+
+    def __len__(self):
+        """Return the number of sequences in the alignment."""
+        return self.array.shape[0]
+
+    def get_alignment_length(self):
+        """Return the number of columns in the alignment."""
+        return self.array.shape[1]
+
+    def __iter__(self):
+        """Iterate over alignment rows as SeqRecord objects."""
+        for index in range(len(self)):
+            yield self._record(index)
+
+    def __getitem__(self, index):
+        """Access part of the alignment.
+
+        align[r] gives a row as a SeqRecord
+        align[r, c] gives a single character as a string
+        align[:, c] gives a column as a string
+        align[r, :] gives a row as a SeqRecord
+
+        Anything else gives a sub alignment as a new ArrayAlignment that
+        shares its data with this alignment, e.g. align[0:2], align[:, 1:3].
+        Rows can also be selected using a list of row numbers or a boolean
+        mask, as for NumPy arrays.
+        """
+        if isinstance(index, (int, numpy.integer)):
+            return self._record(index)
+        if not isinstance(index, tuple):
+            return self._subset(index, slice(None))
+        if len(index) != 2:
+            raise TypeError("Invalid index type.")
+        row_index, col_index = index
+        if isinstance(row_index, (int, numpy.integer)):
+            if isinstance(col_index, (int, numpy.integer)):
+                return chr(self.array[row_index, col_index])
+            return self._record(row_index)[col_index]
+        if isinstance(col_index, (int, numpy.integer)):
+            return self.array[row_index, col_index].tobytes().decode("ASCII")
+        return self._subset(row_index, col_index)
+
+    def __str__(self):
+        """Return a multi-line string summary of the alignment.
+
+        As for a MultipleSeqAlignment, a maximum of 20 rows and 50 columns
+        are shown.
+        """
+        rows, columns = self.array.shape
+        lines = ["ArrayAlignment with %i rows and %i columns" % (rows, columns)]
+        if rows <= 20:
+            indices = range(rows)
+        else:
+            indices = list(range(18)) + [None, rows - 1]
+        for index in indices:
+            if index is None:
+                lines.append("...")
+                continue
+            row = self.array[index]
+            if columns <= 50:
+                text = row.tobytes().decode("ASCII")
+            else:
+                text = "%s...%s" % (
+                    row[:44].tobytes().decode("ASCII"),
+                    row[-3:].tobytes().decode("ASCII"),
+                )
+            lines.append("%s %s" % (text, self._headers[index][0]))
+        return "\n".join(lines)
+
+    def __repr__(self):
+        """Return a representation of the object for debugging."""
+        return "<%s instance (%i records of length %i) at %x>" % (
+            self.__class__,
+            len(self),
+            self.get_alignment_length(),
+            id(self),
+        )
+
+    def to_multiple_seq_alignment(self):
+        """Return the alignment as a MultipleSeqAlignment object."""
+        return MultipleSeqAlignment(
+            self,
+            annotations=dict(self.annotations),
+            column_annotations=dict(self.column_annotations),
+        )
+
+    def column(self, index):
+        """Return one column of the alignment as an array of ASCII codes."""
+        return self.array[:, index]
+
+    def gap_mask(self, gap_char="-"):
+        """Return a boolean array that is True where the alignment has a gap.
+
+        >>> from Bio.Align import ArrayAlignment
+        >>> align = ArrayAlignment.from_array([b"AC-T", b"A--T"])
+        >>> mask = align.gap_mask()
+        >>> print(mask.astype(int))
+        [[0 0 1 0]
+         [0 1 1 0]]
+
+        Arguments:
+         - gap_char - The gap character, or a string of characters that
+           should all be considered as gaps (e.g. "-.").
+
+        """
+        codes = numpy.frombuffer(gap_char.encode("ASCII"), dtype=numpy.uint8)
+        if len(codes) == 1:
+            return self.array == codes[0]
+        return numpy.isin(self.array, codes)
+
+    @property
+    def letters(self):
+        """Return a sorted string of the letters appearing in the alignment."""
+        counts = numpy.bincount(self.array.ravel(), minlength=256)
+        return numpy.flatnonzero(counts).astype(numpy.uint8).tobytes().decode("ASCII")
+
+    @property
+    def weights(self):
+        """Return the weight of each row as an array.
+
+        The weights are taken from the "weight" annotation of each row,
+        as used by Bio.Align.AlignInfo; rows without a weight have weight
+        1.0.
+        """
+        return numpy.array([header[4].get("weight", 1.0) for header in self._headers])
+
+    def _count_letters(self, weights=None):
+        """Count the letters in each column as a (ncol, 256) array (PRIVATE)."""
+        return _count_columns(self.array, 256, weights)
+
+    def column_counts(self, letters=None, weights=None):
+        """Return the number of times each letter appears in each column.
+
+        The result is an ``(ncol, len(letters))`` array; its columns follow
+        the order of the letters.
+
+        Arguments:
+         - letters - A string of the letters to count. By default, all the
+           letters appearing in the alignment are counted, in sorted order
+           (see the letters property).
+         - weights - An optional sequence of one weight per row; the counts
+           are then the sum of the weights of the rows with each letter.
+
+        """
+        if letters is None:
+            letters = self.letters
+        codes = numpy.frombuffer(letters.encode("ASCII"), dtype=numpy.uint8)
+        return self._count_letters(weights)[:, codes]
+
+    def column_frequencies(self, letters=None, weights=None):
+        """Return the frequency of each letter in each column.
+
+        Same as column_counts, but each row of the result is divided by the
+        total count of the given letters in that column.  Columns without
+        any of the letters get frequencies of zero.
+        """
+        counts = self.column_counts(letters, weights)
+        totals = counts.sum(axis=1, keepdims=True)
+        with numpy.errstate(invalid="ignore", divide="ignore"):
+            frequencies = numpy.where(totals > 0, counts / totals, 0.0)
+        return frequencies
+
+
 class PairwiseAlignment:
     """Represents a pairwise sequence alignment.
 
@@ -1420,6 +1841,80 @@ class PairwiseAlignments:
         return alignment
 
 
+class EncodedSequence:
+    """Sequence pre-encoded as an array of letter indices for PairwiseAligner.
+
+    Before running the dynamic programming algorithm, a PairwiseAligner
+    converts each sequence to an array of integer indices into its alphabet
+    (or substitution matrix).  If the same sequence, for example a reference
+    panel, is aligned many times, this conversion can be done once by
+    calling the aligner's ``encode`` method:
+
+    >>> from Bio import Align
+    >>> aligner = Align.PairwiseAligner()
+    >>> target = aligner.encode("TACCG")
+    >>> target
+    EncodedSequence('TACCG', array([19,  0,  2,  2,  6], dtype=int32))
+    >>> aligner.score(target, "ACG")
+    3.0
+    >>> alignment = sorted(aligner.align(target, "ACG"))[0]
+    >>> print(alignment)
+    TACCG
+    -|-||
+    -A-CG
+    <BLANKLINE>
+
+    The indices are stored as a NumPy array of C integers in the ``indices``
+    attribute.  An EncodedSequence can also be created directly from any
+    object supporting the buffer protocol, such as a shared memory block,
+    without copying the data:
+
+    >>> from Bio.Align import EncodedSequence
+    >>> shared = EncodedSequence("TACCG", bytes(target.indices))
+    >>> aligner.score(shared, "ACG")
+    3.0
+
+    The encoding depends on the alphabet or substitution matrix of the
+    aligner; an EncodedSequence should therefore only be used with an
+    aligner with the same alphabet as the aligner that created it.
+    """
+
+    def __init__(self, sequence, indices, alphabet=None):
+        """Initialize the EncodedSequence.
+
+        Arguments:
+         - sequence - The original sequence, used to print alignments.
+         - indices  - The letter indices, as a NumPy array or any object
+                      supporting the buffer protocol with C integer items.
+         - alphabet - The alphabet of the aligner used to create the indices
+                      (optional); used to check that the encoding matches
+                      the aligner.
+
+        """
+        if not isinstance(indices, numpy.ndarray):
+            indices = numpy.frombuffer(indices, dtype=numpy.intc)
+        elif indices.dtype != numpy.intc or not indices.flags.c_contiguous:
+            indices = numpy.ascontiguousarray(indices, dtype=numpy.intc)
+        if indices.ndim != 1:
+            raise ValueError("indices should be a one-dimensional array")
+        if len(indices) != len(sequence):
+            raise ValueError(
+                "sequence and indices have different lengths (%d and %d)"
+                % (len(sequence), len(indices))
+            )
+        self.sequence = sequence
+        self.indices = indices
+        self.alphabet = alphabet
+
+    def __len__(self):
+        """Return the length of the sequence."""
+        return len(self.indices)
+
+    def __repr__(self):
+        """Return a representation of the EncodedSequence."""
+        return "EncodedSequence(%r, %r)" % (self.sequence, self.indices)
+
+
 class PairwiseAligner(_aligners.PairwiseAligner):
     """Performs pairwise sequence alignment using dynamic programming.
 
@@ -1583,13 +2078,44 @@ class PairwiseAligner(_aligners.PairwiseAligner):
             raise AttributeError("PairwiseAligner object has no attribute '%s'" % key)
         _aligners.PairwiseAligner.__setattr__(self, key, value)
 
+    def _check_encoded(self, sequence):
+        if sequence.alphabet is not None and sequence.alphabet != self.alphabet:
+            raise ValueError(
+                "sequence was encoded with a different alphabet than the "
+                "alphabet of this PairwiseAligner"
+            )
+        return sequence.indices
+
+    def encode(self, sequence):
+        """Return the sequence encoded as letter indices, as an EncodedSequence.
+
+        The returned EncodedSequence can be passed to the align and score
+        methods instead of the sequence itself, saving the conversion of the
+        sequence to letter indices on each call.
+        """
+        if isinstance(sequence, EncodedSequence):
+            self._check_encoded(sequence)
+            return sequence
+        if isinstance(sequence, Seq):
+            sequence = str(sequence)
+        indices = _aligners.PairwiseAligner.encode(self, sequence)
+        return EncodedSequence(sequence, indices, self.alphabet)
+
     def align(self, seqA, seqB):
         """Return the alignments of two sequences using PairwiseAligner."""
         if isinstance(seqA, Seq):
             seqA = str(seqA)
         if isinstance(seqB, Seq):
             seqB = str(seqB)
-        score, paths = _aligners.PairwiseAligner.align(self, seqA, seqB)
+        sA = seqA
+        sB = seqB
+        if isinstance(seqA, EncodedSequence):
+            sA = self._check_encoded(seqA)
+            seqA = seqA.sequence
+        if isinstance(seqB, EncodedSequence):
+            sB = self._check_encoded(seqB)
+            seqB = seqB.sequence
+        score, paths = _aligners.PairwiseAligner.align(self, sA, sB)
         alignments = PairwiseAlignments(seqA, seqB, score, paths)
         return alignments
 
@@ -1597,8 +2123,12 @@ class PairwiseAligner(_aligners.PairwiseAligner):
         """Return the alignments score of two sequences using PairwiseAligner."""
         if isinstance(seqA, Seq):
             seqA = str(seqA)
+        elif isinstance(seqA, EncodedSequence):
+            seqA = self._check_encoded(seqA)
         if isinstance(seqB, Seq):
             seqB = str(seqB)
+        elif isinstance(seqB, EncodedSequence):
+            seqB = self._check_encoded(seqB)
         return _aligners.PairwiseAligner.score(self, seqA, seqB)
 
 
@@ -6384,6 +6384,25 @@ exit:
     return 0;
 }
 
+static int
+_is_index_buffer(PyObject* argument)
+{
+    /* Check if the argument is a buffer of integer letter indices,
+     * for example as returned by the encode method. */
+    Py_buffer view;
+    int result = 0;
+    const int flag = PyBUF_FORMAT | PyBUF_C_CONTIGUOUS;
+    if (!PyObject_CheckBuffer(argument)) return 0;
+    if (PyObject_GetBuffer(argument, &view, flag) == -1) {
+        PyErr_Clear();
+        return 0;
+    }
+    if ((strcmp(view.format, "i") == 0 || strcmp(view.format, "l") == 0)
+     && view.itemsize == sizeof(int)) result = 1;
+    PyBuffer_Release(&view);
+    return result;
+}
+
 static int
 sequence_converter(PyObject* argument, void* pointer)
 {
@@ -6410,7 +6429,7 @@ sequence_converter(PyObject* argument, void* pointer)
     view->obj = NULL;
 
     mapping = aligner->mapping;
-    if (*mapping == UNMAPPED) {
+    if (*mapping == UNMAPPED && !_is_index_buffer(argument)) {
         if (!convert_objects_to_ints(view, aligner->alphabet, argument)) return 0;
         return Py_CLEANUP_SUPPORTED;
     }
@@ -6676,6 +6695,31 @@ Aligner_align(Aligner* self, PyObject* args, PyObject* keywords)
     return result;
 }
 
+static const char Aligner_encode__doc__[] =
+"encode a sequence as an array of letter indices";
+
+static PyObject*
+Aligner_encode(Aligner* self, PyObject* args, PyObject* keywords)
+{
+    Py_ssize_t n;
+    Py_buffer view = {0};
+    PyObject* result;
+
+    static char *kwlist[] = {"sequence", NULL};
+
+    view.obj = (PyObject*)self;
+    if(!PyArg_ParseTupleAndKeywords(args, keywords, "O&", kwlist,
+                                    sequence_converter, &view))
+        return NULL;
+
+    n = view.len / view.itemsize;
+    result = PyBytes_FromStringAndSize(view.buf, n * sizeof(int));
+
+    sequence_converter(NULL, &view);
+
+    return result;
+}
+
 static char Aligner_doc[] =
 "Aligner.\n";
 
@@ -6690,6 +6734,11 @@ static PyMethodDef Aligner_methods[] = {
      METH_VARARGS | METH_KEYWORDS,
      Aligner_align__doc__
     },
+    {"encode",
+     (PyCFunction)Aligner_encode,
+     METH_VARARGS | METH_KEYWORDS,
+     Aligner_encode__doc__
+    },
     {NULL}  /* Sentinel */
 };
 
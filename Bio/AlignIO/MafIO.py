@@ -33,9 +33,14 @@ For an inclusive end coordinate, we need to use ``end = start + size - 1``.
 A 1-column wide alignment would have ``start == end``.
 """
 import os
-from itertools import islice
+from bisect import bisect_left, bisect_right
+from itertools import accumulate, islice
 
 from sqlite3 import dbapi2
+
+import numpy
+
+from Bio import bgzf
 from Bio.Seq import Seq
 from Bio.SeqRecord import SeqRecord
 from Bio.Align import MultipleSeqAlignment
@@ -246,12 +251,24 @@ def MafIterator(handle, seq_count=None):
             break
 
 
+def _concatenate_ranges(starts, counts):
+    """Concatenate numpy.arange(start, start + count) for each pair (PRIVATE)."""
+    # offset of each range in the result
+    offsets = numpy.cumsum(counts) - counts
+    return numpy.arange(counts.sum()) + numpy.repeat(starts - offsets, counts)
+
+
 class MafIndex:
     """Index for a MAF file.
 
     The index is a sqlite3 database that is built upon creation of the object
-    if necessary, and queried when methods *search* or *get_spliced* are
-    used.
+    if necessary, and queried when methods *search* or *get_spliced* (or their
+    batch versions *search_many* and *get_spliced_many*) are used.
+
+    The MAF file may be compressed with BGZF (e.g. using ``bgzip``), in which
+    case the index stores BGZF virtual offsets. An index built for the
+    uncompressed file can therefore not be used for the compressed file, or
+    vice versa.
     """
 
     def __init__(self, sqlite_file, maf_file, target_seqname):
@@ -264,7 +281,13 @@ class MafIndex:
         # example: Tests/MAF/ucsc_mm9_chr10.maf
         self._maf_file = maf_file
 
-        self._maf_fp = open(self._maf_file)
+        with open(self._maf_file, "rb") as handle:
+            magic = handle.read(2)
+        if magic == b"\x1f\x8b":
+            # This should be a BGZF file; BgzfReader fails for plain gzip
+            self._maf_fp = bgzf.BgzfReader(self._maf_file, "r")
+        else:
+            self._maf_fp = open(self._maf_file)
 
         # if sqlite_file exists, use the existing db, otherwise index the file
         if os.path.isfile(sqlite_file):
@@ -437,12 +460,18 @@ class MafIndex:
         (bin, start, end, offset) tuples where start and end are
         0-based inclusive coordinates.
         """
+        # BGZF virtual offsets cannot be subtracted, so for compressed files
+        # the offset is taken before reading each line
+        compressed = isinstance(self._maf_fp, bgzf.BgzfReader)
+        if compressed:
+            offset = self._maf_fp.tell()
         line = self._maf_fp.readline()
 
         while line:
             if line.startswith("a"):
                 # note the offset
-                offset = self._maf_fp.tell() - len(line)
+                if not compressed:
+                    offset = self._maf_fp.tell() - len(line)
 
                 # search the following lines for a match to target_seqname
                 while True:
@@ -476,6 +505,8 @@ class MafIndex:
 
                             break
 
+            if compressed:
+                offset = self._maf_fp.tell()
             line = self._maf_fp.readline()
 
     # TODO: check coordinate correctness for the two bin-related static methods
@@ -525,17 +556,9 @@ class MafIndex:
         self._maf_fp.seek(offset)
         return next(self._mafiter)
 
-    def search(self, starts, ends):
-        """Search index database for MAF records overlapping ranges provided.
-
-        Returns *MultipleSeqAlignment* results in order by start, then end, then
-        internal offset field.
-
-        *starts* should be a list of 0-based start coordinates of segments in the reference.
-        *ends* should be the list of the corresponding segment ends
-        (in the half-open UCSC convention:
-        http://genome.ucsc.edu/blog/the-ucsc-genome-browser-coordinate-counting-systems/).
-        """
+    @staticmethod
+    def _check_exons(starts, ends):
+        """Check the exon coordinates given to search (PRIVATE)."""
         # verify the provided exon coordinates
         if len(starts) != len(ends):
             raise ValueError("Every position in starts must have a match in ends")
@@ -548,7 +571,86 @@ class MafIndex:
                     "Exon coordinates (%d, %d) invalid: exon length (%d) < 1"
                     % (exonstart, exonend, exonlen)
                 )
-        con = self._con
+
+    def _query(self, exonstart, exonend):
+        """Return (start, end, offset) rows of records overlapping a range (PRIVATE).
+
+        The rows are sorted by start, then end, then offset. The start and end
+        are zero-based "inclusive" coordinates, as stored in the index.
+        """
+        try:
+            possible_bins = ", ".join(map(str, self._region2bin(exonstart, exonend)))
+        except TypeError:
+            raise TypeError(
+                "Exon coordinates must be integers "
+                "(start=%d, end=%d)" % (exonstart, exonend)
+            ) from None
+
+        # https://www.sqlite.org/lang_expr.html
+        # -----
+        # The BETWEEN operator
+        #
+        # The BETWEEN operator is logically equivalent to a pair of
+        # comparisons. "x BETWEEN y AND z" is equivalent to "x>=y AND x<=z"
+        # except that with BETWEEN, the x expression is only evaluated
+        # once. The precedence of the BETWEEN operator is the same as the
+        # precedence as operators == and != and LIKE and groups left to
+        # right.
+        # -----
+
+        # We are testing overlap between the query segment and records in
+        # the index, using non-strict coordinates comparisons.
+        # The query segment end must be passed as end-inclusive
+        # The index should also have been build with end-inclusive
+        # end coordinates.
+        # See https://github.com/biopython/biopython/pull/1086#issuecomment-285069073
+
+        result = self._con.execute(
+            "SELECT DISTINCT start, end, offset FROM offset_data "
+            "WHERE bin IN (%s) "
+            "AND (end BETWEEN %s AND %s OR %s BETWEEN start AND end) "
+            "ORDER BY start, end, offset ASC;"
+            % (possible_bins, exonstart, exonend - 1, exonend - 1)
+        )
+
+        # rows come from the sqlite index,
+        # which should have been written using __make_new_index,
+        # so rec_start and rec_end should be zero-based "inclusive" coordinates
+        return result.fetchall()
+
+    def _fetch(self, rec_start, rec_end, offset):
+        """Retrieve the MAF record for a row of the index, and check it (PRIVATE)."""
+        # Fetch the alignment from the MAF file and check to be sure we've
+        # retrieved the expected record.
+        fetched = self._get_record(int(offset))
+
+        for record in fetched:
+            if record.id == self._target_seqname:
+                # start and size come from the maf lines
+                start = record.annotations["start"]
+                # "inclusive" end is start + length - 1
+                end = start + record.annotations["size"] - 1
+
+                if not (start == rec_start and end == rec_end):
+                    raise ValueError(
+                        "Expected %s-%s @ offset %s, found %s-%s"
+                        % (rec_start, rec_end, offset, start, end)
+                    )
+
+        return fetched
+
+    def search(self, starts, ends):
+        """Search index database for MAF records overlapping ranges provided.
+
+        Returns *MultipleSeqAlignment* results in order by start, then end, then
+        internal offset field.
+
+        *starts* should be a list of 0-based start coordinates of segments in the reference.
+        *ends* should be the list of the corresponding segment ends
+        (in the half-open UCSC convention:
+        http://genome.ucsc.edu/blog/the-ucsc-genome-browser-coordinate-counting-systems/).
+        """
+        self._check_exons(starts, ends)
 
         # Keep track of what blocks have already been yielded
         # in order to avoid duplicating them
@@ -556,73 +658,111 @@ class MafIndex:
         yielded_rec_coords = set()
         # search for every exon
         for exonstart, exonend in zip(starts, ends):
-            try:
-                possible_bins = ", ".join(
-                    map(str, self._region2bin(exonstart, exonend))
-                )
-            except TypeError:
-                raise TypeError(
-                    "Exon coordinates must be integers "
-                    "(start=%d, end=%d)" % (exonstart, exonend)
-                ) from None
-
-            # https://www.sqlite.org/lang_expr.html
-            # -----
-            # The BETWEEN operator
-            #
-            # The BETWEEN operator is logically equivalent to a pair of
-            # comparisons. "x BETWEEN y AND z" is equivalent to "x>=y AND x<=z"
-            # except that with BETWEEN, the x expression is only evaluated
-            # once. The precedence of the BETWEEN operator is the same as the
-            # precedence as operators == and != and LIKE and groups left to
-            # right.
-            # -----
-
-            # We are testing overlap between the query segment and records in
-            # the index, using non-strict coordinates comparisons.
-            # The query segment end must be passed as end-inclusive
-            # The index should also have been build with end-inclusive
-            # end coordinates.
-            # See https://github.com/biopython/biopython/pull/1086#issuecomment-285069073
-
-            result = con.execute(
-                "SELECT DISTINCT start, end, offset FROM offset_data "
-                "WHERE bin IN (%s) "
-                "AND (end BETWEEN %s AND %s OR %s BETWEEN start AND end) "
-                "ORDER BY start, end, offset ASC;"
-                % (possible_bins, exonstart, exonend - 1, exonend - 1)
-            )
-
-            rows = result.fetchall()
-
-            # rows come from the sqlite index,
-            # which should have been written using __make_new_index,
-            # so rec_start and rec_end should be zero-based "inclusive" coordinates
-            for rec_start, rec_end, offset in rows:
+            for rec_start, rec_end, offset in self._query(exonstart, exonend):
                 # Avoid yielding multiple time the same block
                 if (rec_start, rec_end) in yielded_rec_coords:
                     continue
                 else:
                     yielded_rec_coords.add((rec_start, rec_end))
-                # Iterate through hits, fetching alignments from the MAF file
-                # and checking to be sure we've retrieved the expected record.
 
-                fetched = self._get_record(int(offset))
+                yield self._fetch(rec_start, rec_end, offset)
 
-                for record in fetched:
-                    if record.id == self._target_seqname:
-                        # start and size come from the maf lines
-                        start = record.annotations["start"]
-                        # "inclusive" end is start + length - 1
-                        end = start + record.annotations["size"] - 1
+    def _search_regions(self, regions):
+        """Search the index for the records overlapping many regions (PRIVATE).
 
-                        if not (start == rec_start and end == rec_end):
-                            raise ValueError(
-                                "Expected %s-%s @ offset %s, found %s-%s"
-                                % (rec_start, rec_end, offset, start, end)
-                            )
+        *regions* is a list of (starts, ends) pairs. Yields (index, records)
+        tuples, where records is the list of *MultipleSeqAlignment* objects
+        that ``search`` would return for the region with that index.
 
-                yield fetched
+        The exons of all regions are merged into disjoint ranges before
+        querying the database, and the regions are processed in order of
+        their first position so that each MAF record is read only once (as
+        long as it is needed by consecutive regions).
+        """
+        for starts, ends in regions:
+            self._check_exons(starts, ends)
+
+        # query the database once for each range of overlapping exons
+        exons = sorted(
+            (exonstart, exonend)
+            for starts, ends in regions
+            for exonstart, exonend in zip(starts, ends)
+        )
+        rows = set()
+        merged_start = merged_end = None
+        for exonstart, exonend in exons + [(None, None)]:
+            if merged_end is not None and exonstart is not None:
+                if exonstart <= merged_end:
+                    merged_end = max(merged_end, exonend)
+                    continue
+            if merged_end is not None:
+                rows.update(self._query(merged_start, merged_end))
+            merged_start, merged_end = exonstart, exonend
+        rows = sorted(rows)
+        row_starts = [row[0] for row in rows]
+        # largest end of the rows up to each index, to find the first row
+        # that can overlap an exon
+        max_ends = list(accumulate((row[1] for row in rows), max))
+
+        order = sorted(
+            (i for i, (starts, ends) in enumerate(regions) if starts),
+            key=lambda i: min(regions[i][0]),
+        )
+        # the records read so far which may overlap the following regions
+        cache = {}
+        for n, i in enumerate(order):
+            starts, ends = regions[i]
+            yielded_rec_coords = set()
+            fetched = []
+            for exonstart, exonend in zip(starts, ends):
+                first = bisect_left(max_ends, exonstart)
+                last = bisect_right(row_starts, exonend - 1)
+                for rec_start, rec_end, offset in rows[first:last]:
+                    if rec_end < exonstart:
+                        continue
+                    # Avoid returning multiple time the same block
+                    if (rec_start, rec_end) in yielded_rec_coords:
+                        continue
+                    yielded_rec_coords.add((rec_start, rec_end))
+                    try:
+                        record = cache[offset][1]
+                    except KeyError:
+                        record = self._fetch(rec_start, rec_end, offset)
+                        cache[offset] = (rec_end, record)
+                    fetched.append(record)
+            yield i, fetched
+            # forget the records which end before the next region
+            if n + 1 < len(order):
+                next_start = min(regions[order[n + 1]][0])
+                for offset in [k for k, v in cache.items() if v[0] < next_start]:
+                    del cache[offset]
+        for i, (starts, ends) in enumerate(regions):
+            if not starts:
+                yield i, []
+
+    def search_many(self, regions):
+        """Search index database for MAF records overlapping many regions.
+
+        *regions* should be an iterable of (starts, ends) pairs, each of which
+        is as taken by the ``search`` method. For each region, in the same
+        order, returns the list of *MultipleSeqAlignment* objects that
+        ``search`` would return.
+
+        This is faster than calling ``search`` for each region, as the
+        database is queried once for each set of overlapping regions, and
+        MAF records shared by several regions are read only once. Regions
+        should preferably be given in order of their position on the target
+        sequence, as the results for out of order regions are kept in memory
+        until they can be returned.
+        """
+        regions = [(list(starts), list(ends)) for starts, ends in regions]
+        results = {}
+        next_index = 0
+        for i, fetched in self._search_regions(regions):
+            results[i] = fetched
+            while next_index in results:
+                yield results.pop(next_index)
+                next_index += 1
 
     def get_spliced(self, starts, ends, strand=1):
         """Return a multiple alignment of the exact sequence range provided.
@@ -647,6 +787,39 @@ class MafIndex:
         # pull all alignments that span the desired intervals
         fetched = list(self.search(starts, ends))
 
+        return self._splice(fetched, starts, ends, strand)
+
+    def get_spliced_many(self, regions, strand=1):
+        """Return multiple alignments of many sequence ranges.
+
+        *regions* should be an iterable of (starts, ends) pairs, or
+        (starts, ends, strand) tuples, each of which is as taken by the
+        ``get_spliced`` method; *strand* is used for the regions without one.
+        For each region, in the same order, returns the *MultipleSeqAlignment*
+        that ``get_spliced`` would return.
+
+        As for ``search_many``, this reads the MAF records shared by several
+        regions (e.g. the exons of overlapping genes) only once, and works
+        best for regions sorted by position.
+        """
+        regions = [tuple(region) for region in regions]
+        strands = [region[2] if len(region) > 2 else strand for region in regions]
+        for region_strand in strands:
+            # validate strand
+            if region_strand not in (1, -1):
+                raise ValueError("Strand must be 1 or -1, got %s" % str(region_strand))
+        regions = [(list(region[0]), list(region[1])) for region in regions]
+        results = {}
+        next_index = 0
+        for i, fetched in self._search_regions(regions):
+            starts, ends = regions[i]
+            results[i] = self._splice(fetched, starts, ends, strands[i])
+            while next_index in results:
+                yield results.pop(next_index)
+                next_index += 1
+
+    def _splice(self, fetched, starts, ends, strand):
+        """Splice the exons out of the MAF records found by search (PRIVATE)."""
         # keep track of the expected letter count
         # (sum of lengths of [start, end) segments,
         # where [start, end) half-open)
@@ -661,24 +834,14 @@ class MafIndex:
         # find the union of all IDs in these alignments
         all_seqnames = {sequence.id for multiseq in fetched for sequence in multiseq}
 
-        # split every record by base position
-        # key: sequence name
-        # value: dictionary
-        #        key: position in the reference sequence
-        #        value: letter(s) (including letters
-        #               aligned to the "-" preceding the letter
-        #               at the position in the reference, if any)
-        split_by_position = {seq_name: {} for seq_name in all_seqnames}
-
-        # keep track of what the total number of (unspliced) letters should be
-        total_rec_length = 0
+        # find the target_seqname in each MultipleSeqAlignment, with the
+        # positions it covers
+        blocks = []
 
         # track first strand encountered on the target seqname
         ref_first_strand = None
 
         for multiseq in fetched:
-            # find the target_seqname in this MultipleSeqAlignment and use it to
-            # set the parameters for the rest of this iteration
             for seqrec in multiseq:
                 if seqrec.id == self._target_seqname:
                     try:
@@ -698,20 +861,11 @@ class MafIndex:
                             "No strand information for target seqname (%s)"
                             % self._target_seqname
                         ) from None
-                    # length including gaps (i.e. alignment length)
-                    rec_length = len(seqrec)
                     rec_start = seqrec.annotations["start"]
                     ungapped_length = seqrec.annotations["size"]
                     # inclusive end in zero-based coordinates of the reference
                     rec_end = rec_start + ungapped_length - 1
-                    # This is length in terms of actual letters in the reference
-                    total_rec_length += ungapped_length
-
-                    # blank out these positions for every seqname
-                    for seqrec in multiseq:
-                        for pos in range(rec_start, rec_end + 1):
-                            split_by_position[seqrec.id][pos] = ""
-
+                    blocks.append((multiseq, seqrec, rec_start, rec_end))
                     break
             # http://psung.blogspot.fr/2007/12/for-else-in-python.html
             # https://docs.python.org/2/tutorial/controlflow.html#break-and-continue-statements-and-else-clauses-on-loops
@@ -720,6 +874,137 @@ class MafIndex:
                     "Did not find %s in alignment bundle" % (self._target_seqname,)
                 )
 
+        # The column-wise splicing requires each position of the target to be
+        # covered by at most one block, and each sequence to appear at most
+        # once per block; otherwise fall back to the position-wise splicing
+        ordered = sorted(blocks, key=lambda block: block[2])
+        if all(
+            rec_start <= rec_end
+            and len({seqrec.id for seqrec in multiseq}) == len(multiseq)
+            for multiseq, seqrec, rec_start, rec_end in blocks
+        ) and all(prev[3] < block[2] for prev, block in zip(ordered, ordered[1:])):
+            subseq = self._splice_columns(ordered, all_seqnames, starts, ends)
+        else:
+            subseq = self._splice_positions(blocks, all_seqnames, starts, ends)
+
+        # make sure we're returning the right number of letters
+        if len(subseq[self._target_seqname].replace("-", "")) != expected_letters:
+            raise ValueError(
+                "Returning %s letters for target seqname (%s), expected %s"
+                % (
+                    len(subseq[self._target_seqname].replace("-", "")),
+                    self._target_seqname,
+                    expected_letters,
+                )
+            )
+
+        # check to make sure all sequences are the same length as the target seqname
+        ref_subseq_len = len(subseq[self._target_seqname])
+
+        for seqid, seq in subseq.items():
+            if len(seq) != ref_subseq_len:
+                raise ValueError(
+                    "Returning length %s for %s, expected %s"
+                    % (len(seq), seqid, ref_subseq_len)
+                )
+
+        # finally, build a MultipleSeqAlignment object for our final sequences
+        result_multiseq = []
+
+        for seqid, seq in subseq.items():
+            seq = Seq(seq)
+
+            seq = seq if strand == ref_first_strand else seq.reverse_complement()
+
+            result_multiseq.append(SeqRecord(seq, id=seqid, name=seqid, description=""))
+
+        return MultipleSeqAlignment(result_multiseq)
+
+    def _splice_columns(self, blocks, all_seqnames, starts, ends):
+        """Splice the exons out of non-overlapping blocks using NumPy (PRIVATE).
+
+        Each position in the target sequence takes the alignment columns from
+        its letter up to (but excluding) its next letter, so that the letters
+        aligned to gaps in the target go with the position after them. The
+        blocks must be sorted by their start position.
+        """
+        positions = numpy.concatenate(
+            [
+                numpy.arange(exonstart, exonend)
+                for exonstart, exonend in zip(starts, ends)
+            ]
+        )
+        block_starts = numpy.array([block[2] for block in blocks])
+        block_ends = numpy.array([block[3] for block in blocks])
+        # index of the block covering each position, or -1
+        indices = numpy.searchsorted(block_starts, positions, side="right") - 1
+        indices[positions > block_ends[indices]] = -1
+
+        # the columns of each block to copy to the columns of the spliced
+        # alignment; positions not covered by any block are filled with one
+        # filler character, as are sequences not in the block covering them
+        lows = numpy.zeros(len(positions), int)
+        highs = numpy.ones(len(positions), int)
+        for index, (multiseq, seqrec, rec_start, rec_end) in enumerate(blocks):
+            wanted = indices == index
+            target = numpy.frombuffer(str(seqrec.seq).encode("ASCII"), numpy.uint8)
+            letters = target != ord("-")
+            # position of the letter before (or at) each column
+            column_positions = rec_start + numpy.minimum(
+                numpy.cumsum(letters) - letters, rec_end - rec_start
+            )
+            lows[wanted] = numpy.searchsorted(column_positions, positions[wanted])
+            highs[wanted] = numpy.searchsorted(
+                column_positions, positions[wanted], side="right"
+            )
+        counts = highs - lows
+        offsets = numpy.cumsum(counts) - counts
+        length = counts.sum()
+
+        spliced = {}
+        for seqid in all_seqnames:
+            filler_char = "N" if seqid == self._target_seqname else "-"
+            spliced[seqid] = numpy.full(length, ord(filler_char), numpy.uint8)
+        for index, (multiseq, seqrec, rec_start, rec_end) in enumerate(blocks):
+            wanted = numpy.flatnonzero(indices == index)
+            if len(wanted) == 0:
+                continue
+            columns = _concatenate_ranges(lows[wanted], counts[wanted])
+            spliced_columns = _concatenate_ranges(offsets[wanted], counts[wanted])
+            for record in multiseq:
+                row = numpy.frombuffer(str(record.seq).encode("ASCII"), numpy.uint8)
+                spliced[record.id][spliced_columns] = row[columns]
+
+        # keep the order of the sequence names used by _splice_positions
+        return {
+            seqid: spliced[seqid].tobytes().decode("ASCII") for seqid in all_seqnames
+        }
+
+    def _splice_positions(self, blocks, all_seqnames, starts, ends):
+        """Splice the exons out of the blocks, one position at a time (PRIVATE)."""
+        # split every record by base position
+        # key: sequence name
+        # value: dictionary
+        #        key: position in the reference sequence
+        #        value: letter(s) (including letters
+        #               aligned to the "-" preceding the letter
+        #               at the position in the reference, if any)
+        split_by_position = {seq_name: {} for seq_name in all_seqnames}
+
+        # keep track of what the total number of (unspliced) letters should be
+        total_rec_length = 0
+
+        for multiseq, seqrec, rec_start, rec_end in blocks:
+            # length including gaps (i.e. alignment length)
+            rec_length = len(seqrec)
+            # This is length in terms of actual letters in the reference
+            total_rec_length += rec_end - rec_start + 1
+
+            # blank out these positions for every seqname
+            for seqrec in multiseq:
+                for pos in range(rec_start, rec_end + 1):
+                    split_by_position[seqrec.id][pos] = ""
+
             # the true, chromosome/contig/etc position in the target seqname
             real_pos = rec_start
 
@@ -786,43 +1071,12 @@ class MafIndex:
 
             subseq[seqid] = "".join(seq_splice)
 
-        # make sure we're returning the right number of letters
-        if len(subseq[self._target_seqname].replace("-", "")) != expected_letters:
-            raise ValueError(
-                "Returning %s letters for target seqname (%s), expected %s"
-                % (
-                    len(subseq[self._target_seqname].replace("-", "")),
-                    self._target_seqname,
-                    expected_letters,
-                )
-            )
-
-        # check to make sure all sequences are the same length as the target seqname
-        ref_subseq_len = len(subseq[self._target_seqname])
-
-        for seqid, seq in subseq.items():
-            if len(seq) != ref_subseq_len:
-                raise ValueError(
-                    "Returning length %s for %s, expected %s"
-                    % (len(seq), seqid, ref_subseq_len)
-                )
-
-        # finally, build a MultipleSeqAlignment object for our final sequences
-        result_multiseq = []
-
-        for seqid, seq in subseq.items():
-            seq = Seq(seq)
-
-            seq = seq if strand == ref_first_strand else seq.reverse_complement()
-
-            result_multiseq.append(SeqRecord(seq, id=seqid, name=seqid, description=""))
-
-        return MultipleSeqAlignment(result_multiseq)
+        return subseq
 
     def __repr__(self):
         """Return a string representation of the index."""
         return "MafIO.MafIndex(%r, target_seqname=%r)" % (
-            self._maf_fp.name,
+            self._maf_file,
             self._target_seqname,
         )
 
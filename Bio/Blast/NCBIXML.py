@@ -23,6 +23,12 @@ class _XMLparser(ContentHandler):
     Just a very basic SAX parser.
 
     Redefine the methods startElement, characters and endElement.
+
+    The methods _start_element and _end_element do the same work as
+    startElement and endElement without any debug output, looking up
+    the action methods in tables keyed by tag name which are compiled
+    once from the method map.  With these, the character data should be
+    collected by appending to the _buffer list.
     """
 
     def __init__(self, debug=0):
@@ -38,6 +44,9 @@ class _XMLparser(ContentHandler):
         self._debug_ignore_list = []
         self._method_name_level = 1
         self._method_map = None
+        self._start_map = None
+        self._end_map = None
+        self._buffer = []
 
     def startElement(self, name, attr):
         """Found XML start tag.
@@ -122,6 +131,60 @@ class _XMLparser(ContentHandler):
             return name
         return "/".join(self._tag[-self._method_name_level :])
 
+    def _compile_method_map(self):
+        """Split the method map into tables keyed by tag (PRIVATE).
+
+        The keys are the tag names, or tuples of the parent and tag names
+        if the method names include the parent tag.
+        """
+        self._start_map = {}
+        self._end_map = {}
+        for method, action in self._method_map.items():
+            event, key = method.split("_", 1)
+            if self._method_name_level > 1:
+                key = tuple(key.split("/"))
+            if event == "start":
+                self._start_map[key] = action
+            else:
+                self._end_map[key] = action
+
+    def _start_element(self, name, attr):
+        """Found XML start tag, using the compiled tables (PRIVATE)."""
+        tag = self._tag
+        tag.append(name)
+        if len(tag) == 1:
+            # root node
+            self._on_root_node(name)
+            self._compile_method_map()
+            return
+        if self._method_name_level == 1:
+            action = self._start_map.get(name)
+        else:
+            action = self._start_map.get(tuple(tag[-self._method_name_level :]))
+        if action is not None:
+            action()
+        buffer = self._buffer
+        if buffer:
+            value = "".join(buffer)
+            if value.strip():
+                raise ValueError(
+                    "What should we do with %s before the %r tag?" % (value, name)
+                )
+            buffer.clear()
+
+    def _end_element(self, name):
+        """Found XML end tag, using the compiled tables (PRIVATE)."""
+        tag = self._tag
+        if self._method_name_level == 1:
+            action = self._end_map.get(name)
+        else:
+            action = self._end_map.get(tuple(tag[-self._method_name_level :]))
+        if action is not None:
+            self._value = "".join(self._buffer)
+            action()
+        self._buffer.clear()
+        tag.pop()
+
 
 class BlastParser(_XMLparser):
     """Parse XML BLAST data into a Record.Blast object.
@@ -138,16 +201,20 @@ class BlastParser(_XMLparser):
 
     """
 
-    def __init__(self, debug=0):
+    def __init__(self, debug=0, alignments=True):
         """Initialize the parser.
 
         Arguments:
          - debug - integer, amount of debug information to print
+         - alignments - boolean, if False the alignment strings of the
+           HSPs (query, sbjct and match) are not recorded
 
         """
         # Calling superclass method
         _XMLparser.__init__(self, debug)
 
+        self._alignments = alignments
+
         self._parser = xml.sax.make_parser()
         self._parser.setContentHandler(self)
 
@@ -178,6 +245,17 @@ class BlastParser(_XMLparser):
                 "Invalid root node name: %s. Root node should be either"
                 " BlastOutput or BlastXML2" % name
             )
+        if not self._alignments:
+            skipped = (
+                self._set_hsp_query_seq,
+                self._set_hsp_subject_seq,
+                self._set_hsp_midline,
+            )
+            self._method_map = {
+                method: action
+                for method, action in self._method_map.items()
+                if action not in skipped
+            }
 
     def _setup_blast_v1(self):
         self._method_map = {
@@ -732,7 +810,7 @@ class BlastParser(_XMLparser):
         self._hit_descr_item.sciname = self._value
 
 
-def read(handle, debug=0):
+def read(handle, debug=0, alignments=True):
     """Return a single Blast record (assumes just one query).
 
     Uses the BlastParser internally.
@@ -743,7 +821,7 @@ def read(handle, debug=0):
     Use the Bio.Blast.NCBIXML.parse() function if you expect more than
     one BLAST record (i.e. if you have more than one query sequence).
     """
-    iterator = parse(handle, debug)
+    iterator = parse(handle, debug, alignments)
     try:
         record = next(iterator)
     except StopIteration:
@@ -756,7 +834,7 @@ def read(handle, debug=0):
     return record
 
 
-def parse(handle, debug=0):
+def parse(handle, debug=0, alignments=True):
     """Return an iterator a Blast record for each query.
 
     Incremental parser, this is an iterator that returns
@@ -764,6 +842,9 @@ def parse(handle, debug=0):
 
     handle - file handle to and XML file to parse
     debug - integer, amount of debug information to print
+    alignments - boolean, if False the alignment strings of each HSP
+    (query, sbjct and match) are left empty, which saves time and
+    memory when only the scores and coordinates are needed
 
     This is a generator function that returns multiple Blast records
     objects - one for each query sequence given to blast.  The file
@@ -776,10 +857,22 @@ def parse(handle, debug=0):
     Should also cope with XML output from older versions BLAST which
     gave multiple XML files concatenated together (giving a single file
     which strictly speaking wasn't valid XML).
+
+    Unless debug information is requested, the expat callbacks look up
+    the action for each tag in tables compiled once per XML file.
+
+    >>> from Bio.Blast import NCBIXML
+    >>> with open("Blast/xml_2212L_blastp_001.xml") as handle:
+    ...     record = NCBIXML.read(handle, alignments=False)
+    ...
+    >>> hsp = record.alignments[0].hsps[0]
+    >>> print(hsp.expect, hsp.query_start, hsp.query_end, repr(hsp.query))
+    4.20576e-46 1 103 ''
+
     """
     from xml.parsers import expat
 
-    BLOCK = 1024
+    BLOCK = 65536
     MARGIN = 10  # must be at least length of newline + XML start
     XML_START = "<?xml"
     NEW_LINE = "\n"
@@ -807,20 +900,23 @@ def parse(handle, debug=0):
             )
 
         expat_parser = expat.ParserCreate()
-        blast_parser = BlastParser(debug)
-        expat_parser.StartElementHandler = blast_parser.startElement
-        expat_parser.EndElementHandler = blast_parser.endElement
-        expat_parser.CharacterDataHandler = blast_parser.characters
-
-        expat_parser.Parse(text, False)
-        while blast_parser._records:
-            record = blast_parser._records[0]
-            blast_parser._records = blast_parser._records[1:]
-            yield record
-
+        blast_parser = BlastParser(debug, alignments)
+        if debug:
+            expat_parser.StartElementHandler = blast_parser.startElement
+            expat_parser.EndElementHandler = blast_parser.endElement
+            expat_parser.CharacterDataHandler = blast_parser.characters
+        else:
+            expat_parser.buffer_text = True
+            expat_parser.StartElementHandler = blast_parser._start_element
+            expat_parser.EndElementHandler = blast_parser._end_element
+            expat_parser.CharacterDataHandler = blast_parser._buffer.append
+
+        # The first block may already hold the start of the next XML file,
+        # so check it in the loop below like all other blocks
+        text, pending = NULL, text
         while True:
             # Read in another block of the file...
-            text, pending = pending + handle.read(BLOCK), ""
+            text, pending = pending + handle.read(BLOCK), NULL
             if not text:
                 # End of the file!
                 expat_parser.Parse(NULL, True)  # End of XML record
@@ -862,3 +958,9 @@ def parse(handle, debug=0):
     assert not text, text
     assert not pending, pending
     assert len(blast_parser._records) == 0, len(blast_parser._records)
+
+
+if __name__ == "__main__":
+    from Bio._utils import run_doctest
+
+    run_doctest()
@@ -41,7 +41,6 @@ import os
 import warnings
 from collections import Counter
 from xml.parsers import expat
-from io import BytesIO
 import xml.etree.ElementTree as ET
 from xml.sax.saxutils import escape
 
@@ -300,9 +299,16 @@ class DataHandler(metaclass=DataHandlerMeta):
 
     del Entrez
 
-    def __init__(self, validate, escape):
+    # Contents of the DTD files read so far, and the element models found
+    # in the DTD or XSD of each type of XML file, keyed by their URL. These
+    # are shared by all DataHandler objects in the process.
+    dtd_texts = {}
+    models = {}
+
+    def __init__(self, validate, escape, plain=False):
         """Create a DataHandler object."""
         self.dtd_urls = []
+        self.model_cached = False
         self.element = None
         self.level = 0
         self.data = []
@@ -314,6 +320,8 @@ class DataHandler(metaclass=DataHandlerMeta):
         self.items = set()
         self.errors = set()
         self.validating = validate
+        self.plain = plain
+        self.stack = []
         self.parser = expat.ParserCreate(namespace_separator=" ")
         self.parser.SetParamEntityParsing(expat.XML_PARAM_ENTITY_PARSING_ALWAYS)
         self.parser.XmlDeclHandler = self.xmlDeclHandler
@@ -381,50 +389,60 @@ class DataHandler(metaclass=DataHandlerMeta):
         while True:
             # Read in another block of data from the file.
             data = handle.read(BLOCK)
-            try:
-                self.parser.Parse(data, False)
-            except expat.ExpatError as e:
-                if self.parser.StartElementHandler:
-                    # We saw the initial <!xml declaration, so we can be sure
-                    # that we are parsing XML data. Most likely, the XML file
-                    # is corrupted.
-                    raise CorruptedXMLError(e) from None
-                else:
-                    # We have not seen the initial <!xml declaration, so
-                    # probably the input data is not in XML format.
-                    raise NotXMLError(e) from None
-            try:
-                records = self.record
-            except AttributeError:
-                if self.parser.StartElementHandler:
-                    # We saw the initial <!xml declaration, and expat
-                    # didn't notice any errors, so self.record should be
-                    # defined. If not, this is a bug.
-
-                    raise RuntimeError(
-                        "Failed to parse the XML file correctly, possibly due to a "
-                        "bug in Bio.Entrez. Please contact the Biopython "
-                        "developers via the mailing list or GitHub for assistance."
-                    ) from None
-                else:
-                    # We did not see the initial <!xml declaration, so
-                    # probably the input data is not in XML format.
-                    raise NotXMLError("XML declaration not found") from None
-
-            if not isinstance(records, list):
-                raise ValueError(
-                    "The XML file does not represent a list. Please use Entrez.read "
-                    "instead of Entrez.parse"
-                )
-
+            yield from self.feed(data)
             if not data:
                 break
 
+    def feed(self, data):
+        """Parse a block of XML data, and return the records finished so far.
+
+        This allows the XML to be parsed incrementally as the data arrive,
+        for example from a network connection. Pass empty data at the end
+        of the XML to obtain the last record.
+        """
+        try:
+            self.parser.Parse(data, False)
+        except expat.ExpatError as e:
+            if self.parser.StartElementHandler:
+                # We saw the initial <!xml declaration, so we can be sure
+                # that we are parsing XML data. Most likely, the XML file
+                # is corrupted.
+                raise CorruptedXMLError(e) from None
+            else:
+                # We have not seen the initial <!xml declaration, so
+                # probably the input data is not in XML format.
+                raise NotXMLError(e) from None
+        try:
+            records = self.record
+        except AttributeError:
+            if self.parser.StartElementHandler:
+                # We saw the initial <!xml declaration, and expat
+                # didn't notice any errors, so self.record should be
+                # defined. If not, this is a bug.
+
+                raise RuntimeError(
+                    "Failed to parse the XML file correctly, possibly due to a "
+                    "bug in Bio.Entrez. Please contact the Biopython "
+                    "developers via the mailing list or GitHub for assistance."
+                ) from None
+            else:
+                # We did not see the initial <!xml declaration, so
+                # probably the input data is not in XML format.
+                raise NotXMLError("XML declaration not found") from None
+
+        if not isinstance(records, list):
+            raise ValueError(
+                "The XML file does not represent a list. Please use Entrez.read "
+                "instead of Entrez.parse"
+            )
+
+        if data:
+            finished = []
             while len(records) >= 2:
                 # Then the first record is finished, while the second record
                 # is still a work in progress.
-                record = records.pop(0)
-                yield record
+                finished.append(records.pop(0))
+            return finished
 
         # We have reached the end of the XML file
         self.parser = None
@@ -433,7 +451,7 @@ class DataHandler(metaclass=DataHandlerMeta):
             raise CorruptedXMLError("Premature end of data")
 
         # Send out the remaining records
-        yield from records
+        return records
 
     def xmlDeclHandler(self, version, encoding, standalone):
         """Set XML handlers when an XML declaration is found."""
@@ -488,17 +506,23 @@ class DataHandler(metaclass=DataHandlerMeta):
         """Process the XML schema (before processing the element)."""
         key = "%s noNamespaceSchemaLocation" % self.schema_namespace
         schema = attrs[key]
-        handle = self.open_xsd_file(os.path.basename(schema))
-        # if there is no local xsd file grab the url and parse the file
-        if not handle:
-            handle = urlopen(schema)
-            text = handle.read()
-            self.save_xsd_file(os.path.basename(schema), text)
-            handle.close()
-            self.parse_xsd(ET.fromstring(text))
+        try:
+            model = DataHandler.models[schema]
+        except KeyError:
+            handle = self.open_xsd_file(os.path.basename(schema))
+            # if there is no local xsd file grab the url and parse the file
+            if not handle:
+                handle = urlopen(schema)
+                text = handle.read()
+                self.save_xsd_file(os.path.basename(schema), text)
+                handle.close()
+                self.parse_xsd(ET.fromstring(text))
+            else:
+                self.parse_xsd(ET.fromstring(handle.read()))
+                handle.close()
+            self.save_model(schema)
         else:
-            self.parse_xsd(ET.fromstring(handle.read()))
-            handle.close()
+            self.load_model(model)
         # continue handling the element
         self.startElementHandler(name, attrs)
         # reset the element handler
@@ -513,54 +537,24 @@ class DataHandler(metaclass=DataHandlerMeta):
             del attrs["Type"]
             if itemtype == "Structure":
                 del attrs["Name"]
-                element = DictionaryElement(
+                self.startDictionaryElement(
                     name, attrs, allowed_tags=None, repeated_tags=None
                 )
-                parent = self.element
-                element.parent = parent
-                # For consistency with lists below, store the element here
-                if parent is None:
-                    self.record = element
-                else:
-                    parent.store(element)
-                self.element = element
-                self.parser.EndElementHandler = self.endElementHandler
-                self.parser.CharacterDataHandler = self.skipCharacterDataHandler
             elif name in ("ArticleIds", "History"):
                 del attrs["Name"]
                 allowed_tags = None  # allowed tags are unknown
                 repeated_tags = frozenset(["pubmed", "medline"])
-                element = DictionaryElement(
+                self.startDictionaryElement(
                     tag,
                     attrs,
                     allowed_tags=allowed_tags,
                     repeated_tags=repeated_tags,
                     key=name,
                 )
-                parent = self.element
-                element.parent = parent
-                # For consistency with lists below, store the element here
-                if parent is None:
-                    self.record = element
-                else:
-                    parent.store(element)
-                self.element = element
-                self.parser.EndElementHandler = self.endElementHandler
-                self.parser.CharacterDataHandler = self.skipCharacterDataHandler
             elif itemtype == "List":
                 del attrs["Name"]
                 allowed_tags = None  # allowed tags are unknown
-                element = ListElement(tag, attrs, allowed_tags, name)
-                parent = self.element
-                element.parent = parent
-                if self.element is None:
-                    # Set self.record here to let Entrez.parse iterate over it
-                    self.record = element
-                else:
-                    parent.store(element)
-                self.element = element
-                self.parser.EndElementHandler = self.endElementHandler
-                self.parser.CharacterDataHandler = self.skipCharacterDataHandler
+                self.startListElement(tag, attrs, allowed_tags, name)
             elif itemtype == "Integer":
                 self.parser.EndElementHandler = self.endIntegerElementHandler
                 self.parser.CharacterDataHandler = self.characterDataHandler
@@ -586,30 +580,10 @@ class DataHandler(metaclass=DataHandlerMeta):
             self.attributes = attrs
         elif tag in self.dictionaries:
             allowed_tags, repeated_tags = self.dictionaries[tag]
-            element = DictionaryElement(tag, attrs, allowed_tags, repeated_tags)
-            parent = self.element
-            element.parent = parent
-            # For consistency with lists below, store the element here
-            if parent is None:
-                self.record = element
-            else:
-                parent.store(element)
-            self.element = element
-            self.parser.EndElementHandler = self.endElementHandler
-            self.parser.CharacterDataHandler = self.skipCharacterDataHandler
+            self.startDictionaryElement(tag, attrs, allowed_tags, repeated_tags)
         elif tag in self.lists:
             allowed_tags = self.lists[tag]
-            element = ListElement(tag, attrs, allowed_tags)
-            parent = self.element
-            element.parent = parent
-            if parent is None:
-                # Set self.record here to let Entrez.parse iterate over it
-                self.record = element
-            else:
-                parent.store(element)
-            self.element = element
-            self.parser.EndElementHandler = self.endElementHandler
-            self.parser.CharacterDataHandler = self.skipCharacterDataHandler
+            self.startListElement(tag, attrs, allowed_tags)
         else:
             # Element not found in DTD
             if self.validating:
@@ -621,6 +595,69 @@ class DataHandler(metaclass=DataHandlerMeta):
                 self.parser.CharacterDataHandler = self.skipCharacterDataHandler
                 self.level = 1
 
+    def startDictionaryElement(
+        self, tag, attrs, allowed_tags, repeated_tags=None, key=None
+    ):
+        """Start a new dictionary element and make it the current element."""
+        if self.plain:
+            element = {}
+            if repeated_tags:
+                for repeated_tag in repeated_tags:
+                    element[repeated_tag] = []
+        else:
+            element = DictionaryElement(tag, attrs, allowed_tags, repeated_tags, key)
+        self.startContainerElement(element, tag, key, allowed_tags, repeated_tags)
+
+    def startListElement(self, tag, attrs, allowed_tags, key=None):
+        """Start a new list element and make it the current element."""
+        if self.plain:
+            element = []
+        else:
+            element = ListElement(tag, attrs, allowed_tags, key)
+        self.startContainerElement(element, tag, key, allowed_tags, None)
+
+    def startContainerElement(self, element, tag, key, allowed_tags, repeated_tags):
+        """Store a new list or dictionary element.
+
+        The element is stored in its parent when it is started; this lets
+        Entrez.parse iterate over the records in a list while it is filled.
+        """
+        parent = self.element
+        if parent is None:
+            self.record = element
+        elif self.plain:
+            self.storePlain(element, tag, key)
+        else:
+            parent.store(element)
+        if self.plain:
+            self.stack.append((element, allowed_tags, repeated_tags))
+        else:
+            element.parent = parent
+        self.element = element
+        self.parser.EndElementHandler = self.endElementHandler
+        self.parser.CharacterDataHandler = self.skipCharacterDataHandler
+
+    def storePlain(self, value, tag, key=None):
+        """Store a plain value in the current element, checking tags.
+
+        This does the same as the store methods of ListElement and
+        DictionaryElement, for plain lists and dictionaries.
+        """
+        if key is None:
+            key = tag
+        element, allowed_tags, repeated_tags = self.stack[-1]
+        if isinstance(element, list):
+            if allowed_tags is not None and key not in allowed_tags:
+                raise ValueError("Unexpected item '%s' in list" % key)
+            element.append(value)
+        else:
+            if allowed_tags is not None and tag not in allowed_tags:
+                raise ValueError("Unexpected item '%s' in dictionary" % key)
+            if repeated_tags and key in repeated_tags:
+                element[key].append(value)
+            else:
+                element[key] = value
+
     def startRawElementHandler(self, name, attrs):
         """Handle start of an XML raw element."""
         # check if the name is in a namespace
@@ -669,10 +706,12 @@ class DataHandler(metaclass=DataHandlerMeta):
             del attributes["Name"]
         else:
             key = tag
-        value = StringElement(value, tag, attributes, key)
         if element is None:
             self.record = element
+        elif self.plain:
+            self.storePlain(value, tag, key)
         else:
+            value = StringElement(value, tag, attributes, key)
             element.store(value)
         self.allowed_tags = None
 
@@ -709,6 +748,14 @@ class DataHandler(metaclass=DataHandlerMeta):
 
     def endElementHandler(self, name):
         """Handle end of an XML element."""
+        if self.plain:
+            stack = self.stack
+            stack.pop()
+            if stack:
+                self.element = stack[-1][0]
+            else:
+                self.element = None
+            return
         element = self.element
         self.element = element.parent
         del element.parent
@@ -723,7 +770,10 @@ class DataHandler(metaclass=DataHandlerMeta):
         if self.data:
             value = int("".join(self.data))
             self.data = []
-            value = IntegerElement(value, tag, attributes, key)
+            if not self.plain:
+                value = IntegerElement(value, tag, attributes, key)
+        elif self.plain:
+            value = None
         else:
             value = NoneElement(tag, attributes, key)
         element = self.element
@@ -732,6 +782,9 @@ class DataHandler(metaclass=DataHandlerMeta):
         else:
             self.parser.EndElementHandler = self.endElementHandler
             self.parser.CharacterDataHandler = self.skipCharacterDataHandler
+            if self.plain:
+                self.storePlain(value, tag, key)
+                return
             if value is None:
                 return
             element.store(value)
@@ -958,6 +1011,11 @@ class DataHandler(metaclass=DataHandlerMeta):
         DTD results in much faster parsing. If the DTD is not found locally,
         we try to download it. If new DTDs become available from NCBI,
         putting them in Bio/Entrez/DTDs will allow the parser to see them.
+
+        The contents of each DTD, and the element model of each type of XML
+        file, are kept in memory, so that parsing another XML file of the
+        same type can skip reading the DTD files and analyzing the element
+        declarations.
         """
         urlinfo = urlparse(systemId)
         if urlinfo.scheme in ["http", "https", "ftp"]:
@@ -978,28 +1036,67 @@ class DataHandler(metaclass=DataHandlerMeta):
             url = source.rstrip("/") + "/" + systemId
         else:
             raise ValueError("Unexpected URL scheme %r" % urlinfo.scheme)
-        self.dtd_urls.append(url)
-        # First, try to load the local version of the DTD file
-        location, filename = os.path.split(systemId)
-        handle = self.open_dtd_file(filename)
-        if not handle:
-            # DTD is not available as a local file. Try accessing it through
-            # the internet instead.
+        if not self.dtd_urls:
+            # This is the DTD of the XML file. If we have seen it before, we
+            # can skip the element declarations in this DTD and the DTDs it
+            # includes. They still need to be parsed for their entities and
+            # default attributes.
             try:
-                handle = urlopen(url)
-            except OSError:
-                raise RuntimeError(
-                    "Failed to access %s at %s" % (filename, url)
-                ) from None
-            text = handle.read()
-            handle.close()
-            self.save_dtd_file(filename, text)
-            handle = BytesIO(text)
+                model = DataHandler.models[url]
+            except KeyError:
+                self.model_cached = False
+            else:
+                self.load_model(model)
+                self.model_cached = True
+        self.dtd_urls.append(url)
+        try:
+            text = DataHandler.dtd_texts[url]
+        except KeyError:
+            # First, try to load the local version of the DTD file
+            location, filename = os.path.split(systemId)
+            handle = self.open_dtd_file(filename)
+            if not handle:
+                # DTD is not available as a local file. Try accessing it
+                # through the internet instead.
+                try:
+                    handle = urlopen(url)
+                except OSError:
+                    raise RuntimeError(
+                        "Failed to access %s at %s" % (filename, url)
+                    ) from None
+                text = handle.read()
+                handle.close()
+                self.save_dtd_file(filename, text)
+            else:
+                text = handle.read()
+                handle.close()
+            DataHandler.dtd_texts[url] = text
 
         parser = self.parser.ExternalEntityParserCreate(context)
-        parser.ElementDeclHandler = self.elementDecl
-        parser.ParseFile(handle)
-        handle.close()
+        if not self.model_cached:
+            parser.ElementDeclHandler = self.elementDecl
+        parser.Parse(text, True)
         self.dtd_urls.pop()
+        if not self.dtd_urls and not self.model_cached:
+            self.save_model(url)
         self.parser.StartElementHandler = self.startElementHandler
         return 1
+
+    def save_model(self, url):
+        """Save the element model found in a DTD or XSD for later use."""
+        DataHandler.models[url] = (
+            dict(self.strings),
+            dict(self.lists),
+            dict(self.dictionaries),
+            frozenset(self.items),
+            frozenset(self.errors),
+        )
+
+    def load_model(self, model):
+        """Use the element model saved for a DTD or XSD."""
+        strings, lists, dictionaries, items, errors = model
+        self.strings.update(strings)
+        self.lists.update(lists)
+        self.dictionaries.update(dictionaries)
+        self.items.update(items)
+        self.errors.update(errors)
@@ -59,6 +59,10 @@ Variables:
       automatically retried on error (default is 3).
     - sleep_between_tries   The delay, in seconds, before retrying a request on
       error (default is 15).
+    - cache        A Bio.WebCache.WebCache object to store the responses on
+      disk, and to answer repeated requests from there (default is None,
+      which disables caching). The time to live of the stored responses
+      can be set for each Entrez database.
 
 Functions:
 
@@ -84,6 +88,10 @@ Functions:
     - espell       Retrieves spelling suggestions.
     - ecitmatch    Retrieves PubMed IDs (PMIDs) that correspond to a set of
       input citation strings.
+    - efetch_many  Retrieves the records for a long list of primary IDs in
+      batches, sending several requests at the same time.
+    - esummary_many  Retrieves the document summaries for a long list of
+      primary IDs in batches, sending several requests at the same time.
 
     - read         Parses the XML results returned by any of the above functions.
       Alternatively, the XML data can be read from a file opened in binary mode.
@@ -117,19 +125,25 @@ Functions:
 
 """
 
+import http.client
 import time
+import threading
 import warnings
 import io
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from urllib.error import URLError, HTTPError
-from urllib.parse import urlencode
+from urllib.parse import urlencode, urlsplit
 from urllib.request import urlopen
 
+_EPOST_CGI = "https://eutils.ncbi.nlm.nih.gov/entrez/eutils/epost.fcgi"
 
 email = None
 max_tries = 3
 sleep_between_tries = 15
 tool = "biopython"
 api_key = None
+cache = None
 
 
 # XXX retmode?
@@ -146,7 +160,7 @@ def epost(db, **keywds):
 
     Raises an IOError exception if there's a network error.
     """
-    cgi = "https://eutils.ncbi.nlm.nih.gov/entrez/eutils/epost.fcgi"
+    cgi = _EPOST_CGI
     variables = {"db": db}
     variables.update(keywds)
     return _open(cgi, variables, post=True)
@@ -189,16 +203,7 @@ def efetch(db, **keywords):
     except KeyError:
         pass
     else:
-        try:
-            # ids is a single integer or a string representing a single integer
-            ids = str(int(ids))
-        except TypeError:
-            # ids was not a string; try an iterable:
-            ids = ",".join(map(str, ids))
-        except ValueError:
-            # string with commas or string not representing an integer
-            ids = ",".join(map(str, (id.strip() for id in ids.split(","))))
-
+        ids = ",".join(_split_ids(ids))
         variables["id"] = ids
         if ids.count(",") >= 200:
             # NCBI prefers an HTTP POST instead of an HTTP GET if there are
@@ -464,7 +469,42 @@ def ecitmatch(**keywds):
     return _open(cgi, variables, ecitmatch=True)
 
 
-def read(handle, validate=True, escape=False):
+def efetch_many(db, id, batch_size=500, max_workers=3, **keywds):
+    """Fetch the records for many identifiers in batches, as handles.
+
+    The identifiers are first posted to the Entrez history server with
+    EPost, after which the records are fetched with EFetch in batches of
+    batch_size records. Up to max_workers requests are sent at the same
+    time, each worker reusing its connection to NCBI, while the NCBI rate
+    limit is respected for all requests together. Failed requests are
+    retried up to max_tries times, waiting sleep_between_tries seconds
+    after the first failure and twice as long after each following one.
+
+    The other keyword arguments (such as rettype and retmode) are passed
+    on to EFetch. This is a generator function, returning a handle to the
+    results of each batch in the order of the identifiers. The handles
+    hold the complete results in memory.
+
+    Raises an IOError exception if there's a network error.
+    """
+    with _Scheduler(max_workers) as scheduler:
+        yield from scheduler.fetch_many("efetch.fcgi", db, id, batch_size, keywds)
+
+
+def esummary_many(db, id, batch_size=500, max_workers=3, **keywds):
+    """Retrieve the document summaries for many identifiers in batches.
+
+    This works like efetch_many, but uses ESummary to retrieve the
+    document summaries. This is a generator function, returning a handle
+    to the results of each batch in the order of the identifiers.
+
+    Raises an IOError exception if there's a network error.
+    """
+    with _Scheduler(max_workers) as scheduler:
+        yield from scheduler.fetch_many("esummary.fcgi", db, id, batch_size, keywds)
+
+
+def read(handle, validate=True, escape=False, plain=False):
     """Parse an XML file from the NCBI Entrez Utilities into python objects.
 
     This function parses an XML file created by NCBI's Entrez Utilities,
@@ -501,15 +541,20 @@ def read(handle, validate=True, escape=False):
     derived from the base type. This allows us to store the attributes
     (if any) of each element in a dictionary my_element.attributes, and
     the tag name in my_element.tag.
+
+    If plain is True, the data structure consists of plain Python lists,
+    dictionaries, strings, integers, and None, without the attributes and
+    tag names. This is faster and uses less memory, if the attributes are
+    not needed.
     """
     from .Parser import DataHandler
 
-    handler = DataHandler(validate, escape)
+    handler = DataHandler(validate, escape, plain)
     record = handler.read(handle)
     return record
 
 
-def parse(handle, validate=True, escape=False):
+def parse(handle, validate=True, escape=False, plain=False):
     """Parse an XML file from the NCBI Entrez Utilities into python objects.
 
     This function parses an XML file created by NCBI's Entrez Utilities,
@@ -555,10 +600,15 @@ def parse(handle, validate=True, escape=False):
     derived from the base type. This allows us to store the attributes
     (if any) of each element in a dictionary my_element.attributes, and
     the tag name in my_element.tag.
+
+    If plain is True, the data structure consists of plain Python lists,
+    dictionaries, strings, integers, and None, without the attributes and
+    tag names. This is faster and uses less memory, if the attributes are
+    not needed.
     """
     from .Parser import DataHandler
 
-    handler = DataHandler(validate, escape)
+    handler = DataHandler(validate, escape, plain)
     records = handler.parse(handle)
     return records
 
@@ -577,31 +627,49 @@ def _open(cgi, params=None, post=None, ecitmatch=False):
 
     This function also enforces the "up to three queries per second rule"
     to avoid abusing the NCBI servers.
+
+    If a cache is set, the response is taken from the cache if available,
+    without waiting for the rate limit. Otherwise, the response is stored
+    in the cache, except for EPost requests and searches which store their
+    results on the history server, as these are only valid for a limited
+    time.
     """
-    # NCBI requirement: At most three queries per second if no API key is provided.
-    # Equivalently, at least a third of second between queries
     params = _construct_params(params)
     options = _encode_options(ecitmatch, params)
-    # Using just 0.333333334 seconds sometimes hit the NCBI rate limit,
-    # the slightly longer pause of 0.37 seconds has been more reliable.
-    delay = 0.1 if api_key else 0.37
-    current = time.time()
-    wait = _open.previous + delay - current
-    if wait > 0:
-        time.sleep(wait)
-        _open.previous = current + wait
-    else:
-        _open.previous = current
 
     # By default, post is None. Set to a boolean to over-ride length choice:
     if post is None and len(options) > 1000:
         post = True
     cgi = _construct_cgi(cgi, post, options)
+    data = options.encode("utf8") if post else None
+
+    if (
+        cache is not None
+        and not cgi.startswith(_EPOST_CGI)
+        and "usehistory" not in params
+    ):
+        handle = cache.get(cgi, data, params.get("db"))
+        if handle is None:
+            handle = _urlopen(cgi, data, "api_key" in params)
+            handle = cache.store(handle, cgi, data)
+    else:
+        handle = _urlopen(cgi, data, "api_key" in params)
+
+    subtype = handle.headers.get_content_subtype()
+    if subtype == "plain":
+        url = handle.url
+        handle = io.TextIOWrapper(handle, encoding="UTF-8")
+        handle.url = url
+    return handle
+
 
+def _urlopen(cgi, data, with_api_key):
+    """Open the URL respecting the rate limit, retrying on errors (PRIVATE)."""
+    _rate_limiter.wait(with_api_key)
     for i in range(max_tries):
         try:
-            if post:
-                handle = urlopen(cgi, data=options.encode("utf8"))
+            if data is not None:
+                handle = urlopen(cgi, data=data)
             else:
                 handle = urlopen(cgi)
         except HTTPError as exception:
@@ -626,16 +694,203 @@ def _open(cgi, params=None, post=None, ecitmatch=False):
             time.sleep(sleep_between_tries)
         else:
             break
+    return handle
 
-    subtype = handle.headers.get_content_subtype()
-    if subtype == "plain":
-        url = handle.url
-        handle = io.TextIOWrapper(handle, encoding="UTF-8")
+
+class _RateLimiter:
+    """Spread the requests to NCBI over time (PRIVATE).
+
+    This is a token bucket holding a single token, shared by all threads.
+    NCBI allows at most three queries per second if no API key is provided,
+    and ten queries per second with an API key.
+    """
+
+    def __init__(self):
+        """Initialize the class."""
+        self.lock = threading.Lock()
+        self.previous = 0
+
+    def reserve(self, with_api_key):
+        """Claim the next time slot, and return the time to wait for it.
+
+        The time is in seconds, and zero or negative if the request can be
+        sent immediately. This is used by Bio.Entrez.aio to wait without
+        blocking the event loop.
+        """
+        # Using just 0.333333334 seconds sometimes hit the NCBI rate limit,
+        # the slightly longer pause of 0.37 seconds has been more reliable.
+        delay = 0.1 if with_api_key else 0.37
+        with self.lock:
+            current = time.time()
+            wait = self.previous + delay - current
+            if wait > 0:
+                self.previous = current + wait
+            else:
+                self.previous = current
+        return wait
+
+    def wait(self, with_api_key):
+        """Wait until the next request can be sent."""
+        wait = self.reserve(with_api_key)
+        if wait > 0:
+            time.sleep(wait)
+
+
+_rate_limiter = _RateLimiter()
+
+
+class _Scheduler:
+    """Send requests to the Entrez Utilities from a pool of threads (PRIVATE).
+
+    Each worker thread keeps its HTTP connection open between requests.
+    All requests share the rate limiter of the Bio.Entrez functions. The
+    responses are read completely, and returned as in-memory handles.
+    """
+
+    def __init__(
+        self, max_workers=3, base_url="https://eutils.ncbi.nlm.nih.gov/entrez/eutils/"
+    ):
+        """Initialize the class."""
+        self.base_url = base_url
+        self.max_workers = max_workers
+        self.executor = ThreadPoolExecutor(max_workers)
+        self.local = threading.local()
+        self.connections = []
+        self.lock = threading.Lock()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def close(self):
+        """Wait for the pending requests, and close all connections."""
+        self.executor.shutdown()
+        for connection in self.connections:
+            connection.close()
+        self.connections = []
+
+    def submit(self, utility, params=None, post=None):
+        """Schedule a request to an E-utility, returning a Future for its handle.
+
+        The utility is the name of the cgi script, such as "efetch.fcgi".
+        The arguments params and post are used as in the _open function.
+        """
+        params = _construct_params(params)
+        return self.executor.submit(self.request, utility, params, post)
+
+    def fetch_many(self, utility, db, ids, batch_size, keywds):
+        """Post identifiers to the history server and fetch them in batches.
+
+        This is a generator function, returning the handles in order.
+        Requests are submitted to keep all workers busy, without getting
+        too far ahead of the caller.
+        """
+        if batch_size < 1:
+            raise ValueError("batch_size must be a positive integer")
+        ids = _split_ids(ids)
+        future = self.submit("epost.fcgi", {"db": db, "id": ",".join(ids)}, post=True)
+        handle = future.result()
+        record = read(handle)
+        handle.close()
+        futures = deque()
+        for start in range(0, len(ids), batch_size):
+            params = {
+                "db": db,
+                "WebEnv": record["WebEnv"],
+                "query_key": record["QueryKey"],
+                "retstart": start,
+                "retmax": batch_size,
+            }
+            params.update(keywds)
+            futures.append(self.submit(utility, params))
+            if len(futures) > 2 * self.max_workers:
+                yield futures.popleft().result()
+        while futures:
+            yield futures.popleft().result()
+
+    def get_connection(self):
+        """Return the HTTP connection of the current thread."""
+        try:
+            return self.local.connection
+        except AttributeError:
+            pass
+        parts = urlsplit(self.base_url)
+        if parts.scheme == "https":
+            connection = http.client.HTTPSConnection(parts.netloc)
+        else:
+            connection = http.client.HTTPConnection(parts.netloc)
+        self.local.connection = connection
+        with self.lock:
+            self.connections.append(connection)
+        return connection
+
+    def request(self, utility, params, post):
+        """Send a request and return the response as a handle.
+
+        This runs in a worker thread. Connection failures, HTTP 5XX codes
+        and HTTP 429 codes are retried max_tries times in total, with an
+        exponentially increasing delay starting from sleep_between_tries.
+        """
+        options = _encode_options(False, params)
+        if post is None and len(options) > 1000:
+            post = True
+        url = self.base_url + utility
+        path = urlsplit(url).path
+        for i in range(max_tries):
+            _rate_limiter.wait("api_key" in params)
+            connection = self.get_connection()
+            try:
+                if post:
+                    headers = {"Content-Type": "application/x-www-form-urlencoded"}
+                    connection.request(
+                        "POST", path, body=options.encode("utf8"), headers=headers
+                    )
+                else:
+                    connection.request("GET", path + "?" + options)
+                response = connection.getresponse()
+                data = response.read()
+            except (OSError, http.client.HTTPException):
+                # The connection will be opened again for the next request
+                connection.close()
+                # Reraise if the final try fails
+                if i >= max_tries - 1:
+                    raise
+            else:
+                if response.status // 100 == 2:
+                    break
+                exception = HTTPError(
+                    url, response.status, response.reason, response.headers, None
+                )
+                # Reraise if the final try fails, or for a bad request other
+                # than 429 "Too Many Requests" (see the _open function)
+                if i >= max_tries - 1:
+                    raise exception
+                if response.status // 100 == 4 and response.status != 429:
+                    raise exception
+            time.sleep(sleep_between_tries * 2**i)
+        if not post:
+            url = _construct_cgi(url, post, options)
+        handle = io.BytesIO(data)
+        if response.headers.get_content_subtype() == "plain":
+            handle = io.TextIOWrapper(handle, encoding="UTF-8")
         handle.url = url
-    return handle
+        handle.headers = response.headers
+        return handle
 
 
-_open.previous = 0
+def _split_ids(ids):
+    """Return a list of identifiers from a string, an integer or an iterable (PRIVATE)."""
+    try:
+        # ids is a single integer or a string representing a single integer
+        return [str(int(ids))]
+    except TypeError:
+        # ids was not a string; try an iterable:
+        return [str(id) for id in ids]
+    except ValueError:
+        # string with commas or string not representing an integer
+        return [id.strip() for id in ids.split(",")]
 
 
 def _construct_params(params):
@@ -0,0 +1,302 @@
+# This file is part of the Biopython distribution and governed by your
+# choice of the "Biopython License Agreement" or the "BSD 3-Clause License".
+# Please see the LICENSE file that should have been included as part of this
+# package.
+"""Asynchronous access to the NCBI Entrez Utilities using asyncio.
+
+The coroutines esearch, efetch, elink, esummary, and epost in this module
+take the same arguments as the functions with the same name in Bio.Entrez.
+They use the module variables of Bio.Entrez, such as email, api_key,
+max_tries, and sleep_between_tries, and share its rate limit, so that the
+requests sent by both modules together stay within the limits set by NCBI.
+While waiting for the rate limit or for the network, other tasks in the
+event loop can continue.
+
+Each coroutine returns a Response object as soon as the HTTP headers have
+been received. The body can then be read with its read coroutine method,
+or parsed with the read and parse functions in this module, which use the
+same parser as Entrez.read and Entrez.parse. The parse function is an
+asynchronous generator, which parses the data as they arrive and returns
+each record as soon as it is complete::
+
+    import asyncio
+    from Bio import Entrez
+    from Bio.Entrez import aio
+
+    Entrez.email = "Your.Name.Here@example.org"
+
+    async def print_titles(pmids):
+        response = await aio.esummary(db="pubmed", id=pmids)
+        async for record in aio.parse(response):
+            print(record["Title"])
+        response.close()
+
+    asyncio.run(print_titles("19304878,14630660"))
+
+Responses are not stored in the cache of Bio.Entrez.
+"""
+
+import asyncio
+import io
+from http.client import BadStatusLine, HTTPException, RemoteDisconnected
+from http.client import parse_headers
+from urllib.error import HTTPError
+from urllib.parse import urlsplit
+
+from Bio import Entrez
+from Bio.Entrez import _construct_cgi, _construct_params, _encode_options
+from Bio.Entrez import _split_ids
+from Bio.Entrez.Parser import DataHandler
+
+base_url = "https://eutils.ncbi.nlm.nih.gov/entrez/eutils/"
+
+
+class Response:
+    """Response to a request to the Entrez Utilities.
+
+    Attributes:
+     - url - URL of the request, including the parameters for HTTP GET.
+     - status - HTTP status code.
+     - reason - HTTP reason phrase.
+     - headers - HTTP headers, as an http.client.HTTPMessage object.
+
+    """
+
+    def __init__(self, url, status, reason, headers, reader, writer):
+        """Initialize the class."""
+        self.url = url
+        self.status = status
+        self.reason = reason
+        self.headers = headers
+        self._reader = reader
+        self._writer = writer
+        length = headers.get("Content-Length")
+        if length is not None:
+            self._remaining = int(length)
+        else:
+            self._remaining = None
+
+    def __repr__(self):
+        """Return a string representation of the response."""
+        return "<Response [%d] %s>" % (self.status, self.url)
+
+    async def read(self, size=-1):
+        """Read and return up to size bytes, or all remaining bytes by default.
+
+        An empty bytes object is returned at the end of the response.
+        """
+        remaining = self._remaining
+        if remaining is not None:
+            if size < 0 or size > remaining:
+                size = remaining
+            if size == 0:
+                return b""
+        if size < 0:
+            data = await self._reader.read()
+        else:
+            data = await self._reader.read(size)
+        if remaining is not None:
+            self._remaining = remaining - len(data)
+        return data
+
+    def close(self):
+        """Close the connection."""
+        self._writer.close()
+
+
+async def epost(db, **keywds):
+    """Post a file of identifiers for future use.
+
+    See Bio.Entrez.epost for a description of the arguments. Return a
+    Response object.
+    """
+    variables = {"db": db}
+    variables.update(keywds)
+    return await _open("epost.fcgi", variables, post=True)
+
+
+async def efetch(db, **keywds):
+    """Fetch Entrez results.
+
+    See Bio.Entrez.efetch for a description of the arguments. Return a
+    Response object.
+
+    As in Bio.Entrez.efetch, an HTTP POST is used instead of an HTTP GET if
+    there are over 200 identifiers.
+    """
+    variables = {"db": db}
+    variables.update(keywds)
+    post = False
+    try:
+        ids = variables["id"]
+    except KeyError:
+        pass
+    else:
+        ids = ",".join(_split_ids(ids))
+        variables["id"] = ids
+        if ids.count(",") >= 200:
+            # NCBI prefers an HTTP POST instead of an HTTP GET if there are
+            # more than about 200 IDs
+            post = True
+    return await _open("efetch.fcgi", variables, post=post)
+
+
+async def esearch(db, term, **keywds):
+    """Run an Entrez search.
+
+    See Bio.Entrez.esearch for a description of the arguments. Return a
+    Response object.
+    """
+    variables = {"db": db, "term": term}
+    variables.update(keywds)
+    return await _open("esearch.fcgi", variables)
+
+
+async def elink(**keywds):
+    """Check for linked external articles.
+
+    See Bio.Entrez.elink for a description of the arguments. Return a
+    Response object.
+    """
+    variables = {}
+    variables.update(keywds)
+    return await _open("elink.fcgi", variables)
+
+
+async def esummary(**keywds):
+    """Retrieve document summaries.
+
+    See Bio.Entrez.esummary for a description of the arguments. Return a
+    Response object.
+    """
+    variables = {}
+    variables.update(keywds)
+    return await _open("esummary.fcgi", variables)
+
+
+async def read(response, validate=True, escape=False, plain=False):
+    """Read the XML in a response, and return it as Python objects.
+
+    See Bio.Entrez.read for a description of the arguments.
+    """
+    data = await response.read()
+    return Entrez.read(io.BytesIO(data), validate, escape, plain)
+
+
+async def parse(response, validate=True, escape=False, plain=False):
+    """Parse the XML in a response as it arrives, returning the records one by one.
+
+    This is an asynchronous generator, to be used in an async for loop.
+    See Bio.Entrez.parse for a description of the arguments.
+    """
+    handler = DataHandler(validate, escape, plain)
+    while True:
+        data = await response.read(65536)
+        for record in handler.feed(data):
+            yield record
+        if not data:
+            break
+
+
+async def _wait(with_api_key):
+    """Wait until the next request can be sent, without blocking (PRIVATE)."""
+    wait = Entrez._rate_limiter.reserve(with_api_key)
+    if wait > 0:
+        await asyncio.sleep(wait)
+
+
+async def _open(utility, params=None, post=None):
+    """Send a request to an E-utility, and return the response (PRIVATE).
+
+    The utility is the name of the cgi script, such as "efetch.fcgi".
+    The arguments params and post are used as in Bio.Entrez._open.
+
+    Connection failures, HTTP 5XX codes and HTTP 429 codes are retried
+    Entrez.max_tries times in total, with an exponentially increasing delay
+    starting from Entrez.sleep_between_tries.
+    """
+    params = _construct_params(params)
+    options = _encode_options(False, params)
+    if post is None and len(options) > 1000:
+        post = True
+    url = _construct_cgi(base_url + utility, post, options)
+    data = options.encode("utf8") if post else None
+    max_tries = Entrez.max_tries
+    for i in range(max_tries):
+        await _wait("api_key" in params)
+        try:
+            response = await _urlopen(url, data)
+        except (OSError, HTTPException):
+            # Reraise if the final try fails
+            if i >= max_tries - 1:
+                raise
+        else:
+            if response.status // 100 == 2:
+                return response
+            response.close()
+            exception = HTTPError(
+                url, response.status, response.reason, response.headers, None
+            )
+            # Reraise if the final try fails, or for a bad request other
+            # than 429 "Too Many Requests" (see Bio.Entrez._urlopen)
+            if i >= max_tries - 1:
+                raise exception
+            if response.status // 100 == 4 and response.status != 429:
+                raise exception
+        await asyncio.sleep(Entrez.sleep_between_tries * 2**i)
+
+
+async def _urlopen(url, data):
+    """Send an HTTP request, and return the response once its headers arrive (PRIVATE).
+
+    The request is sent as HTTP/1.0, so that the server sends the body
+    as is and closes the connection afterwards.
+    """
+    parts = urlsplit(url)
+    if parts.scheme == "https":
+        reader, writer = await asyncio.open_connection(
+            parts.hostname, parts.port or 443, ssl=True
+        )
+    else:
+        reader, writer = await asyncio.open_connection(parts.hostname, parts.port or 80)
+    path = parts.path
+    if parts.query:
+        path += "?" + parts.query
+    lines = [
+        "%s %s HTTP/1.0" % ("GET" if data is None else "POST", path),
+        "Host: %s" % parts.netloc,
+        "Accept-Encoding: identity",
+    ]
+    if data is not None:
+        lines.append("Content-Type: application/x-www-form-urlencoded")
+        lines.append("Content-Length: %d" % len(data))
+    writer.write(("\r\n".join(lines) + "\r\n\r\n").encode("ascii"))
+    if data is not None:
+        writer.write(data)
+    try:
+        await writer.drain()
+        line = await reader.readline()
+        if not line:
+            raise RemoteDisconnected("Remote end closed connection without response")
+        words = line.decode("iso-8859-1").split(None, 2)
+        if len(words) < 2 or not words[0].startswith("HTTP/"):
+            raise BadStatusLine(line)
+        try:
+            status = int(words[1])
+        except ValueError:
+            raise BadStatusLine(line) from None
+        if len(words) > 2:
+            reason = words[2].strip()
+        else:
+            reason = ""
+        header = []
+        while True:
+            line = await reader.readline()
+            header.append(line)
+            if line in (b"\r\n", b"\n", b""):
+                break
+        headers = parse_headers(io.BytesIO(b"".join(header)))
+    except BaseException:
+        writer.close()
+        raise
+    return Response(url, status, reason, headers, reader, writer)
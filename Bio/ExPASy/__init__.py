@@ -14,12 +14,17 @@ Functions:
  - get_prosite_raw   Interface to the get-prosite-raw CGI script.
  - get_sprot_raw     Interface to the get-sprot-raw CGI script.
 
+To store the responses on disk, and answer repeated calls from there, set
+the module variable cache to a Bio.WebCache.WebCache object.
+
 """
 
 import io
 from urllib.request import urlopen
 from urllib.error import HTTPError
 
+cache = None
+
 
 def get_prodoc_entry(
     id, cgi="https://prosite.expasy.org/cgi-bin/prosite/get-prodoc-entry"
@@ -129,7 +134,12 @@ def get_sprot_raw(id):
 
 def _open(url):
     """Open URL and convert to text assuming UTF-8 encoding (PRIVATE)."""
-    handle = urlopen(url)
+    if cache is None:
+        handle = urlopen(url)
+    else:
+        handle = cache.get(url)
+        if handle is None:
+            handle = cache.store(urlopen(url), url)
     text_handle = io.TextIOWrapper(handle, encoding="UTF-8")
     text_handle.url = handle.url
     return text_handle
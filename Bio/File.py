@@ -13,8 +13,10 @@ indexing files. These are not intended for direct use.
 
 import os
 import contextlib
+import functools
 import itertools
 import collections.abc
+import multiprocessing
 
 from abc import ABC, abstractmethod
 
@@ -262,6 +264,22 @@ class _IndexedSeqFileDict(collections.abc.Mapping):
         # Pass the offset to the proxy
         return self._proxy.get_raw(self._offsets[key])
 
+    def get_raw_many(self, keys):
+        """Return the raw records of the given keys as a list of bytes strings.
+
+        The records are read in the order of their offsets in the file, which
+        is much faster than calling get_raw for each key in random order. The
+        list returned follows the order of the given keys.
+
+        If any key is not found, a KeyError exception is raised.
+        """
+        keys = list(keys)
+        offsets = [self._offsets[key] for key in keys]
+        raw_records = [None] * len(keys)
+        for index in sorted(range(len(keys)), key=offsets.__getitem__):
+            raw_records[index] = self._proxy.get_raw(offsets[index])
+        return raw_records
+
     def close(self):
         """Close the file handle being used to read the data.
 
@@ -297,6 +315,7 @@ class _SQLiteManySeqFilesDict(_IndexedSeqFileDict):
         key_function,
         repr,
         max_open=10,
+        processes=None,
     ):
         """Initialize the class."""
         # TODO? - Don't keep filename list in memory (just in DB)?
@@ -322,6 +341,7 @@ class _SQLiteManySeqFilesDict(_IndexedSeqFileDict):
         self._proxy_factory = proxy_factory
         self._repr = repr
         self._max_open = max_open
+        self._processes = processes
         self._proxies = {}
 
         # Note if using SQLite :memory: trick index filename, this will
@@ -438,13 +458,10 @@ class _SQLiteManySeqFilesDict(_IndexedSeqFileDict):
     def _build_index(self):
         """Call from __init__ to create a new index (PRIVATE)."""
         index_filename = self._index_filename
-        relative_path = self._relative_path
         filenames = self._filenames
         fmt = self._format
-        key_function = self._key_function
         proxy_factory = self._proxy_factory
-        max_open = self._max_open
-        random_access_proxies = self._proxies
+        processes = self._processes
 
         if not fmt or not filenames:
             raise ValueError(
@@ -475,6 +492,51 @@ class _SQLiteManySeqFilesDict(_IndexedSeqFileDict):
             "CREATE TABLE offset_data (key TEXT, "
             "file_number INTEGER, offset INTEGER, length INTEGER);"
         )
+        if processes:
+            # Scan the files in worker processes, in the order of the files,
+            # while this process writes their offsets to the database
+            pool = multiprocessing.Pool(processes)
+            offset_lists = pool.imap(
+                functools.partial(_scan_offsets, proxy_factory, fmt), filenames
+            )
+        else:
+            pool = offset_lists = None
+        try:
+            count = self._add_files(con, filenames, offset_lists)
+        finally:
+            if pool is not None:
+                pool.terminate()
+                pool.join()
+        self._length = count
+        # print("About to index %i entries" % count)
+        try:
+            con.execute(
+                "CREATE UNIQUE INDEX IF NOT EXISTS key_index ON offset_data(key);"
+            )
+        except sqlite3.IntegrityError as err:
+            self.close()
+            con.close()
+            raise ValueError("Duplicate key? %s" % err) from None
+        con.execute("PRAGMA locking_mode=NORMAL")
+        con.execute("UPDATE meta_data SET value = ? WHERE key = ?;", (count, "count"))
+        con.commit()
+        # print("Index created")
+
+    def _add_files(self, con, filenames, offset_lists=None):
+        """Add the files and their offsets to the new index (PRIVATE).
+
+        The offsets of each file are scanned here unless they are given by
+        offset_lists, an iterator of lists of (key, offset, length) tuples.
+        Returns the number of entries added.
+        """
+        relative_path = self._relative_path
+        index_filename = self._index_filename
+        fmt = self._format
+        key_function = self._key_function
+        proxy_factory = self._proxy_factory
+        max_open = self._max_open
+        random_access_proxies = self._proxies
+
         count = 0
         for i, filename in enumerate(filenames):
             # Default to storing as an absolute path,
@@ -497,13 +559,17 @@ class _SQLiteManySeqFilesDict(_IndexedSeqFileDict):
             con.execute(
                 "INSERT INTO file_data (file_number, name) VALUES (?,?);", (i, f)
             )
-            random_access_proxy = proxy_factory(fmt, filename)
+            if offset_lists is None:
+                random_access_proxy = proxy_factory(fmt, filename)
+                offsets = random_access_proxy
+            else:
+                # handles are opened on demand when records are accessed
+                random_access_proxy = None
+                offsets = next(offset_lists)
             if key_function:
-                offset_iter = (
-                    (key_function(k), i, o, l) for (k, o, l) in random_access_proxy
-                )
+                offset_iter = ((key_function(k), i, o, l) for (k, o, l) in offsets)
             else:
-                offset_iter = ((k, i, o, l) for (k, o, l) in random_access_proxy)
+                offset_iter = ((k, i, o, l) for (k, o, l) in offsets)
             while True:
                 batch = list(itertools.islice(offset_iter, 100))
                 if not batch:
@@ -516,25 +582,12 @@ class _SQLiteManySeqFilesDict(_IndexedSeqFileDict):
                 )
                 con.commit()
                 count += len(batch)
-            if len(random_access_proxies) < max_open:
-                random_access_proxies[i] = random_access_proxy
-            else:
-                random_access_proxy._handle.close()
-        self._length = count
-        # print("About to index %i entries" % count)
-        try:
-            con.execute(
-                "CREATE UNIQUE INDEX IF NOT EXISTS key_index ON offset_data(key);"
-            )
-        except sqlite3.IntegrityError as err:
-            self._proxies = random_access_proxies
-            self.close()
-            con.close()
-            raise ValueError("Duplicate key? %s" % err) from None
-        con.execute("PRAGMA locking_mode=NORMAL")
-        con.execute("UPDATE meta_data SET value = ? WHERE key = ?;", (count, "count"))
-        con.commit()
-        # print("Index created")
+            if random_access_proxy is not None:
+                if len(random_access_proxies) < max_open:
+                    random_access_proxies[i] = random_access_proxy
+                else:
+                    random_access_proxy._handle.close()
+        return count
 
     def __repr__(self):
         return self._repr
@@ -623,8 +676,67 @@ class _SQLiteManySeqFilesDict(_IndexedSeqFileDict):
             else:
                 return proxy.get_raw(offset)
 
+    def get_raw_many(self, keys):
+        """Return the raw records of the given keys as a list of bytes strings.
+
+        The records are read file by file in the order of their offsets,
+        which is much faster than calling get_raw for each key in random
+        order. The list returned follows the order of the given keys.
+
+        If any key is not found, a KeyError exception is raised.
+        """
+        keys = list(keys)
+        rows = {}
+        # SQLite limits the number of parameters in a single statement
+        for start in range(0, len(keys), 500):
+            batch = keys[start : start + 500]
+            rows.update(
+                (row[0], row[1:])
+                for row in self._con.execute(
+                    "SELECT key, file_number, offset, length FROM offset_data "
+                    "WHERE key IN (%s);" % ",".join("?" * len(batch)),
+                    batch,
+                )
+            )
+        for key in keys:
+            if key not in rows:
+                raise KeyError(key)
+        raw_records = [None] * len(keys)
+        proxies = self._proxies
+        for index in sorted(range(len(keys)), key=lambda index: rows[keys[index]]):
+            file_number, offset, length = rows[keys[index]]
+            proxy = proxies.get(file_number)
+            if proxy is None:
+                if len(proxies) >= self._max_open:
+                    # Close an old handle...
+                    proxies.popitem()[1]._handle.close()
+                # Open a new handle...
+                proxy = self._proxy_factory(self._format, self._filenames[file_number])
+                proxies[file_number] = proxy
+            if length:
+                # Shortcut if we have the length
+                h = proxy._handle
+                h.seek(offset)
+                raw_records[index] = h.read(length)
+            else:
+                raw_records[index] = proxy.get_raw(offset)
+        return raw_records
+
     def close(self):
         """Close any open file handles."""
         proxies = self._proxies
         while proxies:
             proxies.popitem()[1]._handle.close()
+
+
+def _scan_offsets(proxy_factory, fmt, filename):
+    """Return the (key, offset, length) tuples of a file to index (PRIVATE).
+
+    This is used to scan files in worker processes when building an SQLite
+    index, so the proxy factory must be picklable.
+    """
+    random_access_proxy = proxy_factory(fmt, filename)
+    try:
+        return list(random_access_proxy)
+    finally:
+        random_access_proxy._handle.close()
@@ -23,6 +23,9 @@ Currently KEGG does not provide any usage guidelines (unlike the NCBI whose
 requirements are reasonably clear). To avoid risking overloading the service,
 Biopython will only allow three calls per second.
 
+To store the responses on disk, and answer repeated calls from there, set
+the module variable cache to a Bio.WebCache.WebCache object.
+
 References:
 Kanehisa, M. and Goto, S.; KEGG: Kyoto Encyclopedia of Genes and Genomes.
 Nucleic Acids Res. 28, 29-34 (2000).
@@ -32,6 +35,8 @@ Nucleic Acids Res. 28, 29-34 (2000).
 import io
 from urllib.request import urlopen
 
+cache = None
+
 
 def _q(op, arg1, arg2=None, arg3=None):
     URL = "http://rest.kegg.jp/%s"
@@ -41,7 +46,13 @@ def _q(op, arg1, arg2=None, arg3=None):
         args = "%s/%s/%s" % (op, arg1, arg2)
     else:
         args = "%s/%s" % (op, arg1)
-    resp = urlopen(URL % (args))
+    url = URL % (args)
+    if cache is None:
+        resp = urlopen(url)
+    else:
+        resp = cache.get(url)
+        if resp is None:
+            resp = cache.store(urlopen(url), url)
 
     if "image" == arg2:
         return resp
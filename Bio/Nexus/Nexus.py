@@ -16,6 +16,7 @@ from functools import reduce
 import copy
 import math
 import random
+import re
 import sys
 
 from Bio import File
@@ -50,6 +51,8 @@ WHITESPACE = " \t\n"
 SPECIALCOMMENTS = [
     "&"
 ]  # supported special comment ('tree' command), all others are ignored
+# characters that start or end comments, quotes and command lines
+_COMMENT_QUOTE_SEMICOLON = re.compile(r"[\[\]'\";]")
 CHARSET = "chars"
 TAXSET = "taxa"
 CODONPOSITIONS = "codonpositions"
@@ -471,26 +474,24 @@ def _kill_comments_and_break_lines(text):
     but no nesting inside these special comments allowed (like [&   [\   ]]).
     ';' ist deleted from end of line.
 
-    NOTE: this function is very slow for large files, and obsolete when using C extension cnexus
+    NOTE: this function is obsolete when using C extension cnexus
     """
     if not text:
         return ""
-    contents = iter(text)
     newtext = []
     newline = []
     quotelevel = ""
     speciallevel = False
     commlevel = 0
-    # Parse with one character look ahead (for special comments)
-    t2 = next(contents)
-    while True:
-        t = t2
-        try:
-            t2 = next(contents)
-        except StopIteration:
-            t2 = None
-        if t is None:
-            break
+    # Only quotes, brackets and semicolons change the state of the parser;
+    # the text in between them is copied in bulk unless it is in a comment
+    pos = 0
+    for match in _COMMENT_QUOTE_SEMICOLON.finditer(text):
+        start = match.start()
+        if commlevel == 0 and pos < start:
+            newline.append(text[pos:start])
+        pos = start + 1
+        t = text[start]
         if t == quotelevel and not (commlevel or speciallevel):
             # matching quote ends quotation
             quotelevel = ""
@@ -503,7 +504,11 @@ def _kill_comments_and_break_lines(text):
             quotelevel = t
         elif not quotelevel and t == "[":
             # opening bracket outside a quote
-            if t2 in SPECIALCOMMENTS and commlevel == 0 and not speciallevel:
+            if (
+                text[pos : pos + 1] in SPECIALCOMMENTS
+                and commlevel == 0
+                and not speciallevel
+            ):
                 speciallevel = True
             else:
                 commlevel += 1
@@ -523,9 +528,11 @@ def _kill_comments_and_break_lines(text):
                 newline = []
             else:
                 newline.append(t)
+    if commlevel == 0 and pos < len(text):
+        newline.append(text[pos:])
     # level of comments should be 0 at the end of the file
     if newline:
-        newtext.append("\n".join(newline))
+        newtext.append("\n".join("".join(newline)))
     if commlevel > 0:
         raise NexusError("Nexus formatting error: unmatched [")
     return newtext
@@ -551,6 +558,49 @@ def _adjust_lines(lines):
     return formatted_lines
 
 
+def _next_word(text, pos=0):
+    """Return the next NEXUS word in text and the position after it (PRIVATE).
+
+    This reads a word like ``CharBuffer.next_word``, but without copying the
+    rest of the text, e.g. the sequence after a taxon name in a matrix.
+    """
+    end = len(text)
+    while pos < end and text[pos] in WHITESPACE:
+        pos += 1
+    if pos == end:
+        return None, pos
+    first = text[pos]
+    pos += 1
+    if first == "'" or first == '"':
+        quoted = first
+    elif first in PUNCTUATION:
+        # if it's non-quote punctuation, return immediately
+        return first, pos
+    else:
+        quoted = False
+    word = [first]
+    while pos < end:
+        c = text[pos]
+        if c == quoted:  # a quote?
+            word.append(c)  # store quote
+            pos += 1
+            if text[pos : pos + 1] == quoted:  # double quote
+                pos += 1  # skip second quote
+            else:  # second single quote ends word
+                break
+        elif quoted:
+            # if quoted, then add anything
+            word.append(c)
+            pos += 1
+        elif c in PUNCTUATION or c in WHITESPACE:
+            # if not quoted and special character, stop
+            break
+        else:
+            word.append(c)  # standard character
+            pos += 1
+    return "".join(word), pos
+
+
 def _replace_parenthesized_ambigs(seq, rev_ambig_values):
     """Replace ambigs in xxx(ACG)xxx format by IUPAC ambiguity code (PRIVATE)."""
     opening = seq.find("(")
@@ -1001,12 +1051,23 @@ class Nexus:
         pass
 
     def _matrix(self, options):
-        """Create a matrix for NEXUS object (PRIVATE)."""
+        """Create a matrix for NEXUS object (PRIVATE).
+
+        The sequences of each taxon are collected as lists of strings and
+        joined once at the end, so that large (and interleaved) matrices are
+        read in linear time.
+        """
         if not self.ntax or not self.nchar:
             raise NexusError("Dimensions must be specified before matrix!")
         self.matrix = {}
         taxcount = 0
         first_matrix_block = True
+        # sequence strings of each taxon, in the order they were read
+        pieces = {}
+        if self.datatype != "standard":
+            valid_characters = set(self.valid_characters)
+            valid_characters.update((self.gap, self.missing))
+        nextaxa = None
 
         # eliminate empty lines and leading/trailing whitespace
         lines = [_.strip() for _ in options.split("\n") if _.strip() != ""]
@@ -1032,9 +1093,9 @@ class Nexus:
                     taxcount = 1
                     first_matrix_block = False
             # get taxon name and sequence
-            linechars = CharBuffer(line)
-            id = quotestrip(linechars.next_word())
-            line = linechars.rest().strip()
+            word, end = _next_word(line)
+            id = quotestrip(word)
+            line = line[end:].strip()
             chars = ""
             if self.interleave:
                 # interleaved matrix
@@ -1045,42 +1106,42 @@ class Nexus:
             else:
                 # non-interleaved matrix
                 chars = "".join(line.split())
-                while len(chars) < self.nchar:
-                    line = next(lineiter)
-                    chars += "".join(line.split())
+                if len(chars) < self.nchar:
+                    parts = [chars]
+                    length = len(chars)
+                    while length < self.nchar:
+                        line = next(lineiter)
+                        parts.append("".join(line.split()))
+                        length += len(parts[-1])
+                    chars = "".join(parts)
 
             # Reformat sequence for non-standard datatypes
             if self.datatype != "standard":
-                iupac_seq = Seq(
-                    _replace_parenthesized_ambigs(chars, self.rev_ambiguous_values),
-                )
+                seq = _replace_parenthesized_ambigs(chars, self.rev_ambiguous_values)
                 # first taxon has the reference sequence if matchhar is used
                 if taxcount == 1:
-                    refseq = iupac_seq
-                else:
-                    if self.matchchar:
-                        while True:
-                            p = str(iupac_seq).find(self.matchchar)
-                            if p == -1:
-                                break
-                            iupac_seq = Seq(
-                                str(iupac_seq)[:p]
-                                + refseq[p]
-                                + str(iupac_seq)[p + 1 :],
-                            )
+                    refseq = seq
+                elif self.matchchar and self.matchchar in seq:
+                    parts = seq.split(self.matchchar)
+                    matched = [parts[0]]
+                    p = len(parts[0])
+                    for part in parts[1:]:
+                        matched.append(refseq[p])
+                        matched.append(part)
+                        p += 1 + len(part)
+                    seq = "".join(matched)
 
                 # Check for invalid characters
-                for i, c in enumerate(str(iupac_seq)):
-                    if (
-                        c not in self.valid_characters
-                        and c != self.gap
-                        and c != self.missing
-                    ):
-                        raise NexusError(
-                            "Taxon %s: Illegal character %s in sequence %s "
-                            "(check dimensions/interleaving)" % (id, c, iupac_seq)
-                        )
+                if not valid_characters.issuperset(seq):
+                    for c in seq:
+                        if c not in valid_characters:
+                            raise NexusError(
+                                "Taxon %s: Illegal character %s in sequence %s "
+                                "(check dimensions/interleaving)" % (id, c, seq)
+                            )
+                iupac_seq = seq
             else:
+                seq = chars
                 iupac_seq = StandardData(chars)
 
                 # Check for invalid characters
@@ -1098,20 +1159,35 @@ class Nexus:
             # add sequence to matrix
             if first_matrix_block:
                 self.unaltered_taxlabels.append(id)
-                id = _unique_label(list(self.matrix.keys()), id)
+                id = _unique_label(self.matrix, id)
                 self.matrix[id] = iupac_seq
+                pieces[id] = [seq]
                 self.taxlabels.append(id)
             else:
                 # taxon names need to be in the same order in each interleaved block
-                id = _unique_label(self.taxlabels[: taxcount - 1], id)
-                taxon_present = self._check_taxlabels(id)
+                if self.unaltered_taxlabels[taxcount - 1] == id:
+                    # same label as in the first block, so same unique label
+                    id = self.taxlabels[taxcount - 1]
+                else:
+                    id = _unique_label(self.taxlabels[: taxcount - 1], id)
+                if nextaxa is None:
+                    # According to NEXUS standard, underscores shall be treated
+                    # as spaces (see _check_taxlabels)
+                    nextaxa = {t.replace(" ", "_"): t for t in self.taxlabels}
+                taxon_present = nextaxa.get(id.replace(" ", "_"))
                 if taxon_present:
-                    self.matrix[taxon_present] += iupac_seq
+                    pieces[taxon_present].append(seq)
                 else:
                     raise NexusError(
                         "Taxon %s not in first block of interleaved "
                         "matrix. Check matrix dimensions and interleave." % id
                     )
+        # join the sequences of interleaved blocks
+        for taxon, parts in pieces.items():
+            if self.datatype != "standard":
+                self.matrix[taxon] = Seq("".join(parts))
+            elif len(parts) > 1:
+                self.matrix[taxon] = StandardData("".join(parts))
         # check all sequences for length according to nchar
         for taxon in self.matrix:
             if len(self.matrix[taxon]) != self.nchar:
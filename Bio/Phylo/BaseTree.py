@@ -17,6 +17,7 @@ import itertools
 import random
 import re
 
+import numpy
 
 # General tree-traversal algorithms
 
@@ -32,24 +33,26 @@ def _level_traverse(root, get_children):
 
 def _preorder_traverse(root, get_children):
     """Traverse a tree in depth-first pre-order (parent before children) (PRIVATE)."""
-
-    def dfs(elem):
+    # Use an explicit stack rather than recursion, so that deep trees do not
+    # exceed the recursion limit
+    stack = [root]
+    while stack:
+        elem = stack.pop()
         yield elem
-        for v in get_children(elem):
-            yield from dfs(v)
-
-    yield from dfs(root)
+        stack.extend(reversed(list(get_children(elem))))
 
 
 def _postorder_traverse(root, get_children):
     """Traverse a tree in depth-first post-order (children before parent) (PRIVATE)."""
-
-    def dfs(elem):
-        for v in get_children(elem):
-            yield from dfs(v)
-        yield elem
-
-    yield from dfs(root)
+    stack = [(root, iter(get_children(root)))]
+    while stack:
+        elem, children = stack[-1]
+        for v in children:
+            stack.append((v, iter(get_children(v))))
+            break
+        else:
+            stack.pop()
+            yield elem
 
 
 def _sorted_attrs(elem):
@@ -389,24 +392,20 @@ class TreeMixin:
 
         """
         # Only one path will work -- ignore weights and visits
-        path = []
         match = _combine_matchers(target, kwargs, True)
-
-        def check_in_path(v):
+        # Depth-first search, keeping the path from the root to the current
+        # clade on an explicit stack instead of recursing
+        path = []
+        stack = [(self.root, 0)]
+        while stack:
+            v, depth = stack.pop()
+            del path[depth:]
+            path.append(v)
             if match(v):
-                path.append(v)
-                return True
-            elif v.is_terminal():
-                return False
-            for child in v:
-                if check_in_path(child):
-                    path.append(v)
-                    return True
-            return False
-
-        if not check_in_path(self.root):
-            return None
-        return path[-2::-1]
+                return path[1:]
+            if not v.is_terminal():
+                stack.extend((child, depth + 1) for child in reversed(v.clades))
+        return None
 
     def get_nonterminals(self, order="preorder"):
         """Get a list of all of this tree's nonterminal (internal) nodes."""
@@ -476,15 +475,11 @@ class TreeMixin:
             depth_of = lambda c: 1  # noqa: E731
         else:
             depth_of = lambda c: c.branch_length or 0  # noqa: E731
-        depths = {}
-
-        def update_depths(node, curr_depth):
-            depths[node] = curr_depth
+        depths = {self.root: self.root.branch_length or 0}
+        for node in _preorder_traverse(self.root, lambda elem: elem.clades):
+            curr_depth = depths[node]
             for child in node.clades:
-                new_depth = curr_depth + depth_of(child)
-                update_depths(child, new_depth)
-
-        update_depths(self.root, self.root.branch_length or 0)
+                depths[child] = curr_depth + depth_of(child)
         return depths
 
     def distance(self, target1, target2=None):
@@ -1119,6 +1114,514 @@ class Clade(TreeElement, TreeMixin):
     color = property(_get_color, _set_color, doc="Branch color.")
 
 
+class TreeIndex:
+    """Precomputed index for fast repeated queries on a tree.
+
+    The index is built once from a tree (or clade), with a single traversal.
+    It stores the clades in preorder, an Euler tour of the tree with a
+    sparse table to find the most recent common ancestor of any two clades
+    in constant time, the distance from the root to each clade, and a map
+    of clade names to clades. This makes ``common_ancestor``, ``distance``
+    and ``is_monophyletic`` queries independent of the size of the tree,
+    instead of searching the tree from the root as the ``TreeMixin`` methods
+    of the same name do.
+
+    The index is a snapshot: it is not updated if the tree is modified
+    afterwards, so a new index must be built after changing the tree.
+
+    Targets can be given as clades or names (the first clade with that name
+    in preorder, as for ``get_path``), or as any other target accepted by
+    ``find_any`` (which is then looked up by searching the tree).
+
+    >>> from io import StringIO
+    >>> from Bio import Phylo
+    >>> from Bio.Phylo.BaseTree import TreeIndex
+    >>> tree = Phylo.read(StringIO("((A:1,B:2)AB:0.5,(C:3,D:1):1);"), "newick")
+    >>> index = TreeIndex(tree)
+    >>> print(index.common_ancestor("A", "B"))
+    AB
+    >>> index.distance("A", "C")
+    5.5
+    >>> index.distance_matrix(["A", "B", "C"]).tolist()
+    [[0.0, 3.0, 5.5], [3.0, 0.0, 6.5], [5.5, 6.5, 0.0]]
+    >>> print(index.is_monophyletic("C", "D"))
+    Clade
+
+    """
+
+    def __init__(self, tree):
+        """Build the index of a Tree or Clade."""
+        root = tree.root
+        clades = []
+        parents = []
+        depths = []
+        children = []
+        stack = [(root, -1)]
+        while stack:
+            clade, parent = stack.pop()
+            index = len(clades)
+            clades.append(clade)
+            parents.append(parent)
+            children.append([])
+            if parent < 0:
+                depths.append(0.0)
+            else:
+                children[parent].append(index)
+                depths.append(depths[parent] + (clade.branch_length or 0))
+            stack.extend((child, index) for child in reversed(clade.clades))
+        size = len(clades)
+        self._root = root
+        self._clades = clades
+        self._positions = {clade: index for index, clade in enumerate(clades)}
+        self._names = {}
+        for clade in clades:
+            if clade.name is not None:
+                self._names.setdefault(clade.name, clade)
+        self._parents = parents
+        self._depths = numpy.array(depths)
+        self._depths.flags.writeable = False
+        counts = [0] * size
+        for index in range(size - 1, -1, -1):
+            if not children[index]:
+                counts[index] += 1
+            if index:
+                counts[parents[index]] += counts[index]
+        self._counts = counts
+        # Euler tour: each clade is visited when it is entered, and again
+        # after each of its children. As clades are numbered in preorder, the
+        # common ancestor of two clades is the clade with the lowest number
+        # visited between their first visits.
+        tour = []
+        first = [0] * size
+        stack = [(0, 0)]
+        while stack:
+            index, child = stack[-1]
+            if not child:
+                first[index] = len(tour)
+            tour.append(index)
+            if child < len(children[index]):
+                stack[-1] = (index, child + 1)
+                stack.append((children[index][child], 0))
+            else:
+                stack.pop()
+        self._first = first
+        # Sparse table: row k holds the lowest clade number in each run of
+        # 2**k consecutive visits of the tour
+        length = len(tour)
+        table = numpy.empty((length.bit_length(), length), numpy.int32)
+        table[0] = tour
+        for k in range(1, len(table)):
+            half = 1 << (k - 1)
+            table[k, : length - 2 * half + 1] = numpy.minimum(
+                table[k - 1, : length - 2 * half + 1],
+                table[k - 1, half : length - half + 1],
+            )
+        table.flags.writeable = False
+        self._table = table
+
+    def _index(self, target):
+        """Return the number of a target clade in preorder (PRIVATE)."""
+        if isinstance(target, TreeElement):
+            index = self._positions.get(target)
+            if index is not None:
+                return index
+        elif isinstance(target, str):
+            if target in self._names:
+                return self._positions[self._names[target]]
+        else:
+            match = _object_matcher(target)
+            for index, clade in enumerate(self._clades):
+                if match(clade):
+                    return index
+        raise ValueError("target %r is not in this tree" % target)
+
+    def _lca(self, index1, index2):
+        """Return the number of the common ancestor of two clades (PRIVATE)."""
+        start = self._first[index1]
+        end = self._first[index2]
+        if start > end:
+            start, end = end, start
+        k = (end - start + 1).bit_length() - 1
+        return int(min(self._table[k, start], self._table[k, end - (1 << k) + 1]))
+
+    def find_any(self, target):
+        """Return the first clade in preorder matching the target, or None."""
+        try:
+            return self._clades[self._index(target)]
+        except ValueError:
+            return None
+
+    def get_path(self, target):
+        """List the clades from the root to the given target.
+
+        As for ``TreeMixin.get_path``, the list ends with the target, but
+        excludes the root clade.
+        """
+        path = []
+        index = self._index(target)
+        while index > 0:
+            path.append(self._clades[index])
+            index = self._parents[index]
+        path.reverse()
+        return path
+
+    def trace(self, start, finish):
+        """List of all clade object between two targets in this tree.
+
+        Excluding ``start``, including ``finish``.
+        """
+        index1 = self._index(start)
+        index2 = self._index(finish)
+        mrca = self._lca(index1, index2)
+        fromstart = []
+        if index1 != mrca:
+            index1 = self._parents[index1]
+            while index1 != mrca:
+                fromstart.append(self._clades[index1])
+                index1 = self._parents[index1]
+        to = []
+        while index2 != mrca:
+            to.append(self._clades[index2])
+            index2 = self._parents[index2]
+        to.reverse()
+        return fromstart + [self._clades[mrca]] + to
+
+    def common_ancestor(self, targets, *more_targets):
+        """Most recent common ancestor (clade) of all the given targets."""
+        mrca = None
+        for target in _combine_args(targets, *more_targets):
+            index = self._index(target)
+            if mrca is None:
+                mrca = index
+            else:
+                mrca = self._lca(mrca, index)
+        if mrca is None:
+            return self._root
+        return self._clades[mrca]
+
+    def depths(self, unit_branch_lengths=False):
+        """Create a mapping of tree clades to depths, as ``TreeMixin.depths``."""
+        start = self._root.branch_length or 0
+        if unit_branch_lengths:
+            levels = [start]
+            for parent in self._parents[1:]:
+                levels.append(levels[parent] + 1)
+            return dict(zip(self._clades, levels))
+        return dict(zip(self._clades, (self._depths + start).tolist()))
+
+    def distance(self, target1, target2=None):
+        """Calculate the sum of the branch lengths between two targets.
+
+        If only one target is specified, the other is the root of this tree.
+        """
+        index1 = self._index(target1)
+        if target2 is None:
+            return float(self._depths[index1])
+        index2 = self._index(target2)
+        mrca = self._lca(index1, index2)
+        depths = self._depths
+        return float(depths[index1] + depths[index2] - 2 * depths[mrca])
+
+    def distance_matrix(self, targets=None):
+        """Return the distances between all pairs of targets as a square array.
+
+        By default, the targets are the terminals of the tree in preorder.
+        The distances are calculated with NumPy for blocks of rows of the
+        matrix at a time. To use the matrix in ``Bio.Phylo.TreeConstruction``,
+        wrap it in an ``ArrayDistanceMatrix`` with the names of the targets.
+        """
+        if targets is None:
+            indices = [
+                index for index, clade in enumerate(self._clades) if not clade.clades
+            ]
+        else:
+            indices = [self._index(target) for target in targets]
+        indices = numpy.array(indices, int)
+        first = numpy.array(self._first)[indices]
+        depths = self._depths[indices]
+        size = len(indices)
+        matrix = numpy.empty((size, size))
+        step = max(1, (1 << 22) // max(size, 1))
+        for start in range(0, size, step):
+            rows = slice(start, start + step)
+            low = numpy.minimum.outer(first[rows], first)
+            high = numpy.maximum.outer(first[rows], first)
+            k = numpy.frexp(high - low + 1)[1] - 1
+            mrca = numpy.minimum(
+                self._table[k, low], self._table[k, high - (1 << k) + 1]
+            )
+            matrix[rows] = depths[rows, None] + depths[None, :] - 2 * self._depths[mrca]
+        return matrix
+
+    def is_monophyletic(self, terminals, *more_terminals):
+        """MRCA of terminals if they comprise a complete subclade, or False.
+
+        As for ``TreeMixin.is_monophyletic``, the given targets must be
+        terminals of the tree.
+        """
+        indices = {
+            self._index(target) for target in _combine_args(terminals, *more_terminals)
+        }
+        if not indices:
+            return False
+        mrca = None
+        for index in indices:
+            if self._clades[index].clades:
+                return False
+            if mrca is None:
+                mrca = index
+            else:
+                mrca = self._lca(mrca, index)
+        if self._counts[mrca] == len(indices):
+            return self._clades[mrca]
+        return False
+
+
+class ArrayTree:
+    """A phylogenetic tree stored compactly in NumPy arrays.
+
+    Instead of one ``Clade`` object per node, the structure of the tree and
+    the node data are stored in arrays with one element per node. The nodes
+    are numbered in preorder, so the root is node 0 and every node comes
+    after its parent. The arrays are:
+
+        parents : array of int32
+            The parent of each node, or -1 for the root.
+        first_children : array of int32
+            The first (leftmost) child of each node, or -1 for terminals.
+        next_siblings : array of int32
+            The next child of the same parent, or -1 for the last child.
+        branch_lengths : array of float
+            The length of the branch leading to each node (NaN if missing).
+        confidences : array of float
+            The support value of each node (NaN if missing).
+        names : array of object
+            The name of each node (None if missing).
+
+    This needs a small fraction of the memory of ``Tree`` and ``Clade``
+    objects, and all traversals are iterative, so trees with millions of
+    nodes or a depth beyond the Python recursion limit can be handled.
+    ``Bio.Phylo.NewickIO`` can read trees directly into this representation
+    (with ``compact=True``) and write them without converting them.
+
+    >>> from Bio.Phylo.BaseTree import ArrayTree, Clade, Tree
+    >>> tree = Tree(Clade(clades=[Clade(0.5, "A"), Clade(1.5, "B")], name="AB"))
+    >>> compact = ArrayTree.from_tree(tree)
+    >>> compact
+    ArrayTree(nodes=3, rooted=True)
+    >>> compact.parents.tolist()
+    [-1, 0, 0]
+    >>> compact.names.tolist()
+    ['AB', 'A', 'B']
+    >>> compact.postorder().tolist()
+    [1, 2, 0]
+    >>> print(compact.to_tree())
+    Tree(rooted=True)
+        Clade(name='AB')
+            Clade(branch_length=0.5, name='A')
+            Clade(branch_length=1.5, name='B')
+
+    """
+
+    def __init__(
+        self,
+        parents,
+        branch_lengths=None,
+        confidences=None,
+        names=None,
+        rooted=True,
+        id=None,
+        name=None,
+    ):
+        """Initialize the tree from the parent of each node, in preorder.
+
+        Arguments:
+         - parents - Sequence with the parent of each node, or -1 for the
+           root (node 0). Each node must come after its parent, and the
+           children of a node are taken in the order of their numbers.
+         - branch_lengths, confidences - Sequences of numbers, with NaN or
+           None for missing values (optional).
+         - names - Sequence of node names, with None for unnamed nodes
+           (optional).
+         - rooted, id, name - As for ``Tree``.
+
+        """
+        parents = numpy.array(parents, numpy.int32)
+        size = len(parents)
+        if parents.ndim != 1 or size == 0:
+            raise ValueError("parents should be a non-empty one-dimensional array")
+        if (
+            parents[0] != -1
+            or not ((parents[1:] >= 0) & (parents[1:] < numpy.arange(1, size))).all()
+        ):
+            raise ValueError(
+                "nodes should be numbered in preorder, with the root first"
+            )
+        self.parents = parents
+        self.branch_lengths = self._values(branch_lengths, size)
+        self.confidences = self._values(confidences, size)
+        if names is None:
+            self.names = numpy.full(size, None, object)
+        else:
+            self.names = numpy.empty(size, object)
+            self.names[:] = names
+        first_children = numpy.full(size, -1, numpy.int32)
+        next_siblings = numpy.full(size, -1, numpy.int32)
+        # group the nodes by parent, keeping the order of the siblings
+        order = numpy.argsort(parents[1:], kind="stable") + 1
+        groups = parents[order]
+        same = groups[:-1] == groups[1:]
+        next_siblings[order[:-1][same]] = order[1:][same]
+        starts = numpy.ones(len(order), bool)
+        starts[1:] = ~same
+        first_children[groups[starts]] = order[starts]
+        self.first_children = first_children
+        self.next_siblings = next_siblings
+        self.rooted = rooted
+        self.id = id
+        self.name = name
+
+    @staticmethod
+    def _values(values, size):
+        """Return an array of floats, with NaN for missing values (PRIVATE)."""
+        if values is None:
+            return numpy.full(size, numpy.nan)
+        values = numpy.array(
+            [numpy.nan if value is None else value for value in values], float
+        )
+        if values.shape != (size,):
+            raise ValueError("expected %d values, not %d" % (size, len(values)))
+        return values
+
+    @classmethod
+    def from_tree(cls, tree):
+        """Create an ArrayTree from a Tree or Clade object.
+
+        The tree is traversed without recursion. Clade attributes other than
+        the branch length, confidence and name are not kept.
+        """
+        parents = []
+        branch_lengths = []
+        confidences = []
+        names = []
+        stack = [(tree.root, -1)]
+        while stack:
+            clade, parent = stack.pop()
+            index = len(parents)
+            parents.append(parent)
+            branch_lengths.append(clade.branch_length)
+            confidences.append(clade.confidence)
+            names.append(clade.name)
+            stack.extend((child, index) for child in reversed(clade.clades))
+        if isinstance(tree, Tree):
+            kwargs = {"rooted": tree.rooted, "id": tree.id, "name": tree.name}
+        else:
+            kwargs = {}
+        return cls(parents, branch_lengths, confidences, names, **kwargs)
+
+    def to_tree(self):
+        """Return the tree as a Tree of Clade objects."""
+        clades = []
+        for parent, branch_length, confidence, name in zip(
+            self.parents.tolist(),
+            self.branch_lengths.tolist(),
+            self.confidences.tolist(),
+            self.names.tolist(),
+        ):
+            clade = Clade(
+                branch_length=None if branch_length != branch_length else branch_length,
+                name=name,
+                confidence=None if confidence != confidence else confidence,
+            )
+            if parent >= 0:
+                clades[parent].clades.append(clade)
+            clades.append(clade)
+        return Tree(root=clades[0], rooted=self.rooted, id=self.id, name=self.name)
+
+    def __len__(self):
+        """Return the number of nodes in the tree."""
+        return len(self.parents)
+
+    def __repr__(self):
+        """Return a representation of the tree for debugging."""
+        return "%s(nodes=%d, rooted=%r)" % (
+            self.__class__.__name__,
+            len(self),
+            self.rooted,
+        )
+
+    def children(self, node):
+        """Return the list of the children of a node."""
+        children = []
+        child = self.first_children[node]
+        while child >= 0:
+            children.append(int(child))
+            child = self.next_siblings[child]
+        return children
+
+    def is_terminal(self, node):
+        """Check if a node is a terminal (leaf) node."""
+        return self.first_children[node] < 0
+
+    def preorder(self):
+        """Return the nodes in depth-first pre-order (parent before children)."""
+        return numpy.arange(len(self))
+
+    def postorder(self):
+        """Return the nodes in depth-first post-order (children before parent)."""
+        parents = self.parents.tolist()
+        first_children = self.first_children.tolist()
+        next_siblings = self.next_siblings.tolist()
+        order = []
+        node = 0
+        while node >= 0:
+            # descend to the leftmost terminal
+            while first_children[node] >= 0:
+                node = first_children[node]
+            order.append(node)
+            # go up until a node with a next sibling is found
+            while node >= 0 and next_siblings[node] < 0:
+                node = parents[node]
+                if node >= 0:
+                    order.append(node)
+            if node >= 0:
+                node = next_siblings[node]
+        return numpy.array(order, numpy.int32)
+
+    def get_terminals(self):
+        """Return the terminal (leaf) nodes in preorder."""
+        return numpy.flatnonzero(self.first_children < 0)
+
+    def count_terminals(self):
+        """Count the number of terminal (leaf) nodes in the tree."""
+        return int(numpy.count_nonzero(self.first_children < 0))
+
+    def depths(self, unit_branch_lengths=False):
+        """Return the depth of each node as an array, as ``TreeMixin.depths``.
+
+        :Parameters:
+            unit_branch_lengths : bool
+                If True, count only the number of branches (levels in the tree).
+                By default the distance is the cumulative branch length leading
+                to the node.
+
+        """
+        if unit_branch_lengths:
+            lengths = [1] * len(self)
+        else:
+            lengths = numpy.nan_to_num(self.branch_lengths).tolist()
+        root = self.branch_lengths[0]
+        depths = [0 if root != root else float(root)] + lengths[1:]
+        parents = self.parents.tolist()
+        for node in range(1, len(depths)):
+            depths[node] += depths[parents[node]]
+        return numpy.array(depths)
+
+    def total_branch_length(self):
+        """Calculate the sum of all the branch lengths in this tree."""
+        return float(numpy.nansum(self.branch_lengths))
+
+
 class BranchColor:
     """Indicates the color of a clade when rendered graphically.
 
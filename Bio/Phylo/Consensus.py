@@ -9,14 +9,25 @@
 
 This module contains a ``_BitString`` class to assist the consensus tree
 searching and some common consensus algorithms such as strict, majority rule and
-adam consensus.
+adam consensus. The strict and majority rule consensus and the branch support
+count clades as integer bitmasks of their terminals (splits) in a dict.
 """
 
+import copy
 import random
 import itertools
-
+import os
 from ast import literal_eval
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy
+
+from Bio.Align import ArrayAlignment, MultipleSeqAlignment
+from Bio.Align import _select_letters
 from Bio.Phylo import BaseTree
+from Bio.Seq import Seq
+from Bio.SeqRecord import SeqRecord
 
 
 class _BitString(str):
@@ -231,43 +242,43 @@ def strict_consensus(trees):
     first_tree = next(trees_iter)
 
     terms = first_tree.get_terminals()
-    bitstr_counts, tree_count = _count_clades(itertools.chain([first_tree], trees_iter))
+    split_counts, tree_count = _count_splits(
+        itertools.chain([first_tree], trees_iter), [term.name for term in terms]
+    )
 
-    # Store bitstrs for strict clades
-    strict_bitstrs = [
-        bitstr for bitstr, t in bitstr_counts.items() if t[0] == tree_count
-    ]
-    strict_bitstrs.sort(key=lambda bitstr: bitstr.count("1"), reverse=True)
+    # Store splits for strict clades
+    strict_splits = [split for split, t in split_counts.items() if t[0] == tree_count]
+    strict_splits.sort(key=_count_bits, reverse=True)
     # Create root
     root = BaseTree.Clade()
-    if strict_bitstrs[0].count("1") == len(terms):
+    if _count_bits(strict_splits[0]) == len(terms):
         root.clades.extend(terms)
     else:
         raise ValueError("Taxons in provided trees should be consistent")
-    # make a bitstr to clades dict and store root clade
-    bitstr_clades = {strict_bitstrs[0]: root}
+    # make a split to clades dict and store root clade
+    split_clades = {strict_splits[0]: root}
     # create inner clades
-    for bitstr in strict_bitstrs[1:]:
-        clade_terms = [terms[i] for i in bitstr.index_one()]
+    for split in strict_splits[1:]:
+        clade_terms = [terms[i] for i in _split_indices(split, len(terms))]
         clade = BaseTree.Clade()
         clade.clades.extend(clade_terms)
-        for bs, c in bitstr_clades.items():
+        for bs, c in split_clades.items():
             # check if it should be the parent of current clade
-            if bs.contains(bitstr):
-                # remove old bitstring
-                del bitstr_clades[bs]
+            if bs & split == split:
+                # remove old split
+                del split_clades[bs]
                 # update clade childs
                 new_childs = [child for child in c.clades if child not in clade_terms]
                 c.clades = new_childs
                 # set current clade as child of c
                 c.clades.append(clade)
-                # update bitstring
-                bs = bs ^ bitstr
+                # update split
+                bs = bs ^ split
                 # update clade
-                bitstr_clades[bs] = c
+                split_clades[bs] = c
                 break
         # put new clade
-        bitstr_clades[bitstr] = clade
+        split_clades[split] = clade
     return BaseTree.Tree(root=root)
 
 
@@ -281,6 +292,9 @@ def majority_consensus(trees, cutoff=0):
     clade in the result consensus tree is the average length of all counts for
     that clade.
 
+    The trees are consumed one at a time, so only the table of split counts
+    is kept in memory, not the trees themselves.
+
     :Parameters:
         trees : iterable
             iterable of trees to produce consensus tree.
@@ -290,88 +304,92 @@ def majority_consensus(trees, cutoff=0):
     first_tree = next(tree_iter)
 
     terms = first_tree.get_terminals()
-    bitstr_counts, tree_count = _count_clades(itertools.chain([first_tree], tree_iter))
+    size = len(terms)
+    split_counts, tree_count = _count_splits(
+        itertools.chain([first_tree], tree_iter), [term.name for term in terms]
+    )
 
-    # Sort bitstrs by descending #occurrences, then #tips, then tip order
-    bitstrs = sorted(
-        bitstr_counts.keys(),
-        key=lambda bitstr: (bitstr_counts[bitstr][0], bitstr.count("1"), str(bitstr)),
+    # Sort splits by descending #occurrences, then #tips, then tip order
+    splits = sorted(
+        split_counts,
+        key=lambda split: (split_counts[split][0], _count_bits(split), split),
         reverse=True,
     )
     root = BaseTree.Clade()
-    if bitstrs[0].count("1") == len(terms):
+    if _count_bits(splits[0]) == size:
         root.clades.extend(terms)
     else:
         raise ValueError("Taxons in provided trees should be consistent")
-    # Make a bitstr-to-clades dict and store root clade
-    bitstr_clades = {bitstrs[0]: root}
+    # The accepted clades form a hierarchy, kept as a split-to-clade dict
+    # plus the parent and (non-terminal) child splits of each accepted split,
+    # and the accepted split each terminal is directly attached to.
+    split_clades = {splits[0]: root}
+    parents = {}
+    children = {splits[0]: []}
+    term_parents = [splits[0]] * size
+    # Insertion order of the accepted splits, used to order the children of
+    # new clades (a parent is re-stamped each time it gains a child)
+    stamp = itertools.count()
+    stamps = {splits[0]: next(stamp)}
     # create inner clades
-    for bitstr in bitstrs[1:]:
+    for split in splits[1:]:
         # apply majority rule
-        count_in_trees, branch_length_sum = bitstr_counts[bitstr]
+        count_in_trees, branch_length_sum = split_counts[split]
         confidence = 100.0 * count_in_trees / tree_count
         if confidence < cutoff * 100.0:
             break
-        clade_terms = [terms[i] for i in bitstr.index_one()]
-        clade = BaseTree.Clade()
-        clade.clades.extend(clade_terms)
-        clade.confidence = confidence
-        clade.branch_length = branch_length_sum / count_in_trees
-        bsckeys = sorted(bitstr_clades, key=lambda bs: bs.count("1"), reverse=True)
-
-        # check if current clade is compatible with previous clades and
-        # record it's possible parent and child clades.
-        compatible = True
-        parent_bitstr = None
-        child_bitstrs = []  # multiple independent childs
-        for bs in bsckeys:
-            if not bs.iscompatible(bitstr):
-                compatible = False
+
+        # find the smallest accepted clade containing the current one, by
+        # walking up from one of its terminals
+        indices = _split_indices(split, size)
+        parent_split = term_parents[indices[0]]
+        while parent_split & split != split:
+            parent_split = parents[parent_split]
+        # the current clade is compatible with all accepted clades if it
+        # contains or is independent of each child of its parent; those it
+        # contains become its own children
+        child_splits = []
+        for bs in children[parent_split]:
+            overlap = bs & split
+            if overlap == bs:
+                child_splits.append(bs)
+            elif overlap:
                 break
-            # assign the closest ancestor as its parent
-            # as bsckeys is sorted, it should be the last one
-            if bs.contains(bitstr):
-                parent_bitstr = bs
-            # assign the closest descendant as its child
-            # the largest and independent clades
-            if (
-                bitstr.contains(bs)
-                and bs != bitstr
-                and all(c.independent(bs) for c in child_bitstrs)
-            ):
-                child_bitstrs.append(bs)
-        if not compatible:
-            continue
-
-        if parent_bitstr:
-            # insert current clade; remove old bitstring
-            parent_clade = bitstr_clades.pop(parent_bitstr)
-            # update parent clade childs
-            parent_clade.clades = [
-                c for c in parent_clade.clades if c not in clade_terms
-            ]
-            # set current clade as child of parent_clade
+        else:
+            child_splits.sort(key=lambda bs: (-_count_bits(bs), stamps[bs]))
+            clade_terms = []
+            for i in indices:
+                if term_parents[i] == parent_split:
+                    clade_terms.append(terms[i])
+                    term_parents[i] = split
+            child_clades = [split_clades[bs] for bs in child_splits]
+            clade = BaseTree.Clade()
+            clade.clades.extend(clade_terms)
+            clade.clades.extend(child_clades)
+            clade.confidence = confidence
+            clade.branch_length = branch_length_sum / count_in_trees
+
+            # insert current clade under its parent
+            parent_clade = split_clades[parent_split]
+            moved = {id(c) for c in clade.clades}
+            parent_clade.clades = [c for c in parent_clade.clades if id(c) not in moved]
             parent_clade.clades.append(clade)
-            # update bitstring
-            # parent = parent ^ bitstr
-            # update clade
-            bitstr_clades[parent_bitstr] = parent_clade
-
-        if child_bitstrs:
-            remove_list = []
-            for c in child_bitstrs:
-                remove_list.extend(c.index_one())
-                child_clade = bitstr_clades[c]
-                parent_clade.clades.remove(child_clade)
-                clade.clades.append(child_clade)
-            remove_terms = [terms[i] for i in remove_list]
-            clade.clades = [c for c in clade.clades if c not in remove_terms]
-        # put new clade
-        bitstr_clades[bitstr] = clade
-        if (len(bitstr_clades) == len(terms) - 1) or (
-            len(bitstr_clades) == len(terms) - 2 and len(root.clades) == 3
-        ):
-            break
+            children[parent_split] = [
+                bs for bs in children[parent_split] if bs & split != bs
+            ]
+            children[parent_split].append(split)
+            children[split] = child_splits
+            parents[split] = parent_split
+            for bs in child_splits:
+                parents[bs] = split
+            stamps[parent_split] = next(stamp)
+            stamps[split] = next(stamp)
+            # put new clade
+            split_clades[split] = clade
+            if (len(split_clades) == size - 1) or (
+                len(split_clades) == size - 2 and len(root.clades) == 3
+            ):
+                break
     return BaseTree.Tree(root=root)
 
 
@@ -470,6 +488,83 @@ def _sub_clade(clade, term_names):
     return sub_clade
 
 
+def _count_bits(split):
+    """Return the number of terminals in an integer split (PRIVATE)."""
+    return bin(split).count("1")
+
+
+def _split_indices(split, size):
+    """Return the ascending terminal indices set in an integer split (PRIVATE).
+
+    Terminal ``i`` of ``size`` is stored as bit ``size - 1 - i``, so that
+    the binary representation of the integer reads like a ``_BitString``.
+    """
+    indices = []
+    while split:
+        bit = split & -split
+        indices.append(size - bit.bit_length())
+        split ^= bit
+    indices.reverse()
+    return indices
+
+
+def _tree_to_splits(tree, term_bits):
+    """Return a list of (clade, split) for the non-terminal clades of a tree (PRIVATE).
+
+    Each split is an integer bitmask of the clade's terminals, using the
+    bit given for each terminal name in the term_bits dict (terminals with
+    other names are ignored). The clades are listed in preorder.
+    """
+    order = []
+    stack = [tree.root]
+    while stack:
+        clade = stack.pop()
+        order.append(clade)
+        stack.extend(reversed(clade.clades))
+    clade_bits = {}
+    splits = []
+    for clade in reversed(order):
+        if clade.clades:
+            split = 0
+            for child in clade.clades:
+                split |= clade_bits[child]
+            splits.append((clade, split))
+        else:
+            split = term_bits.get(clade.name, 0)
+        clade_bits[clade] = split
+    splits.reverse()
+    return splits
+
+
+def _count_splits(trees, term_names):
+    """Count distinct splits (sets of terminal names) in the trees (PRIVATE).
+
+    Return a tuple first a dict of the integer splits (see ``_split_indices``)
+    for the given ordered terminal names, to a list of the count of
+    occurrences and sum of branch length for that split, second the number of
+    trees processed.
+    """
+    size = len(term_names)
+    term_bits = {name: 1 << (size - 1 - i) for i, name in enumerate(term_names)}
+    full = (1 << size) - 1
+    splits = {}
+    tree_count = 0
+    for tree in trees:
+        tree_count += 1
+        tree_splits = _tree_to_splits(tree, term_bits)
+        if not tree_splits or tree_splits[0][1] != full:
+            raise ValueError("Taxons in provided trees should be consistent")
+        for clade, split in tree_splits:
+            try:
+                counts = splits[split]
+            except KeyError:
+                splits[split] = [1, clade.branch_length or 0]
+            else:
+                counts[0] += 1
+                counts[1] += clade.branch_length or 0
+    return splits, tree_count
+
+
 def _count_clades(trees):
     """Count distinct clades (different sets of terminal names) in the trees (PRIVATE).
 
@@ -481,20 +576,17 @@ def _count_clades(trees):
             An iterable that returns the trees to count
 
     """
-    bitstrs = {}
-    tree_count = 0
-    for tree in trees:
-        tree_count += 1
-        clade_bitstrs = _tree_to_bitstrs(tree)
-        for clade in tree.find_clades(terminal=False):
-            bitstr = clade_bitstrs[clade]
-            if bitstr in bitstrs:
-                count, sum_bl = bitstrs[bitstr]
-                count += 1
-                sum_bl += clade.branch_length or 0
-                bitstrs[bitstr] = (count, sum_bl)
-            else:
-                bitstrs[bitstr] = (1, clade.branch_length or 0)
+    trees_iter = iter(trees)
+    first_tree = next(trees_iter)
+    term_names = [term.name for term in first_tree.find_clades(terminal=True)]
+    splits, tree_count = _count_splits(
+        itertools.chain([first_tree], trees_iter), term_names
+    )
+    size = len(term_names)
+    bitstrs = {
+        _BitString(bin(split)[2:].zfill(size)): tuple(counts)
+        for split, counts in splits.items()
+    }
     return bitstrs, tree_count
 
 
@@ -512,7 +604,7 @@ def get_support(target_tree, trees, len_trees=None):
 
     """
     term_names = sorted(term.name for term in target_tree.find_clades(terminal=True))
-    bitstrs = {}
+    term_bits = {name: 1 << i for i, name in enumerate(term_names)}
 
     size = len_trees
     if size is None:
@@ -525,66 +617,110 @@ def get_support(target_tree, trees, len_trees=None):
                 "as the optional parameter len_trees."
             ) from None
 
-    for clade in target_tree.find_clades(terminal=False):
-        bitstr = _clade_to_bitstr(clade, term_names)
-        bitstrs[bitstr] = (clade, 0)
+    # Map each split to its (last) clade in the target tree and its count
+    split_clades = {
+        split: clade for clade, split in _tree_to_splits(target_tree, term_bits)
+    }
+    split_counts = dict.fromkeys(split_clades, 0)
     for tree in trees:
-        for clade in tree.find_clades(terminal=False):
-            bitstr = _clade_to_bitstr(clade, term_names)
-            if bitstr in bitstrs:
-                c, t = bitstrs[bitstr]
-                c.confidence = (t + 1) * 100.0 / size
-                bitstrs[bitstr] = (c, t + 1)
+        for clade, split in _tree_to_splits(tree, term_bits):
+            if split in split_counts:
+                split_counts[split] += 1
+    for split, count in split_counts.items():
+        if count:
+            split_clades[split].confidence = count * 100.0 / size
     return target_tree
 
 
-def bootstrap(msa, times):
+def bootstrap(msa, times, seed=None):
     """Generate bootstrap replicates from a multiple sequence alignment object.
 
+    Each replicate is created with its own random number generator, seeded
+    from the seed and the replicate number, so the replicates are the same
+    for the same seed.
+
     :Parameters:
-        msa : MultipleSeqAlignment
+        msa : MultipleSeqAlignment or ArrayAlignment
             multiple sequence alignment to generate replicates.
         times : int
             number of bootstrap times.
+        seed : int
+            seed for the random sampling of the columns (optional; by
+            default it is taken from the ``random`` module).
 
     """
-    length = len(msa[0])
-    i = 0
-    while i < times:
-        i += 1
-        item = None
-        for j in range(length):
-            col = random.randint(0, length - 1)
-            if not item:
-                item = msa[:, col : col + 1]
-            else:
-                item += msa[:, col : col + 1]
-        yield item
+    data = _get_bootstrap_data(msa)
+    if seed is None:
+        seed = random.getrandbits(64)
+    for i in range(times):
+        yield _bootstrap_replicate(data, seed, i)
 
 
-def bootstrap_trees(msa, times, tree_constructor):
+def bootstrap_trees(msa, times, tree_constructor, n_jobs=1, seed=None):
     """Generate bootstrap replicate trees from a multiple sequence alignment.
 
+    The trees are generated in the order of the replicates, and as they
+    are built, so they can be processed one at a time. Each replicate is
+    built with a new copy of the tree constructor.
+
     :Parameters:
-        msa : MultipleSeqAlignment
+        msa : MultipleSeqAlignment or ArrayAlignment
             multiple sequence alignment to generate replicates.
         times : int
             number of bootstrap times.
         tree_constructor : TreeConstructor
             tree constructor to be used to build trees.
+        n_jobs : int
+            number of processes used to build the trees in parallel
+            (default 1, i.e. no additional processes). Use None to use all
+            available CPUs. The alignment is sent to each process only once,
+            and the trees do not depend on the number of processes.
+        seed : int
+            seed for the random sampling of the columns (optional; by
+            default it is taken from the ``random`` module).
 
     """
-    msas = bootstrap(msa, times)
-    for aln in msas:
-        tree = tree_constructor.build_tree(aln)
-        yield tree
+    data = _get_bootstrap_data(msa)
+    if seed is None:
+        seed = random.getrandbits(64)
+    if n_jobs is None:
+        n_jobs = os.cpu_count()
+    if n_jobs > 1 and times > 1:
+        executor = ProcessPoolExecutor(
+            n_jobs,
+            initializer=_set_bootstrap_data,
+            initargs=(data, seed, tree_constructor),
+        )
+        # Only keep a few replicates ahead of the caller, so that the trees
+        # are not all held in memory, and little work is wasted if the
+        # caller stops early
+        futures = deque()
+        try:
+            for i in range(times):
+                futures.append(executor.submit(_bootstrap_tree, i))
+                if len(futures) >= 2 * n_jobs:
+                    yield futures.popleft().result()
+            while futures:
+                yield futures.popleft().result()
+        finally:
+            for future in futures:
+                future.cancel()
+            executor.shutdown()
+    else:
+        for i in range(times):
+            alignment = _bootstrap_replicate(data, seed, i)
+            yield copy.deepcopy(tree_constructor).build_tree(alignment)
 
 
-def bootstrap_consensus(msa, times, tree_constructor, consensus):
+def bootstrap_consensus(msa, times, tree_constructor, consensus, n_jobs=1, seed=None):
     """Consensus tree of a series of bootstrap trees for a multiple sequence alignment.
 
+    The trees are passed to the consensus method as they are built, so
+    with ``majority_consensus`` or ``strict_consensus`` they are not all
+    kept in memory.
+
     :Parameters:
-        msa : MultipleSeqAlignment
+        msa : MultipleSeqAlignment or ArrayAlignment
             Multiple sequence alignment to generate replicates.
         times : int
             Number of bootstrap times.
@@ -593,13 +729,96 @@ def bootstrap_consensus(msa, times, tree_constructor, consensus):
         consensus : function
             Consensus method in this module: ``strict_consensus``,
             ``majority_consensus``, ``adam_consensus``.
+        n_jobs : int
+            Number of processes used to build the trees in parallel
+            (default 1). Use None to use all available CPUs.
+        seed : int
+            Seed for the random sampling of the columns (optional).
 
     """
-    trees = bootstrap_trees(msa, times, tree_constructor)
-    tree = consensus(list(trees))
+    trees = bootstrap_trees(msa, times, tree_constructor, n_jobs, seed)
+    tree = consensus(trees)
     return tree
 
 
+_bootstrap_data = None
+
+
+def _get_bootstrap_data(msa):
+    """Return the alignment to sample the columns from (PRIVATE).
+
+    Returns the alignment as an ArrayAlignment if possible, and otherwise
+    the letters of the alignment as a two-dimensional array together with
+    the alignment itself, and if the original alignment is an ArrayAlignment.
+    """
+    if isinstance(msa, ArrayAlignment):
+        return msa, None, True
+    try:
+        return ArrayAlignment(msa), None, False
+    except ValueError:
+        # Letters are not ASCII
+        array = numpy.array([list(str(record.seq)) for record in msa])
+        if array.ndim != 2:
+            raise ValueError("Sequences must all be the same length") from None
+        return msa, array, False
+
+
+def _bootstrap_replicate(data, seed, index):
+    """Create one bootstrap replicate of an alignment (PRIVATE).
+
+    The columns are sampled using a random number generator seeded from
+    both the seed and the replicate index. The per-letter and per-column
+    annotations are sampled with the columns; the other annotations are
+    copied.
+    """
+    alignment, array, array_alignment = data
+    length = alignment.get_alignment_length()
+    rng = numpy.random.default_rng([seed, index])
+    columns = rng.integers(length, size=length)
+    if array is None:
+        replicate = alignment[:, columns]
+        if array_alignment:
+            return replicate
+        return replicate.to_multiple_seq_alignment()
+    records = []
+    for record, row in zip(alignment, array[:, columns].tolist()):
+        records.append(
+            SeqRecord(
+                Seq("".join(row)),
+                id=record.id,
+                name=record.name,
+                description=record.description,
+                dbxrefs=list(record.dbxrefs),
+                annotations=dict(record.annotations),
+                letter_annotations={
+                    key: _select_letters(value, columns)
+                    for key, value in record.letter_annotations.items()
+                },
+            )
+        )
+    return MultipleSeqAlignment(
+        records,
+        annotations=dict(alignment.annotations),
+        column_annotations={
+            key: _select_letters(value, columns)
+            for key, value in alignment.column_annotations.items()
+        },
+    )
+
+
+def _set_bootstrap_data(data, seed, tree_constructor):
+    """Store the alignment, seed and tree constructor in a worker process (PRIVATE)."""
+    global _bootstrap_data
+    _bootstrap_data = (data, seed, tree_constructor)
+
+
+def _bootstrap_tree(index):
+    """Build the tree of one bootstrap replicate in a worker process (PRIVATE)."""
+    data, seed, tree_constructor = _bootstrap_data
+    alignment = _bootstrap_replicate(data, seed, index)
+    return copy.deepcopy(tree_constructor).build_tree(alignment)
+
+
 def _clade_to_bitstr(clade, tree_term_names):
     """Create a BitString representing a clade, given ordered tree taxon names (PRIVATE)."""
     clade_term_names = {term.name for term in clade.find_clades(terminal=True)}
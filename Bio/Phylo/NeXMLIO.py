@@ -129,72 +129,105 @@ class Parser:
             node_dict[prop] = meta_node.text
 
     def parse(self, values_are_confidence=False, rooted=False):
-        """Parse the text stream this object was initialized with."""
-        nexml_doc = ElementTree.iterparse(self.handle, events=("end",))
-
-        for event, node in nexml_doc:
-            if node.tag == qUri("nex:tree"):
-                node_dict = {}
-                node_children = {}
-                root = None
-
-                nodes = []
-                edges = []
-                for child in node:
-                    if child.tag == qUri("nex:node"):
-                        nodes.append(child)
-                    if child.tag == qUri("nex:edge"):
-                        edges.append(child)
-
-                for node in nodes:
-                    node_id = node.attrib["id"]
-                    this_node = node_dict[node_id] = {}
-                    if "otu" in node.attrib and node.attrib["otu"]:
-                        this_node["name"] = node.attrib["otu"]
-                    if "root" in node.attrib and node.attrib["root"] == "true":
-                        root = node_id
-
-                    for child in node:
-                        if child.tag == qUri("nex:meta"):
-                            self.add_annotation(node_dict[node_id], child)
-
-                srcs = set()
-                tars = set()
-                for edge in edges:
-                    src, tar = edge.attrib["source"], edge.attrib["target"]
-                    srcs.add(src)
-                    tars.add(tar)
-                    if src not in node_children:
-                        node_children[src] = set()
-
-                    node_children[src].add(tar)
-                    if "length" in edge.attrib:
-                        node_dict[tar]["branch_length"] = float(edge.attrib["length"])
-                    if "property" in edge.attrib and edge.attrib["property"] in matches(
-                        "cdao:has_Support_Value"
-                    ):
-                        node_dict[tar]["confidence"] = float(edge.attrib["content"])
-
-                    for child in edge:
-                        if child.tag == qUri("nex:meta"):
-                            self.add_annotation(node_dict[tar], child)
-
-                if root is None:
-                    # if no root specified, start the recursive tree creation function
-                    # with the first node that's not a child of any other nodes
-                    rooted = False
-                    possible_roots = (
-                        node.attrib["id"]
-                        for node in nodes
-                        if node.attrib["id"] in srcs and node.attrib["id"] not in tars
-                    )
-                    root = next(possible_roots)
-                else:
-                    rooted = True
+        """Parse the text stream this object was initialized with.
+
+        Each tree is returned as soon as its closing tag has been read. The
+        XML elements are discarded once they have been processed, so that
+        memory use is bounded by the size of a single tree rather than by
+        the size of the file.
+        """
+        tree_tag = qUri("nex:tree")
+        node_tag = qUri("nex:node")
+        edge_tag = qUri("nex:edge")
+        meta_tag = qUri("nex:meta")
+
+        # open elements, from the document root down to the current element
+        stack = []
+        tree = None
+        for event, elem in ElementTree.iterparse(self.handle, events=("start", "end")):
+            if event == "start":
+                if elem.tag == tree_tag and tree is None:
+                    tree = elem
+                    node_dict = {}
+                    node_ids = []
+                    edges = []
+                    root = None
+                stack.append(elem)
+                continue
+
+            stack.pop()
+            parent = stack[-1] if stack else None
+            if elem is tree:
+                tree = None
+                yield self._build_tree(node_dict, node_ids, edges, root)
+            elif tree is None:
+                # not part of a tree
+                pass
+            elif parent is tree and elem.tag == node_tag:
+                node_id = elem.attrib["id"]
+                node_ids.append(node_id)
+                this_node = node_dict[node_id] = {}
+                if "otu" in elem.attrib and elem.attrib["otu"]:
+                    this_node["name"] = elem.attrib["otu"]
+                if "root" in elem.attrib and elem.attrib["root"] == "true":
+                    root = node_id
+
+                for child in elem:
+                    if child.tag == meta_tag:
+                        self.add_annotation(this_node, child)
+            elif parent is tree and elem.tag == edge_tag:
+                annotations = {}
+                for child in elem:
+                    if child.tag == meta_tag:
+                        self.add_annotation(annotations, child)
+                edges.append((elem.attrib, annotations))
+            else:
+                # keep the children of nodes and edges until these are read
+                continue
+
+            if parent is not None:
+                # this element and its preceding siblings have been processed
+                del parent[:]
+
+    def _build_tree(self, node_dict, node_ids, edges, root):
+        """Create a NeXML.Tree from the nodes and edges of a tree (PRIVATE)."""
+        node_children = {}
+        srcs = set()
+        tars = set()
+        for attrib, annotations in edges:
+            src, tar = attrib["source"], attrib["target"]
+            srcs.add(src)
+            tars.add(tar)
+            if src not in node_children:
+                node_children[src] = set()
+
+            node_children[src].add(tar)
+            if "length" in attrib:
+                node_dict[tar]["branch_length"] = float(attrib["length"])
+            if "property" in attrib and attrib["property"] in matches(
+                "cdao:has_Support_Value"
+            ):
+                node_dict[tar]["confidence"] = float(attrib["content"])
+
+            if annotations:
+                node_dict[tar].update(annotations)
+
+        if root is None:
+            # if no root specified, start the recursive tree creation function
+            # with the first node that's not a child of any other nodes
+            rooted = False
+            possible_roots = (
+                node_id
+                for node_id in node_ids
+                if node_id in srcs and node_id not in tars
+            )
+            root = next(possible_roots)
+        else:
+            rooted = True
 
-                yield NeXML.Tree(
-                    root=self._make_tree(root, node_dict, node_children), rooted=rooted
-                )
+        return NeXML.Tree(
+            root=self._make_tree(root, node_dict, node_children), rooted=rooted
+        )
 
     @classmethod
     def _make_tree(cls, node, node_dict, children):
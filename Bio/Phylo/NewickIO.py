@@ -15,6 +15,7 @@ See: http://evolution.genetics.washington.edu/phylip/newick_doc.html
 import re
 from io import StringIO
 
+from Bio.Phylo import BaseTree
 from Bio.Phylo import Newick
 
 
@@ -28,10 +29,10 @@ tokens = [
     (r"\(", "open parens"),
     (r"\)", "close parens"),
     (r"[^\s\(\)\[\]\'\:\;\,]+", "unquoted node label"),
-    (r"\:\ ?[+-]?[0-9]*\.?[0-9]+([eE][+-]?[0-9]+)?", "edge length"),
+    (r"\:\ ?[+-]?[0-9]*\.?[0-9]+(?:[eE][+-]?[0-9]+)?", "edge length"),
     (r"\,", "comma"),
-    (r"\[(\\.|[^\]])*\]", "comment"),
-    (r"\'(\\.|[^\'])*\'", "quoted node label"),
+    (r"\[(?:\\.|[^\]])*\]", "comment"),
+    (r"\'(?:\\.|[^\'])*\'", "quoted node label"),
     (r"\;", "semicolon"),
     (r"\n", "newline"),
 ]
@@ -46,6 +47,10 @@ token_dict = {name: re.compile(token) for token, name in tokens}
 def parse(handle, **kwargs):
     """Iterate over the trees in a Newick file handle.
 
+    With ``compact=True``, the trees are returned as compact
+    ``Bio.Phylo.BaseTree.ArrayTree`` objects instead, without creating a
+    ``Clade`` object for each node.
+
     :returns: generator of Bio.Phylo.Newick.Tree objects.
 
     """
@@ -55,6 +60,8 @@ def parse(handle, **kwargs):
 def write(trees, handle, plain=False, **kwargs):
     """Write a trees in Newick format to the given file handle.
 
+    The trees can also be ``Bio.Phylo.BaseTree.ArrayTree`` objects.
+
     :returns: number of trees written.
 
     """
@@ -82,6 +89,33 @@ def _format_comment(text):
     return "[%s]" % (text.replace("[", "\\[").replace("]", "\\]"))
 
 
+def _format_label(label):
+    """Quote a node label if it cannot be written as an unquoted label (PRIVATE)."""
+    if label:
+        unquoted_label = re.match(token_dict["unquoted node label"], label)
+        if (not unquoted_label) or (unquoted_label.end() < len(label)):
+            label = "'%s'" % label.replace("\\", "\\\\").replace("'", "\\'")
+    return label
+
+
+def _preorder(parents, root):
+    """Return the nodes of a tree in preorder, given the parent of each node (PRIVATE).
+
+    The children of each node are taken in the order of their numbers.
+    """
+    children = [[] for parent in parents]
+    for node, parent in enumerate(parents):
+        if parent >= 0:
+            children[parent].append(node)
+    order = []
+    stack = [root]
+    while stack:
+        node = stack.pop()
+        order.append(node)
+        stack.extend(reversed(children[node]))
+    return order
+
+
 def _get_comment(clade):
     try:
         comment = clade.coment
@@ -112,78 +146,95 @@ class Parser:
         return cls(handle)
 
     def parse(
-        self, values_are_confidence=False, comments_are_confidence=False, rooted=False
+        self,
+        values_are_confidence=False,
+        comments_are_confidence=False,
+        rooted=False,
+        compact=False,
     ):
-        """Parse the text stream this object was initialized with."""
+        """Parse the text stream this object was initialized with.
+
+        The trees are read one at a time, so files with many trees (such as
+        samples from a posterior distribution) are not read into memory at
+        once. Each tree must end with a ';' at the end of a line.
+
+        If compact is True, the trees are returned as ``BaseTree.ArrayTree``
+        objects instead of ``Newick.Tree`` objects. Comments are then only
+        kept if they are used as confidence values.
+        """
         self.values_are_confidence = values_are_confidence
         self.comments_are_confidence = comments_are_confidence
         self.rooted = rooted
-        buf = ""
+        if compact:
+            parse_tree = self._parse_compact_tree
+        else:
+            parse_tree = self._parse_tree
+        lines = []
         for line in self.handle:
-            buf += line.rstrip()
-            if buf.endswith(";"):
-                yield self._parse_tree(buf)
-                buf = ""
+            line = line.rstrip()
+            lines.append(line)
+            if line.endswith(";"):
+                yield parse_tree("".join(lines))
+                lines = []
+        buf = "".join(lines)
         if buf:
             # Last tree is missing a terminal ';' character -- that's OK
-            yield self._parse_tree(buf)
+            yield parse_tree(buf)
+
+    def _tokenize(self, text):
+        """Split the text representation of a tree into tokens (PRIVATE).
+
+        Returns the list of tokens before the first ';', and the first token
+        after it (or None).
+        """
+        tokens = tokenizer.findall(text.strip())
+        try:
+            end = tokens.index(";")
+        except ValueError:
+            return tokens, None
+        after = tokens[end + 1] if end + 1 < len(tokens) else None
+        del tokens[end:]
+        return tokens, after
 
     def _parse_tree(self, text):
-        """Parse the text representation into an Tree object (PRIVATE)."""
-        tokens = re.finditer(tokenizer, text.strip())
+        """Parse the text representation into an Tree object (PRIVATE).
 
+        The clades are created by new_clade and finished by process_clade.
+        """
         new_clade = self.new_clade
-        root_clade = new_clade()
-
-        current_clade = root_clade
-        entering_branch_length = False
+        process_clade = self.process_clade
+        current_clade = root_clade = new_clade()
 
         lp_count = 0
         rp_count = 0
-        for match in tokens:
-            token = match.group()
-
-            if token.startswith("'"):
-                # quoted label; add characters to clade name
-                current_clade.name = token[1:-1]
+        tokens, after = self._tokenize(text)
+        for token in tokens:
+            char = token[0]
 
-            elif token.startswith("["):
-                # comment
-                current_clade.comment = token[1:-1]
-                if self.comments_are_confidence:
-                    # Try to use this comment as a numeric support value
-                    current_clade.confidence = _parse_confidence(current_clade.comment)
-
-            elif token == "(":
+            if char == "(":
                 # start a new clade, which is a child of the current clade
                 current_clade = new_clade(current_clade)
-                entering_branch_length = False
                 lp_count += 1
 
-            elif token == ",":
+            elif char == ",":
                 # if the current clade is the root, then the external parentheses
                 # are missing and a new root should be created
                 if current_clade is root_clade:
                     root_clade = new_clade()
                     current_clade.parent = root_clade
                 # start a new child clade at the same level as the current clade
-                parent = self.process_clade(current_clade)
+                parent = process_clade(current_clade)
                 current_clade = new_clade(parent)
-                entering_branch_length = False
 
-            elif token == ")":
+            elif char == ")":
                 # done adding children for this parent clade
-                parent = self.process_clade(current_clade)
+                parent = process_clade(current_clade)
                 if not parent:
                     raise NewickError("Parenthesis mismatch.")
                 current_clade = parent
-                entering_branch_length = False
                 rp_count += 1
 
-            elif token == ";":
-                break
-
-            elif token.startswith(":"):
+            elif char == ":":
                 # branch length or confidence
                 value = float(token[1:])
                 if self.values_are_confidence:
@@ -191,7 +242,18 @@ class Parser:
                 else:
                     current_clade.branch_length = value
 
-            elif token == "\n":
+            elif char == "'":
+                # quoted label; add characters to clade name
+                current_clade.name = token[1:-1]
+
+            elif char == "[":
+                # comment
+                current_clade.comment = token[1:-1]
+                if self.comments_are_confidence:
+                    # Try to use this comment as a numeric support value
+                    current_clade.confidence = _parse_confidence(current_clade.comment)
+
+            elif char == "\n":
                 pass
 
             else:
@@ -200,20 +262,115 @@ class Parser:
 
         if not lp_count == rp_count:
             raise NewickError("Number of open/close parentheses do not match.")
+        # there should be no remaining tokens after the ';'
+        if after is not None:
+            raise NewickError("Text after semicolon in Newick tree: %s" % after)
 
-        # if ; token broke out of for loop, there should be no remaining tokens
-        try:
-            next_token = next(tokens)
-            raise NewickError(
-                "Text after semicolon in Newick tree: %s" % next_token.group()
-            )
-        except StopIteration:
-            pass
-
-        self.process_clade(current_clade)
-        self.process_clade(root_clade)
+        process_clade(current_clade)
+        process_clade(root_clade)
         return Newick.Tree(root=root_clade, rooted=self.rooted)
 
+    def _parse_compact_tree(self, text):
+        """Parse the text representation into an ArrayTree object (PRIVATE).
+
+        This follows ``_parse_tree``, but stores the parent, name, branch
+        length and confidence of each node in lists instead of creating
+        Clade objects.
+        """
+        parents = [-1]
+        names = [None]
+        branch_lengths = [None]
+        confidences = [None]
+        root = current = 0
+
+        lp_count = 0
+        rp_count = 0
+        tokens, after = self._tokenize(text)
+        for token in tokens:
+            char = token[0]
+
+            if char == "(" or char == ",":
+                if char == "(":
+                    # start a new node, which is a child of the current node
+                    parent = current
+                    lp_count += 1
+                else:
+                    # if the current node is the root, then the external
+                    # parentheses are missing and a new root should be created
+                    if current == root:
+                        root = len(parents)
+                        parents.append(-1)
+                        names.append(None)
+                        branch_lengths.append(None)
+                        confidences.append(None)
+                        parents[current] = root
+                    # start a new child node at the same level as the current node
+                    parent = parents[current]
+                current = len(parents)
+                parents.append(parent)
+                names.append(None)
+                branch_lengths.append(None)
+                confidences.append(None)
+
+            elif char == ")":
+                # done adding children for this parent node
+                current = parents[current]
+                if current < 0:
+                    raise NewickError("Parenthesis mismatch.")
+                rp_count += 1
+
+            elif char == ":":
+                # branch length or confidence
+                value = float(token[1:])
+                if self.values_are_confidence:
+                    confidences[current] = value
+                else:
+                    branch_lengths[current] = value
+
+            elif char == "'":
+                # quoted label
+                names[current] = token[1:-1]
+
+            elif char == "[":
+                # comment
+                if self.comments_are_confidence:
+                    confidences[current] = _parse_confidence(token[1:-1])
+
+            elif char == "\n":
+                pass
+
+            else:
+                # unquoted node label
+                names[current] = token
+
+        if not lp_count == rp_count:
+            raise NewickError("Number of open/close parentheses do not match.")
+        # there should be no remaining tokens after the ';'
+        if after is not None:
+            raise NewickError("Text after semicolon in Newick tree: %s" % after)
+
+        if not (self.values_are_confidence or self.comments_are_confidence):
+            # numeric labels of internal nodes are confidence values
+            internal = set(parents)
+            for node, name in enumerate(names):
+                if name and confidences[node] is None and node in internal:
+                    confidences[node] = _parse_confidence(name)
+                    if confidences[node] is not None:
+                        names[node] = None
+
+        if root != 0:
+            # the nodes were not created in preorder; renumber them
+            order = _preorder(parents, root)
+            numbers = {node: number for number, node in enumerate(order)}
+            numbers[-1] = -1
+            parents = [numbers[parents[node]] for node in order]
+            names = [names[node] for node in order]
+            branch_lengths = [branch_lengths[node] for node in order]
+            confidences = [confidences[node] for node in order]
+        return BaseTree.ArrayTree(
+            parents, branch_lengths, confidences, names, rooted=self.rooted
+        )
+
     def new_clade(self, parent=None):
         """Return new Newick.Clade, optionally with temporary reference to parent."""
         clade = Newick.Clade()
@@ -287,32 +444,51 @@ class Writer:
         )
 
         def newickize(clade):
-            """Convert a node tree to a Newick tree string, recursively."""
-            label = clade.name or ""
-            if label:
-                unquoted_label = re.match(token_dict["unquoted node label"], label)
-                if (not unquoted_label) or (unquoted_label.end() < len(label)):
-                    label = "'%s'" % label.replace("\\", "\\\\").replace("'", "\\'")
-
-            if clade.is_terminal():  # terminal
-                return label + make_info_string(clade, terminal=True)
-            else:
-                subtrees = (newickize(sub) for sub in clade)
-                return "(%s)%s" % (",".join(subtrees), label + make_info_string(clade))
+            """Convert a node tree to a Newick tree string, without recursion."""
+            parts = []
+            # the open clades, each with an iterator over its other children
+            stack = []
+            while True:
+                # open the clades down to the leftmost terminal
+                while not clade.is_terminal():
+                    parts.append("(")
+                    children = iter(clade)
+                    stack.append((clade, children))
+                    clade = next(children)
+                label = _format_label(clade.name or "")
+                parts.append(label + make_info_string(clade, terminal=True))
+                # close the clades that have no more children
+                while True:
+                    if not stack:
+                        return "".join(parts)
+                    parent, children = stack[-1]
+                    clade = next(children, None)
+                    if clade is not None:
+                        parts.append(",")
+                        break
+                    stack.pop()
+                    label = _format_label(parent.name or "")
+                    parts.append(")" + label + make_info_string(parent))
 
         # Convert each tree to a string
         for tree in self.trees:
             if ladderize in ("left", "LEFT", "right", "RIGHT"):
+                if isinstance(tree, BaseTree.ArrayTree):
+                    tree = tree.to_tree()
                 # Nexus compatibility shim, kind of
                 tree.ladderize(reverse=(ladderize in ("right", "RIGHT")))
-            rawtree = newickize(tree.root) + ";"
+            if isinstance(tree, BaseTree.ArrayTree):
+                rawtree = _array_tree_to_string(tree, make_info_string) + ";"
+            else:
+                rawtree = newickize(tree.root) + ";"
             if plain_newick:
                 yield rawtree
                 continue
             # Nexus-style (?) notation before the raw Newick tree
             treeline = ["tree", (tree.name or "a_tree"), "="]
-            if tree.weight != 1:
-                treeline.append("[&W%s]" % round(float(tree.weight), 3))
+            weight = getattr(tree, "weight", 1)
+            if weight != 1:
+                treeline.append("[&W%s]" % round(float(weight), 3))
             if tree.rooted:
                 treeline.append("[&R]")
             treeline.append(rawtree)
@@ -371,3 +547,47 @@ class Writer:
                     ) + _get_comment(clade)
 
         return make_info_string
+
+
+class _ArrayTreeNode:
+    """Attributes of one node of an ArrayTree, for make_info_string (PRIVATE)."""
+
+    __slots__ = ("branch_length", "confidence")
+
+
+def _array_tree_to_string(tree, make_info_string):
+    """Convert an ArrayTree to a Newick tree string, without recursion (PRIVATE)."""
+    parents = tree.parents.tolist()
+    first_children = tree.first_children.tolist()
+    next_siblings = tree.next_siblings.tolist()
+    names = tree.names.tolist()
+    branch_lengths = tree.branch_lengths.tolist()
+    confidences = tree.confidences.tolist()
+    view = _ArrayTreeNode()
+
+    def label(node, terminal):
+        branch_length = branch_lengths[node]
+        confidence = confidences[node]
+        # NaN values are missing
+        view.branch_length = None if branch_length != branch_length else branch_length
+        view.confidence = None if confidence != confidence else confidence
+        return _format_label(names[node] or "") + make_info_string(
+            view, terminal=terminal
+        )
+
+    parts = []
+    node = 0
+    while True:
+        # open the clades down to the leftmost terminal
+        while first_children[node] >= 0:
+            parts.append("(")
+            node = first_children[node]
+        parts.append(label(node, True))
+        # close the clades that have no more children
+        while next_siblings[node] < 0:
+            node = parents[node]
+            if node < 0:
+                return "".join(parts)
+            parts.append(")" + label(node, False))
+        parts.append(",")
+        node = next_siblings[node]
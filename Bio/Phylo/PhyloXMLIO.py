@@ -62,28 +62,38 @@ class PhyloXMLError(Exception):
 # Public API
 
 
-def read(file):
+def read(file, skip=()):
     """Parse a phyloXML file or stream and build a tree of Biopython objects.
 
     The children of the root node are phylogenies and possibly other arbitrary
     (non-phyloXML) objects.
 
+    :Parameters:
+        file
+            either an open handle or a file name.
+        skip
+            names of annotation elements (e.g. ``"sequence"`` and
+            ``"distribution"``) to leave out of the phylogenies and their
+            clades. See ``Parser.skippable`` for the supported names.
+
     :returns: a single ``Bio.Phylo.PhyloXML.Phyloxml`` object.
 
     """
-    return Parser(file).read()
+    return Parser(file, skip).read()
 
 
-def parse(file):
+def parse(file, skip=()):
     """Iterate over the phylogenetic trees in a phyloXML file.
 
     This ignores any additional data stored at the top level, but may be more
-    memory-efficient than the ``read`` function.
+    memory-efficient than the ``read`` function: each phylogeny is returned as
+    soon as it has been read, and the XML elements read so far are discarded.
+    The ``skip`` argument is as for the ``read`` function.
 
     :returns: a generator of ``Bio.Phylo.PhyloXML.Phylogeny`` objects.
 
     """
-    return Parser(file).parse()
+    return Parser(file, skip).parse()
 
 
 def write(obj, file, encoding=DEFAULT_ENCODING, indent=True):
@@ -282,10 +292,35 @@ class Parser:
     current clade is finished -- this shouldn't be a problem because clade is
     the only recursive element, and non-clade nodes below this level are of
     bounded size.
+
+    Annotations which are not needed can be skipped by passing their element
+    names (from ``Parser.skippable``) as ``skip``; their XML elements are then
+    discarded as they are read, without creating any objects.
     """
 
-    def __init__(self, file):
+    skippable = frozenset(
+        [
+            "binary_characters",
+            "clade_relation",
+            "date",
+            "distribution",
+            "events",
+            "property",
+            "reference",
+            "sequence",
+            "sequence_relation",
+            "taxonomy",
+        ]
+    )
+
+    def __init__(self, file, skip=()):
         """Initialize the class."""
+        skip = frozenset(skip)
+        if not skip.issubset(self.skippable):
+            raise ValueError(
+                "Cannot skip element(s): %s" % ", ".join(sorted(skip - self.skippable))
+            )
+        self.skip = skip
         # Get an iterable context for XML parsing events
         context = iter(ElementTree.iterparse(file, events=("start", "end")))
         event, root = next(context)
@@ -305,6 +340,7 @@ class Parser:
                 if localtag == "phylogeny":
                     phylogeny = self._parse_phylogeny(elem)
                     phyloxml.phylogenies.append(phylogeny)
+                    self.root.clear()
             if event == "end" and namespace != NAMESPACES["phy"]:
                 # Deal with items not specified by phyloXML
                 other_depth -= 1
@@ -320,10 +356,28 @@ class Parser:
         phytag = _ns("phylogeny")
         for event, elem in self.context:
             if event == "start" and elem.tag == phytag:
-                yield self._parse_phylogeny(elem)
+                phylogeny = self._parse_phylogeny(elem)
+                # Discard the XML elements of this and any preceding siblings
+                self.root.clear()
+                yield phylogeny
+            elif event == "end":
+                # Top-level 'other' elements are not used here
+                elem.clear()
 
     # Special parsing cases -- incremental, using self.context
 
+    def _skip_element(self, parent):
+        """Consume the parsing events of an element without using it (PRIVATE).
+
+        The element and its descendants are cleared as soon as they are
+        complete, so that skipped annotations are never all in memory.
+        """
+        for event, elem in self.context:
+            if event == "end":
+                elem.clear()
+                if elem is parent:
+                    break
+
     def _parse_phylogeny(self, parent):
         """Parse a single phylogeny within the phyloXML tree (PRIVATE).
 
@@ -348,6 +402,9 @@ class Parser:
                     raise ValueError("Phylogeny object should only have 1 clade")
                 phylogeny.root = self._parse_clade(elem)
                 continue
+            if event == "start" and tag in self.skip and namespace == NAMESPACES["phy"]:
+                self._skip_element(elem)
+                continue
             if event == "end":
                 if tag == "phylogeny":
                     parent.clear()
@@ -396,6 +453,13 @@ class Parser:
                 if tag == "clade":
                     clade.clades.append(self._parse_clade(elem))
                     continue
+                if (
+                    tag in self.skip
+                    and namespace == NAMESPACES["phy"]
+                    and not tag_stack
+                ):
+                    self._skip_element(elem)
+                    continue
                 if tag == "taxonomy":
                     clade.taxonomies.append(self._parse_taxonomy(elem))
                     continue
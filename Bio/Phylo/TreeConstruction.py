@@ -10,10 +10,21 @@
 import itertools
 import copy
 import numbers
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy
+
 from Bio.Phylo import BaseTree
-from Bio.Align import MultipleSeqAlignment
+from Bio.Align import ArrayAlignment, MultipleSeqAlignment
 from Bio.Align import substitution_matrices
 
+# Number of rows of the distance matrix calculated in one block, and the
+# number of matrix elements (rows times alignment columns) processed at a
+# time within a block; these bound the memory used by DistanceCalculator.
+_DISTANCE_BLOCK_ROWS = 256
+_DISTANCE_BLOCK_SIZE = 1 << 22
+
 
 class _Matrix:
     """Base class for distance matrix or scoring matrix.
@@ -346,9 +357,10 @@ class DistanceMatrix(_Matrix):
         name_width = max(12, max(map(len, self.names)) + 1)
         value_fmts = ("{" + str(x) + ":.4f}" for x in range(1, len(self.matrix) + 1))
         row_fmt = "{0:" + str(name_width) + "s}" + "  ".join(value_fmts) + "\n"
-        for i, (name, values) in enumerate(zip(self.names, self.matrix)):
+        matrix = self.matrix
+        for i, (name, values) in enumerate(zip(self.names, matrix)):
             # Mirror the matrix values across the diagonal
-            mirror_values = (self.matrix[j][i] for j in range(i + 1, len(self.matrix)))
+            mirror_values = (matrix[j][i] for j in range(i + 1, len(matrix)))
             fields = itertools.chain([name], values, mirror_values)
             handle.write(row_fmt.format(*fields))
 
@@ -357,6 +369,204 @@ class DistanceMatrix(_Matrix):
 _DistanceMatrix = DistanceMatrix
 
 
+class ArrayDistanceMatrix(DistanceMatrix):
+    """Distance matrix stored as a condensed NumPy array.
+
+    The distances are stored in the ``array`` attribute as a one-dimensional
+    array with the lower triangle of the matrix (without the diagonal), row
+    by row; the distance between elements i and j (with i > j) is found at
+    index ``i * (i - 1) // 2 + j``. This uses much less memory than the
+    nested lists of a DistanceMatrix, and is used directly by the tree
+    construction methods of DistanceTreeConstructor.
+
+    :Parameters:
+        names : list
+            names of elements, used for indexing
+        matrix : list or array
+            nested list of numerical lists in lower triangular format (as for
+            DistanceMatrix), a condensed one-dimensional array, or a square
+            two-dimensional array of which the lower triangle is used.
+
+    Examples
+    --------
+    >>> from Bio.Phylo.TreeConstruction import ArrayDistanceMatrix
+    >>> names = ['Alpha', 'Beta', 'Gamma', 'Delta']
+    >>> matrix = [[0], [1, 0], [2, 3, 0], [4, 5, 6, 0]]
+    >>> dm = ArrayDistanceMatrix(names, matrix)
+    >>> dm.array.tolist()
+    [1.0, 2.0, 3.0, 4.0, 5.0, 6.0]
+    >>> dm['Beta', 'Gamma']
+    3.0
+    >>> dm['Beta']
+    [1.0, 0.0, 3.0, 5.0]
+    >>> del dm['Alpha']
+    >>> dm.matrix
+    [[0], [3.0, 0], [5.0, 6.0, 0]]
+
+    """
+
+    def __init__(self, names, matrix=None):
+        """Initialize the class."""
+        if isinstance(names, list) and all(isinstance(s, str) for s in names):
+            if len(set(names)) == len(names):
+                self.names = names
+            else:
+                raise ValueError("Duplicate names found")
+        else:
+            raise TypeError("'names' should be a list of strings")
+        n = len(names)
+        if matrix is None:
+            self.array = numpy.zeros(n * (n - 1) // 2)
+        elif isinstance(matrix, numpy.ndarray):
+            if matrix.ndim == 2:
+                if matrix.shape != (n, n):
+                    raise ValueError("'names' and 'matrix' should be the same size")
+                matrix = numpy.concatenate([matrix[i, :i] for i in range(n)])
+            elif matrix.ndim != 1 or len(matrix) != n * (n - 1) // 2:
+                raise ValueError("'names' and 'matrix' should be the same size")
+            self.array = numpy.array(matrix, float)
+        else:
+            self.matrix = matrix
+
+    @property
+    def matrix(self):
+        """Distances as a nested list in lower triangular format."""
+        values = self.array.tolist()
+        return [
+            values[i * (i - 1) // 2 : i * (i + 1) // 2] + [0] for i in range(len(self))
+        ]
+
+    @matrix.setter
+    def matrix(self, matrix):
+        n = len(self)
+        if not (
+            isinstance(matrix, list)
+            and all(isinstance(l, list) for l in matrix)
+            and all(isinstance(x, numbers.Number) for l in matrix for x in l)
+        ):
+            raise TypeError("'matrix' should be a list of numerical lists")
+        if len(matrix) != n:
+            raise ValueError("'names' and 'matrix' should be the same size")
+        if [len(m) for m in matrix] != list(range(1, n + 1)):
+            raise ValueError("'matrix' should be in lower triangle format")
+        values = itertools.chain.from_iterable(row[:-1] for row in matrix)
+        self.array = numpy.fromiter(values, float, n * (n - 1) // 2)
+
+    def _indices(self, item):
+        """Return the indices given by a pair of indices or names (PRIVATE)."""
+        if not (
+            all(isinstance(i, numbers.Integral) for i in item)
+            or all(isinstance(i, str) for i in item)
+        ):
+            raise TypeError("Invalid index type.")
+        i, j = map(self._index, item)
+        return i, j
+
+    def _index(self, item):
+        """Return the index of an element given by index or name (PRIVATE)."""
+        if isinstance(item, str):
+            if item in self.names:
+                return self.names.index(item)
+            raise ValueError("Item not found.")
+        if isinstance(item, numbers.Integral):
+            index = int(item)
+            if index < 0:
+                index += len(self)
+            if not 0 <= index < len(self):
+                raise IndexError("Index out of range.")
+            return index
+        raise TypeError("Invalid index type.")
+
+    def _row(self, index):
+        """Return the distances from the given index to all others (PRIVATE)."""
+        row = numpy.zeros(len(self))
+        start = index * (index - 1) // 2
+        row[:index] = self.array[start : start + index]
+        others = numpy.arange(index + 1, len(self))
+        row[index + 1 :] = self.array[others * (others - 1) // 2 + index]
+        return row
+
+    def _square(self):
+        """Return the distances as a square two-dimensional array (PRIVATE)."""
+        n = len(self)
+        square = numpy.zeros((n, n))
+        for i in range(n):
+            values = self.array[i * (i - 1) // 2 : i * (i + 1) // 2]
+            square[i, :i] = values
+            square[:i, i] = values
+        return square
+
+    def __getitem__(self, item):
+        """Access value(s) by the index(s) or name(s), as for DistanceMatrix."""
+        if isinstance(item, (numbers.Integral, str)):
+            return self._row(self._index(item)).tolist()
+        elif isinstance(item, tuple) and len(item) == 2:
+            i, j = self._indices(item)
+            if i == j:
+                return 0
+            if i < j:
+                i, j = j, i
+            return self.array[i * (i - 1) // 2 + j].item()
+        else:
+            raise TypeError("Invalid index type.")
+
+    def __setitem__(self, item, value):
+        """Set value(s) by the index(s) or name(s), as for DistanceMatrix."""
+        if isinstance(item, (numbers.Integral, str)):
+            index = self._index(item)
+            if not (
+                isinstance(value, list)
+                and all(isinstance(n, numbers.Number) for n in value)
+            ):
+                raise TypeError("Invalid value type.")
+            if len(value) != len(self):
+                raise ValueError("Value not the same size.")
+            start = index * (index - 1) // 2
+            self.array[start : start + index] = value[:index]
+            others = numpy.arange(index + 1, len(self))
+            self.array[others * (others - 1) // 2 + index] = value[index + 1 :]
+        elif isinstance(item, tuple) and len(item) == 2:
+            i, j = self._indices(item)
+            if not isinstance(value, numbers.Number):
+                raise TypeError("Invalid value type.")
+            if i < j:
+                i, j = j, i
+            if i > j:
+                self.array[i * (i - 1) // 2 + j] = value
+        else:
+            raise TypeError("Invalid index type.")
+
+    def __delitem__(self, item):
+        """Delete related distances by the index or name."""
+        index = self._index(item)
+        square = numpy.delete(self._square(), index, 0)
+        square = numpy.delete(square, index, 1)
+        del self.names[index]
+        self.array = ArrayDistanceMatrix(self.names, square).array
+
+    def insert(self, name, value, index=None):
+        """Insert distances given the name and value.
+
+        :Parameters:
+            name : str
+                name of a row/col to be inserted
+            value : list
+                a row/col of values to be inserted
+
+        """
+        if not isinstance(name, str):
+            raise TypeError("Invalid name type.")
+        if index is None:
+            index = len(self)
+        if not isinstance(index, int):
+            raise TypeError("Invalid index type.")
+        square = numpy.insert(self._square(), index, 0, 0)
+        square = numpy.insert(square, index, 0, 1)
+        self.names.insert(index, name)
+        self.array = ArrayDistanceMatrix(self.names, square).array
+        self[index] = value
+
+
 class DistanceCalculator:
     """Class to calculate the distance matrix from a DNA or Protein.
 
@@ -516,22 +726,176 @@ class DistanceCalculator:
             return 1  # max possible scaled distance
         return 1 - (score * 1.0 / max_score)
 
-    def get_distance(self, msa):
+    def _encode(self, alignment):
+        """Encode the alignment as an integer array of letter indices (PRIVATE).
+
+        For the identity model, letters are numbered in order of appearance
+        in the alignment; for a scoring matrix, the index of each letter in
+        the matrix alphabet is used.  Letters in skip_letters are encoded as
+        -1.  Returns the encoded array and the number of letters.
+        """
+        array = alignment.array
+        table = numpy.full(256, -2, numpy.intp)
+        if self.scoring_matrix is None:
+            codes = numpy.flatnonzero(numpy.bincount(array.ravel(), minlength=256))
+            table[codes] = numpy.arange(len(codes))
+            size = len(codes)
+        else:
+            for index, letter in enumerate(self.scoring_matrix.alphabet):
+                if len(letter) == 1 and ord(letter) < 256:
+                    table[ord(letter)] = index
+            size = len(self.scoring_matrix.alphabet)
+        for letter in self.skip_letters:
+            if len(letter) == 1 and ord(letter) < 256:
+                table[ord(letter)] = -1
+        indices = table[array]
+        bad = numpy.argwhere(indices == -2)
+        if len(bad):
+            row, position = bad[0]
+            raise ValueError(
+                "Bad letter '%s' in sequence '%s' at position '%s'"
+                % (chr(array[row, position]), alignment[int(row)].id, position)
+            )
+        return indices, size
+
+    def get_distance(self, msa, n_jobs=1, array=False):
         """Return a DistanceMatrix for MSA object.
 
+        The alignment is encoded as an integer array, and the distances are
+        calculated with NumPy in blocks of rows of the distance matrix to
+        bound the memory usage.
+
         :Parameters:
-            msa : MultipleSeqAlignment
+            msa : MultipleSeqAlignment or ArrayAlignment
                 DNA or Protein multiple sequence alignment.
+            n_jobs : int
+                Number of processes used to calculate the blocks of the
+                distance matrix in parallel (default 1, i.e. no additional
+                processes). Use None to use all available CPUs.
+            array : bool
+                If True, return an ArrayDistanceMatrix instead of a
+                DistanceMatrix (default False). This is recommended for
+                large alignments.
 
         """
-        if not isinstance(msa, MultipleSeqAlignment):
+        if isinstance(msa, ArrayAlignment):
+            alignment = msa
+        elif isinstance(msa, MultipleSeqAlignment):
+            try:
+                alignment = ArrayAlignment(msa)
+            except ValueError:
+                # Letters are not ASCII; compare the sequences letter by letter
+                names = [s.id for s in msa]
+                dm = DistanceMatrix(names)
+                for seq1, seq2 in itertools.combinations(msa, 2):
+                    dm[seq1.id, seq2.id] = self._pairwise(seq1, seq2)
+                if array:
+                    return ArrayDistanceMatrix(names, dm.matrix)
+                return dm
+        else:
             raise TypeError("Must provide a MultipleSeqAlignment object.")
 
-        names = [s.id for s in msa]
-        dm = DistanceMatrix(names)
-        for seq1, seq2 in itertools.combinations(msa, 2):
-            dm[seq1.id, seq2.id] = self._pairwise(seq1, seq2)
-        return dm
+        names = [s.id for s in alignment]
+        indices, size = self._encode(alignment)
+        if self.scoring_matrix is None:
+            scores = None
+        else:
+            scores = numpy.array(self.scoring_matrix, float)
+        # the block sizes are passed on, as worker processes started by
+        # spawning do not see changes to the module variables
+        data = (indices, size, scores, _DISTANCE_BLOCK_ROWS, _DISTANCE_BLOCK_SIZE)
+        n = len(names)
+        if array:
+            dm = ArrayDistanceMatrix(names)
+        else:
+            matrix = []
+
+        def store(start, distances):
+            for i, row in enumerate(distances, start):
+                if array:
+                    dm.array[i * (i - 1) // 2 : i * (i + 1) // 2] = row[:i]
+                else:
+                    matrix.append(row[:i].tolist() + [0])
+
+        starts = range(0, n, _DISTANCE_BLOCK_ROWS)
+        if n_jobs is None:
+            n_jobs = os.cpu_count()
+        if n_jobs > 1 and n > _DISTANCE_BLOCK_ROWS:
+            with ProcessPoolExecutor(
+                n_jobs, initializer=_set_distance_data, initargs=(data,)
+            ) as executor:
+                blocks = executor.map(_calculate_distance_block, starts)
+                for start, distances in zip(starts, blocks):
+                    store(start, distances)
+        else:
+            for start in starts:
+                store(start, _calculate_distance_block(start, data))
+        if array:
+            return dm
+        return DistanceMatrix(names, matrix)
+
+
+_distance_data = None
+
+
+def _set_distance_data(data):
+    """Store the encoded alignment in a worker process (PRIVATE)."""
+    global _distance_data
+    _distance_data = data
+
+
+def _calculate_distance_block(start, data=None):
+    """Calculate a block of rows of the distance matrix (PRIVATE).
+
+    Returns the rows start to start + block_rows of the distance matrix
+    (up to the diagonal) as a two-dimensional array, using the encoded
+    alignment from DistanceCalculator._encode and the block sizes stored
+    with it.  Scores between all pairs of sequences are calculated as sums
+    of matrix products over the letters, processing a limited number of
+    alignment columns (about block_size / number of rows) at a time.
+    """
+    if data is None:
+        data = _distance_data
+    indices, size, scores, block_rows, block_size = data
+    n, length = indices.shape
+    end = min(start + block_rows, n)
+    rows = indices[start:end]
+    columns = indices[:end]
+    score = numpy.zeros((end - start, end))
+    if scores is not None:
+        diagonal = scores.diagonal()
+        max_score1 = numpy.zeros((end - start, end))
+        max_score2 = numpy.zeros((end - start, end))
+    step = max(1, block_size // end)
+    for position in range(0, length, step):
+        block1 = rows[:, position : position + step]
+        block2 = columns[:, position : position + step]
+        if scores is None:
+            # count identical letters
+            for letter in range(size):
+                score += (block1 == letter).astype(float) @ (block2 == letter).T
+        else:
+            valid1 = block1 >= 0
+            valid2 = block2 >= 0
+            letters1 = numpy.where(valid1, block1, 0)
+            letters2 = numpy.where(valid2, block2, 0)
+            for letter in numpy.unique(block2[valid2]):
+                # scores[seq2_letter, seq1_letter], as the rows of the
+                # distance matrix correspond to the second sequence
+                values = numpy.where(valid1, scores[letter, letters1], 0.0)
+                score += values @ (block2 == letter).T
+            values1 = numpy.where(valid1, diagonal[letters1], 0.0)
+            values2 = numpy.where(valid2, diagonal[letters2], 0.0)
+            max_score1 += valid1.astype(float) @ values2.T
+            max_score2 += values1 @ valid2.T
+    if scores is None:
+        max_score = length
+    else:
+        # Take the higher score if the matrix is asymmetrical
+        max_score = numpy.maximum(max_score1, max_score2)
+    with numpy.errstate(divide="ignore", invalid="ignore"):
+        distances = numpy.where(max_score == 0, 1.0, 1 - score / max_score)
+    return distances
 
 
 class TreeConstructor:
@@ -600,6 +964,12 @@ class DistanceTreeConstructor(TreeConstructor):
                         Clade(branch_length=0.10256410256410259, name='Delta')
                     Clade(branch_length=0.14423076923076922, name='Gamma')
 
+    For large alignments, use an ArrayDistanceMatrix to reduce memory usage,
+    and prune the search of the Q-matrix when building the NJ Tree::
+
+        dm = calculator.get_distance(aln, array=True)
+        njtree = constructor.nj(dm, prune=True)
+
     """
 
     methods = ["nj", "upgma"]
@@ -649,78 +1019,105 @@ class DistanceTreeConstructor(TreeConstructor):
         if not isinstance(distance_matrix, DistanceMatrix):
             raise TypeError("Must provide a DistanceMatrix object.")
 
-        # make a copy of the distance matrix to be used
-        dm = copy.deepcopy(distance_matrix)
+        # work on a square array of the distances; merged clades are stored
+        # at the lower index of the pair, the higher index becomes inactive
+        dm = _square_distances(distance_matrix)
+        n = len(dm)
         # init terminal clades
-        clades = [BaseTree.Clade(None, name) for name in dm.names]
-        # init minimum index
-        min_i = 0
-        min_j = 0
-        inner_count = 0
-        while len(dm) > 1:
-            min_dist = dm[1, 0]
-            # find minimum index
-            for i in range(1, len(dm)):
-                for j in range(0, i):
-                    if min_dist >= dm[i, j]:
-                        min_dist = dm[i, j]
-                        min_i = i
-                        min_j = j
+        clades = [BaseTree.Clade(None, name) for name in distance_matrix.names]
+        if n == 1:
+            return BaseTree.Tree(clades[0])
+        heights = [0] * n
+        active = numpy.ones(n, bool)
+        # for each row, the minimum distance to the clades at lower indices,
+        # and the last index at which it is found
+        row_min = numpy.full(n, numpy.inf)
+        row_arg = numpy.zeros(n, int)
+        _update_row_minima(dm, active, numpy.arange(1, n), row_min, row_arg)
+        for inner_count in range(1, n):
+            # find the last minimum in the lower triangle
+            min_dist = row_min.min()
+            min_i = numpy.flatnonzero(row_min == min_dist)[-1]
+            min_j = row_arg[min_i]
+            min_dist = min_dist.item()
 
             # create clade
             clade1 = clades[min_i]
             clade2 = clades[min_j]
-            inner_count += 1
             inner_clade = BaseTree.Clade(None, "Inner" + str(inner_count))
             inner_clade.clades.append(clade1)
             inner_clade.clades.append(clade2)
             # assign branch length
             if clade1.is_terminal():
                 clade1.branch_length = min_dist * 1.0 / 2
+                height1 = clade1.branch_length
             else:
-                clade1.branch_length = min_dist * 1.0 / 2 - self._height_of(clade1)
+                clade1.branch_length = min_dist * 1.0 / 2 - heights[min_i]
+                height1 = heights[min_i]
 
             if clade2.is_terminal():
                 clade2.branch_length = min_dist * 1.0 / 2
+                height2 = clade2.branch_length
             else:
-                clade2.branch_length = min_dist * 1.0 / 2 - self._height_of(clade2)
+                clade2.branch_length = min_dist * 1.0 / 2 - heights[min_j]
+                height2 = heights[min_j]
 
             # update node list
             clades[min_j] = inner_clade
-            del clades[min_i]
+            heights[min_j] = max(height1, height2)
+            active[min_i] = False
+            row_min[min_i] = numpy.inf
 
-            # rebuild distance matrix,
             # set the distances of new node at the index of min_j
-            for k in range(0, len(dm)):
-                if k != min_i and k != min_j:
-                    dm[min_j, k] = (dm[min_i, k] + dm[min_j, k]) * 1.0 / 2
-
-            dm.names[min_j] = "Inner" + str(inner_count)
-
-            del dm[min_i]
+            others = numpy.flatnonzero(active)
+            others = others[others != min_j]
+            dm[min_j, others] = (dm[min_i, others] + dm[min_j, others]) * 1.0 / 2
+            dm[others, min_j] = dm[min_j, others]
+
+            # update the row minima of the new node and of the rows after it;
+            # rows with their minimum at min_i or min_j are recalculated
+            rows = others[others > min_j]
+            stale = (row_arg[rows] == min_i) | (row_arg[rows] == min_j)
+            stale, rows = rows[stale], rows[~stale]
+            values = dm[rows, min_j]
+            lower = (values < row_min[rows]) | (
+                (values == row_min[rows]) & (min_j > row_arg[rows])
+            )
+            row_min[rows[lower]] = values[lower]
+            row_arg[rows[lower]] = min_j
+            rows = numpy.append(stale, min_j)
+            _update_row_minima(dm, active, rows, row_min, row_arg)
         inner_clade.branch_length = 0
         return BaseTree.Tree(inner_clade)
 
-    def nj(self, distance_matrix):
+    def nj(self, distance_matrix, prune=False):
         """Construct and return a Neighbor Joining tree.
 
+        The Q-matrix is calculated with NumPy in blocks of rows. With
+        ``prune=True``, the rows of the distance matrix are kept sorted, and
+        only the start of each row is searched, as in RapidNJ: the Q-values
+        in the rest of the row are bounded from below by the distances. This
+        is much faster for large matrices. However, the row sums are then
+        updated incrementally, which may change the rounding of the Q-values:
+        tied Q-values, which are common if the distances take only a few
+        values, may then be resolved differently, giving a different tree.
+
         :Parameters:
             distance_matrix : DistanceMatrix
                 The distance matrix for tree construction.
+            prune : bool
+                Only search the parts of the Q-matrix that may contain the
+                minimum (default False).
 
         """
         if not isinstance(distance_matrix, DistanceMatrix):
             raise TypeError("Must provide a DistanceMatrix object.")
 
-        # make a copy of the distance matrix to be used
-        dm = copy.deepcopy(distance_matrix)
+        # work on a square array of the distances; merged clades are stored
+        # at the lower index of the pair, the higher index becomes inactive
+        dm = _square_distances(distance_matrix)
         # init terminal clades
-        clades = [BaseTree.Clade(None, name) for name in dm.names]
-        # init node distance
-        node_dist = [0] * len(dm)
-        # init minimum index
-        min_i = 0
-        min_j = 0
+        clades = [BaseTree.Clade(None, name) for name in distance_matrix.names]
         inner_count = 0
         # special cases for Minimum Alignment Matrices
         if len(dm) == 1:
@@ -733,8 +1130,8 @@ class DistanceTreeConstructor(TreeConstructor):
             min_j = 0
             clade1 = clades[min_i]
             clade2 = clades[min_j]
-            clade1.branch_length = dm[min_i, min_j] / 2.0
-            clade2.branch_length = dm[min_i, min_j] - clade1.branch_length
+            clade1.branch_length = dm[min_i, min_j].item() / 2.0
+            clade2.branch_length = dm[min_i, min_j].item() - clade1.branch_length
             inner_clade = BaseTree.Clade(None, "Inner")
             inner_clade.clades.append(clade1)
             inner_clade.clades.append(clade2)
@@ -742,25 +1139,37 @@ class DistanceTreeConstructor(TreeConstructor):
             root = clades[0]
 
             return BaseTree.Tree(root, rooted=False)
-        while len(dm) > 2:
+        active = numpy.ones(len(dm), bool)
+        size = len(dm)
+        row_sums = _row_sums(dm)
+        if prune:
+            sorted_rows = _SortedRows(dm)
+        while size > 2:
+            if 2 * size <= len(dm):
+                # drop the inactive rows and columns
+                keep = numpy.flatnonzero(active)
+                dm = dm[numpy.ix_(keep, keep)]
+                clades = [clades[k] for k in keep]
+                active = active[keep]
+                row_sums = _row_sums(dm)
+                if prune:
+                    sorted_rows = _SortedRows(dm)
+            elif not prune or size <= 4:
+                # the row sums are only updated incrementally when pruning;
+                # recalculate them for the last joins, which involve ties
+                row_sums = _row_sums(dm)
             # calculate nodeDist
-            for i in range(0, len(dm)):
-                node_dist[i] = 0
-                for j in range(0, len(dm)):
-                    node_dist[i] += dm[i, j]
-                node_dist[i] = node_dist[i] / (len(dm) - 2)
+            node_dist = row_sums / (size - 2)
+            node_dist[~active] = -numpy.inf
 
             # find minimum distance pair
-            min_dist = dm[1, 0] - node_dist[1] - node_dist[0]
-            min_i = 0
-            min_j = 1
-            for i in range(1, len(dm)):
-                for j in range(0, i):
-                    temp = dm[i, j] - node_dist[i] - node_dist[j]
-                    if min_dist > temp:
-                        min_dist = temp
-                        min_i = i
-                        min_j = j
+            if prune:
+                min_i, min_j = sorted_rows.find_pair(active, node_dist)
+            else:
+                min_i, min_j = _nj_pair(dm, node_dist)
+            first, second = numpy.flatnonzero(active)[:2]
+            if (min_i, min_j) == (second, first):
+                min_i, min_j = first, second
             # create clade
             clade1 = clades[min_i]
             clade2 = clades[min_j]
@@ -770,48 +1179,219 @@ class DistanceTreeConstructor(TreeConstructor):
             inner_clade.clades.append(clade2)
             # assign branch length
             clade1.branch_length = (
-                dm[min_i, min_j] + node_dist[min_i] - node_dist[min_j]
+                dm[min_i, min_j].item()
+                + node_dist[min_i].item()
+                - node_dist[min_j].item()
             ) / 2.0
-            clade2.branch_length = dm[min_i, min_j] - clade1.branch_length
-
-            # update node list
-            clades[min_j] = inner_clade
-            del clades[min_i]
-
-            # rebuild distance matrix,
-            # set the distances of new node at the index of min_j
-            for k in range(0, len(dm)):
-                if k != min_i and k != min_j:
-                    dm[min_j, k] = (
-                        dm[min_i, k] + dm[min_j, k] - dm[min_i, min_j]
-                    ) / 2.0
-
-            dm.names[min_j] = "Inner" + str(inner_count)
-            del dm[min_i]
+            clade2.branch_length = dm[min_i, min_j].item() - clade1.branch_length
+
+            # update node list, keeping the new node at the lower index
+            low, high = min(min_i, min_j), max(min_i, min_j)
+            clades[low] = inner_clade
+            active[high] = False
+            size -= 1
+
+            # set the distances of new node at the index of low
+            others = numpy.flatnonzero(active)
+            others = others[others != low]
+            values = (dm[min_i, others] + dm[min_j, others] - dm[min_i, min_j]) / 2.0
+            row_sums[others] += values - dm[min_i, others] - dm[min_j, others]
+            row_sums[low] = values.sum()
+            dm[high, :] = 0
+            dm[:, high] = 0
+            dm[low, :] = 0
+            dm[:, low] = 0
+            dm[low, others] = values
+            dm[others, low] = values
+            if prune:
+                sorted_rows.add(dm, active, low)
 
         # set the last clade as one of the child of the inner_clade
         root = None
-        if clades[0] == inner_clade:
-            clades[0].branch_length = 0
-            clades[1].branch_length = dm[1, 0]
-            clades[0].clades.append(clades[1])
-            root = clades[0]
+        first, second = numpy.flatnonzero(active)
+        if clades[first] is inner_clade:
+            clades[first].branch_length = 0
+            clades[second].branch_length = dm[second, first].item()
+            clades[first].clades.append(clades[second])
+            root = clades[first]
         else:
-            clades[0].branch_length = dm[1, 0]
-            clades[1].branch_length = 0
-            clades[1].clades.append(clades[0])
-            root = clades[1]
+            clades[first].branch_length = dm[second, first].item()
+            clades[second].branch_length = 0
+            clades[second].clades.append(clades[first])
+            root = clades[second]
 
         return BaseTree.Tree(root, rooted=False)
 
-    def _height_of(self, clade):
-        """Calculate clade height -- the longest path to any terminal (PRIVATE)."""
-        height = 0
-        if clade.is_terminal():
-            height = clade.branch_length
-        else:
-            height = height + max(self._height_of(c) for c in clade.clades)
-        return height
+
+def _square_distances(distance_matrix):
+    """Return the distances of a DistanceMatrix as a square array (PRIVATE)."""
+    if not isinstance(distance_matrix, ArrayDistanceMatrix):
+        names = list(distance_matrix.names)
+        distance_matrix = ArrayDistanceMatrix(names, distance_matrix.matrix)
+    return distance_matrix._square()
+
+
+def _block_rows(n):
+    """Return the number of rows of an n-column array per block (PRIVATE)."""
+    return max(1, _DISTANCE_BLOCK_SIZE // max(n, 1))
+
+
+def _row_sums(dm):
+    """Return the sums of the rows of a square array (PRIVATE).
+
+    The values in each row are added one by one in column order, instead of
+    by the pairwise summation used by numpy.sum, so that the sums are
+    rounded exactly as by a plain Python loop. Ties in the Q-matrix are then
+    broken in the same way as by the original implementation of nj.
+    """
+    n = len(dm)
+    sums = numpy.empty(n)
+    step = _block_rows(n)
+    for start in range(0, n, step):
+        block = dm[start : start + step]
+        sums[start : start + step] = numpy.cumsum(block, axis=1)[:, -1]
+    return sums
+
+
+def _update_row_minima(dm, active, rows, row_min, row_arg):
+    """Recalculate the minimum distance of the given rows (PRIVATE).
+
+    Only the active columns before each row are considered (as in the lower
+    triangle); the last column with the minimum distance is stored in
+    row_arg.
+    """
+    columns = numpy.arange(len(dm))
+    step = _block_rows(len(dm))
+    for start in range(0, len(rows), step):
+        block = rows[start : start + step]
+        values = dm[block]
+        values[(columns >= block[:, None]) | ~active] = numpy.inf
+        last = len(dm) - 1 - values[:, ::-1].argmin(axis=1)
+        row_min[block] = values[numpy.arange(len(block)), last]
+        row_arg[block] = last
+
+
+def _nj_pair(dm, node_dist):
+    """Return the pair of nodes to join with the minimum Q-value (PRIVATE).
+
+    Returns the indices (i, j) with i > j of the first minimum of the lower
+    triangle of the Q-matrix, scanning the rows in order. Inactive nodes
+    must have a node distance of minus infinity.
+    """
+    n = len(dm)
+    columns = numpy.arange(n)
+    min_dist = numpy.inf
+    min_i, min_j = 1, 0
+    step = _block_rows(n)
+    for start in range(1, n, step):
+        end = min(start + step, n)
+        rows = numpy.arange(start, end)
+        q = dm[start:end, :end] - node_dist[start:end, None] - node_dist[:end]
+        q[columns[:end] >= rows[:, None]] = numpy.inf
+        index = q.argmin()
+        row, column = divmod(index, end)
+        if q[row, column] < min_dist:
+            min_dist = q[row, column]
+            min_i, min_j = start + row, column
+    return min_i, min_j
+
+
+class _SortedRows:
+    """Rows of a distance matrix sorted by distance, as used by RapidNJ (PRIVATE).
+
+    For each row, the columns are stored in order of increasing distance,
+    together with the distances. The entries are not updated when nodes are
+    joined; instead, the row of the new node is sorted and added, and
+    entries referring to nodes that were removed, or that were created after
+    the row was sorted, are ignored. As the Q-values in a row are bounded
+    from below by the distance minus the node distance of the row and the
+    maximum node distance, only the start of most rows needs to be searched.
+    """
+
+    def __init__(self, dm):
+        """Sort all rows of the distance matrix (PRIVATE)."""
+        n = len(dm)
+        self.columns = numpy.empty((n, n), numpy.intp)
+        self.distances = numpy.empty((n, n + 1))
+        self.distances[:, n] = numpy.inf
+        # the time at which the node in each column was created, and at
+        # which each row was sorted
+        self.created = numpy.zeros(n, int)
+        self.sorted = numpy.zeros(n, int)
+        self.time = 0
+        step = _block_rows(n)
+        for start in range(0, n, step):
+            rows = numpy.arange(start, min(start + step, n))
+            values = dm[rows]
+            values[numpy.arange(len(rows)), rows] = numpy.inf
+            order = values.argsort(axis=1, kind="stable")
+            self.columns[rows] = order
+            self.distances[rows, :n] = numpy.take_along_axis(values, order, axis=1)
+
+    def add(self, dm, active, index):
+        """Sort the row of a newly created node (PRIVATE)."""
+        self.time += 1
+        self.created[index] = self.time
+        self.sorted[index] = self.time
+        others = numpy.flatnonzero(active)
+        others = others[others != index]
+        values = dm[index, others]
+        order = values.argsort(kind="stable")
+        self.columns[index, : len(others)] = others[order]
+        self.columns[index, len(others) :] = index
+        self.distances[index, : len(others)] = values[order]
+        self.distances[index, len(others) :] = numpy.inf
+
+    def find_pair(self, active, node_dist):
+        """Return the pair of nodes to join with the minimum Q-value (PRIVATE).
+
+        The Q-values are calculated exactly as in _nj_pair, and for the same
+        node distances, the same pair is returned, including for ties. Note
+        that nj updates the row sums incrementally when pruning, so that the
+        node distances may differ from those of the full search by rounding.
+        """
+        rows = numpy.flatnonzero(active)
+        max_dist = node_dist[rows].max()
+        n = len(active)
+        min_dist = numpy.inf
+        pairs = []
+        start, step = 0, 8
+        while len(rows) and start < n:
+            end = min(start + step, n)
+            columns = self.columns[rows, start:end]
+            distances = self.distances[rows, start:end]
+            row_dist = node_dist[rows, None]
+            column_dist = node_dist[columns]
+            # subtract the node distance of the higher index first
+            q = numpy.where(
+                columns < rows[:, None],
+                distances - row_dist - column_dist,
+                distances - column_dist - row_dist,
+            )
+            valid = active[columns] & (columns != rows[:, None])
+            valid &= self.created[columns] <= self.sorted[rows, None]
+            q[~valid] = numpy.inf
+            value = q.min()
+            if value < min_dist:
+                min_dist = value
+                pairs = []
+            if value == min_dist < numpy.inf:
+                index = numpy.argwhere(q == value)
+                i = rows[index[:, 0]]
+                j = columns[index[:, 0], index[:, 1]]
+                pairs.extend(zip(numpy.maximum(i, j), numpy.minimum(i, j)))
+            # keep the rows in which the remaining Q-values may be lower,
+            # allowing for rounding errors; rows without further entries have
+            # an infinite bound
+            distances = self.distances[rows, end]
+            bounds = distances - node_dist[rows] - max_dist
+            finite = numpy.isfinite(bounds)
+            margin = abs(distances) + abs(node_dist[rows]) + abs(max_dist)
+            bounds[finite] -= 1e-12 * margin[finite]
+            rows = rows[bounds <= min_dist]
+            start, step = end, 2 * step
+        i, j = min(pairs)
+        return i, j
 
 
 # #################### Tree Scoring and Searching Classes #####################
@@ -870,7 +1450,72 @@ class NNITreeSearcher(TreeSearcher):
         return self._nni(starting_tree, alignment)
 
     def _nni(self, starting_tree, alignment):
-        """Search for the best parsimony tree using the NNI algorithm (PRIVATE)."""
+        """Search for the best parsimony tree using the NNI algorithm (PRIVATE).
+
+        With a ParsimonyScorer, the neighbor trees are scored incrementally:
+        each interchange is made in place, and only the partial scores of the
+        clades affected by it are recalculated. The tree is only copied once
+        the best interchange is found.
+        """
+        if not isinstance(self.scorer, ParsimonyScorer):
+            return self._nni_copies(starting_tree, alignment)
+        scorer = self.scorer
+        best_tree = starting_tree
+        while True:
+            clade_scores, weights, columns = scorer._get_clade_scores(
+                best_tree, alignment
+            )
+            best_score = scorer._get_root_score(
+                clade_scores[best_tree.root], weights, columns
+            )
+            temp = best_score
+            best_move = None
+            parents = {}
+            for clade in best_tree.find_clades():
+                for child in clade.clades:
+                    parents[child] = clade
+            for move in self._get_moves(best_tree):
+                # recalculate the clade that is lower in the tree first, then
+                # the other one, then all ancestors
+                clade1, clade2 = move[0][0], move[1][0]
+                if parents.get(clade2) is clade1:
+                    path = [clade2, clade1]
+                else:
+                    path = [clade1, clade2]
+                clade = parents.get(path[-1])
+                while clade is not None:
+                    path.append(clade)
+                    clade = parents.get(clade)
+                self._swap(move)
+                new_scores = {}
+                for clade in path:
+                    left, right = (
+                        (
+                            new_scores[child]
+                            if child in new_scores
+                            else clade_scores[child]
+                        )
+                        for child in clade.clades
+                    )
+                    new_scores[clade] = scorer._combine(left, right)
+                self._swap(move)
+                score = scorer._get_root_score(
+                    new_scores[best_tree.root], weights, columns
+                )
+                if score < best_score:
+                    best_score = score
+                    best_move = move
+            # stop if no smaller score exist
+            if best_score >= temp:
+                break
+            self._swap(best_move)
+            tree = copy.deepcopy(best_tree)
+            self._swap(best_move)
+            best_tree = tree
+        return best_tree
+
+    def _nni_copies(self, starting_tree, alignment):
+        """Search for the best tree scoring copies of the neighbor trees (PRIVATE)."""
         best_tree = starting_tree
         while True:
             best_score = self.scorer.get_score(best_tree, alignment)
@@ -890,17 +1535,25 @@ class NNITreeSearcher(TreeSearcher):
 
         Currently only for binary rooted trees.
         """
+        neighbors = []
+        for move in self._get_moves(tree):
+            self._swap(move)
+            neighbors.append(copy.deepcopy(tree))
+            self._swap(move)
+        return neighbors
+
+    def _get_moves(self, tree):
+        """Get all nearest neighbor interchanges of the given tree (PRIVATE).
+
+        Each interchange is returned as two (clade, index) pairs, giving the
+        two child clades to swap. Currently only for binary rooted trees.
+        """
         # make child to parent dict
         parents = {}
         for clade in tree.find_clades():
-            if clade != tree.root:
-                node_path = tree.get_path(clade)
-                # cannot get the parent if the parent is root. Bug?
-                if len(node_path) == 1:
-                    parents[clade] = tree.root
-                else:
-                    parents[clade] = node_path[-2]
-        neighbors = []
+            for child in clade.clades:
+                parents[child] = clade
+        moves = []
         root_childs = []
         for clade in tree.get_nonterminals(order="level"):
             if clade == tree.root:
@@ -910,81 +1563,34 @@ class NNITreeSearcher(TreeSearcher):
                 root_childs.append(right)
                 if not left.is_terminal() and not right.is_terminal():
                     # make changes around the left_left clade
-                    # left_left = left.clades[0]
-                    left_right = left.clades[1]
-                    right_left = right.clades[0]
-                    right_right = right.clades[1]
-                    # neightbor 1 (left_left + right_right)
-                    del left.clades[1]
-                    del right.clades[1]
-                    left.clades.append(right_right)
-                    right.clades.append(left_right)
-                    temp_tree = copy.deepcopy(tree)
-                    neighbors.append(temp_tree)
+                    # neighbor 1 (left_left + right_right)
+                    moves.append(((left, 1), (right, 1)))
                     # neighbor 2 (left_left + right_left)
-                    del left.clades[1]
-                    del right.clades[0]
-                    left.clades.append(right_left)
-                    right.clades.append(right_right)
-                    temp_tree = copy.deepcopy(tree)
-                    neighbors.append(temp_tree)
-                    # change back (left_left + left_right)
-                    del left.clades[1]
-                    del right.clades[0]
-                    left.clades.append(left_right)
-                    right.clades.insert(0, right_left)
+                    moves.append(((left, 1), (right, 0)))
             elif clade in root_childs:
                 # skip root child
                 continue
             else:
                 # method for other clades
                 # make changes around the parent clade
-                left = clade.clades[0]
-                right = clade.clades[1]
                 parent = parents[clade]
                 if clade == parent.clades[0]:
-                    sister = parent.clades[1]
-                    # neighbor 1 (parent + right)
-                    del parent.clades[1]
-                    del clade.clades[1]
-                    parent.clades.append(right)
-                    clade.clades.append(sister)
-                    temp_tree = copy.deepcopy(tree)
-                    neighbors.append(temp_tree)
-                    # neighbor 2 (parent + left)
-                    del parent.clades[1]
-                    del clade.clades[0]
-                    parent.clades.append(left)
-                    clade.clades.append(right)
-                    temp_tree = copy.deepcopy(tree)
-                    neighbors.append(temp_tree)
-                    # change back (parent + sister)
-                    del parent.clades[1]
-                    del clade.clades[0]
-                    parent.clades.append(sister)
-                    clade.clades.insert(0, left)
+                    sister = 1
                 else:
-                    sister = parent.clades[0]
-                    # neighbor 1 (parent + right)
-                    del parent.clades[0]
-                    del clade.clades[1]
-                    parent.clades.insert(0, right)
-                    clade.clades.append(sister)
-                    temp_tree = copy.deepcopy(tree)
-                    neighbors.append(temp_tree)
-                    # neighbor 2 (parent + left)
-                    del parent.clades[0]
-                    del clade.clades[0]
-                    parent.clades.insert(0, left)
-                    clade.clades.append(right)
-                    temp_tree = copy.deepcopy(tree)
-                    neighbors.append(temp_tree)
-                    # change back (parent + sister)
-                    del parent.clades[0]
-                    del clade.clades[0]
-                    parent.clades.insert(0, sister)
-                    clade.clades.insert(0, left)
-        return neighbors
+                    sister = 0
+                # neighbor 1 (parent + right)
+                moves.append(((parent, sister), (clade, 1)))
+                # neighbor 2 (parent + left)
+                moves.append(((parent, sister), (clade, 0)))
+        return moves
+
+    @staticmethod
+    def _swap(move):
+        """Swap the two child clades of a nearest neighbor interchange (PRIVATE)."""
+        (clade1, index1), (clade2, index2) = move
+        child1 = clade1.clades[index1]
+        clade1.clades[index1] = clade2.clades[index2]
+        clade2.clades[index2] = child1
 
 
 # ######################## Parsimony Classes ##########################
@@ -996,6 +1602,14 @@ class ParsimonyScorer(Scorer):
     This is a combination of Fitch algorithm and Sankoff algorithm.
     See ParsimonyTreeConstructor for usage.
 
+    Identical alignment columns (site patterns) are scored only once, and
+    all site patterns are scored together in a single pass over the tree:
+    for the Fitch algorithm, the sets of states are stored as bitmasks in
+    NumPy arrays, and for the Sankoff algorithm, the score arrays of all
+    site patterns are calculated at once. The site patterns of the last
+    alignment scored are kept, as tree searchers score many trees against
+    the same alignment.
+
     :Parameters:
         matrix : _Matrix
             scoring matrix used in parsimony score calculation.
@@ -1008,6 +1622,8 @@ class ParsimonyScorer(Scorer):
             self.matrix = matrix
         else:
             raise TypeError("Must provide a _Matrix object.")
+        self._site_patterns = None
+        self._costs = None
 
     def get_score(self, tree, alignment):
         """Calculate parsimony score using the Fitch algorithm.
@@ -1016,6 +1632,19 @@ class ParsimonyScorer(Scorer):
         MSA using either the Fitch algorithm (without a penalty matrix)
         or the Sankoff algorithm (with a matrix).
         """
+        clade_scores, weights, columns = self._get_clade_scores(tree, alignment)
+        return self._get_root_score(clade_scores[tree.root], weights, columns)
+
+    def _get_clade_scores(self, tree, alignment):
+        """Calculate the partial scores of all clades of the tree (PRIVATE).
+
+        Returns a dictionary with the partial score of each clade, the
+        weights of the site patterns, and the index of the site pattern of
+        each informative column. For the Fitch algorithm, the partial
+        score is the set of states of the clade and the number of changes in
+        its subtree; for the Sankoff algorithm, it is the score array of the
+        clade.
+        """
         # make sure the tree is rooted and bifurcating
         if not tree.is_bifurcating():
             raise ValueError("The tree provided should be bifurcating.")
@@ -1029,66 +1658,149 @@ class ParsimonyScorer(Scorer):
             raise ValueError(
                 "Taxon names of the input tree should be the same with the alignment."
             )
-        # term_align = dict(zip(terms, alignment))
-        score = 0
-        for i in range(len(alignment[0])):
-            # parsimony score for column_i
-            score_i = 0
-            # get column
-            column_i = alignment[:, i]
-            # skip non-informative column
-            if column_i == len(column_i) * column_i[0]:
-                continue
+        letters, patterns, weights, columns = self._get_site_patterns(alignment)
+        if not self.matrix:
+            clade_scores = dict(zip(terms, self._get_fitch_states(letters, patterns)))
+        else:
+            clade_scores = dict(zip(terms, self._get_sankoff_scores(letters, patterns)))
+        for clade in tree.get_nonterminals(order="postorder"):
+            clade_childs = clade.clades
+            left_score = clade_scores[clade_childs[0]]
+            right_score = clade_scores[clade_childs[1]]
+            clade_scores[clade] = self._combine(left_score, right_score)
+        return clade_scores, weights, columns
+
+    def _get_site_patterns(self, alignment):
+        """Return the site patterns of the alignment, and their weights (PRIVATE).
+
+        Returns the letters in the alignment, an array with the indices of
+        the letters in each (informative) site pattern, with one row per
+        sequence, the number of columns with each site pattern, and the
+        index of the site pattern of each informative column.
+        """
+        key = [id(record.seq) for record in alignment]
+        if self._site_patterns is not None:
+            cached_alignment, cached_key, site_patterns = self._site_patterns
+            if cached_alignment is alignment and cached_key == key:
+                return site_patterns
+        try:
+            array = ArrayAlignment(alignment).array
+        except ValueError:
+            # Letters are not ASCII
+            array = numpy.array([list(str(record.seq)) for record in alignment])
+            if array.ndim != 2:
+                raise ValueError("Sequences must all be the same length") from None
+        letters, codes = numpy.unique(array, return_inverse=True)
+        codes = codes.reshape(array.shape)
+        # skip non-informative columns
+        codes = codes[:, (codes != codes[0]).any(axis=0)]
+        if codes.size:
+            patterns, columns, weights = numpy.unique(
+                codes, axis=1, return_inverse=True, return_counts=True
+            )
+            columns = columns.ravel()
+        else:
+            patterns, weights, columns = codes, numpy.zeros(0, int), []
+        if array.dtype == numpy.uint8:
+            letters = [chr(letter) for letter in letters]
+        else:
+            letters = letters.tolist()
+        site_patterns = (letters, patterns, weights, columns)
+        self._site_patterns = (alignment, key, site_patterns)
+        return site_patterns
 
-            # start calculating score_i using the tree and column_i
-
-            # Fitch algorithm without the penalty matrix
-            if not self.matrix:
-                # init by mapping terminal clades and states in column_i
-                clade_states = dict(zip(terms, [{c} for c in column_i]))
-                for clade in tree.get_nonterminals(order="postorder"):
-                    clade_childs = clade.clades
-                    left_state = clade_states[clade_childs[0]]
-                    right_state = clade_states[clade_childs[1]]
-                    state = left_state & right_state
-                    if not state:
-                        state = left_state | right_state
-                        score_i = score_i + 1
-                    clade_states[clade] = state
-            # Sankoff algorithm with the penalty matrix
+    def _get_fitch_states(self, letters, patterns):
+        """Return the sets of states of the terminal clades (PRIVATE).
+
+        The set of states of each clade is stored as a bitmask, using as many
+        64-bit words as needed for the letters in the alignment, together
+        with the number of changes in its subtree for each site pattern.
+        """
+        words, bits = numpy.divmod(patterns, 64)
+        shape = patterns.shape + ((len(letters) - 1) // 64 + 1,)
+        masks = numpy.zeros(shape, numpy.uint64)
+        rows, columns = numpy.indices(patterns.shape)
+        masks[rows, columns, words] = numpy.uint64(1) << bits.astype(numpy.uint64)
+        changes = numpy.zeros(patterns.shape[1], int)
+        return [(mask, changes) for mask in masks]
+
+    def _get_sankoff_scores(self, letters, patterns):
+        """Return the score arrays of the terminal clades (PRIVATE).
+
+        Matrices of only int or only float values are used as float arrays;
+        other values are kept as Python objects in arrays of dtype object,
+        so that the scores are calculated with the same arithmetic as in
+        a column by column calculation.
+        """
+        alphabet = self.matrix.names
+        indices = []
+        for letter in letters:
+            if letter in alphabet:
+                indices.append(alphabet.index(letter))
+            elif (patterns == len(indices)).any():
+                raise ValueError(f"Letter '{letter}' not found in the scoring matrix")
             else:
-                inf = float("inf")
-                # init score arrays for terminal clades
-                alphabet = self.matrix.names
-                length = len(alphabet)
-                clade_scores = {}
-                for j in range(len(column_i)):
-                    array = [inf] * length
-                    index = alphabet.index(column_i[j])
-                    array[index] = 0
-                    clade_scores[terms[j]] = array
-                # bottom up calculation
-                for clade in tree.get_nonterminals(order="postorder"):
-                    clade_childs = clade.clades
-                    left_score = clade_scores[clade_childs[0]]
-                    right_score = clade_scores[clade_childs[1]]
-                    array = []
-                    for m in range(length):
-                        min_l = inf
-                        min_r = inf
-                        for n in range(length):
-                            sl = self.matrix[alphabet[m], alphabet[n]] + left_score[n]
-                            sr = self.matrix[alphabet[m], alphabet[n]] + right_score[n]
-                            if min_l > sl:
-                                min_l = sl
-                            if min_r > sr:
-                                min_r = sr
-                        array.append(min_l + min_r)
-                    clade_scores[clade] = array
-                # minimum from root score
-                score_i = min(array)
-                # TODO: resolve internal states
-            score = score + score_i
+                indices.append(0)
+        indices = numpy.array(indices, int)[patterns]
+        length = len(alphabet)
+        costs = [self.matrix[i] for i in range(length)]
+        types = {type(value) for row in costs for value in row}
+        if types == {int} or types == {float}:
+            self._costs = numpy.array(costs, float)
+        else:
+            self._costs = numpy.array(costs, object)
+        # init score arrays for terminal clades
+        arrays = numpy.full(
+            patterns.shape + (length,), numpy.inf, dtype=self._costs.dtype
+        )
+        rows, columns = numpy.indices(patterns.shape)
+        arrays[rows, columns, indices] = 0
+        return list(arrays)
+
+    def _combine(self, left_score, right_score):
+        """Calculate the partial score of a clade from its children (PRIVATE)."""
+        if not self.matrix:
+            # Fitch algorithm: use the intersection of the sets of states of
+            # the children if not empty, or otherwise their union
+            left_state, left_changes = left_score
+            right_state, right_changes = right_score
+            state = left_state & right_state
+            empty = ~state.any(axis=1)
+            state[empty] = left_state[empty] | right_state[empty]
+            return state, left_changes + right_changes + empty
+        # Sankoff algorithm: minimum over the child states n of
+        # costs[m, n] + score[n], summed over the children
+        costs = self._costs
+        minima = []
+        for child_score in (left_score, right_score):
+            minimum = numpy.full_like(child_score, numpy.inf)
+            for n in range(len(costs)):
+                numpy.minimum(
+                    minimum, costs[:, n] + child_score[:, n, None], out=minimum
+                )
+            minima.append(minimum)
+        return minima[0] + minima[1]
+
+    def _get_root_score(self, root_score, weights, columns):
+        """Return the parsimony score from the partial score of the root (PRIVATE).
+
+        The weights and columns are those returned by _get_clade_scores.
+        """
+        if not self.matrix:
+            state, changes = root_score
+            return int(changes @ weights)
+        # minimum from root score
+        scores = root_score.min(axis=1)
+        # TODO: resolve internal states
+        matrix = self.matrix.matrix
+        if all(type(value) is int for row in matrix for value in row):
+            return int(scores @ weights)
+        # add the scores column by column, to get the same rounding
+        # and type of the score as without site patterns
+        scores = scores.tolist()
+        score = 0
+        for pattern in columns:
+            score = score + scores[pattern]
         return score
 
 
@@ -226,6 +226,10 @@ file, so there is no need to specify it again in SearchIO.
 'comments' and 'fields' keyword arguments are both applicable for parsing,
 indexing, and writing.
 
+A 'filter' keyword argument, taking a ``SearchIO.ResultFilter`` object, may
+also be used for parsing and indexing, both with blast-tab and blast-xml, to
+skip the HSPs and hits failing its criteria while parsing.
+
 blast-tab provides the following attributes for each SearchIO objects:
 
 +-------------+-------------------+--------------+
@@ -408,7 +412,7 @@ The blast-text parser provides the following object attributes:
 
 """
 
-from .blast_tab import BlastTabParser, BlastTabIndexer, BlastTabWriter
+from .blast_tab import BlastTabParser, BlastTabIndexer, BlastTabTable, BlastTabWriter
 from .blast_xml import BlastXmlParser, BlastXmlIndexer, BlastXmlWriter
 from .blast_text import BlastTextParser
 
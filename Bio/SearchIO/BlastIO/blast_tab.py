@@ -8,12 +8,16 @@
 """Bio.SearchIO parser for BLAST+ tab output format, with or without comments."""
 
 import re
+from io import StringIO
+from itertools import islice
+
+import numpy
 
 from Bio.SearchIO._index import SearchIndexer
 from Bio.SearchIO._model import QueryResult, Hit, HSP, HSPFragment
 
 
-__all__ = ("BlastTabIndexer", "BlastTabParser", "BlastTabWriter")
+__all__ = ("BlastTabIndexer", "BlastTabParser", "BlastTabTable", "BlastTabWriter")
 
 
 # longname-shortname map
@@ -134,6 +138,13 @@ _COLUMN_FRAG = {
 _SUPPORTED_FIELDS = set(
     list(_COLUMN_QRESULT) + list(_COLUMN_HIT) + list(_COLUMN_HSP) + list(_COLUMN_FRAG)
 )
+# column to caster map, and caster to array type map, used in BlastTabTable
+_COLUMN_CASTERS = {
+    sname: caster
+    for mapping in (_COLUMN_QRESULT, _COLUMN_HIT, _COLUMN_HSP, _COLUMN_FRAG)
+    for sname, (attr_name, caster) in mapping.items()
+}
+_CASTER_DTYPES = {int: numpy.int64, float: numpy.float64}
 
 # column order in the non-commented tabular output variant
 # values must be keys inside the column-attribute maps above
@@ -208,11 +219,14 @@ def _augment_blast_hsp(hsp, attr):
 class BlastTabParser:
     """Parser for the BLAST tabular format."""
 
-    def __init__(self, handle, comments=False, fields=_DEFAULT_FIELDS):
+    def __init__(self, handle, comments=False, fields=_DEFAULT_FIELDS, filter=None):
         """Initialize the class."""
         self.handle = handle
         self.has_comments = comments
         self.fields = self._prep_fields(fields)
+        self._filter = filter
+        if not comments:
+            self._check_filter()
         self.line = self.handle.readline().strip()
 
     def __iter__(self):
@@ -233,6 +247,32 @@ class BlastTabParser:
 
         yield from iterfunc()
 
+    def _check_filter(self):
+        """Raise a ValueError if the filter needs missing columns (PRIVATE)."""
+        if self._filter is not None:
+            fields = self.fields
+            self._filter._check_format(
+                "blast-tab",
+                evalue="evalue" in fields,
+                bitscore="bitscore" in fields,
+                ident_pct="pident" in fields
+                or ("nident" in fields and "length" in fields),
+            )
+
+    def _get_ident_pct(self, row):
+        """Return the percent identity of a parsed row, or None (PRIVATE).
+
+        Without the pident column, it is calculated from the nident and
+        length columns, as done by the writer.
+        """
+        ident_pct = row["hsp"].get("ident_pct")
+        if ident_pct is None and self._filter.min_ident_pct is not None:
+            ident_num = row["hsp"].get("ident_num")
+            aln_span = row["frag"].get("aln_span")
+            if ident_num is not None and aln_span:
+                ident_pct = ident_num / float(aln_span) * 100
+        return ident_pct
+
     def _prep_fields(self, fields):
         """Validate and format the given fields for use by the parser (PRIVATE)."""
         # cast into list if fields is a space-separated string
@@ -259,6 +299,7 @@ class BlastTabParser:
             if comments:
                 try:
                     self.fields = comments["fields"]
+                    self._check_filter()
                     # iterator for the query results
                     qres_iter = self._parse_qresult()
                 except KeyError:
@@ -333,6 +374,11 @@ class BlastTabParser:
                 "Expected %i columns, found: %i" % (len(fields), len(columns))
             )
 
+        return self._parse_columns(columns)
+
+    def _parse_columns(self, columns):
+        """Return a dictionary of parsed values from the columns of a row (PRIVATE)."""
+        fields = self.fields
         qresult, hit, hsp, frag = {}, {}, {}, {}
         for idx, value in enumerate(columns):
             sname = fields[idx]
@@ -376,111 +422,116 @@ class BlastTabParser:
 
     def _parse_qresult(self):
         """Yield QueryResult objects (PRIVATE)."""
-        # state values, used to determine what to do with each line
-        state_EOF = 0
-        state_QRES_NEW = 1
-        state_QRES_SAME = 3
-        state_HIT_NEW = 2
-        state_HIT_SAME = 4
-        # dummies for initial states
-        qres_state = None
-        hit_state = None
-        file_state = None
-        cur_qid = None
-        cur_hid = None
-        # dummies for initial id caches
+        # parsed values of the rows of the current query kept by the filter,
+        # and of its last row
+        rows = []
+        last = None
         prev_qid = None
-        prev_hid = None
-        # dummies for initial parsed value containers
-        cur, prev = None, None
-        hit_list, hsp_list = [], []
+        # number of hits of the current query kept by the filter
+        hit_num = 0
 
         while True:
-            # store previous line's parsed values if we've past the first line
-            if cur is not None:
-                prev = cur
-                prev_qid = cur_qid
-                prev_hid = cur_hid
             # only parse the line if it's not EOF or not a comment line
             if self.line and not self.line.startswith("#"):
                 cur = self._parse_result_row()
                 cur_qid = self._get_id(cur["qresult"])
-                cur_hid = self._get_id(cur["hit"])
-            else:
-                file_state = state_EOF
-                # mock values for cur_qid and cur_hid since the line is empty
-                cur_qid, cur_hid = None, None
-
-            # get the state of hit and qresult
-            if prev_qid != cur_qid:
-                qres_state = state_QRES_NEW
-            else:
-                qres_state = state_QRES_SAME
-            # new hits are hits with different id or hits in a new qresult
-            if prev_hid != cur_hid or qres_state == state_QRES_NEW:
-                hit_state = state_HIT_NEW
-            else:
-                hit_state = state_HIT_SAME
-
-            # we're creating objects for the previously parsed line(s),
-            # so nothing is done in the first parsed line (prev == None)
-            if prev is not None:
-                # every line is essentially an HSP with one fragment, so we
-                # create both of these for every line
-                frag = HSPFragment(prev_hid, prev_qid)
-                for attr, value in prev["frag"].items():
-                    # adjust coordinates to Python range
-                    # NOTE: this requires both start and end coords to be
-                    # present, otherwise a KeyError will be raised.
-                    # Without this limitation, we might misleadingly set the
-                    # start / end coords
-                    for seq_type in ("query", "hit"):
-                        if attr == seq_type + "_start":
-                            value = min(value, prev["frag"][seq_type + "_end"]) - 1
-                        elif attr == seq_type + "_end":
-                            value = max(value, prev["frag"][seq_type + "_start"])
-                    setattr(frag, attr, value)
-                # strand and frame setattr require the full parsed values
-                # to be set first
-                for seq_type in ("hit", "query"):
-                    # try to set hit and query frame
-                    frame = self._get_frag_frame(frag, seq_type, prev["frag"])
-                    setattr(frag, "%s_frame" % seq_type, frame)
-                    # try to set hit and query strand
-                    strand = self._get_frag_strand(frag, seq_type, prev["frag"])
-                    setattr(frag, "%s_strand" % seq_type, strand)
-
-                hsp = HSP([frag])
-                for attr, value in prev["hsp"].items():
-                    setattr(hsp, attr, value)
-                hsp_list.append(hsp)
-
-                # create hit and append to temp hit container if hit_state
-                # says we're not at the same hit or at a new query
-                if hit_state == state_HIT_NEW:
-                    hit = Hit(hsp_list)
-                    for attr, value in prev["hit"].items():
-                        if attr != "id_all":
-                            setattr(hit, attr, value)
-                        else:
-                            # not setting hit ID since it's already set from the
-                            # prev_hid above
-                            setattr(hit, "_id_alt", value[1:])
-                    hit_list.append(hit)
-                    hsp_list = []
-                # create qresult and yield if we're at a new qresult or EOF
-                if qres_state == state_QRES_NEW or file_state == state_EOF:
-                    qresult = QueryResult(hit_list, prev_qid)
-                    for attr, value in prev["qresult"].items():
-                        setattr(qresult, attr, value)
-                    yield qresult
-                    # if current line is EOF, break
-                    if file_state == state_EOF:
-                        break
-                    hit_list = []
+                # we're creating objects for the previously parsed line(s),
+                # so a qresult is only created once we're at a new qresult
+                if last is not None and cur_qid != prev_qid:
+                    yield self._build_qresult(rows, last)
+                    rows = []
+                    hit_num = 0
+                if self._filter is None:
+                    rows.append(cur)
+                elif self._filter.accepts(
+                    cur["hsp"].get("evalue"),
+                    cur["hsp"].get("bitscore"),
+                    self._get_ident_pct(cur),
+                ):
+                    # check the number of hits if the row starts a new hit
+                    if not rows or self._get_id(cur["hit"]) != self._get_id(
+                        rows[-1]["hit"]
+                    ):
+                        hit_num += 1
+                    if (
+                        self._filter.max_hits is None
+                        or hit_num <= self._filter.max_hits
+                    ):
+                        rows.append(cur)
+                last = cur
+                prev_qid = cur_qid
+            elif last is not None or not self.line:
+                # EOF or a comment line starting the next query; comment
+                # lines before the first row are skipped
+                if last is not None:
+                    yield self._build_qresult(rows, last)
+                break
 
             self.line = self.handle.readline().strip()
 
+    def _build_qresult(self, rows, last=None):
+        """Return a QueryResult object from the parsed rows of one query (PRIVATE).
+
+        The query ID and attributes are taken from the last row of the query,
+        which is also the last of the given rows unless they were filtered.
+        """
+        if last is None:
+            last = rows[-1]
+        hit_ids = [self._get_id(parsed["hit"]) for parsed in rows]
+        hit_list, hsp_list = [], []
+
+        for idx, parsed in enumerate(rows):
+            qid = self._get_id(parsed["qresult"])
+            hid = hit_ids[idx]
+            # every line is essentially an HSP with one fragment, so we
+            # create both of these for every line
+            frag = HSPFragment(hid, qid)
+            for attr, value in parsed["frag"].items():
+                # adjust coordinates to Python range
+                # NOTE: this requires both start and end coords to be
+                # present, otherwise a KeyError will be raised.
+                # Without this limitation, we might misleadingly set the
+                # start / end coords
+                for seq_type in ("query", "hit"):
+                    if attr == seq_type + "_start":
+                        value = min(value, parsed["frag"][seq_type + "_end"]) - 1
+                    elif attr == seq_type + "_end":
+                        value = max(value, parsed["frag"][seq_type + "_start"])
+                setattr(frag, attr, value)
+            # strand and frame setattr require the full parsed values
+            # to be set first
+            for seq_type in ("hit", "query"):
+                # try to set hit and query frame
+                frame = self._get_frag_frame(frag, seq_type, parsed["frag"])
+                setattr(frag, "%s_frame" % seq_type, frame)
+                # try to set hit and query strand
+                strand = self._get_frag_strand(frag, seq_type, parsed["frag"])
+                setattr(frag, "%s_strand" % seq_type, strand)
+
+            hsp = HSP([frag])
+            for attr, value in parsed["hsp"].items():
+                setattr(hsp, attr, value)
+            hsp_list.append(hsp)
+
+            # create hit and append to temp hit container if the next row
+            # is from another hit, or if this is the last row
+            if idx + 1 == len(rows) or hit_ids[idx + 1] != hid:
+                hit = Hit(hsp_list)
+                for attr, value in parsed["hit"].items():
+                    if attr != "id_all":
+                        setattr(hit, attr, value)
+                    else:
+                        # not setting hit ID since it's already set from the
+                        # hid above
+                        setattr(hit, "_id_alt", value[1:])
+                hit_list.append(hit)
+                hsp_list = []
+
+        qresult = QueryResult(hit_list, self._get_id(last["qresult"]))
+        for attr, value in last["qresult"].items():
+            setattr(qresult, attr, value)
+        return qresult
+
     def _get_frag_frame(self, frag, seq_type, parsedict):
         """Return fragment frame for given object (PRIVATE).
 
@@ -521,14 +572,263 @@ class BlastTabParser:
             # else implicit None return
 
 
+class BlastTabTable:
+    """Columnar representation of a BLAST tabular output file.
+
+    All rows of the file are read into NumPy arrays, one for each column,
+    which are much more compact and faster to build than the equivalent
+    ``QueryResult`` objects. This is useful for very large outputs, such as
+    the BLAST-compatible tabular output of DIAMOND. The ``QueryResult``
+    objects are only created for the queries looked up by their ID:
+
+    >>> from Bio import SearchIO
+    >>> table = SearchIO.read_table('Blast/tab_2226_tblastn_001.txt', 'blast-tab')
+    >>> len(table)
+    2
+    >>> list(table)
+    ['gi|16080617|ref|NP_391444.1|', 'gi|11464971:4-101']
+    >>> table.fields[:4]
+    ['qseqid', 'sseqid', 'pident', 'length']
+    >>> table.columns['evalue'][:3].tolist()
+    [1e-05, 0.0001, 0.0001]
+    >>> table['gi|11464971:4-101']
+    QueryResult(id='gi|11464971:4-101', 5 hits)
+
+    Columns of integers or floats (as listed in the ``_COLUMN_*`` maps used
+    by ``BlastTabParser``) are stored as int64 or float64 arrays, all other
+    columns as arrays of UTF-8 encoded bytes, as are the ``query_ids``. The
+    rows of each query are the rows from ``offsets[i]`` to ``offsets[i + 1]``,
+    where ``i`` is the position of the query ID in ``query_ids``;
+    ``get_columns`` returns them for a given ID.
+
+    The IDs must be unique, which requires the rows of each query to be
+    consecutive in the file, as written by BLAST.
+    """
+
+    def __init__(
+        self, handle, comments=False, fields=_DEFAULT_FIELDS, chunk_size=100000
+    ):
+        """Initialize the class, reading all rows from the handle.
+
+        The arguments are the same as those of ``BlastTabParser``; in addition,
+        *chunk_size* is the number of lines converted to arrays at once.
+        """
+        # also used to create the QueryResult objects from the arrays
+        self._parser = BlastTabParser(StringIO(), comments, fields)
+        self.has_comments = comments
+        self.fields = None if comments else self._parser.fields
+        # arrays of each column, for every chunk of consecutive rows
+        self._chunks = []
+        self._nrows = 0
+        # first row and comments of each commented query
+        self._blocks = []
+
+        comment_lines = []
+        while True:
+            lines = list(islice(handle, chunk_size))
+            if not lines:
+                break
+            lines = [line for line in map(str.strip, lines) if line]
+            marks = [idx for idx, line in enumerate(lines) if line.startswith("#")]
+            if marks and not comments:
+                raise ValueError(
+                    "Encountered unexpected character '#' at the beginning of a line. "
+                    "Set comments=True if the file is a commented file."
+                )
+            start = 0
+            for idx in marks + [len(lines)]:
+                if idx > start:
+                    if comment_lines:
+                        self._add_comments(comment_lines)
+                        comment_lines = []
+                    self._add_rows(lines[start:idx])
+                if idx < len(lines):
+                    comment_lines.append(lines[idx])
+                start = idx + 1
+        if comment_lines:
+            self._add_comments(comment_lines)
+
+        if self.fields is None:
+            # commented file where no query has any hits
+            self.fields = []
+        self._parser.fields = self.fields
+        self._finish()
+
+    def _add_comments(self, lines):
+        """Store the comments of the queries in the given lines (PRIVATE)."""
+        parser = BlastTabParser(StringIO("\n".join(lines)), comments=True)
+        while True:
+            comments = parser._parse_comments()
+            if not comments:
+                break
+            if "fields" in comments:
+                if self.fields is None:
+                    self.fields = comments["fields"]
+                elif comments["fields"] != self.fields:
+                    raise ValueError(
+                        "All queries must have the same fields, found %r and %r"
+                        % (self.fields, comments["fields"])
+                    )
+            self._blocks.append((self._nrows, comments))
+
+    def _add_rows(self, lines):
+        """Convert the given rows to arrays (PRIVATE)."""
+        fields = self.fields
+        if fields is None:
+            raise ValueError("Required 'Fields' comment line not found.")
+        ncols = len(fields)
+        for line in lines:
+            if line.count("\t") != ncols - 1:
+                raise ValueError(
+                    "Expected %i columns, found: %i" % (ncols, line.count("\t") + 1)
+                )
+        values = "\t".join(lines).encode().split(b"\t")
+
+        chunk = []
+        for idx, field in enumerate(fields):
+            column = values[idx::ncols]
+            caster = _COLUMN_CASTERS.get(field)
+            if caster in _CASTER_DTYPES:
+                column = list(map(caster, column))
+            chunk.append(numpy.array(column, _CASTER_DTYPES.get(caster, bytes)))
+        self._chunks.append(chunk)
+        self._nrows += len(lines)
+
+    def _finish(self):
+        """Join the arrays and find the rows of each query (PRIVATE)."""
+        columns = {}
+        for idx, field in enumerate(self.fields):
+            if self._chunks:
+                column = numpy.concatenate([chunk[idx] for chunk in self._chunks])
+            else:
+                caster = _COLUMN_CASTERS.get(field)
+                column = numpy.array([], _CASTER_DTYPES.get(caster, bytes))
+            columns[field] = column
+        self.columns = columns
+        del self._chunks
+
+        nrows = self._nrows
+        keys = None
+        if nrows:
+            for field in ("qseqid", "qacc", "qaccver"):
+                if field in columns:
+                    keys = columns[field]
+                    break
+            # first row of each run of rows with the same query ID
+            starts = numpy.flatnonzero(keys[1:] != keys[:-1]) + 1
+        else:
+            starts = numpy.array([], numpy.int64)
+
+        if not self.has_comments:
+            self.offsets = numpy.concatenate(([0], starts, [nrows])).astype(numpy.int64)
+            if not nrows:
+                self.offsets = self.offsets[:1]
+                self.query_ids = numpy.array([], bytes)
+            else:
+                self.query_ids = keys[self.offsets[:-1]]
+            self._comments = None
+        else:
+            # split the rows of each comment block by query ID, as done by
+            # BlastTabParser, and add the blocks without rows
+            offsets, query_ids, query_comments = [], [], []
+            ends = [block[0] for block in self._blocks[1:]] + [nrows]
+            for (start, comments), end in zip(self._blocks, ends):
+                first = numpy.searchsorted(starts, start, "right")
+                last = numpy.searchsorted(starts, end, "left")
+                for row in [start] + starts[first:last].tolist():
+                    offsets.append(row)
+                    # the query ID from the comments takes precedence
+                    if "id" in comments:
+                        query_ids.append(comments["id"].encode())
+                    else:
+                        query_ids.append(keys[row])
+                    query_comments.append(comments)
+            offsets.append(nrows)
+            self.offsets = numpy.array(offsets, numpy.int64)
+            self.query_ids = numpy.array(query_ids, bytes)
+            self._comments = query_comments
+
+        # order of the query IDs, for looking them up
+        self._order = numpy.argsort(self.query_ids, kind="stable")
+        sorted_ids = self.query_ids[self._order]
+        duplicates = numpy.flatnonzero(sorted_ids[1:] == sorted_ids[:-1])
+        if len(duplicates):
+            key = sorted_ids[duplicates[0]].decode()
+            raise ValueError("Duplicate key %r" % key)
+
+    def _index(self, key):
+        """Return the position of the given query ID (PRIVATE)."""
+        if isinstance(key, str):
+            value = key.encode()
+            idx = numpy.searchsorted(self.query_ids, value, sorter=self._order)
+            if idx < len(self._order):
+                idx = self._order[idx]
+                if self.query_ids[idx] == value:
+                    return idx
+        raise KeyError(key)
+
+    def __len__(self):
+        """Return the number of queries."""
+        return len(self.query_ids)
+
+    def __iter__(self):
+        """Iterate over the query IDs, in the order of the file."""
+        for key in self.query_ids:
+            yield key.decode()
+
+    def __contains__(self, key):
+        """Return True if the table has a query with the given ID."""
+        try:
+            self._index(key)
+        except KeyError:
+            return False
+        return True
+
+    def get_columns(self, key):
+        """Return a dictionary of the column arrays for the rows of a query.
+
+        The arrays are views of the arrays in the ``columns`` dictionary.
+        """
+        idx = self._index(key)
+        start, end = self.offsets[idx], self.offsets[idx + 1]
+        return {field: column[start:end] for field, column in self.columns.items()}
+
+    def __getitem__(self, key):
+        """Return the QueryResult object of the query with the given ID."""
+        parser = self._parser
+        columns = self.get_columns(key)
+        values = []
+        for field in self.fields:
+            column = columns[field].tolist()
+            if (
+                field not in _COLUMN_CASTERS
+                or _COLUMN_CASTERS[field] not in _CASTER_DTYPES
+            ):
+                column = [value.decode() for value in column]
+            values.append(column)
+        rows = zip(*values)
+        rows = [parser._parse_columns(row) for row in rows]
+        if rows:
+            qresult = parser._build_qresult(rows)
+        else:
+            # the query has no results
+            qresult = QueryResult()
+        if self._comments is not None:
+            for attr, value in self._comments[self._index(key)].items():
+                setattr(qresult, attr, value)
+        return qresult
+
+
 class BlastTabIndexer(SearchIndexer):
     """Indexer class for BLAST+ tab output."""
 
     _parser = BlastTabParser
 
-    def __init__(self, filename, comments=False, fields=_DEFAULT_FIELDS):
+    def __init__(self, filename, comments=False, fields=_DEFAULT_FIELDS, filter=None):
         """Initialize the class."""
-        SearchIndexer.__init__(self, filename, comments=comments, fields=fields)
+        SearchIndexer.__init__(
+            self, filename, comments=comments, fields=fields, filter=filter
+        )
 
         # if the file doesn't have comments,
         # get index of column used as the key (qseqid / qacc / qaccver)
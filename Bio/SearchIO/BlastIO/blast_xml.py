@@ -228,11 +228,14 @@ def _extract_ids_and_descs(raw_id, raw_desc):
 class BlastXmlParser:
     """Parser for the BLAST XML format."""
 
-    def __init__(self, handle, use_raw_query_ids=False, use_raw_hit_ids=False):
+    def __init__(
+        self, handle, use_raw_query_ids=False, use_raw_hit_ids=False, filter=None
+    ):
         """Initialize the class."""
         self.xml_iter = iter(ElementTree.iterparse(handle, events=("start", "end")))
         self._use_raw_query_ids = use_raw_query_ids
         self._use_raw_hit_ids = use_raw_hit_ids
+        self._filter = filter
         self._meta, self._fallback = self._parse_preamble()
 
     def __iter__(self):
@@ -416,8 +419,16 @@ class BlastXmlParser:
         if root_hit_elem is None:
             root_hit_elem = []
 
+        # number of hits kept by the filter
+        hit_num = 0
+
         for hit_elem in root_hit_elem:
 
+            if self._filter is not None and self._filter.max_hits is not None:
+                if hit_num >= self._filter.max_hits:
+                    hit_elem.clear()
+                    continue
+
             # BLAST sometimes mangles the sequence IDs and descriptions, so we need
             # to extract the actual values.
             raw_hit_id = hit_elem.findtext("Hit_id")
@@ -433,6 +444,11 @@ class BlastXmlParser:
             hit_desc, alt_hit_descs = descs[0], descs[1:]
 
             hsps = list(self._parse_hsp(hit_elem.find("Hit_hsps"), query_id, hit_id))
+            if self._filter is not None and not hsps and self._filter._tests_hsps():
+                # all HSPs were removed by the filter
+                hit_elem.clear()
+                continue
+            hit_num += 1
 
             hit = Hit(hsps)
             hit.description = hit_desc
@@ -492,6 +508,9 @@ class BlastXmlParser:
             root_hsp_frag_elem = []
 
         for hsp_frag_elem in root_hsp_frag_elem:
+            if self._filter is not None and not self._accepts(hsp_frag_elem):
+                hsp_frag_elem.clear()
+                continue
             coords = {}  # temporary container for coordinates
             frag = HSPFragment(hit_id, query_id)
             for key, val_info in _ELEM_FRAG.items():
@@ -548,6 +567,22 @@ class BlastXmlParser:
             hsp_frag_elem.clear()
             yield hsp
 
+    def _accepts(self, hsp_frag_elem):
+        """Return True if the Hsp element passes the filter of the parser (PRIVATE)."""
+        evalue = hsp_frag_elem.findtext("Hsp_evalue")
+        if evalue is not None:
+            evalue = float(evalue)
+        bitscore = hsp_frag_elem.findtext("Hsp_bit-score")
+        if bitscore is not None:
+            bitscore = float(bitscore)
+        ident_num = hsp_frag_elem.findtext("Hsp_identity")
+        aln_span = hsp_frag_elem.findtext("Hsp_align-len")
+        if ident_num is not None and aln_span is not None:
+            ident_pct = int(ident_num) / float(aln_span) * 100
+        else:
+            ident_pct = None
+        return self._filter.accepts(evalue, bitscore, ident_pct)
+
 
 class BlastXmlIndexer(SearchIndexer):
     """Indexer class for BLAST XML output."""
@@ -559,7 +594,7 @@ class BlastXmlIndexer(SearchIndexer):
 
     def __init__(self, filename, **kwargs):
         """Initialize the class."""
-        SearchIndexer.__init__(self, filename)
+        SearchIndexer.__init__(self, filename, **kwargs)
         # TODO: better way to do this?
         iter_obj = self._parser(self._handle, **kwargs)
         self._meta, self._fallback = iter_obj._meta, iter_obj._fallback
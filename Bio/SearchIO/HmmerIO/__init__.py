@@ -35,6 +35,11 @@ Bio.SearchIO.HmmerIO supports the following HMMER output formats:
   'hmmscan3-domtab', 'hmmsearch3-domtab', or 'phmmer3-domtab' as the file format
   name.
 
+The HMMER3 formats also accept a 'filter' keyword argument for parsing and
+indexing, taking a ``SearchIO.ResultFilter`` object. HSPs (domains) failing its
+e-value and bit score criteria, and hits beyond its maximum number of hits, are
+skipped while parsing.
+
 Note that for all output formats, HMMER uses its own convention of input and
 output coordinates. It does not use the term 'hit' or 'query', instead it
 uses 'hmm' or 'ali'. For example, 'hmmfrom' is the start coordinate of the HMM
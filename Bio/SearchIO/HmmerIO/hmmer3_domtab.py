@@ -128,18 +128,21 @@ class Hmmer3DomtabParser(Hmmer3TabParser):
 
             # start creating objects after the first line (i.e. prev is filled)
             if prev is not None:
-                # each line is basically an HSP with one HSPFragment
-                frag = HSPFragment(prev_hid, prev_qid)
-                for attr, value in prev["frag"].items():
-                    setattr(frag, attr, value)
-                hsp = HSP([frag])
-                for attr, value in prev["hsp"].items():
-                    setattr(hsp, attr, value)
-                hsp_list.append(hsp)
+                # each line is basically an HSP with one HSPFragment,
+                # unless the filter removes it
+                if self._accepts(prev["hsp"], len(hit_list)):
+                    frag = HSPFragment(prev_hid, prev_qid)
+                    for attr, value in prev["frag"].items():
+                        setattr(frag, attr, value)
+                    hsp = HSP([frag])
+                    for attr, value in prev["hsp"].items():
+                        setattr(hsp, attr, value)
+                    hsp_list.append(hsp)
 
                 # create hit object when we've finished parsing all its hsps
-                # i.e. when hit state is state_HIT_NEW
-                if hit_state == state_HIT_NEW:
+                # i.e. when hit state is state_HIT_NEW; hits without any
+                # hsp left by the filter are removed
+                if hit_state == state_HIT_NEW and (self._filter is None or hsp_list):
                     hit = Hit(hsp_list)
                     for attr, value in prev["hit"].items():
                         setattr(hit, attr, value)
@@ -17,9 +17,13 @@ __all__ = ("Hmmer3TabParser", "Hmmer3TabIndexer", "Hmmer3TabWriter")
 class Hmmer3TabParser:
     """Parser for the HMMER table format."""
 
-    def __init__(self, handle):
+    def __init__(self, handle, filter=None):
         """Initialize the class."""
         self.handle = handle
+        if filter is not None:
+            # HMMER does not report the percent identity of its hits
+            filter._check_format("HMMER", ident_pct=False)
+        self._filter = filter
         self.line = self.handle.readline()
 
     def __iter__(self):
@@ -109,22 +113,24 @@ class Hmmer3TabParser:
 
             if prev is not None:
                 # since domain tab formats only have 1 Hit per line
-                # we always create HSPFragment, HSP, and Hit per line
-                prev_hid = prev["hit"]["id"]
-
-                # create fragment and HSP and set their attributes
-                frag = HSPFragment(prev_hid, prev_qid)
-                for attr, value in prev["frag"].items():
-                    setattr(frag, attr, value)
-                hsp = HSP([frag])
-                for attr, value in prev["hsp"].items():
-                    setattr(hsp, attr, value)
-
-                # create Hit and set its attributes
-                hit = Hit([hsp])
-                for attr, value in prev["hit"].items():
-                    setattr(hit, attr, value)
-                hit_list.append(hit)
+                # we always create HSPFragment, HSP, and Hit per line,
+                # unless the filter removes them
+                if self._accepts(prev["hsp"], len(hit_list)):
+                    prev_hid = prev["hit"]["id"]
+
+                    # create fragment and HSP and set their attributes
+                    frag = HSPFragment(prev_hid, prev_qid)
+                    for attr, value in prev["frag"].items():
+                        setattr(frag, attr, value)
+                    hsp = HSP([frag])
+                    for attr, value in prev["hsp"].items():
+                        setattr(hsp, attr, value)
+
+                    # create Hit and set its attributes
+                    hit = Hit([hsp])
+                    for attr, value in prev["hit"].items():
+                        setattr(hit, attr, value)
+                    hit_list.append(hit)
 
                 # create qresult and yield if we're at a new qresult or at EOF
                 if qres_state == state_QRES_NEW or file_state == state_EOF:
@@ -139,6 +145,19 @@ class Hmmer3TabParser:
 
             self.line = self.handle.readline()
 
+    def _accepts(self, hsp, hit_num):
+        """Return True if the HSP passes the filter of the parser (PRIVATE).
+
+        The HSP is given as a dictionary of parsed values, with the number of
+        hits already kept in its query, not counting its own hit.
+        """
+        if self._filter is None:
+            return True
+        max_hits = self._filter.max_hits
+        if max_hits is not None and hit_num >= max_hits:
+            return False
+        return self._filter.accepts(hsp.get("evalue"), hsp.get("bitscore"))
+
 
 class Hmmer3TabIndexer(SearchIndexer):
     """Indexer class for HMMER table output."""
@@ -35,9 +35,13 @@ _HRE_ID_LINE = re.compile(r"^(\s+\S+\s+[0-9-]+ )(.+?)(\s+[0-9-]+)")
 class Hmmer3TextParser:
     """Parser for the HMMER 3.0 text output."""
 
-    def __init__(self, handle):
+    def __init__(self, handle, filter=None):
         """Initialize the class."""
         self.handle = handle
+        if filter is not None:
+            # HMMER does not report the percent identity of its hits
+            filter._check_format("HMMER", ident_pct=False)
+        self._filter = filter
         self.line = read_forward(self.handle)
         self._meta = self._parse_preamble()
 
@@ -253,7 +257,19 @@ class Hmmer3TextParser:
                 ):
 
                     hit_attr = hit_attrs.pop(0)
-                    hit = Hit(hsp_list)
+                    # hsps removed by the filter are kept as None so that
+                    # their alignments can be skipped later
+                    kept_hsps = [hsp for hsp in hsp_list if hsp is not None]
+                    if self._filter is not None:
+                        max_hits = self._filter.max_hits
+                        if max_hits is not None and len(hit_list) >= max_hits:
+                            break
+                        # hits without any hsp left are removed, as by
+                        # hsp_filter; hits without domains are only kept if
+                        # the hsps are not filtered
+                        if not kept_hsps and self._filter._tests_hsps():
+                            break
+                    hit = Hit(kept_hsps)
                     for attr, value in hit_attr.items():
                         if attr == "description":
                             cur_val = getattr(hit, attr)
@@ -271,6 +287,10 @@ class Hmmer3TextParser:
                 # index, is_included, bitscore, bias, evalue_cond, evalue
                 # hmmfrom, hmmto, query_ends, hit_ends, alifrom, alito,
                 # envfrom, envto, acc_avg
+                if not self._accepts(parsed, len(hit_list)):
+                    hsp_list.append(None)
+                    self.line = read_forward(self.handle)
+                    continue
                 frag = HSPFragment(hid, qid)
                 # set query and hit descriptions if they are defined / nonempty string
                 if qdesc:
@@ -323,7 +343,20 @@ class Hmmer3TextParser:
 
             # parse the hsp alignments
             if self.line.startswith("  Alignments for each domain:"):
-                self._parse_aln_block(hid, hit.hsps)
+                self._parse_aln_block(hid, hsp_list)
+
+    def _accepts(self, parsed, hit_num):
+        """Return True if the parsed HSP table row passes the filter (PRIVATE).
+
+        The number of hits already kept in the query, not counting the
+        hit of the row, is given by hit_num.
+        """
+        if self._filter is None:
+            return True
+        max_hits = self._filter.max_hits
+        if max_hits is not None and hit_num >= max_hits:
+            return False
+        return self._filter.accepts(float(parsed[5]), float(parsed[2]))
 
     def _parse_aln_block(self, hid, hsp_list):
         """Parse a HMMER3 HSP alignment block (PRIVATE)."""
@@ -333,6 +366,16 @@ class Hmmer3TextParser:
             if self.line.startswith(">>") or self.line.startswith("Internal pipeline"):
                 return hsp_list
             assert self.line.startswith("  == domain %i" % (dom_counter + 1))
+            if hsp_list[dom_counter] is None:
+                # hsp removed by the filter, skip its alignment
+                self.line = self.handle.readline()
+                self._read_until(
+                    lambda line: line.startswith("  == domain")
+                    or line.startswith(">>")
+                    or line.startswith("Internal pipeline")
+                )
+                dom_counter += 1
+                continue
             # alias hsp to local var
             # but note that we're still changing the attrs of the actual
             # hsp inside the qresult as we're not creating a copy
@@ -67,6 +67,11 @@ functions Bio.SearchIO.index(...) or Bio.SearchIO.index_db(...). They have a
 similar interface to their counterparts in SeqIO and AlignIO, with the addition
 of optional, format-specific keyword arguments.
 
+Very large tabular output files (for example from BLAST or DIAMOND) may also
+be read with Bio.SearchIO.read_table(...), which stores the values of each
+column in a NumPy array, and only creates QueryResult objects for the queries
+you look up.
+
 
 Output
 ======
@@ -194,14 +199,34 @@ Each of these formats have different keyword arguments available for use with
 the main SearchIO functions. More details and examples are available in each
 of the format's documentation.
 
+The blast-tab, blast-xml, hmmer3-tab, hmmer3-domtab and hmmer3-text parsers
+also accept a ``filter`` keyword argument, a ``ResultFilter`` object whose
+criteria (maximum e-value, minimum bit score, minimum percent identity and
+maximum number of hits per query) are applied while parsing. HSPs and hits
+failing them are skipped before any object is created for them.
+
 """
 
+import functools
+import heapq
+import itertools
+import operator
+
 from Bio.File import as_handle
 from Bio.SearchIO._model import QueryResult, Hit, HSP, HSPFragment
-from Bio.SearchIO._utils import get_processor
-
+from Bio.SearchIO._utils import get_processor, ResultFilter
 
-__all__ = ("read", "parse", "to_dict", "index", "index_db", "write", "convert")
+__all__ = (
+    "read",
+    "parse",
+    "read_table",
+    "to_dict",
+    "merge",
+    "index",
+    "index_db",
+    "write",
+    "convert",
+)
 
 
 # dictionary of supported formats for parse() and read()
@@ -244,6 +269,11 @@ _INDEXER_MAP = {
     "phmmer3-domtab": ("HmmerIO", "Hmmer3DomtabHmmqueryIndexer"),
 }
 
+# dictionary of supported formats for read_table()
+_TABLE_MAP = {
+    "blast-tab": ("BlastIO", "BlastTabTable"),
+}
+
 # dictionary of supported formats for write()
 _WRITER_MAP = {
     "blast-tab": ("BlastIO", "BlastTabWriter"),
@@ -291,6 +321,18 @@ def parse(handle, format=None, **kwargs):
     Search 33212 has 44 hits
     Search 33213 has 95 hits
 
+    Several parsers accept a ``filter`` keyword argument, a ``ResultFilter``
+    object, to skip the HSPs and hits you are not interested in while parsing:
+
+    >>> result_filter = SearchIO.ResultFilter(max_evalue=1e-10, max_hits=3)
+    >>> for qresult in SearchIO.parse('Blast/mirna.tab', 'blast-tab',
+    ...                               comments=True, filter=result_filter):
+    ...     print("Search %s has %i hits" % (qresult.id, len(qresult)))
+    ...
+    Search 33211 has 3 hits
+    Search 33212 has 3 hits
+    Search 33213 has 3 hits
+
     """
     # get the iterator object and do error checking
     iterator = get_processor(format, _ITERATOR_MAP)
@@ -357,6 +399,39 @@ def read(handle, format=None, **kwargs):
     return query_result
 
 
+def read_table(handle, format=None, **kwargs):
+    """Read all rows of a tabular search output file into column arrays.
+
+     - handle - Handle to the file, or the filename as a string.
+     - format - Lower case string denoting one of the supported formats.
+     - kwargs - Format-specific keyword arguments.
+
+    ``read_table`` reads the whole file at once, storing the values of each
+    column in a NumPy array. This takes much less time and memory than
+    creating the QueryResult objects for all queries with ``parse``. The
+    returned table behaves like a read-only dictionary, where the QueryResult
+    objects are only created when they are looked up by their query ID:
+
+    >>> from Bio import SearchIO
+    >>> table = SearchIO.read_table('Blast/mirna.tab', 'blast-tab', comments=True)
+    >>> len(table)
+    3
+    >>> table['33212']
+    QueryResult(id='33212', 44 hits)
+    >>> table.columns['bitscore'][:3].tolist()
+    [111.0, 109.0, 102.0]
+    >>> table.get_columns('33212')['sseqid'][:2].tolist()
+    [b'gi|296923684|ref|NR_031821.1|', b'gi|270133209|ref|NR_033077.1|']
+
+    Currently only the blast-tab format is supported.
+
+    """
+    table_class = get_processor(format, _TABLE_MAP)
+
+    with as_handle(handle) as source_file:
+        return table_class(source_file, **kwargs)
+
+
 def to_dict(qresults, key_function=None):
     """Turn a QueryResult iterator or list into a dictionary.
 
@@ -418,6 +493,126 @@ def to_dict(qresults, key_function=None):
     return qdict
 
 
+def merge(
+    handles, format=None, key_function=None, sort_by="evalue", max_hits=None, **kwargs
+):
+    """Merge the QueryResult objects of several search output files.
+
+     - handles      - List of handles to the files, or filenames.
+     - format       - Lower case string denoting one of the supported formats.
+     - key_function - Optional callback function which when given a
+                      QueryResult identifier string should return the key
+                      the queries of each file are sorted by. Defaults to
+                      the identifier itself.
+     - sort_by      - How the hits of merged queries are ranked, either
+                      'evalue' (lowest first, the default) or 'bitscore'
+                      (highest first).
+     - max_hits     - Optional maximum number of hits kept for each query,
+                      after ranking.
+     - kwargs       - Format-specific keyword arguments.
+
+    This function is meant for searches split into several jobs, for example
+    against chunks of a database, whose output files (the shards) contain
+    results for the same queries. The shards are parsed together, and the
+    QueryResult objects of the same query are combined into a single one,
+    whose hits are ranked by their best e-value or bit score. Hits found in
+    several shards are combined as well, like with ``QueryResult.absorb``.
+
+    Only one QueryResult per shard is held in memory at any time, so the
+    queries must appear in the same order in all shards, which must be
+    sorted by the key given by key_function, although each shard may lack
+    some queries (for example the queries without hits in tabular output).
+    Search tools usually write the queries in the order of the query file,
+    so their positions in this file are a convenient key. Here, the rows of a
+    BLAST tabular output file are spread over two shards:
+
+    >>> from io import StringIO
+    >>> from Bio import SearchIO
+    >>> with open('Blast/tab_2226_tblastn_001.txt') as handle:
+    ...     lines = handle.readlines()
+    ...
+    >>> shards = [StringIO(''.join(lines[0::2])), StringIO(''.join(lines[1::2]))]
+    >>> order = {'gi|16080617|ref|NP_391444.1|': 0, 'gi|11464971:4-101': 1}
+    >>> for qresult in SearchIO.merge(shards, 'blast-tab', order.__getitem__):
+    ...     print("Search %s has %i hits" % (qresult.id, len(qresult)))
+    ...     for hit in qresult[:2]:
+    ...         print("  %s %s" % (hit.id, [hsp.evalue for hsp in hit]))
+    ...
+    Search gi|16080617|ref|NP_391444.1| has 3 hits
+      gi|145479850|ref|XM_001425911.1| [1e-05]
+      gi|115975252|ref|XM_001180111.1| [0.0001]
+    Search gi|11464971:4-101 has 5 hits
+      gi|350596019|ref|XM_003360601.2| [2e-67, 4e-05]
+      gi|301779869|ref|XM_002925302.1| [2e-67, 3e-09]
+
+    A ValueError is raised if a shard is found not to be sorted. Note that the
+    e-values of searches against chunks of a database depend on the size of
+    each chunk, unless the search tool was given the size of the whole
+    database.
+    """
+    if sort_by not in ("evalue", "bitscore"):
+        raise ValueError("sort_by must be 'evalue' or 'bitscore', not %r" % sort_by)
+    if max_hits is not None and max_hits < 0:
+        raise ValueError("max_hits must be a non-negative integer or None")
+    rank_key = functools.partial(_merge_rank_key, sort_by)
+
+    def keyed(handle, shard):
+        """Yield the sort key, shard number and QueryResult objects of a shard."""
+        prev_key = None
+        for qresult in parse(handle, format, **kwargs):
+            if key_function is None:
+                key = qresult.id
+            else:
+                key = key_function(qresult.id)
+            if prev_key is not None and key < prev_key:
+                raise ValueError(
+                    "Queries of shard %r are not sorted (%r found after %r)"
+                    % (handle, key, prev_key)
+                )
+            prev_key = key
+            yield key, shard, qresult
+
+    # the shard number makes ties follow the order of the shards, and keeps
+    # the QueryResult objects from being compared
+    shards = [keyed(handle, shard) for shard, handle in enumerate(handles)]
+    merged = heapq.merge(*shards)
+    for key, group in itertools.groupby(merged, key=operator.itemgetter(0)):
+        qresults = [qresult for key, shard, qresult in group]
+        qresult = qresults[0]
+        # hits found in several shards, whose HSPs must be ranked again
+        combined = set()
+        for other in qresults[1:]:
+            for hit in other:
+                if hit.id in qresult:
+                    combined.add(hit.id)
+                qresult.absorb(hit)
+        for hit_id in combined:
+            qresult[hit_id].sort(key=rank_key)
+        qresult.sort(key=rank_key)
+        if max_hits is not None and len(qresult) > max_hits:
+            qresult = qresult[:max_hits]
+        yield qresult
+
+
+def _merge_rank_key(sort_by, item):
+    """Return the key ranking a Hit or HSP by e-value or bit score (PRIVATE).
+
+    Hits without their own value use the best value of their HSPs. Items
+    without any value are ranked last.
+    """
+    value = getattr(item, sort_by, None)
+    if value is None and isinstance(item, Hit):
+        values = [getattr(hsp, sort_by) for hsp in item if hasattr(hsp, sort_by)]
+        if values:
+            value = min(values) if sort_by == "evalue" else max(values)
+    if value is None:
+        return (True, 0)
+    elif sort_by == "evalue":
+        return (False, value)
+    else:
+        return (False, -value)
+
+
 def index(filename, format=None, key_function=None, **kwargs):
     """Indexes a search output file and returns a dictionary-like object.
 
@@ -476,6 +671,18 @@ def index(filename, format=None, key_function=None, **kwargs):
     Note that the callback function does not change the QueryResult's ID value.
     It only changes the key value used to retrieve the associated QueryResult.
 
+    The raw bytes of several queries can be fetched at once with the
+    ``get_raw_many`` method, which reads them in the order of their positions
+    in the file:
+
+    >>> from Bio import SearchIO
+    >>> from io import BytesIO
+    >>> search_idx = SearchIO.index('Blast/mirna.xml', 'blast-xml')
+    >>> raw_list = search_idx.get_raw_many(['33213', '33211'])
+    >>> [SearchIO.read(BytesIO(raw), 'blast-xml').id for raw in raw_list]
+    ['33213', '33211']
+    >>> search_idx.close()
+
     """
     if not isinstance(filename, str):
         raise TypeError("Need a filename (not a handle)")
@@ -489,7 +696,14 @@ def index(filename, format=None, key_function=None, **kwargs):
     )
 
 
-def index_db(index_filename, filenames=None, format=None, key_function=None, **kwargs):
+def index_db(
+    index_filename,
+    filenames=None,
+    format=None,
+    key_function=None,
+    processes=None,
+    **kwargs
+):
     """Indexes several search output files into an SQLite database.
 
      - index_filename - The SQLite filename.
@@ -501,6 +715,9 @@ def index_db(index_filename, filenames=None, format=None, key_function=None, **k
      - key_function - Optional callback function which when given a
                       QueryResult identifier string should return a unique
                       key for the dictionary.
+     - processes    - Optional number of worker processes used to scan the
+                      files when building a new index. By default the files
+                      are scanned one after the other in the current process.
      - kwargs       - Format-specific keyword arguments.
 
     The ``index_db`` function is similar to ``index`` in that it indexes the start
@@ -543,6 +760,23 @@ def index_db(index_filename, filenames=None, format=None, key_function=None, **k
     the index database in memory. This is useful for quick tests, but using
     the Bio.SearchIO.index(...) function instead would use less memory.
 
+    Building the index of many files can be spread over several processes with
+    the ``processes`` argument. The files are then scanned in parallel, while
+    the offsets are written to the database in the current process, in the
+    same order as without worker processes. As with ``index``, the raw bytes
+    of many queries can be fetched with ``get_raw_many``, which reads them file
+    by file in the order of their positions:
+
+    >>> from Bio import SearchIO
+    >>> files = ['Blast/mirna.xml', 'Blast/wnts.xml']
+    >>> db_idx = SearchIO.index_db(':memory:', files, 'blast-xml', processes=2)
+    >>> len(db_idx)
+    8
+    >>> raw_list = db_idx.get_raw_many(['gi|156630997:105-1160', '33212'])
+    >>> [len(raw) for raw in raw_list]
+    [68505, 47395]
+    >>> db_idx.close()
+
     BGZF compressed files are supported, and detected automatically. Ordinary
     GZIP compressed files are not supported.
 
@@ -563,18 +797,28 @@ def index_db(index_filename, filenames=None, format=None, key_function=None, **k
         key_function,
     )
 
-    def proxy_factory(format, filename=None):
-        """Given a filename returns proxy object, else boolean if format OK."""
-        if filename:
-            return get_processor(format, _INDEXER_MAP)(filename, **kwargs)
-        else:
-            return format in _INDEXER_MAP
+    # a module level function, so worker processes can use it
+    proxy_factory = functools.partial(_index_db_proxy_factory, kwargs)
 
     return _SQLiteManySeqFilesDict(
-        index_filename, filenames, proxy_factory, format, key_function, repr
+        index_filename,
+        filenames,
+        proxy_factory,
+        format,
+        key_function,
+        repr,
+        processes=processes,
     )
 
 
+def _index_db_proxy_factory(kwargs, format, filename=None):
+    """Given a filename returns proxy object, else boolean if format OK (PRIVATE)."""
+    if filename:
+        return get_processor(format, _INDEXER_MAP)(filename, **kwargs)
+    else:
+        return format in _INDEXER_MAP
+
+
 def write(qresults, handle, format=None, **kwargs):
     """Write QueryResult objects to a file in the given format.
 
@@ -703,8 +703,9 @@ class HSPFragment(_BaseHSP):
 
     HSPFragment forms the core of any parsed search output file. Depending on
     the search output file format, it may contain the actual query and/or hit
-    sequences that produces the search hits. These sequences are stored as
-    SeqRecord objects (see SeqRecord):
+    sequences that produces the search hits. These sequences are accessed as
+    SeqRecord objects (see SeqRecord), which are only created when first
+    needed, as parsers give them as plain strings:
 
     >>> from Bio import SearchIO
     >>> qresult = next(SearchIO.parse('Blast/mirna.xml', 'blast-xml'))
@@ -837,15 +838,9 @@ class HSPFragment(_BaseHSP):
         aln_span = getattr_str(self, "aln_span")
         lines.append("  Fragments: 1 (%s columns)" % aln_span)
         # sequences
-        if self.query is not None and self.hit is not None:
-            try:
-                qseq = str(self.query.seq)
-            except AttributeError:  # query is None
-                qseq = "?"
-            try:
-                hseq = str(self.hit.seq)
-            except AttributeError:  # hit is None
-                hseq = "?"
+        if self._query is not None and self._hit is not None:
+            qseq = self._get_seq_str("query")
+            hseq = self._get_seq_str("hit")
 
             # similarity line
             simil = ""
@@ -901,31 +896,45 @@ class HSPFragment(_BaseHSP):
                     % (len(opp_seq), opp_type, len(seq), seq_type)
                 )
 
-        seq_id = getattr(self, "%s_id" % seq_type)
-        seq_desc = getattr(self, "%s_description" % seq_type)
-        seq_feats = getattr(self, "%s_features" % seq_type)
-        seq_name = "aligned %s sequence" % seq_type
-
+        # strings are kept as they are, their SeqRecord is created on access
         if isinstance(seq, SeqRecord):
-            seq.id = seq_id
-            seq.description = seq_desc
-            seq.name = seq_name
-            seq.features = seq_feats
+            seq.id = getattr(self, "%s_id" % seq_type)
+            seq.description = getattr(self, "%s_description" % seq_type)
+            seq.name = "aligned %s sequence" % seq_type
+            seq.features = getattr(self, "%s_features" % seq_type)
             seq.annotations["molecule_type"] = self.molecule_type
-        elif isinstance(seq, str):
+
+        return seq
+
+    def _get_seq_record(self, seq_type):
+        """Return the hit or query sequence as a SeqRecord object (PRIVATE).
+
+        Sequences stored as strings are converted into SeqRecord objects,
+        which replace the strings from then on.
+        """
+        attr_name = "_%s" % seq_type
+        seq = getattr(self, attr_name)
+        if isinstance(seq, str):
             seq = SeqRecord(
                 Seq(seq),
-                id=seq_id,
-                name=seq_name,
-                description=seq_desc,
-                features=seq_feats,
+                id=getattr(self, "%s_id" % seq_type),
+                name="aligned %s sequence" % seq_type,
+                description=getattr(self, "%s_description" % seq_type),
+                features=getattr(self, "%s_features" % seq_type),
                 annotations={"molecule_type": self.molecule_type},
             )
+            setattr(self, attr_name, seq)
+        return seq
 
+    def _get_seq_str(self, seq_type):
+        """Return the hit or query sequence as a string (PRIVATE)."""
+        seq = getattr(self, "_%s" % seq_type)
+        if isinstance(seq, SeqRecord):
+            return str(seq.seq)
         return seq
 
     def _hit_get(self):
-        return self._hit
+        return self._get_seq_record("hit")
 
     def _hit_set(self, value):
         self._hit = self._set_seq(value, "hit")
@@ -937,7 +946,7 @@ class HSPFragment(_BaseHSP):
     )
 
     def _query_get(self):
-        return self._query
+        return self._get_seq_record("query")
 
     def _query_set(self, value):
         self._query = self._set_seq(value, "query")
@@ -972,12 +981,13 @@ class HSPFragment(_BaseHSP):
 
     def _molecule_type_set(self, value):
         self._molecule_type = value
+        # sequences still stored as strings get the new value when converted
         try:
-            self.query.annotations["molecule_type"] = value
+            self._query.annotations["molecule_type"] = value
         except AttributeError:
             pass
         try:
-            self.hit.annotations["molecule_type"] = value
+            self._hit.annotations["molecule_type"] = value
         except AttributeError:
             pass
 
@@ -995,10 +1005,10 @@ class HSPFragment(_BaseHSP):
         try:
             self._aln_span
         except AttributeError:
-            if self.query is not None:
-                self._aln_span = len(self.query)
-            elif self.hit is not None:
-                self._aln_span = len(self.hit)
+            if self._query is not None:
+                self._aln_span = len(self._query)
+            elif self._hit is not None:
+                self._aln_span = len(self._hit)
 
         return self._aln_span
 
@@ -160,8 +160,102 @@ def fragcascade(attr, seq_type, doc=""):
 
     def setter(self, value):
         setattr(self, attr_name, value)
-        seq = getattr(self, seq_type)
-        if seq is not None:
+        # sequences stored as strings are not SeqRecord objects yet
+        seq = getattr(self, "_%s" % seq_type, None)
+        if seq is not None and not isinstance(seq, str):
             setattr(seq, attr, value)
 
     return property(fget=getter, fset=setter, doc=doc)
+
+
+class ResultFilter:
+    """Criteria for the HSPs and hits kept while parsing search output files.
+
+    A ``ResultFilter`` can be given as the ``filter`` keyword argument of
+    ``SearchIO.parse``, ``read``, ``index`` and ``index_db`` for the formats
+    which support it (blast-tab, blast-xml, hmmer3-tab, hmmer3-domtab and
+    hmmer3-text). The parser then skips the HSPs that fail the criteria before
+    creating any object for them, which is much faster than filtering the
+    parsed QueryResult objects with ``hsp_filter`` and ``hit_filter``:
+
+     - max_evalue    - Maximum e-value of the HSPs.
+     - min_bitscore  - Minimum bit score of the HSPs.
+     - min_ident_pct - Minimum percent identity of the HSPs (blast-tab, with
+                       the ``pident`` or ``nident`` and ``length`` columns,
+                       and blast-xml only).
+     - max_hits      - Maximum number of hits per query, keeping the first
+                       hits in the file (that is, the best ones).
+
+    A ValueError is raised if the format does not provide the values needed
+    for a criterion. HSPs without a value for a given criterion fail it. Hits
+    without any HSP left are removed, as by ``hsp_filter``, but queries are
+    always kept, even if they have no hits left:
+
+    >>> from Bio import SearchIO
+    >>> result_filter = SearchIO.ResultFilter(max_evalue=1e-10, max_hits=3)
+    >>> for qresult in SearchIO.parse('Blast/mirna.xml', 'blast-xml',
+    ...                               filter=result_filter):
+    ...     print("Search %s has %i hits" % (qresult.id, len(qresult)))
+    ...
+    Search 33211 has 3 hits
+    Search 33212 has 3 hits
+    Search 33213 has 3 hits
+
+    """
+
+    def __init__(
+        self, max_evalue=None, min_bitscore=None, min_ident_pct=None, max_hits=None
+    ):
+        """Initialize the class."""
+        if max_hits is not None and max_hits < 0:
+            raise ValueError("max_hits must be a non-negative integer or None")
+        self.max_evalue = max_evalue
+        self.min_bitscore = min_bitscore
+        self.min_ident_pct = min_ident_pct
+        self.max_hits = max_hits
+
+    def __repr__(self):
+        """Return the filter representation as a string."""
+        return (
+            "ResultFilter(max_evalue=%r, min_bitscore=%r, min_ident_pct=%r, "
+            "max_hits=%r)"
+            % (self.max_evalue, self.min_bitscore, self.min_ident_pct, self.max_hits)
+        )
+
+    def _check_format(self, fmt, evalue=True, bitscore=True, ident_pct=True):
+        """Raise a ValueError if a criterion cannot be evaluated (PRIVATE).
+
+        The arguments evalue, bitscore and ident_pct tell if the format given
+        by fmt provides these values for its HSPs.
+        """
+        for name, value, available in (
+            ("max_evalue", self.max_evalue, evalue),
+            ("min_bitscore", self.min_bitscore, bitscore),
+            ("min_ident_pct", self.min_ident_pct, ident_pct),
+        ):
+            if value is not None and not available:
+                raise ValueError(
+                    "%s cannot be used for %s output, which does not provide "
+                    "the required values" % (name, fmt)
+                )
+
+    def _tests_hsps(self):
+        """Return True if any criterion applies to the HSP values (PRIVATE)."""
+        return (
+            self.max_evalue is not None
+            or self.min_bitscore is not None
+            or self.min_ident_pct is not None
+        )
+
+    def accepts(self, evalue=None, bitscore=None, ident_pct=None):
+        """Return True if an HSP with the given values passes the criteria."""
+        if self.max_evalue is not None:
+            if evalue is None or evalue > self.max_evalue:
+                return False
+        if self.min_bitscore is not None:
+            if bitscore is None or bitscore < self.min_bitscore:
+                return False
+        if self.min_ident_pct is not None:
+            if ident_pct is None or ident_pct < self.min_ident_pct:
+                return False
+        return True
@@ -22,6 +22,9 @@ Currently TogoWS does not provide any usage guidelines (unlike the NCBI whose
 requirements are reasonably clear). To avoid risking overloading the service,
 Biopython will only allow three calls per second.
 
+To store the responses on disk, and answer repeated calls from there, set
+the module variable cache to a Bio.WebCache.WebCache object.
+
 The TogoWS SOAP service offers a more complex API for calling web services
 (essentially calling remote functions) provided by DDBJ, KEGG and PDBj. For
 example, this allows you to run a remote BLAST search at the DDBJ. This is
@@ -42,6 +45,8 @@ from urllib.parse import quote
 # Constant
 _BASE_URL = "http://togows.dbcls.jp"
 
+cache = None
+
 # Caches:
 _search_db_names = None
 _entry_db_names = None
@@ -344,7 +349,19 @@ def _open(url, post=None):
 
     In the absence of clear guidelines, this function enforces a limit of
     "up to three queries per second" to avoid abusing the TogoWS servers.
+
+    If a cache is set, responses found in the cache are returned without
+    waiting.
     """
+    if post:
+        post = post.encode()
+    if cache is not None:
+        handle = cache.get(url, post)
+        if handle is not None:
+            text_handle = io.TextIOWrapper(handle, encoding="UTF-8")
+            text_handle.url = handle.url
+            return text_handle
+
     delay = 0.333333333  # one third of a second
     current = time.time()
     wait = _open.previous + delay - current
@@ -355,9 +372,11 @@ def _open(url, post=None):
         _open.previous = current
 
     if post:
-        handle = urlopen(url, post.encode())
+        handle = urlopen(url, post)
     else:
         handle = urlopen(url)
+    if cache is not None:
+        handle = cache.store(handle, url, post)
 
     # We now trust TogoWS to have set an HTTP error code, that
     # suffices for my current unit tests. Previously we would
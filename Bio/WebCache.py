@@ -0,0 +1,223 @@
+# This file is part of the Biopython distribution and governed by your
+# choice of the "Biopython License Agreement" or the "BSD 3-Clause License".
+# Please see the LICENSE file that should have been included as part of this
+# package.
+"""On-disk cache for the responses of web services.
+
+The modules in Biopython which access web services, such as Bio.Entrez,
+Bio.KEGG.REST, Bio.TogoWS, and Bio.ExPASy, have a module variable cache,
+which is None by default. Setting it to a WebCache object stores the
+responses in a local directory, and answers repeated requests from disk
+without contacting the web service. For Bio.Entrez, this also means that
+these requests do not count against the NCBI rate limit:
+
+>>> import tempfile
+>>> from Bio import Entrez
+>>> from Bio.WebCache import WebCache
+>>> directory = tempfile.TemporaryDirectory()
+>>> Entrez.cache = WebCache(directory.name, ttls={"taxonomy": 30 * 86400})
+
+Each response is saved in a file named after a hash of the URL and its
+parameters, sorted, and leaving out parameters which do not affect the
+response, such as the email address and API key for NCBI. Cached responses
+expire after a time to live (TTL), which can be set separately for each
+database. If the total size of the cached responses exceeds the maximum
+size, the least recently used responses are removed.
+
+>>> Entrez.cache = None
+>>> directory.cleanup()
+
+"""
+
+import email.message
+import hashlib
+import io
+import json
+import os
+import threading
+import time
+
+from urllib.parse import parse_qsl, urlencode, urlsplit
+
+
+class WebCache:
+    """Directory of cached responses of web services.
+
+    Arguments:
+     - directory - directory to store the responses in; this is created if
+       it does not exist yet.
+     - max_size - maximum total size in bytes of the stored responses
+       (default 1 GB).
+     - ttl - time in seconds after which a stored response expires (default
+       one day); use None for responses that never expire.
+     - ttls - dictionary mapping a database name to the time to live of the
+       responses for that database, overriding ttl.
+     - ignored_params - names of URL parameters which are not used to
+       identify a response.
+
+    """
+
+    def __init__(
+        self,
+        directory,
+        max_size=2**30,
+        ttl=86400,
+        ttls=None,
+        ignored_params=("tool", "email", "api_key"),
+    ):
+        """Create a WebCache object."""
+        self.directory = os.path.abspath(os.path.expanduser(directory))
+        os.makedirs(self.directory, exist_ok=True)
+        self.max_size = max_size
+        self.ttl = ttl
+        if ttls is None:
+            ttls = {}
+        self.ttls = ttls
+        self.ignored_params = frozenset(ignored_params)
+        self._size = None  # total size of the stored responses, once known
+        self._lock = threading.Lock()
+
+    def __repr__(self):
+        """Return a string representation of the cache."""
+        return "WebCache(%r)" % self.directory
+
+    def key(self, url, data=None):
+        """Return the key of the response to a request.
+
+        The key is a hash of the URL and its parameters, sorted and without
+        the ignored parameters. For an HTTP POST request, data is the body
+        of the request with the URL encoded parameters.
+        """
+        parts = urlsplit(url)
+        params = parse_qsl(parts.query, keep_blank_values=True)
+        if data is not None:
+            if isinstance(data, bytes):
+                data = data.decode("utf8")
+            params.extend(parse_qsl(data, keep_blank_values=True))
+        params = sorted(
+            (name, value) for name, value in params if name not in self.ignored_params
+        )
+        text = "%s://%s%s?%s" % (
+            parts.scheme,
+            parts.netloc,
+            parts.path,
+            urlencode(params),
+        )
+        return hashlib.sha256(text.encode("utf8")).hexdigest()
+
+    def _path(self, key):
+        return os.path.join(self.directory, key[:2], key)
+
+    def get(self, url, data=None, database=None):
+        """Return a handle to the stored response to a request, or None.
+
+        The handle is a binary in-memory handle, with attributes url and
+        headers like the handles returned by urllib.request.urlopen. None is
+        returned if the response was not stored, or if it has expired.
+        """
+        path = self._path(self.key(url, data))
+        try:
+            with open(path, "rb") as handle:
+                info = json.loads(handle.readline().decode("utf8"))
+                content = handle.read()
+        except (OSError, ValueError):
+            return None
+        ttl = self.ttls.get(database, self.ttl)
+        if ttl is not None and time.time() - info["time"] > ttl:
+            self._remove(path)
+            return None
+        # Record that this response was used recently
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        return self._make_handle(content, info["url"], info["content_type"])
+
+    def store(self, handle, url, data=None):
+        """Store the response in the given handle, and return a new handle.
+
+        The response is read completely from the handle, which is closed.
+        The handle returned is a binary in-memory handle with the same
+        contents, and attributes url and headers.
+        """
+        content = handle.read()
+        content_type = handle.headers.get("Content-Type", "")
+        response_url = getattr(handle, "url", url)
+        handle.close()
+        info = {"url": response_url, "content_type": content_type, "time": time.time()}
+        header = (json.dumps(info) + "\n").encode("utf8")
+        path = self._path(self.key(url, data))
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # Write to a temporary file first, so that other threads or processes
+        # never see a partially written response
+        temp_path = "%s.%d.%d" % (path, os.getpid(), threading.get_ident())
+        with open(temp_path, "wb") as output:
+            output.write(header)
+            output.write(content)
+        os.replace(temp_path, path)
+        self._add_size(len(header) + len(content))
+        return self._make_handle(content, response_url, content_type)
+
+    def clear(self):
+        """Remove all stored responses."""
+        with self._lock:
+            for path, size, mtime in self._entries():
+                self._remove(path)
+            self._size = 0
+
+    def _make_handle(self, content, url, content_type):
+        handle = io.BytesIO(content)
+        handle.url = url
+        handle.headers = email.message.Message()
+        if content_type:
+            handle.headers["Content-Type"] = content_type
+        return handle
+
+    def _remove(self, path):
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+    def _entries(self):
+        """Return the path, size and time of last use of each response."""
+        entries = []
+        for subdirectory in os.scandir(self.directory):
+            if not subdirectory.is_dir():
+                continue
+            for entry in os.scandir(subdirectory.path):
+                if "." in entry.name:
+                    # Response still being written
+                    continue
+                try:
+                    stat = entry.stat()
+                except OSError:
+                    continue
+                entries.append((entry.path, stat.st_size, stat.st_mtime))
+        return entries
+
+    def _add_size(self, size):
+        """Update the total size, removing old responses if needed."""
+        with self._lock:
+            if self._size is None:
+                self._size = sum(size for path, size, mtime in self._entries())
+            else:
+                self._size += size
+            if self._size <= self.max_size:
+                return
+            # Other processes may share the directory, so check it again
+            entries = self._entries()
+            entries.sort(key=lambda entry: entry[2])
+            total = sum(size for path, size, mtime in entries)
+            for path, size, mtime in entries:
+                if total <= self.max_size:
+                    break
+                self._remove(path)
+                total -= size
+            self._size = total
+
+
+if __name__ == "__main__":
+    from Bio._utils import run_doctest
+
+    run_doctest()
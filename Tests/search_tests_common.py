@@ -150,13 +150,14 @@ def compare_attrs(obj_a, obj_b, attrs):
         # since they are seqrecords, we compare the strings only
         # comparing using compare_record is too slow
         if attr in ("_hit", "_query") and (val_a is not None and val_b is not None):
-            # compare seq directly if it's a contiguous hsp
-            if isinstance(val_a, SeqRecord) and isinstance(val_b, SeqRecord):
-                assert str(val_a.seq) == str(val_b.seq), "%s: %r vs %r" % (
-                    attr,
-                    val_a,
-                    val_b,
-                )
+            # compare seq directly if it's a contiguous hsp, whose sequences
+            # may not have been converted into SeqRecord objects yet
+            if isinstance(val_a, (str, SeqRecord)) and isinstance(
+                val_b, (str, SeqRecord)
+            ):
+                seq_a = val_a if isinstance(val_a, str) else str(val_a.seq)
+                seq_b = val_b if isinstance(val_b, str) else str(val_b.seq)
+                assert seq_a == seq_b, "%s: %r vs %r" % (attr, val_a, val_b)
             elif isinstance(val_a, list) and isinstance(val_b, list):
                 for seq_a, seq_b in zip(val_a, val_b):
                     assert str(seq_a.seq) == str(seq_b.seq), "%s: %r vs %r" % (
@@ -4,9 +4,10 @@
 # as part of this package.
 
 """Bio.Align.AlignInfo related tests."""
+
 import unittest
 
-from Bio.Align import MultipleSeqAlignment
+from Bio.Align import ArrayAlignment, MultipleSeqAlignment
 from Bio.Seq import Seq
 from Bio.SeqRecord import SeqRecord
 from Bio import AlignIO
@@ -121,6 +122,66 @@ X  0.0 0.0 0.0 0.0 0.0 0.0 0.0 0.0 0.0 0.0 0.0 0.0 0.0 0.0 0.0 0.0 0.0
         )
         self.assertAlmostEqual(ic, 133.061475107, places=6)
 
+    def test_array_alignment(self):
+        records = [
+            SeqRecord(Seq("MHQAIFIYQIGYP*LKSGYIQSIRSPEYDNW-"), id="ID001"),
+            SeqRecord(Seq("MH--IFIYQIGYAYLKSGYIQSIRSPEY-NW*"), id="ID002"),
+            SeqRecord(Seq("MHQAIFIYQIGYPYLKSGYIQSIRSPEYDNW*"), id="ID003"),
+        ]
+        records[1].annotations["weight"] = 0.5
+        msa = MultipleSeqAlignment(records)
+        summary1 = SummaryInfo(msa)
+        summary2 = SummaryInfo(ArrayAlignment(msa))
+        c = summary2.dumb_consensus(ambiguous="X")
+        self.assertEqual(str(c), "MHQAIFIYQIGYXXLKSGYIQSIRSPEYDNW*")
+        self.assertEqual(c, summary1.dumb_consensus(ambiguous="X"))
+        c = summary2.gap_consensus(ambiguous="X", threshold=0.5)
+        self.assertEqual(str(c), "MHQAIFIYQIGYPYLKSGYIQSIRSPEYDNW*")
+        m1 = summary1.pos_specific_score_matrix(chars_to_ignore=["-", "*"])
+        m2 = summary2.pos_specific_score_matrix(chars_to_ignore=["-", "*"])
+        self.assertEqual(str(m1), str(m2))
+        self.assertEqual(
+            m2[12],
+            {
+                "A": 0.5,
+                "D": 0.0,
+                "E": 0.0,
+                "F": 0.0,
+                "G": 0.0,
+                "H": 0.0,
+                "I": 0.0,
+                "K": 0.0,
+                "L": 0.0,
+                "M": 0.0,
+                "N": 0.0,
+                "P": 2.0,
+                "Q": 0.0,
+                "R": 0.0,
+                "S": 0.0,
+                "W": 0.0,
+                "Y": 0.0,
+            },
+        )
+        letters = IUPACData.protein_letters
+        e_freq_table = {letter: 1.0 / len(letters) for letter in letters}
+        ic1 = summary1.information_content(
+            e_freq_table=e_freq_table, chars_to_ignore=["-", "*"]
+        )
+        ic2 = summary2.information_content(
+            e_freq_table=e_freq_table, chars_to_ignore=["-", "*"]
+        )
+        self.assertAlmostEqual(ic1, ic2)
+        self.assertAlmostEqualList(summary1.ic_vector, summary2.ic_vector)
+
+    def test_information_content_errors(self):
+        summary = SummaryInfo(AlignIO.read("GFF/multi.fna", "fasta"))
+        with self.assertRaises(ValueError):
+            summary.information_content(pseudo_count=-1)
+        with self.assertRaises(ValueError):
+            summary.information_content(e_freq_table={"A": 0.5, "C": 0.5})
+        with self.assertRaises(ValueError):
+            summary.information_content()
+
     def test_pseudo_count(self):
         # use example from
         # http://biologie.univ-mrs.fr/upload/p202/01.4.PSSM_theory.pdf
@@ -5,12 +5,14 @@
 
 """Unit tests for the Bio.Phylo.Consensus module."""
 
+import itertools
 import os
 import unittest
 import tempfile
 
 # from io import StringIO
 from Bio import AlignIO
+from Bio.Align import ArrayAlignment
 from Bio import Phylo
 from Bio.Phylo import BaseTree
 from Bio.Phylo.TreeConstruction import DistanceCalculator
@@ -66,6 +68,32 @@ class ConsensusTest(unittest.TestCase):
         self.assertEqual(bitstr_counts[_BitString("00011")][0], 1)
         self.assertEqual(bitstr_counts[_BitString("01111")][0], 1)
 
+    def test_count_splits(self):
+        term_names = [term.name for term in self.trees[0].get_terminals()]
+        split_counts, len_trees = Consensus._count_splits(self.trees, term_names)
+        self.assertEqual(len_trees, len(self.trees))
+        self.assertEqual(
+            {split: counts[0] for split, counts in split_counts.items()},
+            {0b11111: 3, 0b11000: 2, 0b00111: 3, 0b00110: 2, 0b00011: 1, 0b01111: 1},
+        )
+        self.assertEqual(Consensus._split_indices(0b00110, 5), [2, 3])
+        self.assertEqual(Consensus._count_bits(0b01111), 4)
+        # splits do not depend on the order of the terminals in each tree
+        tree = self.trees[1]
+        tree.root.clades.reverse()
+        for clade in tree.find_clades():
+            clade.clades.reverse()
+        self.assertEqual(
+            Consensus._count_splits(self.trees, term_names)[0], split_counts
+        )
+        consensus_tree = Consensus.majority_consensus(self.trees)
+        ref_tree = next(Phylo.parse("./TreeConstruction/majority_ref.tre", "newick"))
+        self.assertTrue(Consensus._equal_topology(consensus_tree, ref_tree))
+        # all trees must have the same taxa
+        tree.prune("Alpha")
+        self.assertRaises(ValueError, Consensus._count_splits, self.trees, term_names)
+        self.assertRaises(ValueError, Consensus.majority_consensus, self.trees)
+
     def test_strict_consensus(self):
         ref_trees = list(Phylo.parse("./TreeConstruction/strict_refs.tre", "newick"))
         # three trees
@@ -142,6 +170,70 @@ class BootstrapTest(unittest.TestCase):
         self.assertEqual(len(msa_list[0]), len(self.msa))
         self.assertEqual(len(msa_list[0][0]), len(self.msa[0]))
 
+    def test_bootstrap_seed(self):
+        msa_list = list(Consensus.bootstrap(self.msa, 3, seed=42))
+        for msa1, msa2 in zip(msa_list, Consensus.bootstrap(self.msa, 3, seed=42)):
+            self.assertEqual([str(r.seq) for r in msa1], [str(r.seq) for r in msa2])
+            self.assertEqual([r.id for r in msa1], [r.id for r in self.msa])
+        self.assertNotEqual(str(msa_list[0][0].seq), str(msa_list[1][0].seq))
+        # each column of a replicate is a column of the alignment
+        columns = {self.msa[:, i] for i in range(len(self.msa[0]))}
+        for i in range(len(msa_list[0][0])):
+            self.assertIn(msa_list[0][:, i], columns)
+        aln = ArrayAlignment(self.msa)
+        replicate = next(Consensus.bootstrap(aln, 1, seed=42))
+        self.assertIsInstance(replicate, ArrayAlignment)
+        self.assertEqual(
+            [str(r.seq) for r in replicate], [str(r.seq) for r in msa_list[0]]
+        )
+
+    def test_bootstrap_annotations(self):
+        length = self.msa.get_alignment_length()
+        for record in self.msa:
+            record.annotations["molecule_type"] = "protein"
+            record.letter_annotations["position"] = list(range(length))
+        self.msa.column_annotations["marks"] = "".join(
+            "abcdefghij"[i % 10] for i in range(length)
+        )
+        for aln in (self.msa, ArrayAlignment(self.msa)):
+            replicate = next(Consensus.bootstrap(aln, 1, seed=7))
+            marks = replicate.column_annotations["marks"]
+            for record, old_record in zip(replicate, self.msa):
+                self.assertEqual(record.annotations, {"molecule_type": "protein"})
+                positions = record.letter_annotations["position"]
+                self.assertEqual(len(positions), length)
+                self.assertEqual(
+                    str(record.seq), "".join(old_record.seq[i] for i in positions)
+                )
+                self.assertEqual(
+                    marks,
+                    "".join(self.msa.column_annotations["marks"][i] for i in positions),
+                )
+
+    def test_bootstrap_trees_close(self):
+        calculator = DistanceCalculator("identity")
+        constructor = DistanceTreeConstructor(calculator)
+        trees = Consensus.bootstrap_trees(self.msa, 1000, constructor, n_jobs=2, seed=1)
+        self.assertIsInstance(next(trees), BaseTree.Tree)
+        # the pending replicates are cancelled, not all built
+        trees.close()
+
+    def test_bootstrap_trees_n_jobs(self):
+        calculator = DistanceCalculator("blosum62")
+        constructor = DistanceTreeConstructor(calculator)
+        trees = list(Consensus.bootstrap_trees(self.msa, 10, constructor, seed=1))
+        parallel_trees = Consensus.bootstrap_trees(
+            self.msa, 10, constructor, n_jobs=2, seed=1
+        )
+        for tree1, tree2 in itertools.zip_longest(trees, parallel_trees):
+            self.assertTrue(Consensus._equal_topology(tree1, tree2))
+        tree = Consensus.bootstrap_consensus(
+            self.msa, 10, constructor, Consensus.majority_consensus, n_jobs=2, seed=1
+        )
+        self.assertTrue(
+            Consensus._equal_topology(tree, Consensus.majority_consensus(trees))
+        )
+
     def test_bootstrap_trees(self):
         calculator = DistanceCalculator("blosum62")
         constructor = DistanceTreeConstructor(calculator)
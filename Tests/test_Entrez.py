@@ -3,17 +3,25 @@
 # license.  Please see the LICENSE file that should have been included
 # as part of this package.
 
-"""Offline tests for two Entrez features.
+"""Offline tests for three Entrez features.
 
 (1) the URL construction of NCBI's Entrez services.
 (2) setting a custom directory for DTD and XSD downloads.
+(3) sending requests from a pool of threads, tested with a local server.
+(4) sending requests from asyncio coroutines, tested with a local server.
 """
 
+import asyncio
+import threading
 import unittest
 import warnings
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.error import HTTPError
+from urllib.parse import parse_qs, urlsplit
 
 from Bio import Entrez
 from Bio.Entrez import Parser
+from Bio.Entrez import aio
 
 
 # This lets us set the email address to be sent to NCBI Entrez:
@@ -201,6 +209,235 @@ class CustomDirectoryTest(unittest.TestCase):
         shutil.rmtree(tmpdir)
 
 
+class EntrezRequestHandler(BaseHTTPRequestHandler):
+    """Local stand-in for the NCBI Entrez Utilities."""
+
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        parts = urlsplit(self.path)
+        self.respond(parts.path, parse_qs(parts.query))
+
+    def do_POST(self):
+        length = int(self.headers["Content-Length"])
+        body = self.rfile.read(length).decode()
+        self.respond(urlsplit(self.path).path, parse_qs(body))
+
+    def respond(self, path, params):
+        server = self.server
+        with server.lock:
+            server.requests.append((path, params, self.client_address))
+            failures = server.failures.pop(path, 0)
+            if failures > 1:
+                server.failures[path] = failures - 1
+        if failures:
+            status, content_type, data = 503, "text/plain", b"Try again\n"
+        elif path.endswith("/epost.fcgi"):
+            with open("Entrez/epost1.xml", "rb") as handle:
+                data = handle.read()
+            status, content_type = 200, "text/xml"
+        elif path.endswith("/esearch.fcgi"):
+            with open("Entrez/esearch1.xml", "rb") as handle:
+                data = handle.read()
+            status, content_type = 200, "text/xml"
+        elif path.endswith("/elink.fcgi"):
+            with open("Entrez/elink1.xml", "rb") as handle:
+                data = handle.read()
+            status, content_type = 200, "text/xml"
+        elif path.endswith("/efetch.fcgi") and "retstart" not in params:
+            with open("Entrez/pubmed1.xml", "rb") as handle:
+                data = handle.read()
+            status, content_type = 200, "text/xml"
+        elif path.endswith("/efetch.fcgi"):
+            status, content_type = 200, "text/plain"
+            data = ("%s-%s\n" % (params["retstart"][0], params["retmax"][0])).encode()
+        elif path.endswith("/esummary.fcgi") and "retstart" in params:
+            status, content_type = 200, "text/xml"
+            data = b"<start>%s</start>" % params["retstart"][0].encode()
+        else:
+            status, content_type, data = 400, "text/plain", b"Bad request\n"
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class LocalServerTest(unittest.TestCase):
+    """Base class for tests using a local stand-in server."""
+
+    def setUp(self):
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), EntrezRequestHandler)
+        self.server.lock = threading.Lock()
+        self.server.requests = []
+        self.server.failures = {}
+        self.thread = threading.Thread(target=self.server.serve_forever)
+        self.thread.start()
+        host, port = self.server.server_address
+        self.base_url = "http://%s:%d/entrez/eutils/" % (host, port)
+        self.sleep_between_tries = Entrez.sleep_between_tries
+        Entrez.sleep_between_tries = 0
+
+    def tearDown(self):
+        Entrez.sleep_between_tries = self.sleep_between_tries
+        self.server.shutdown()
+        self.server.server_close()
+        self.thread.join()
+
+
+class SchedulerTest(LocalServerTest):
+    """Tests for the request scheduler, using a local stand-in server."""
+
+    def test_fetch_many(self):
+        """Test fetching records in batches through the history server."""
+        ids = [str(i) for i in range(1000, 1010)]
+        with Entrez._Scheduler(max_workers=1, base_url=self.base_url) as scheduler:
+            handles = scheduler.fetch_many(
+                "efetch.fcgi", "nucleotide", ids, 4, {"rettype": "fasta"}
+            )
+            self.assertEqual(
+                ["0-4\n", "4-4\n", "8-4\n"], [handle.read() for handle in handles]
+            )
+        paths = [path for path, params, address in self.server.requests]
+        self.assertEqual(
+            ["/entrez/eutils/epost.fcgi"] + 3 * ["/entrez/eutils/efetch.fcgi"], paths
+        )
+        path, params, address = self.server.requests[0]
+        self.assertEqual([",".join(ids)], params["id"])
+        self.assertEqual(["5cfd4026f9df285d6cfc723c662d74bcbe09"], params["api_key"])
+        for path, params, address in self.server.requests[1:]:
+            self.assertEqual(["1"], params["query_key"])
+            self.assertEqual(["fasta"], params["rettype"])
+            self.assertTrue(params["WebEnv"][0].startswith("0zYsuLk3zG"))
+        # the single worker reused its connection for all requests
+        addresses = {address for path, params, address in self.server.requests}
+        self.assertEqual(1, len(addresses))
+
+    def test_workers(self):
+        """Test sending requests from several workers."""
+        ids = range(25)
+        with Entrez._Scheduler(max_workers=3, base_url=self.base_url) as scheduler:
+            handles = scheduler.fetch_many("esummary.fcgi", "pubmed", ids, 2, {})
+            data = [handle.read() for handle in handles]
+        starts = [b"<start>%d</start>" % start for start in range(0, 25, 2)]
+        self.assertEqual(starts, data)
+        self.assertEqual(14, len(self.server.requests))
+        addresses = {address for path, params, address in self.server.requests}
+        self.assertLessEqual(len(addresses), 3)
+
+    def test_retry(self):
+        """Test retrying requests after server errors."""
+        self.server.failures["/entrez/eutils/efetch.fcgi"] = 2
+        with Entrez._Scheduler(max_workers=1, base_url=self.base_url) as scheduler:
+            handle = scheduler.submit("efetch.fcgi", {"retstart": 0, "retmax": 1})
+            self.assertEqual("0-1\n", handle.result().read())
+            self.assertEqual(3, len(self.server.requests))
+            self.server.failures["/entrez/eutils/efetch.fcgi"] = 3
+            future = scheduler.submit("efetch.fcgi", {"retstart": 0, "retmax": 1})
+            with self.assertRaises(HTTPError) as cm:
+                future.result()
+            self.assertEqual(503, cm.exception.code)
+            future = scheduler.submit("einfo.fcgi")
+            with self.assertRaises(HTTPError) as cm:
+                future.result()
+            self.assertEqual(400, cm.exception.code)
+        self.assertEqual(7, len(self.server.requests))
+
+
+class AsyncTest(LocalServerTest):
+    """Tests for the asyncio interface, using a local stand-in server."""
+
+    def setUp(self):
+        super().setUp()
+        self.aio_base_url = aio.base_url
+        aio.base_url = self.base_url
+
+    def tearDown(self):
+        aio.base_url = self.aio_base_url
+        super().tearDown()
+
+    def test_read(self):
+        """Test reading responses from concurrent requests."""
+
+        async def search_and_link():
+            responses = await asyncio.gather(
+                aio.esearch("pubmed", "biopython"),
+                aio.elink(dbfrom="pubmed", id="19304878"),
+                aio.epost("pubmed", id="11237011,12466850"),
+            )
+            records = [await aio.read(response) for response in responses]
+            for response in responses:
+                response.close()
+            return records
+
+        search, link, post = asyncio.run(search_and_link())
+        self.assertEqual("biopython[All Fields]", search["QueryTranslation"])
+        self.assertEqual("pubmed", link[0]["DbFrom"])
+        self.assertEqual("1", post["QueryKey"])
+        paths = sorted(path for path, params, address in self.server.requests)
+        self.assertEqual(
+            [
+                "/entrez/eutils/elink.fcgi",
+                "/entrez/eutils/epost.fcgi",
+                "/entrez/eutils/esearch.fcgi",
+            ],
+            paths,
+        )
+        for path, params, address in self.server.requests:
+            self.assertEqual(["biopython"], params["tool"])
+            self.assertEqual(
+                ["5cfd4026f9df285d6cfc723c662d74bcbe09"], params["api_key"]
+            )
+            if path.endswith("/epost.fcgi"):
+                self.assertEqual(["11237011,12466850"], params["id"])
+
+    def test_parse(self):
+        """Test parsing the records in a response as they arrive."""
+
+        async def fetch_titles():
+            response = await aio.efetch("pubmed", id=["11237011", "12466850"])
+            self.assertEqual(200, response.status)
+            self.assertEqual("text/xml", response.headers.get_content_type())
+            titles = []
+            async for record in aio.parse(response):
+                article = record["MedlineCitation"]["Article"]
+                titles.append(article["Journal"]["Title"])
+            response.close()
+            return titles
+
+        titles = asyncio.run(fetch_titles())
+        self.assertEqual(
+            ["Social justice (San Francisco, Calif.)", "Biochimica et biophysica acta"],
+            titles,
+        )
+        path, params, address = self.server.requests[0]
+        self.assertEqual(["11237011,12466850"], params["id"])
+
+    def test_retry(self):
+        """Test retrying requests after server errors."""
+        self.server.failures["/entrez/eutils/efetch.fcgi"] = 2
+
+        async def fetch():
+            response = await aio.efetch("nucleotide", retstart=0, retmax=1)
+            data = await response.read()
+            response.close()
+            return data
+
+        self.assertEqual(b"0-1\n", asyncio.run(fetch()))
+        self.assertEqual(3, len(self.server.requests))
+        self.server.failures["/entrez/eutils/efetch.fcgi"] = 3
+        with self.assertRaises(HTTPError) as cm:
+            asyncio.run(fetch())
+        self.assertEqual(503, cm.exception.code)
+        with self.assertRaises(HTTPError) as cm:
+            asyncio.run(aio.esummary(db="pubmed"))
+        self.assertEqual(400, cm.exception.code)
+        self.assertEqual(7, len(self.server.requests))
+
+
 if __name__ == "__main__":
     runner = unittest.TextTestRunner(verbosity=2)
     unittest.main(testRunner=runner)
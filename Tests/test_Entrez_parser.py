@@ -64,6 +64,46 @@ class GeneralTests(unittest.TestCase):
         self.assertIn("DbList", record)
         handle.close()
 
+    def test_plain(self):
+        """Test reading and parsing into plain Python objects."""
+        with open("Entrez/esummary1.xml", "rb") as handle:
+            records = Entrez.read(handle)
+        with open("Entrez/esummary1.xml", "rb") as handle:
+            plain_records = Entrez.read(handle, plain=True)
+        self.assertEqual(records, plain_records)
+        self.assertIs(type(plain_records), list)
+        record = plain_records[0]
+        self.assertIs(type(record), dict)
+        self.assertIs(type(record["Id"]), str)
+        self.assertIs(type(record["PmcRefCount"]), int)
+        self.assertIs(type(record["AuthorList"]), list)
+        self.assertIs(type(record["ArticleIds"]), dict)
+        self.assertEqual(record["ArticleIds"], {"pubmed": ["11850928"], "medline": []})
+        with open("Entrez/pubmed1.xml", "rb") as handle:
+            records = list(Entrez.parse(handle, plain=True))
+        self.assertEqual(len(records), 2)
+        self.assertIs(type(records[1]), dict)
+        title = records[1]["MedlineCitation"]["Article"]["Journal"]["Title"]
+        self.assertIs(type(title), str)
+        self.assertEqual(title, "Biochimica et biophysica acta")
+
+    def test_cached_model(self):
+        """Test reading XML files with a DTD seen before."""
+        from Bio.Entrez import Parser
+
+        url = "http://www.ncbi.nlm.nih.gov/entrez/query/DTD/pubmed_080101.dtd"
+        Parser.DataHandler.models.pop(url, None)
+        with open("Entrez/pubmed1.xml", "rb") as handle:
+            record = Entrez.read(handle)
+        self.assertIn(url, Parser.DataHandler.models)
+        self.assertIn(url, Parser.DataHandler.dtd_texts)
+        with open("Entrez/pubmed1.xml", "rb") as handle:
+            cached_record = Entrez.read(handle)
+        self.assertEqual(record, cached_record)
+        article = cached_record[0]["MedlineCitation"]["Article"]
+        self.assertEqual(article.tag, "Article")
+        self.assertEqual(article["Language"], ["eng"])
+
 
 class EInfoTest(unittest.TestCase):
     """Tests for parsing XML output returned by EInfo."""
@@ -17,6 +17,7 @@ import tempfile
 import shutil
 
 from Bio.AlignIO.MafIO import MafIndex
+from Bio import bgzf
 from Bio import SeqIO
 from Bio.Seq import Seq
 from Bio.SeqRecord import SeqRecord
@@ -161,6 +162,26 @@ if sqlite3:
             idx = MafIndex(self.tmpfile, "MAF/ucsc_mm9_chr10_big.maf", "mm9.chr10")
             self.assertEqual(len(idx), 983)
 
+        def test_good_small_bgzf(self):
+            filename = self.tmpdir + "/ucsc_mm9_chr10.maf.bgz"
+            with open("MAF/ucsc_mm9_chr10.maf", "rb") as handle:
+                data = handle.read()
+            with bgzf.BgzfWriter(filename, "wb") as handle:
+                handle.write(data)
+            idx = MafIndex(self.tmpfile, filename, "mm9.chr10")
+            self.assertEqual(len(idx), 48)
+            plain_idx = MafIndex(
+                "MAF/ucsc_mm9_chr10.mafindex", "MAF/ucsc_mm9_chr10.maf", "mm9.chr10"
+            )
+            starts, ends = (3014742, 3018161), (3015028, 3018644)
+            results = list(idx.search(starts, ends))
+            plain_results = list(plain_idx.search(starts, ends))
+            self.assertEqual(len(results), 8)
+            self.assertEqual(len(results), len(plain_results))
+            for ali, plain_ali in zip(results, plain_results):
+                for record, plain_record in zip(ali, plain_ali):
+                    self.assertTrue(compare_record(record, plain_record))
+
         def test_bundle_without_target(self):
             self.assertRaises(
                 ValueError,
@@ -623,6 +644,43 @@ if sqlite3:
             for seq_id, sequence in correct_sequences.items():
                 self.assertEqual(seq_dict[seq_id].ungap("-"), sequence)
 
+        def test_search_many(self):
+            regions = [
+                ((3014742, 3018161), (3015028, 3018644)),
+                ((0,), (1000,)),
+                ((3014644, 3014689), (3014644 + 45, 3014689 + 53)),
+                ((3012076,), (3015028,)),
+            ]
+            results = list(self.idx.search_many(regions))
+            self.assertEqual(len(results), len(regions))
+            for (starts, ends), alignments in zip(regions, results):
+                expected = list(self.idx.search(starts, ends))
+                self.assertEqual(len(alignments), len(expected))
+                for ali, expected_ali in zip(alignments, expected):
+                    for record, expected_record in zip(ali, expected_ali):
+                        self.assertTrue(compare_record(record, expected_record))
+            self.assertEqual(results[1], [])
+
+        def test_get_spliced_many(self):
+            regions = [
+                ((3014644, 3014689), (3014644 + 45, 3014689 + 53)),
+                ((3014742, 3018161), (3015028, 3018644), -1),
+                ((0, 1000), (500, 1500)),
+                ((3012076,), (3015028,)),
+            ]
+            results = list(self.idx.get_spliced_many(regions))
+            self.assertEqual(len(results), len(regions))
+            for region, ali in zip(regions, results):
+                expected = self.idx.get_spliced(*region)
+                self.assertEqual(len(ali), len(expected))
+                for record, expected_record in zip(ali, expected):
+                    self.assertTrue(compare_record(record, expected_record))
+            self.assertEqual(str(results[2][0].seq), "N" * 1000)
+
+        def test_get_spliced_many_invalid_strand(self):
+            regions = [((3014742,), (3015028,), ".")]
+            self.assertRaises(ValueError, next, self.idx.get_spliced_many(regions))
+
     class TestSearchBadMAF(unittest.TestCase):
         """Test index searching on an incorrectly-formatted MAF."""
 
@@ -6,6 +6,9 @@
 
 import os
 import unittest
+from contextlib import redirect_stdout
+from io import StringIO
+from xml.parsers import expat
 from Bio.Blast import NCBIXML
 
 E_VALUE_THRESH = 1e-10
@@ -4122,6 +4125,71 @@ class TestNCBIXML(unittest.TestCase):
         self.assertEqual(description.e, 7.83523e-61)
         self.assertEqual(description.num_alignments, 12)
 
+    def test_xml_without_alignments(self):
+        """Parsing BLAST XML without the alignment strings."""
+        for filename in ("xml_2222_blastx_001.xml", "xml_2900_blastn_001_v2.xml"):
+            datafile = os.path.join("Blast", filename)
+            with open(datafile) as handle:
+                records = list(NCBIXML.parse(handle))
+            with open(datafile) as handle:
+                short_records = list(NCBIXML.parse(handle, alignments=False))
+            self.assertEqual(len(records), len(short_records))
+            for record, short_record in zip(records, short_records):
+                self.assertEqual(record.query_id, short_record.query_id)
+                self.assertEqual(len(record.alignments), len(short_record.alignments))
+                for alignment, short_alignment in zip(
+                    record.alignments, short_record.alignments
+                ):
+                    self.assertEqual(alignment.hit_id, short_alignment.hit_id)
+                    for hsp, short_hsp in zip(alignment.hsps, short_alignment.hsps):
+                        self.assertTrue(hsp.query)
+                        self.assertEqual("", short_hsp.query)
+                        self.assertEqual("", short_hsp.sbjct)
+                        self.assertEqual("", short_hsp.match)
+                        self.assertEqual(hsp.expect, short_hsp.expect)
+                        self.assertEqual(hsp.frame, short_hsp.frame)
+                        self.assertEqual(hsp.query_start, short_hsp.query_start)
+                        self.assertEqual(hsp.sbjct_end, short_hsp.sbjct_end)
+
+    def test_xml_debug(self):
+        """Parsing BLAST XML with and without debug information."""
+        datafile = os.path.join("Blast", "xml_2212L_blastx_001.xml")
+        with open(datafile, "rb") as handle:
+            record = NCBIXML.read(handle)
+        with open(datafile, "rb") as handle:
+            with redirect_stdout(StringIO()) as stdout:
+                debug_record = NCBIXML.read(handle, debug=1)
+        self.assertIn("Added Blast record", stdout.getvalue())
+        self.assertEqual(record.query, debug_record.query)
+        self.assertEqual(record.ka_params, debug_record.ka_params)
+        hsp = record.alignments[0].hsps[0]
+        debug_hsp = debug_record.alignments[0].hsps[0]
+        self.assertEqual(hsp.match, debug_hsp.match)
+        self.assertEqual(hsp.bits, debug_hsp.bits)
+
+    def test_method_name_level(self):
+        """Dispatching tags by their names and those of their ancestors."""
+
+        class Parser(NCBIXML._XMLparser):
+            def _on_root_node(self, name):
+                self._method_name_level = 3
+                self._method_map = {
+                    "end_a/b/c": lambda: values.append(("abc", self._value)),
+                    "end_x/b/c": lambda: values.append(("xbc", self._value)),
+                }
+
+        values = []
+        parser = Parser()
+        expat_parser = expat.ParserCreate()
+        expat_parser.StartElementHandler = parser._start_element
+        expat_parser.EndElementHandler = parser._end_element
+        expat_parser.CharacterDataHandler = parser._buffer.append
+        expat_parser.Parse(
+            "<r><a><b><c>1</c></b></a><x><b><c>2</c></b></x><y><b><c>3</c></b></y></r>",
+            True,
+        )
+        self.assertEqual([("abc", "1"), ("xbc", "2")], values)
+
 
 if __name__ == "__main__":
     runner = unittest.TextTestRunner(verbosity=2)
@@ -1177,6 +1177,30 @@ class TestSelf(unittest.TestCase):
     def test_empty_file_read(self):
         self.assertEqual([], list(NexusIterator(StringIO())))
 
+    def test_interleaved_matchchar(self):
+        """Read an interleaved matrix using a matchchar and comments."""
+        n = Nexus.Nexus(
+            """#NEXUS
+        begin data;
+        dimensions ntax=3 nchar=12;
+        format interleave datatype=dna missing=? gap=- matchchar=.;
+        matrix [the first block]
+        'taxon one'  ACGT-A
+        taxon_2      ..C..R
+        taxon_3      ?.....
+        [the second block]
+        'taxon one'  GG[;]CCTT
+        taxon_2      .A.(AG)..
+        taxon_3      ......
+        ;
+        end;
+        """
+        )
+        self.assertEqual(n.taxlabels, ["taxon one", "taxon_2", "taxon_3"])
+        self.assertEqual(str(n.matrix["taxon one"]), "ACGT-AGGCCTT")
+        self.assertEqual(str(n.matrix["taxon_2"]), "ACCT-RGACRTT")
+        self.assertEqual(str(n.matrix["taxon_3"]), "?CGT-AGGCCTT")
+
     def test_multiple_output(self):
         records = [
             SeqRecord(
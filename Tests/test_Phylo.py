@@ -11,9 +11,20 @@ import tempfile
 
 from io import StringIO
 
+try:
+    import numpy
+except ImportError:
+    from Bio import MissingPythonDependencyError
+
+    raise MissingPythonDependencyError(
+        "Install NumPy if you want to use Bio.Phylo."
+    ) from None
+
 from Bio import Phylo
 from Bio.Phylo import PhyloXML
-
+from Bio.Phylo.BaseTree import ArrayTree, TreeIndex
+from Bio.Phylo import NewickIO
+from Bio.Phylo.NewickIO import NewickError
 
 # Example Newick and Nexus files
 EX_NEWICK = "Nexus/int_node_labels.nwk"
@@ -173,6 +184,49 @@ class IOTests(unittest.TestCase):
         )
         self.assertEqual({leaf.name for leaf in tree.get_terminals()}, {"0", "1", "2"})
 
+    def test_newick_read_stream(self):
+        """Parse a stream of Newick trees, some spanning several lines."""
+        handle = StringIO("(A:1,(B:2,C:3)90:1);\n(A,\nB,\n(C,D));\n(A,B)")
+        trees = list(Phylo.parse(handle, "newick"))
+        self.assertEqual([tree.count_terminals() for tree in trees], [3, 4, 2])
+        self.assertEqual(trees[0].root.clades[1].confidence, 90)
+        self.assertEqual(trees[0].total_branch_length(), 7)
+        handle.seek(0)
+        trees = list(Phylo.parse(handle, "newick", compact=True))
+        self.assertEqual([tree.count_terminals() for tree in trees], [3, 4, 2])
+        self.assertEqual(trees[0].confidences[2], 90)
+        self.assertEqual(trees[0].total_branch_length(), 7)
+        for text in ("(A,B));", "(A,(B,C);", "(A,B);C"):
+            with self.assertRaises(NewickError):
+                Phylo.read(StringIO(text), "newick")
+
+    def test_newick_parser_subclass(self):
+        """Parse Newick trees with a subclass overriding the clade methods."""
+
+        class Parser(NewickIO.Parser):
+            def new_clade(self, parent=None):
+                clade = super().new_clade(parent)
+                clade.from_subclass = True
+                return clade
+
+            def process_clade(self, clade):
+                if clade.name:
+                    clade.name = clade.name.lower()
+                return super().process_clade(clade)
+
+        parser = Parser.from_string("(A:1,(B:2,C:3)D:1)E;\nX,Y;")
+        trees = list(parser.parse())
+        self.assertEqual(
+            [clade.name for clade in trees[0].find_clades()],
+            ["e", "a", "d", "b", "c"],
+        )
+        self.assertEqual(
+            [clade.name for clade in trees[1].find_clades()], [None, "x", "y"]
+        )
+        for tree in trees:
+            for clade in tree.find_clades():
+                self.assertTrue(clade.from_subclass)
+
 
 class TreeTests(unittest.TestCase):
     """Tests for methods on BaseTree.Tree objects."""
@@ -498,6 +552,177 @@ class MixinTests(unittest.TestCase):
             self.assertEqual(clade.branch_length, blen)
 
 
+class TreeIndexTests(unittest.TestCase):
+    """Tests for the TreeIndex class."""
+
+    def setUp(self):
+        self.phylogenies = list(Phylo.parse(EX_PHYLO, "phyloxml"))
+
+    def test_queries(self):
+        """TreeIndex: queries give the same results as TreeMixin methods."""
+        for tree in self.phylogenies + [Phylo.read(EX_APAF, "phyloxml")]:
+            index = TreeIndex(tree)
+            clades = list(tree.find_clades())
+            for clade in clades:
+                self.assertEqual(index.get_path(clade), tree.get_path(clade))
+                self.assertAlmostEqual(index.distance(clade), tree.distance(clade))
+                for other in clades:
+                    self.assertIs(
+                        index.common_ancestor(clade, other),
+                        tree.common_ancestor(clade, other),
+                    )
+                    self.assertEqual(
+                        index.trace(clade, other), tree.trace(clade, other)
+                    )
+                    self.assertAlmostEqual(
+                        index.distance(clade, other), tree.distance(clade, other)
+                    )
+            terminals = tree.get_terminals()
+            matrix = index.distance_matrix()
+            self.assertEqual(matrix.shape, (len(terminals), len(terminals)))
+            for i, j in zip(*numpy.triu_indices(len(terminals))):
+                self.assertAlmostEqual(
+                    matrix[i, j], tree.distance(terminals[i], terminals[j])
+                )
+                self.assertEqual(matrix[i, j], matrix[j, i])
+            depths = index.depths()
+            for clade, depth in tree.depths().items():
+                self.assertAlmostEqual(depths[clade], depth)
+            self.assertEqual(index.depths(True), tree.depths(True))
+
+    def test_names(self):
+        """TreeIndex: targets given by name."""
+        tree = self.phylogenies[10]
+        index = TreeIndex(tree)
+        self.assertEqual(index.common_ancestor("A", "B", "C"), tree.clade[0])
+        self.assertEqual(index.find_any("D"), tree.find_any("D"))
+        self.assertIsNone(index.find_any("E"))
+        self.assertRaises(ValueError, index.distance, "A", "E")
+        self.assertEqual(index.get_path({"name": "B"}), tree.get_path("B"))
+        self.assertEqual(index.distance_matrix(["A", "A"]).tolist(), [[0, 0], [0, 0]])
+
+    def test_is_monophyletic(self):
+        """TreeIndex: is_monophyletic() method."""
+        tree = self.phylogenies[10]
+        index = TreeIndex(tree)
+        abcd = tree.get_terminals()
+        abc = tree.clade[0].get_terminals()
+        ab = abc[:2]
+        d = tree.clade[1].get_terminals()
+        self.assertEqual(index.is_monophyletic(abcd), tree.root)
+        self.assertEqual(index.is_monophyletic(abc), tree.clade[0])
+        self.assertFalse(index.is_monophyletic(ab))
+        self.assertEqual(index.is_monophyletic(d), tree.clade[1])
+        self.assertEqual(index.is_monophyletic(*abcd), tree.root)
+        self.assertFalse(index.is_monophyletic(tree.clade[0], "D"))
+
+
+class ArrayTreeTests(unittest.TestCase):
+    """Tests for the ArrayTree class."""
+
+    def test_from_tree(self):
+        """ArrayTree: conversion from and to Tree objects."""
+        for tree in Phylo.parse(EX_PHYLO, "phyloxml"):
+            compact = ArrayTree.from_tree(tree)
+            clades = list(tree.find_clades())
+            positions = {clade: index for index, clade in enumerate(clades)}
+            self.assertEqual(len(compact), len(clades))
+            self.assertEqual(compact.rooted, tree.rooted)
+            self.assertEqual(compact.names.tolist(), [c.name for c in clades])
+            for clade in clades:
+                node = positions[clade]
+                self.assertEqual(
+                    compact.children(node), [positions[c] for c in clade.clades]
+                )
+                self.assertEqual(compact.is_terminal(node), clade.is_terminal())
+            self.assertEqual(
+                compact.postorder().tolist(),
+                [positions[c] for c in tree.find_clades(order="postorder")],
+            )
+            self.assertEqual(
+                compact.get_terminals().tolist(),
+                [positions[c] for c in tree.get_terminals()],
+            )
+            depths = tree.depths()
+            for clade, depth in zip(clades, compact.depths()):
+                self.assertAlmostEqual(depth, depths[clade])
+            self.assertAlmostEqual(
+                compact.total_branch_length(), tree.total_branch_length()
+            )
+            copy = compact.to_tree()
+            for clade, other in zip(clades, copy.find_clades()):
+                self.assertEqual(clade.name, other.name)
+                self.assertEqual(clade.branch_length, other.branch_length)
+                self.assertEqual(len(clade.clades), len(other.clades))
+
+    def test_parents(self):
+        """ArrayTree: nodes must be numbered in preorder."""
+        tree = ArrayTree([-1, 0, 1, 1, 0], names=["r", None, "A", "B", "C"])
+        self.assertEqual(tree.children(0), [1, 4])
+        self.assertEqual(tree.children(1), [2, 3])
+        self.assertEqual(tree.first_children.tolist(), [1, 2, -1, -1, -1])
+        self.assertEqual(tree.next_siblings.tolist(), [-1, 4, 3, -1, -1])
+        self.assertEqual(tree.count_terminals(), 3)
+        self.assertRaises(ValueError, ArrayTree, [0, 0])
+        self.assertRaises(ValueError, ArrayTree, [-1, 2, 0])
+        self.assertRaises(ValueError, ArrayTree, [-1, 0], branch_lengths=[1.0])
+
+    def test_newick(self):
+        """ArrayTree: reading and writing Newick files."""
+        for filename in (EX_NEWICK, EX_NEWICK2):
+            trees = list(Phylo.parse(filename, "newick"))
+            compact_trees = list(Phylo.parse(filename, "newick", compact=True))
+            self.assertEqual(len(trees), len(compact_trees))
+            for tree, compact in zip(trees, compact_trees):
+                self.assertIsInstance(compact, ArrayTree)
+                self.assertEqual(compact.rooted, tree.rooted)
+                for clade, other in zip(
+                    tree.find_clades(), compact.to_tree().find_clades()
+                ):
+                    self.assertEqual(clade.name, other.name)
+                    self.assertEqual(clade.branch_length, other.branch_length)
+                    self.assertEqual(clade.confidence, other.confidence)
+            for options in ({}, {"plain": True}):
+                handle1 = StringIO()
+                handle2 = StringIO()
+                Phylo.write(trees, handle1, "newick", **options)
+                Phylo.write(compact_trees, handle2, "newick", **options)
+                self.assertEqual(handle1.getvalue(), handle2.getvalue())
+        # missing external parentheses create a new root
+        compact = Phylo.read(StringIO("(A,B),C;"), "newick", compact=True)
+        self.assertEqual(compact.parents.tolist(), [-1, 0, 1, 1, 0])
+        self.assertEqual(compact.names.tolist(), [None, None, "A", "B", "C"])
+        handle = StringIO()
+        Phylo.write(compact, handle, "newick", plain=True)
+        self.assertEqual(handle.getvalue(), "((A,B),C);\n")
+
+    def test_deep_tree(self):
+        """ArrayTree: trees deeper than the recursion limit."""
+        size = 5000
+        text = "(" * (size - 1) + "t0:1" + ",t:1):1" * (size - 1) + ";"
+        compact = Phylo.read(StringIO(text), "newick", compact=True)
+        self.assertEqual(len(compact), 2 * size - 1)
+        self.assertEqual(compact.postorder()[-1], 0)
+        self.assertEqual(compact.depths().max(), size)
+        handle = StringIO()
+        Phylo.write(compact, handle, "newick", plain=True)
+        self.assertEqual(handle.getvalue().count("("), size - 1)
+        tree = compact.to_tree()
+        self.assertEqual(len(list(tree.find_clades(order="postorder"))), len(compact))
+        self.assertEqual(len(tree.get_path(tree.get_terminals()[0])), size - 1)
+        self.assertEqual(max(tree.depths().values()), size)
+        self.assertEqual(
+            ArrayTree.from_tree(tree).parents.tolist(), compact.parents.tolist()
+        )
+        handle = StringIO()
+        Phylo.write(tree, handle, "newick", plain=True)
+        self.assertEqual(handle.getvalue(), text.replace(":1", "") + "\n")
+        tree = Phylo.read(StringIO(text), "newick")
+        handle = StringIO()
+        Phylo.write(tree, handle, "newick", branch_length_only=True)
+        self.assertEqual(handle.getvalue().count(":1.00000"), 2 * size - 1)
+
+
 # ---------------------------------------------------------
 
 if __name__ == "__main__":
@@ -124,6 +124,29 @@ class ParseTests(unittest.TestCase):
     )
     test_shape_dollo = _test_shape_factory(EX_DOLLO, (((2, (2, 2)), (2, (2, 2)),),),)
 
+    def test_parse_skip(self):
+        """Parse the phylogenies in phyloxml_examples.xml, skipping annotations."""
+        trees = list(PhyloXMLIO.parse(EX_PHYLO))
+        skipped = list(PhyloXMLIO.parse(EX_PHYLO, skip=["sequence", "distribution"]))
+        self.assertEqual(len(skipped), 13)
+        self.assertTrue(any(clade.sequences for clade in trees[4].find_clades()))
+        self.assertTrue(any(clade.distributions for clade in trees[10].find_clades()))
+        for tree, tree_skipped in zip(trees, skipped):
+            clades = list(tree.find_clades())
+            clades_skipped = list(tree_skipped.find_clades())
+            self.assertEqual(
+                [clade.name for clade in clades],
+                [clade.name for clade in clades_skipped],
+            )
+            self.assertEqual(
+                [len(clade.taxonomies) for clade in clades],
+                [len(clade.taxonomies) for clade in clades_skipped],
+            )
+            for clade in clades_skipped:
+                self.assertEqual(clade.sequences, [])
+                self.assertEqual(clade.distributions, [])
+        self.assertRaises(ValueError, PhyloXMLIO.parse, EX_PHYLO, skip=["clade"])
+
 
 class TreeTests(unittest.TestCase):
     """Tests for instantiation and attributes of each complex type."""
@@ -8,7 +8,9 @@
 import os
 import unittest
 
-from Bio.SearchIO import parse
+from io import StringIO
+
+from Bio.SearchIO import parse, read_table, ResultFilter
 from Bio.SearchIO.BlastIO.blast_tab import _LONG_SHORT_MAP as all_fields
 
 # test case files are in the Blast directory
@@ -991,6 +993,147 @@ class BlastTabCases(unittest.TestCase):
         self.assertEqual(1, counter)
 
 
+class BlastTabTableCases(unittest.TestCase):
+    """Tests for reading BLAST tabular output into column arrays."""
+
+    def check_qresults(self, table, qresults):
+        """Compare the QueryResult objects from the table and the parser."""
+        self.assertEqual(list(table), [qresult.id for qresult in qresults])
+        for qresult in qresults:
+            table_qresult = table[qresult.id]
+            self.assertEqual(qresult.id, table_qresult.id)
+            self.assertEqual(qresult.hit_keys, table_qresult.hit_keys)
+            for attr in ("program", "version", "description", "target"):
+                self.assertEqual(getattr(qresult, attr), getattr(table_qresult, attr))
+            for hit, table_hit in zip(qresult, table_qresult):
+                self.assertEqual(len(hit), len(table_hit))
+                for hsp, table_hsp in zip(hit, table_hit):
+                    for attr in (
+                        "evalue",
+                        "bitscore",
+                        "ident_pct",
+                        "query_range",
+                        "hit_range",
+                        "hit_strand",
+                    ):
+                        self.assertEqual(getattr(hsp, attr), getattr(table_hsp, attr))
+
+    def test_tab_2226_tblastn_001(self):
+        """Test reading TBLASTN 2.2.26+ tabular output (tab_2226_tblastn_001)."""
+        tab_file = get_file("tab_2226_tblastn_001.txt")
+        table = read_table(tab_file, FMT)
+
+        self.assertEqual(2, len(table))
+        self.assertEqual([0, 3, 12], table.offsets.tolist())
+        self.assertEqual("int64", table.columns["qstart"].dtype)
+        self.assertEqual("float64", table.columns["evalue"].dtype)
+        self.assertEqual(b"gi|11464971:4-101", table.query_ids[1])
+        columns = table.get_columns("gi|16080617|ref|NP_391444.1|")
+        self.assertEqual([1e-05, 1e-04, 1e-04], columns["evalue"].tolist())
+        self.assertEqual([1744, 1057, 1057], columns["sstart"].tolist())
+        self.assertIn("gi|11464971:4-101", table)
+        self.assertNotIn("gi|11464971", table)
+        self.assertRaises(KeyError, table.__getitem__, "gi|11464971")
+        self.check_qresults(table, list(parse(tab_file, FMT)))
+
+    def test_tab_2226_tblastn_005(self):
+        """Test reading commented TBLASTN 2.2.26+ output (tab_2226_tblastn_005)."""
+        tab_file = get_file("tab_2226_tblastn_005.txt")
+        table = read_table(tab_file, FMT, comments=True)
+
+        self.assertEqual(3, len(table))
+        # the first query has no hits
+        self.assertEqual([0, 0, 3, 12], table.offsets.tolist())
+        self.assertEqual(0, len(table["random_s00"]))
+        self.check_qresults(table, list(parse(tab_file, FMT, comments=True)))
+
+        self.assertRaises(ValueError, read_table, tab_file, FMT)
+
+    def test_tab_2226_tblastn_013(self):
+        """Test reading TBLASTN 2.2.26+ output with custom fields (tab_2226_tblastn_013)."""
+        tab_file = get_file("tab_2226_tblastn_013.txt")
+        table = read_table(tab_file, FMT, fields="qseq std sseq", chunk_size=2)
+
+        self.assertEqual(["qseq"], table.fields[:1])
+        self.check_qresults(table, list(parse(tab_file, FMT, fields="qseq std sseq")))
+        qresult = table["gi|16080617|ref|NP_391444.1|"]
+        self.assertEqual(
+            "PDSNIETKEGTYVGLADTHTIEVTVDNEPVSLDITEESTSDLD", qresult[0][0].query.seq
+        )
+
+        self.assertRaises(ValueError, read_table, tab_file, FMT)
+
+
+class BlastTabFilterCases(unittest.TestCase):
+    """Tests for filtering BLAST tabular output while parsing."""
+
+    def test_tab_2226_tblastn_004(self):
+        """Test filtering TBLASTN 2.2.26+ tabular output (tab_2226_tblastn_004)."""
+        tab_file = get_file("tab_2226_tblastn_004.txt")
+        result_filter = ResultFilter(max_evalue=1e-5)
+        qresults = list(parse(tab_file, FMT, filter=result_filter))
+        self.assertEqual(1, len(qresults))
+        qresult = qresults[0]
+        self.assertEqual("gi|11464971:4-101", qresult.id)
+        self.assertEqual(4, len(qresult))
+        self.assertEqual([1, 2, 2, 2], [len(hit) for hit in qresult])
+        self.assertEqual(3e-09, max(hsp.evalue for hsp in qresult.hsps))
+
+    def test_tab_2226_tblastn_004_max_hits(self):
+        """Test filtering TBLASTN 2.2.26+ tabular output by hits and identity."""
+        tab_file = get_file("tab_2226_tblastn_004.txt")
+        result_filter = ResultFilter(min_ident_pct=97, max_hits=2)
+        qresult = list(parse(tab_file, FMT, filter=result_filter))[0]
+        self.assertEqual(
+            ["gi|301779869|ref|XM_002925302.1|", "gi|296223671|ref|XM_002757683.1|"],
+            qresult.hit_keys,
+        )
+        self.assertEqual([1, 1], [len(hit) for hit in qresult])
+
+    def test_tab_2226_tblastn_001_no_hits(self):
+        """Test filtering out all hits of TBLASTN 2.2.26+ tabular output."""
+        tab_file = get_file("tab_2226_tblastn_001.txt")
+        result_filter = ResultFilter(min_bitscore=1000)
+        qresults = list(parse(tab_file, FMT, filter=result_filter))
+        self.assertEqual(
+            ["gi|16080617|ref|NP_391444.1|", "gi|11464971:4-101"],
+            [qresult.id for qresult in qresults],
+        )
+        self.assertEqual([0, 0], [len(qresult) for qresult in qresults])
+
+    def test_missing_columns(self):
+        """Test filtering by values that are not in the columns."""
+        tab_file = get_file("tab_2226_tblastn_010.txt")
+        result_filter = ResultFilter(min_ident_pct=90)
+        qresults = parse(tab_file, FMT, comments=True, filter=result_filter)
+        self.assertRaises(ValueError, list, qresults)
+        result_filter = ResultFilter(max_evalue=1e-5)
+        qresults = parse(tab_file, FMT, fields="qseqid sseqid", filter=result_filter)
+        self.assertRaises(ValueError, list, qresults)
+
+    def test_ident_num(self):
+        """Test filtering by identity calculated from the nident column."""
+        rows = ["query\thit1\t49\t50", "query\thit2\t40\t50", "query\thit3\t60\t60"]
+        handle = StringIO("\n".join(rows) + "\n")
+        result_filter = ResultFilter(min_ident_pct=90)
+        fields = "qseqid sseqid nident length"
+        qresult = list(parse(handle, FMT, fields=fields, filter=result_filter))[0]
+        self.assertEqual(["hit1", "hit3"], qresult.hit_keys)
+        self.assertEqual([49, 60], [hsp.ident_num for hsp in qresult.hsps])
+
+    def test_invalid_max_hits(self):
+        """Test creating a filter with a negative maximum number of hits."""
+        with self.assertRaisesRegex(ValueError, "non-negative integer"):
+            ResultFilter(max_hits=-1)
+
+    def test_zero_max_hits(self):
+        """Test filtering out all hits with a maximum of zero hits."""
+        tab_file = get_file("tab_2226_tblastn_004.txt")
+        result_filter = ResultFilter(max_hits=0)
+        qresults = list(parse(tab_file, FMT, filter=result_filter))
+        self.assertEqual([0], [len(qresult) for qresult in qresults])
+
+
 if __name__ == "__main__":
     runner = unittest.TextTestRunner(verbosity=2)
     unittest.main(testRunner=runner)
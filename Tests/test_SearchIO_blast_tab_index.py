@@ -7,6 +7,8 @@
 
 import unittest
 
+from Bio.SearchIO import ResultFilter
+
 from search_tests_common import CheckRaw, CheckIndex
 
 
@@ -168,6 +170,12 @@ class BlastTabIndexCases(CheckIndex):
         filename = "Blast/tab_2226_tblastn_011.txt"
         self.check_index(filename, self.fmt, comments=True)
 
+    def test_blasttab_2226_tblastn_011_filter(self):
+        """Test blast-tab indexing, BLAST 2.2.26+, all columns, filtered."""
+        filename = "Blast/tab_2226_tblastn_011.txt"
+        result_filter = ResultFilter(max_evalue=1e-5, min_ident_pct=50, max_hits=2)
+        self.check_index(filename, self.fmt, comments=True, filter=result_filter)
+
 
 if __name__ == "__main__":
     runner = unittest.TextTestRunner(verbosity=2)
@@ -11,7 +11,7 @@ import unittest
 import warnings
 
 from Bio import BiopythonParserWarning
-from Bio.SearchIO import parse
+from Bio.SearchIO import parse, ResultFilter
 
 
 # test case files are in the Blast directory
@@ -4082,6 +4082,41 @@ class BlastXmlSpecialCases(unittest.TestCase):
         self.assertEqual(qresult.blast_id, "Query_1")
 
 
+class BlastXmlFilterCases(unittest.TestCase):
+    """Tests for filtering BLAST XML output while parsing."""
+
+    def test_xml_2226_blastp_004(self):
+        """Test filtering BLASTP 2.2.26+ XML output (xml_2226_blastp_004)."""
+        xml_file = get_file("xml_2226_blastp_004.xml")
+        result_filter = ResultFilter(max_evalue=1e-8, min_ident_pct=30)
+        qresult = list(parse(xml_file, FMT, filter=result_filter))[0]
+        self.assertEqual("gi|11464971:4-101", qresult.id)
+        hit = qresult[0]
+        self.assertEqual("gi|11464971|ref|NP_062422.1|", hit.id)
+        self.assertEqual(1, len(hit))
+        self.assertEqual(2.24956e-69, hit.hsps[0].evalue)
+        self.assertEqual(98, hit.hsps[0].ident_num)
+        hit = qresult[1]
+        self.assertEqual("gi|354480464|ref|XP_003502426.1|", hit.id)
+        self.assertEqual(2, len(hit))
+        self.assertEqual(1.81272e-09, hit.hsps[1].evalue)
+        for hsp in qresult.hsps:
+            self.assertLessEqual(hsp.evalue, 1e-8)
+            self.assertGreaterEqual(hsp.ident_num * 100 / hsp.aln_span, 30)
+
+    def test_xml_2226_blastp_004_max_hits(self):
+        """Test filtering BLASTP 2.2.26+ XML output by number of hits."""
+        xml_file = get_file("xml_2226_blastp_004.xml")
+        qresult = list(parse(xml_file, FMT))[0]
+        result_filter = ResultFilter(max_hits=3)
+        filtered = list(parse(xml_file, FMT, filter=result_filter))[0]
+        self.assertEqual(qresult.hit_keys[:3], filtered.hit_keys)
+        self.assertEqual(
+            [len(hit) for hit in qresult[:3]], [len(hit) for hit in filtered]
+        )
+        self.assertEqual(str(qresult[2][1].hit.seq), str(filtered[2][1].hit.seq))
+
+
 if __name__ == "__main__":
     runner = unittest.TextTestRunner(verbosity=2)
     unittest.main(testRunner=runner)
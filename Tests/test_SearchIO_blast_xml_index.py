@@ -7,8 +7,16 @@
 
 import unittest
 
+from Bio import SearchIO
+from Bio.SearchIO import ResultFilter
+
 from search_tests_common import CheckRaw, CheckIndex
 
+try:
+    import sqlite3
+except ImportError:
+    sqlite3 = None
+
 
 class BlastXmlRawCases(CheckRaw):
     """Check BLAST XML get_raw method."""
@@ -760,6 +768,82 @@ class BlastXmlIndexCases(CheckIndex):
         filename = "Blast/xml_2226_tblastn_004.xml"
         self.check_index(filename, self.fmt)
 
+    def test_blastxml_2226_tblastn_004_filter(self):
+        """Test blast-xml indexing, BLAST 2.2.26+, multiple hits, filtered."""
+        filename = "Blast/xml_2226_tblastn_004.xml"
+        result_filter = ResultFilter(max_evalue=1e-5, min_ident_pct=50, max_hits=2)
+        self.check_index(filename, self.fmt, filter=result_filter)
+
+
+class BlastXmlManyCases(unittest.TestCase):
+    """Check BLAST XML index_db worker processes and get_raw_many method."""
+
+    fmt = "blast-xml"
+    filenames = [
+        "Blast/mirna.xml",
+        "Blast/wnts.xml",
+        "Blast/xml_2226_blastn_003.xml",
+        "Blast/xml_2226_blastn_004.xml",
+        "Blast/xml_2226_tblastn_001.xml",
+    ]
+    # in random order, spread over several files
+    keys = [
+        "gi|53729353:216-1313",
+        "hg19_dna",
+        "33212",
+        "gi|16080617|ref|NP_391444.1|",
+        "gi|356995852:1-490",
+        "33211",
+        "gi|156630997:105-1160",
+        "33212",
+    ]
+
+    @unittest.skipIf(sqlite3 is None, "sqlite3 is not available")
+    def test_index_db_processes(self):
+        """Test blast-xml index_db with worker processes."""
+        serial = SearchIO.index_db(":memory:", self.filenames[1:], self.fmt)
+        parallel = SearchIO.index_db(
+            ":memory:", self.filenames[1:], self.fmt, processes=2
+        )
+        query = "SELECT key, file_number, offset, length FROM offset_data;"
+        self.assertEqual(
+            serial._con.execute(query).fetchall(),
+            parallel._con.execute(query).fetchall(),
+        )
+        self.assertEqual(len(serial), len(parallel))
+        for key in serial:
+            self.assertEqual(serial.get_raw(key), parallel.get_raw(key))
+        serial.close()
+        parallel.close()
+
+    @unittest.skipIf(sqlite3 is None, "sqlite3 is not available")
+    def test_index_db_processes_duplicate(self):
+        """Test blast-xml index_db with worker processes, duplicate keys."""
+        filenames = ["Blast/xml_2226_blastp_004.xml", "Blast/xml_2226_blastp_004.xml"]
+        with self.assertRaises(ValueError):
+            SearchIO.index_db(":memory:", filenames, self.fmt, processes=2)
+
+    @unittest.skipIf(sqlite3 is None, "sqlite3 is not available")
+    def test_index_db_get_raw_many(self):
+        """Test blast-xml index_db get_raw_many method."""
+        # few open handles, so they are closed and reopened
+        idx = SearchIO.index_db(":memory:", self.filenames, self.fmt)
+        idx._max_open = 2
+        raw_list = idx.get_raw_many(self.keys)
+        self.assertEqual([idx.get_raw(key) for key in self.keys], raw_list)
+        self.assertEqual([], idx.get_raw_many([]))
+        self.assertRaises(KeyError, idx.get_raw_many, ["33211", "no_such_key"])
+        idx.close()
+
+    def test_index_get_raw_many(self):
+        """Test blast-xml index get_raw_many method."""
+        idx = SearchIO.index("Blast/wnts.xml", self.fmt)
+        keys = sorted(idx, reverse=True)
+        raw_list = idx.get_raw_many(keys)
+        self.assertEqual([idx.get_raw(key) for key in keys], raw_list)
+        self.assertRaises(KeyError, idx.get_raw_many, ["33211"])
+        idx.close()
+
 
 if __name__ == "__main__":
     runner = unittest.TextTestRunner(verbosity=2)
@@ -9,7 +9,7 @@
 import os
 import unittest
 
-from Bio.SearchIO import parse
+from Bio.SearchIO import parse, ResultFilter
 
 
 # test case files are in the Blast directory
@@ -644,6 +644,32 @@ class HmmersearchCases(unittest.TestCase):
         self.assertEqual(0.95, hsp.acc_avg)
 
 
+class FilterCases(unittest.TestCase):
+    """Testing filtering hmmer3-domtab output while parsing."""
+
+    def test_domtab_31b1_hmmscan_001(self):
+        """Test filtering hmmscan-domtab, 3.1b1 (domtab_31b1_hmmscan_001)."""
+        tab_file = get_file("domtab_31b1_hmmscan_001.out")
+        result_filter = ResultFilter(max_evalue=1.0)
+        qresults = list(parse(tab_file, "hmmscan3-domtab", filter=result_filter))
+        self.assertEqual([1, 2, 2, 5], [len(qresult) for qresult in qresults])
+        self.assertEqual(["Xpo1", "IBN_N"], qresults[2].hit_keys)
+        self.assertEqual([1, 1], [len(hit) for hit in qresults[2]])
+        self.assertEqual([1, 1, 1, 1, 1], [len(hit) for hit in qresults[3]])
+
+    def test_domtab_31b1_hmmscan_001_max_hits(self):
+        """Test filtering hmmscan-domtab by number of hits."""
+        tab_file = get_file("domtab_31b1_hmmscan_001.out")
+        result_filter = ResultFilter(max_hits=1)
+        qresults = list(parse(tab_file, "hmmscan3-domtab", filter=result_filter))
+        self.assertEqual(
+            ["Globin", "Ig_3", "Xpo1", "Pou"],
+            [qresult.hit_keys[0] for qresult in qresults],
+        )
+        self.assertEqual([1, 1, 1, 1], [len(qresult) for qresult in qresults])
+        self.assertEqual(2, len(qresults[2]["Xpo1"]))
+
+
 if __name__ == "__main__":
     runner = unittest.TextTestRunner(verbosity=2)
     unittest.main(testRunner=runner)
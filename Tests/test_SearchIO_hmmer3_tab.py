@@ -9,7 +9,7 @@
 import os
 import unittest
 
-from Bio.SearchIO import parse
+from Bio.SearchIO import parse, ResultFilter
 
 
 # test case files are in the Blast directory
@@ -492,6 +492,22 @@ class HmmsearchCases(unittest.TestCase):
         self.assertEqual(0.0, hsp.bias)
 
 
+class FilterCases(unittest.TestCase):
+    """Testing filtering hmmer3-tab output while parsing."""
+
+    def test_31b1_hmmscan_001(self):
+        """Test filtering hmmer3-tab, hmmscan 3.1b1 (tab_31b1_hmmscan_001)."""
+        tab_file = get_file("tab_31b1_hmmscan_001.out")
+        result_filter = ResultFilter(max_evalue=0.1, min_bitscore=12, max_hits=2)
+        qresults = list(parse(tab_file, FMT, filter=result_filter))
+        self.assertEqual([1, 2, 2, 2], [len(qresult) for qresult in qresults])
+        self.assertEqual(["Xpo1", "IBN_N"], qresults[2].hit_keys)
+        self.assertEqual(["Pou", "Homeobox"], qresults[3].hit_keys)
+        result_filter = ResultFilter(min_ident_pct=90)
+        with self.assertRaises(ValueError):
+            next(parse(tab_file, FMT, filter=result_filter))
+
+
 if __name__ == "__main__":
     runner = unittest.TextTestRunner(verbosity=2)
     unittest.main(testRunner=runner)
@@ -9,7 +9,7 @@
 import os
 import unittest
 
-from Bio.SearchIO import parse
+from Bio.SearchIO import parse, ResultFilter
 
 
 # test case files are in the Blast directory
@@ -2614,6 +2614,71 @@ class PhmmerCases(unittest.TestCase):
         self.assertEqual("68889******************9887764", hsp.aln_annotation["PP"])
 
 
+class FilterCases(unittest.TestCase):
+    """Testing filtering hmmer3-text output while parsing."""
+
+    def test_31b1_hmmscan_001(self):
+        """Test filtering hmmer3-text, hmmscan 3.1b1 (text_31b1_hmmscan_001)."""
+        txt_file = get_file("text_31b1_hmmscan_001.out")
+        qresults = list(parse(txt_file, FMT))
+        result_filter = ResultFilter(max_evalue=1.0)
+        filtered = list(parse(txt_file, FMT, filter=result_filter))
+        self.assertEqual(
+            [qresult.id for qresult in qresults], [qresult.id for qresult in filtered]
+        )
+        self.assertEqual([0, 1, 2, 2, 5], [len(qresult) for qresult in filtered])
+        self.assertEqual(["Xpo1", "IBN_N"], filtered[3].hit_keys)
+        self.assertEqual([1, 1], [len(hit) for hit in filtered[3]])
+        # the alignments of the kept domains must not be mixed up with the
+        # alignments of the filtered ones
+        hit = filtered[3]["IBN_N"]
+        self.assertEqual(0.036, hit.hsps[0].evalue)
+        self.assertEqual(str(qresults[3]["IBN_N"][0].hit.seq), str(hit.hsps[0].hit.seq))
+        self.assertEqual(
+            str(qresults[3]["IBN_N"][0].query.seq), str(hit.hsps[0].query.seq)
+        )
+        hit = filtered[4]["HTH_31"]
+        self.assertEqual(1, len(hit))
+        self.assertEqual(
+            str(qresults[4]["HTH_31"][0].hit.seq), str(hit.hsps[0].hit.seq)
+        )
+
+    def test_31b1_hmmscan_001_max_hits(self):
+        """Test filtering hmmer3-text by number of hits and bit score."""
+        txt_file = get_file("text_31b1_hmmscan_001.out")
+        result_filter = ResultFilter(min_bitscore=10, max_hits=2)
+        filtered = list(parse(txt_file, FMT, filter=result_filter))
+        self.assertEqual([0, 1, 2, 2, 2], [len(qresult) for qresult in filtered])
+        self.assertEqual(["Pou", "Homeobox"], filtered[4].hit_keys)
+        self.assertEqual(["Xpo1", "IBN_N"], filtered[3].hit_keys)
+        self.assertEqual(116.1, filtered[3]["Xpo1"][0].bitscore)
+        self.assertEqual(1, len(filtered[3]["Xpo1"]))
+
+    def test_30_hmmscan_010_no_domains(self):
+        """Test filtering hmmer3-text with hits without domains."""
+        txt_file = get_file("text_30_hmmscan_010.out")
+        # the last hit of the first two queries has no domains; it is kept
+        # unless the hsps are filtered, as by hsp_filter
+        result_filter = ResultFilter(max_hits=20)
+        filtered = list(parse(txt_file, FMT, filter=result_filter))
+        self.assertEqual([14, 14, 14], [len(qresult) for qresult in filtered])
+        self.assertEqual(0, len(filtered[0]["NRPS-COM_Cterm"]))
+        result_filter = ResultFilter(max_hits=13)
+        filtered = list(parse(txt_file, FMT, filter=result_filter))
+        self.assertEqual([13, 13, 13], [len(qresult) for qresult in filtered])
+        result_filter = ResultFilter(max_evalue=1.0)
+        filtered = list(parse(txt_file, FMT, filter=result_filter))
+        self.assertEqual([13, 13, 14], [len(qresult) for qresult in filtered])
+        self.assertNotIn("NRPS-COM_Cterm", filtered[0])
+
+    def test_ident_pct(self):
+        """Test filtering hmmer3-text on percent identity, which is missing."""
+        txt_file = get_file("text_31b1_hmmscan_001.out")
+        result_filter = ResultFilter(min_ident_pct=90)
+        with self.assertRaises(ValueError):
+            next(parse(txt_file, FMT, filter=result_filter))
+
+
 if __name__ == "__main__":
     runner = unittest.TextTestRunner(verbosity=2)
     unittest.main(testRunner=runner)
@@ -7,6 +7,8 @@
 
 import unittest
 
+from Bio.SearchIO import ResultFilter
+
 from search_tests_common import CheckRaw, CheckIndex
 
 
@@ -334,6 +336,12 @@ class Hmmer3TextIndexCases(CheckIndex):
         filename = "Hmmer/text_30_hmmsearch_005.out"
         self.check_index(filename, self.fmt)
 
+    def test_hmmertext_text_31b1_hmmscan_001_filter(self):
+        """Test hmmer3-text indexing, HMMER 3.1b1, multiple queries, filtered."""
+        filename = "Hmmer/text_31b1_hmmscan_001.out"
+        result_filter = ResultFilter(max_evalue=1.0, max_hits=2)
+        self.check_index(filename, self.fmt, filter=result_filter)
+
 
 if __name__ == "__main__":
     runner = unittest.TextTestRunner(verbosity=2)
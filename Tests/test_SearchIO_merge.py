@@ -0,0 +1,137 @@
+# This code is part of the Biopython distribution and governed by its
+# license.  Please see the LICENSE file that should have been included
+# as part of this package.
+
+"""Tests for SearchIO merging of several search output files."""
+
+import unittest
+from io import StringIO
+
+from Bio import SearchIO
+
+
+class MergeCases(unittest.TestCase):
+    """Tests for merging shards of search output files."""
+
+    def split_lines(self, filename, shard_func, shard_num=2):
+        """Spread the data lines of a file over several shards."""
+        shards = [[] for _ in range(shard_num)]
+        with open(filename) as handle:
+            for line in handle:
+                if line.startswith("#"):
+                    continue
+                shards[shard_func(line)].append(line)
+        return [StringIO("".join(lines)) for lines in shards]
+
+    def test_domtab_by_hit(self):
+        """Test merging hmmscan domain tables split by hit."""
+        filename = "Hmmer/domtab_31b1_hmmscan_001.out"
+        fmt = "hmmscan3-domtab"
+        qresults = list(SearchIO.parse(filename, fmt))
+        order = {qresult.id: index for index, qresult in enumerate(qresults)}
+        # every second hit of each query goes to the second shard
+        hit_shards = {}
+        for qresult in qresults:
+            for index, hit in enumerate(qresult):
+                hit_shards[qresult.id, hit.id] = index % 2
+        shards = self.split_lines(
+            filename, lambda line: hit_shards[line.split()[3], line.split()[0]]
+        )
+        merged = list(SearchIO.merge(shards, fmt, order.__getitem__))
+        self.assertEqual(
+            [qresult.id for qresult in qresults], [qresult.id for qresult in merged]
+        )
+        for qresult, merged_qresult in zip(qresults, merged):
+            # HMMER already ranks the hits by e-value
+            self.assertEqual(qresult.hit_keys, merged_qresult.hit_keys)
+            self.assertEqual(qresult.seq_len, merged_qresult.seq_len)
+            for hit, merged_hit in zip(qresult, merged_qresult):
+                self.assertEqual(len(hit), len(merged_hit))
+
+    def test_domtab_by_hsp(self):
+        """Test merging hmmscan domain tables split by HSP."""
+        filename = "Hmmer/domtab_31b1_hmmscan_001.out"
+        fmt = "hmmscan3-domtab"
+        qresults = list(SearchIO.parse(filename, fmt))
+        order = {qresult.id: index for index, qresult in enumerate(qresults)}
+        # the last domain of each hit goes to the first shard, so the HSPs
+        # of the merged hits must be ranked again
+        shards = self.split_lines(
+            filename, lambda line: int(line.split()[9] != line.split()[10])
+        )
+        merged = list(SearchIO.merge(shards, fmt, order.__getitem__))
+        self.assertEqual(4, len(merged))
+        hit = merged[2]["Xpo1"]
+        self.assertEqual([1.2e-33, 2600.0], [hsp.evalue for hsp in hit])
+        for qresult, merged_qresult in zip(qresults, merged):
+            self.assertEqual(qresult.hit_keys, merged_qresult.hit_keys)
+            for hit, merged_hit in zip(qresult, merged_qresult):
+                self.assertEqual(
+                    sorted(hsp.evalue for hsp in hit),
+                    [hsp.evalue for hsp in merged_hit],
+                )
+
+    def test_blast_tab_rank(self):
+        """Test merging BLAST tabular output, ranking and maximum of hits."""
+        filename = "Blast/tab_2226_tblastn_001.txt"
+        fmt = "blast-tab"
+        order = {"gi|16080617|ref|NP_391444.1|": 0, "gi|11464971:4-101": 1}
+
+        def hsp_shards(line):
+            return int(float(line.split("\t")[10]) > 1e-20)
+
+        shards = self.split_lines(filename, hsp_shards)
+        merged = list(
+            SearchIO.merge(
+                shards, fmt, order.__getitem__, sort_by="bitscore", max_hits=2
+            )
+        )
+        self.assertEqual([2, 2], [len(qresult) for qresult in merged])
+        self.assertEqual(
+            ["gi|301779869|ref|XM_002925302.1|", "gi|296223671|ref|XM_002757683.1|"],
+            merged[1].hit_keys,
+        )
+        self.assertEqual([202.0, 45.1], [hsp.bitscore for hsp in merged[1][0]])
+
+    def test_missing_queries(self):
+        """Test merging shards lacking some queries, sorted by query ID."""
+        filename = "Blast/tab_2226_tblastn_001.txt"
+        fmt = "blast-tab"
+        # the second query, first in ID order, only has hits in one shard
+        shards = self.split_lines(
+            filename, lambda line: int(line.startswith("gi|16080617"))
+        )
+        shards.insert(0, StringIO(""))
+        merged = list(SearchIO.merge(shards, fmt))
+        self.assertEqual(
+            ["gi|11464971:4-101", "gi|16080617|ref|NP_391444.1|"],
+            [qresult.id for qresult in merged],
+        )
+        self.assertEqual([5, 3], [len(qresult) for qresult in merged])
+
+    def test_unsorted(self):
+        """Test merging shards which are not sorted."""
+        filename = "Blast/tab_2226_tblastn_001.txt"
+        shards = self.split_lines(filename, lambda line: 0, shard_num=1)
+        with self.assertRaises(ValueError):
+            list(SearchIO.merge(shards, "blast-tab"))
+
+    def test_invalid_arguments(self):
+        """Test merging with invalid arguments."""
+        filenames = ["Blast/tab_2226_tblastn_004.txt"]
+        with self.assertRaises(ValueError):
+            list(SearchIO.merge(filenames, "blast-tab", sort_by="pident"))
+        with self.assertRaisesRegex(ValueError, "non-negative integer"):
+            list(SearchIO.merge(filenames, "blast-tab", max_hits=-1))
+
+    def test_zero_max_hits(self):
+        """Test merging while keeping no hits."""
+        filenames = ["Blast/tab_2226_tblastn_004.txt"]
+        merged = list(SearchIO.merge(filenames, "blast-tab", max_hits=0))
+        self.assertEqual(["gi|11464971:4-101"], [qresult.id for qresult in merged])
+        self.assertEqual([0], [len(qresult) for qresult in merged])
+
+
+if __name__ == "__main__":
+    runner = unittest.TextTestRunner(verbosity=2)
+    unittest.main(testRunner=runner)
@@ -1379,6 +1379,29 @@ class HSPFragmentCases(unittest.TestCase):
         with self.assertRaises(AttributeError):
             self.fragment.aln.molecule_type
 
+    def test_seqmodel_lazy(self):
+        """Test HSPFragment creating its SeqRecord objects when accessed."""
+        # sequences given as strings are kept as strings until accessed
+        self.assertEqual("ATGCTAGCTACA", self.fragment._hit)
+        self.assertEqual("ATG--AGCTAGG", self.fragment._query)
+        self.assertEqual(12, self.fragment.aln_span)
+        self.assertIn("Query - ATG--AGCTAGG", str(self.fragment))
+        self.assertIsInstance(self.fragment._query, str)
+        # values set before the access end up in the SeqRecord objects
+        self.fragment.query_id = "new_query_id"
+        self.fragment.hit_description = "new hit description"
+        self.fragment.molecule_type = "DNA"
+        query = self.fragment.query
+        self.assertIsInstance(query, SeqRecord)
+        self.assertEqual("new_query_id", query.id)
+        self.assertEqual("DNA", query.annotations["molecule_type"])
+        self.assertEqual("new hit description", self.fragment.hit.description)
+        # the SeqRecord objects are kept once created
+        self.assertIs(query, self.fragment.query)
+        self.fragment.query_description = "new query description"
+        self.assertEqual("new query description", query.description)
+        self.assertEqual("ATG--AGCTAGG", str(self.fragment.aln[0].seq))
+
     def test_molecule_type_no_seq(self):
         """Test HSPFragment molecule_type property, query and hit sequences not present."""
         self.assertIsNone(self.fragment.molecule_type)
@@ -5,23 +5,40 @@
 
 """Unit tests for the Bio.Phylo.TreeConstruction module."""
 
+import functools
+import multiprocessing
 import os
 import unittest
 import tempfile
 
+try:
+    import numpy
+except ImportError:
+    from Bio import MissingPythonDependencyError
+
+    raise MissingPythonDependencyError(
+        "Install NumPy if you want to use Bio.Phylo.TreeConstruction."
+    ) from None
+
+from fractions import Fraction
 from io import StringIO
 from Bio import AlignIO
+from Bio.Align import ArrayAlignment, MultipleSeqAlignment
 from Bio import Phylo
 from Bio.Phylo import BaseTree
 from Bio.Phylo import TreeConstruction
 from Bio.Phylo import Consensus
 from Bio.Phylo.TreeConstruction import _Matrix
+from Bio.Phylo.TreeConstruction import ArrayDistanceMatrix
 from Bio.Phylo.TreeConstruction import DistanceMatrix
 from Bio.Phylo.TreeConstruction import DistanceCalculator
 from Bio.Phylo.TreeConstruction import DistanceTreeConstructor
 from Bio.Phylo.TreeConstruction import ParsimonyScorer
+from Bio.Phylo.TreeConstruction import Scorer
 from Bio.Phylo.TreeConstruction import NNITreeSearcher
 from Bio.Phylo.TreeConstruction import ParsimonyTreeConstructor
+from Bio.Seq import Seq
+from Bio.SeqRecord import SeqRecord
 
 
 temp_dir = tempfile.mkdtemp()
@@ -137,6 +154,79 @@ class DistanceMatrixTest(unittest.TestCase):
             self.assertTrue(line.startswith(name))
 
 
+class ArrayDistanceMatrixTest(unittest.TestCase):
+    """Test for ArrayDistanceMatrix construction and manipulation."""
+
+    def setUp(self):
+        self.names = ["Alpha", "Beta", "Gamma", "Delta"]
+        self.matrix = [[0], [1, 0], [2, 3, 0], [4, 5, 6, 0]]
+
+    def test_construction(self):
+        dm = ArrayDistanceMatrix(self.names, self.matrix)
+        self.assertIsInstance(dm, DistanceMatrix)
+        self.assertEqual(dm.array.tolist(), [1, 2, 3, 4, 5, 6])
+        self.assertEqual(dm.matrix, self.matrix)
+        self.assertEqual(
+            repr(dm),
+            "ArrayDistanceMatrix(names=['Alpha', 'Beta', 'Gamma', 'Delta'], "
+            "matrix=[[0], [1.0, 0], [2.0, 3.0, 0], [4.0, 5.0, 6.0, 0]])",
+        )
+        square = numpy.array(
+            [[0, 1, 2, 4], [1, 0, 3, 5], [2, 3, 0, 6], [4, 5, 6, 0]], float
+        )
+        self.assertEqual(ArrayDistanceMatrix(self.names, square).matrix, self.matrix)
+        condensed = numpy.arange(1.0, 7.0)
+        self.assertEqual(ArrayDistanceMatrix(self.names, condensed).matrix, self.matrix)
+        self.assertEqual(ArrayDistanceMatrix(self.names).array.tolist(), [0] * 6)
+        self.assertRaises(ValueError, ArrayDistanceMatrix, self.names, square[:3])
+        self.assertRaises(ValueError, ArrayDistanceMatrix, self.names, condensed[:5])
+        self.assertRaises(
+            ValueError, ArrayDistanceMatrix, self.names, [[0], [1, 0], [2, 3, 0]]
+        )
+        self.assertRaises(
+            TypeError, ArrayDistanceMatrix, self.names, [[0], ["a", 0], [2, 3, 0]]
+        )
+        self.assertRaises(TypeError, ArrayDistanceMatrix, ["Alpha", 1], [[0], [1, 0]])
+        self.assertRaises(ValueError, ArrayDistanceMatrix, ["Alpha", "Alpha"])
+
+    def test_manipulation(self):
+        dm = ArrayDistanceMatrix(list(self.names), self.matrix)
+        ref = DistanceMatrix(list(self.names), self.matrix)
+        self.assertEqual(dm[1], ref[1])
+        self.assertEqual(dm[2, 1], ref[2, 1])
+        self.assertEqual(dm[1, 2], ref[1, 2])
+        self.assertEqual(dm[-1], ref[3])
+        self.assertEqual(dm["Gamma", "Delta"], ref["Gamma", "Delta"])
+        for item, value in (("Alpha", [0, 10, 20, 40]), (("Beta", "Delta"), 7)):
+            dm[item] = value
+            ref[item] = value
+            self.assertEqual(dm.matrix, ref.matrix)
+        del dm[1]
+        del ref[1]
+        self.assertEqual(dm.names, ref.names)
+        self.assertEqual(dm.matrix, ref.matrix)
+        dm.insert("Beta", [1, 0, 3, 5], 1)
+        ref.insert("Beta", [1, 0, 3, 5], 1)
+        self.assertEqual(dm.names, ref.names)
+        self.assertEqual(dm.matrix, ref.matrix)
+        self.assertRaises(ValueError, dm.__getitem__, "A")
+        self.assertRaises(TypeError, dm.__getitem__, (1, "A"))
+        self.assertRaises(TypeError, dm.__getitem__, (1, 1.2))
+        self.assertRaises(IndexError, dm.__getitem__, 6)
+        self.assertRaises(IndexError, dm.__setitem__, (10, 10), 1)
+        self.assertRaises(ValueError, dm.__setitem__, 0, [1, 2])
+        self.assertRaises(TypeError, dm.__setitem__, ("Alpha", "Beta"), "a")
+
+    def test_format_phylip(self):
+        dm = ArrayDistanceMatrix(self.names, self.matrix)
+        ref = DistanceMatrix(self.names, self.matrix)
+        handle = StringIO()
+        dm.format_phylip(handle)
+        ref_handle = StringIO()
+        ref.format_phylip(ref_handle)
+        self.assertEqual(handle.getvalue(), ref_handle.getvalue())
+
+
 class DistanceCalculatorTest(unittest.TestCase):
     """Test DistanceCalculator."""
 
@@ -170,6 +260,53 @@ class DistanceCalculatorTest(unittest.TestCase):
         self.assertEqual(dmat["Alpha", "Alpha"], 0.0)
         self.assertAlmostEqual(dmat["Alpha", "Gamma"], 4.0 / 5.0)
 
+    def test_array_alignment(self):
+        aln = AlignIO.read("TreeConstruction/msa.phy", "phylip")
+        for model in ("identity", "blastn", "blosum62"):
+            calculator = DistanceCalculator(model)
+            dm1 = calculator.get_distance(aln)
+            dm2 = calculator.get_distance(ArrayAlignment(aln))
+            self.assertEqual(dm1.names, dm2.names)
+            self.assertEqual(dm1.matrix, dm2.matrix)
+
+    def test_blocks(self):
+        aln = AlignIO.read("TreeConstruction/msa.phy", "phylip")
+        calculator = DistanceCalculator("blosum62")
+        dm = calculator.get_distance(aln)
+        block_rows = TreeConstruction._DISTANCE_BLOCK_ROWS
+        block_size = TreeConstruction._DISTANCE_BLOCK_SIZE
+        TreeConstruction._DISTANCE_BLOCK_ROWS = 2
+        TreeConstruction._DISTANCE_BLOCK_SIZE = 7
+        # worker processes started by spawning must use the same block sizes
+        executor = TreeConstruction.ProcessPoolExecutor
+        TreeConstruction.ProcessPoolExecutor = functools.partial(
+            executor, mp_context=multiprocessing.get_context("spawn")
+        )
+        try:
+            self.assertEqual(calculator.get_distance(aln).matrix, dm.matrix)
+            self.assertEqual(calculator.get_distance(aln, n_jobs=2).matrix, dm.matrix)
+        finally:
+            TreeConstruction.ProcessPoolExecutor = executor
+            TreeConstruction._DISTANCE_BLOCK_ROWS = block_rows
+            TreeConstruction._DISTANCE_BLOCK_SIZE = block_size
+
+    def test_array_distance_matrix(self):
+        aln = AlignIO.read("TreeConstruction/msa.phy", "phylip")
+        for model in ("identity", "blosum62"):
+            calculator = DistanceCalculator(model)
+            dm = calculator.get_distance(aln)
+            array_dm = calculator.get_distance(aln, array=True)
+            self.assertIsInstance(array_dm, ArrayDistanceMatrix)
+            self.assertEqual(array_dm.names, dm.names)
+            self.assertEqual(array_dm.matrix, dm.matrix)
+
+    def test_bad_letter(self):
+        aln = AlignIO.read(StringIO(">Alpha\nACGT\n>Beta\nACJT"), "fasta")
+        calculator = DistanceCalculator("blosum62")
+        message = "^Bad letter 'J' in sequence 'Beta' at position '2'$"
+        with self.assertRaisesRegex(ValueError, message):
+            calculator.get_distance(aln)
+
 
 class DistanceTreeConstructorTest(unittest.TestCase):
     """Test DistanceTreeConstructor."""
@@ -210,6 +347,85 @@ class DistanceTreeConstructorTest(unittest.TestCase):
         ref_min_tree = Phylo.read("./TreeConstruction/nj_min.tre", "newick")
         self.assertTrue(Consensus._equal_topology(min_tree, ref_min_tree))
 
+    def test_array_distance_matrix(self):
+        array_dm = ArrayDistanceMatrix(list(self.dm.names), self.dm.matrix)
+        for method in ("upgma", "nj"):
+            tree = getattr(self.constructor, method)(self.dm)
+            array_tree = getattr(self.constructor, method)(array_dm)
+            self.assertEqual(str(array_tree), str(tree))
+        tree = self.constructor.nj(array_dm, prune=True)
+        self.assertEqual(str(tree), str(array_tree))
+
+    def test_nj_ties(self):
+        # many tied Q-values; the pairs must be joined in the same order as
+        # by the original pure Python implementation
+        names = ["A", "B", "C", "D", "E", "F", "G", "H", "I"]
+        matrix = [
+            [0],
+            [0.7, 0],
+            [0.3, 0.1, 0],
+            [0.1, 0.2, 0.7, 0],
+            [0.3, 0.3, 0.1, 0.3, 0],
+            [0.7, 0.2, 0.7, 0.1, 0.2, 0],
+            [0.3, 0.1, 0.7, 0.3, 0.1, 0.3, 0],
+            [0.7, 0.3, 0.7, 0.1, 0.2, 0.3, 0.1, 0],
+            [0.1, 0.2, 0.3, 0.7, 0.2, 0.1, 0.3, 0.2, 0],
+        ]
+        tree = self.constructor.nj(DistanceMatrix(names, matrix))
+        joins = {
+            clade.name: [child.name for child in clade.clades]
+            for clade in tree.get_nonterminals()
+        }
+        self.assertEqual(
+            joins,
+            {
+                "Inner1": ["C", "B"],
+                "Inner2": ["D", "A"],
+                "Inner3": ["H", "G"],
+                "Inner4": ["I", "F"],
+                "Inner5": ["E", "Inner1"],
+                "Inner6": ["Inner4", "Inner5"],
+                "Inner7": ["Inner2", "Inner6", "Inner3"],
+            },
+        )
+        self.assertEqual(tree.root.clades[0].branch_length, 0.17812499999999998)
+        # for the same node distances, the pruned search breaks the ties in
+        # the same way as the full search
+        dm = TreeConstruction._square_distances(DistanceMatrix(names, matrix))
+        sorted_rows = TreeConstruction._SortedRows(dm)
+        active = numpy.ones(len(dm), bool)
+        for index in range(len(dm) - 3):
+            node_dist = TreeConstruction._row_sums(dm) / (active.sum() - 2)
+            node_dist[~active] = -numpy.inf
+            self.assertEqual(
+                sorted_rows.find_pair(active, node_dist),
+                TreeConstruction._nj_pair(dm, node_dist),
+            )
+            # remove a node, as when it is joined
+            active[index] = False
+            dm[index, :] = 0
+            dm[:, index] = 0
+
+    def test_nj_prune(self):
+        # distances of the tree (((A:1,B:2):1,(C:1,D:3):2):1,E:4,(F:2,G:1):3)
+        names = ["A", "B", "C", "D", "E", "F", "G"]
+        tree = Phylo.read(
+            StringIO("(((A:1,B:2):1,(C:1,D:3):2):1,E:4,(F:2,G:1):3);"), "newick"
+        )
+        matrix = [
+            [tree.distance(name1, name2) for name2 in names[: i + 1]]
+            for i, name1 in enumerate(names)
+        ]
+        dm = DistanceMatrix(names, matrix)
+        for prune in (False, True):
+            nj_tree = self.constructor.nj(dm, prune=prune)
+            self.assertTrue(Consensus._equal_topology(nj_tree, tree))
+            for name1 in names:
+                for name2 in names:
+                    self.assertAlmostEqual(
+                        nj_tree.distance(name1, name2), tree.distance(name1, name2)
+                    )
+
     def test_built_tree(self):
         tree = self.constructor.build_tree(self.aln)
         self.assertIsInstance(tree, BaseTree.Tree)
@@ -293,6 +509,54 @@ class ParsimonyScorerTest(unittest.TestCase):
         score = scorer.get_score(tree, aln)
         self.assertEqual(score, 3 + 1 + 3 + 3 + 2 + 1 + 2 + 5)
 
+    def test_site_patterns(self):
+        tree = Phylo.read("./TreeConstruction/upgma.tre", "newick")
+        alphabet = ["A", "T", "C", "G"]
+        step_matrix = [[0], [2.5, 0], [2.5, 1, 0], [1, 2.5, 2.5, 0]]
+        for matrix, score in ((None, 13), (_Matrix(alphabet, step_matrix), 23.5)):
+            aln = AlignIO.read("TreeConstruction/msa.phy", "phylip")
+            scorer = ParsimonyScorer(matrix)
+            self.assertEqual(scorer.get_score(tree, aln), score)
+            # repeated columns are scored once, with a weight
+            self.assertEqual(scorer.get_score(tree, aln + aln[:, ::-1]), 2 * score)
+            # the site patterns of the last alignment are kept
+            self.assertEqual(scorer.get_score(tree, aln), score)
+            aln[0].seq = aln[1].seq
+            self.assertLess(scorer.get_score(tree, aln), score)
+
+    def test_score_type(self):
+        # the scores are added column by column, as without site patterns
+        tree = Phylo.read("./TreeConstruction/upgma.tre", "newick")
+        alphabet = ["A", "T", "C", "G"]
+        step_matrix = [[0.0], [0.2, 0.0], [0.1, 0.1, 0.0], [0.1, 0.1, 0.2, 0.0]]
+        aln = AlignIO.read("TreeConstruction/msa.phy", "phylip")
+        scorer = ParsimonyScorer(_Matrix(alphabet, step_matrix))
+        self.assertEqual(scorer.get_score(tree, aln), 1.5000000000000004)
+        # values other than int and float are kept
+        step_matrix = [
+            [0],
+            [Fraction(5, 2), 0],
+            [Fraction(5, 2), Fraction(1, 3), 0],
+            [1, Fraction(5, 2), Fraction(5, 2), 0],
+        ]
+        scorer = ParsimonyScorer(_Matrix(alphabet, step_matrix))
+        score = scorer.get_score(tree, aln)
+        self.assertIsInstance(score, Fraction)
+        self.assertEqual(score, Fraction(43, 2))
+
+    def test_many_letters(self):
+        # more letters than fit in a 64-bit word, including non-ASCII letters
+        letters = [chr(0x100 + i) for i in range(70)]
+        records = [
+            SeqRecord(Seq(letters[i] + letters[69 - i]), id=name)
+            for i, name in enumerate("ABCD")
+        ]
+        aln = MultipleSeqAlignment(records)
+        tree = Phylo.read(StringIO("((A,B),(C,D));"), "newick")
+        tree.rooted = True
+        scorer = ParsimonyScorer()
+        self.assertEqual(scorer.get_score(tree, aln), 6)
+
 
 class NNITreeSearcherTest(unittest.TestCase):
     """Test NNITreeSearcher."""
@@ -308,6 +572,33 @@ class NNITreeSearcherTest(unittest.TestCase):
         self.assertEqual(len(trees), 2 * (5 - 3))
         Phylo.write(trees, os.path.join(temp_dir, "neighbor_trees.tre"), "newick")
 
+    def test_incremental_search(self):
+        aln = AlignIO.read("TreeConstruction/msa.phy", "phylip")
+
+        class CopyScorer(Scorer):
+            # scores each neighbor tree from scratch
+            def __init__(self, scorer):
+                self.scorer = scorer
+
+            def get_score(self, tree, alignment):
+                return self.scorer.get_score(tree, alignment)
+
+        alphabet = ["A", "T", "C", "G"]
+        step_matrix = [[0], [2.5, 0], [2.5, 1, 0], [1, 2.5, 2.5, 0]]
+        for matrix in (None, _Matrix(alphabet, step_matrix)):
+            for filename in ("upgma.tre", "nj.tre"):
+                tree = Phylo.read("./TreeConstruction/" + filename, "newick")
+                scorer = ParsimonyScorer(matrix)
+                # this roots the tree, if needed
+                score = scorer.get_score(tree, aln)
+                tree_string = tree.format("newick")
+                best_tree = NNITreeSearcher(scorer).search(tree, aln)
+                ref_tree = NNITreeSearcher(CopyScorer(scorer)).search(tree, aln)
+                self.assertEqual(best_tree.format("newick"), ref_tree.format("newick"))
+                self.assertLessEqual(scorer.get_score(best_tree, aln), score)
+                # the starting tree is left unchanged
+                self.assertEqual(tree.format("newick"), tree_string)
+
 
 class ParsimonyTreeConstructorTest(unittest.TestCase):
     """Test ParsimonyTreeConstructor."""
@@ -0,0 +1,177 @@
+# This code is part of the Biopython distribution and governed by its
+# license.  Please see the LICENSE file that should have been included
+# as part of this package.
+
+"""Tests for the on-disk cache for web services."""
+
+import email.message
+import io
+import json
+import os
+import tempfile
+import time
+import unittest
+import warnings
+
+from Bio import Entrez
+from Bio import ExPASy
+from Bio.WebCache import WebCache
+
+
+class FakeResponse(io.BytesIO):
+    """Response returned by the fake urlopen function."""
+
+    def __init__(self, url, content, content_type="text/xml"):
+        super().__init__(content)
+        self.url = url
+        self.headers = email.message.Message()
+        self.headers["Content-Type"] = content_type
+
+
+class WebCacheTests(unittest.TestCase):
+    """Tests for the WebCache class."""
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.cache = WebCache(self.directory.name, max_size=1000, ttls={"pubmed": 10})
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def store(self, url, content, data=None):
+        handle = FakeResponse(url, content, "text/plain; charset=UTF-8")
+        return self.cache.store(handle, url, data)
+
+    def test_key(self):
+        """Test the keys of requests."""
+        key = self.cache.key("https://example.org/efetch.fcgi?db=pubmed&id=1,2")
+        self.assertEqual(64, len(key))
+        self.assertEqual(
+            key,
+            self.cache.key(
+                "https://example.org/efetch.fcgi?id=1%2C2&tool=biopython&db=pubmed"
+            ),
+        )
+        self.assertEqual(
+            key, self.cache.key("https://example.org/efetch.fcgi", b"db=pubmed&id=1,2")
+        )
+        self.assertNotEqual(
+            key, self.cache.key("https://example.org/efetch.fcgi?db=pubmed&id=2,1")
+        )
+        self.assertNotEqual(
+            key, self.cache.key("https://example.org/esummary.fcgi?db=pubmed&id=1,2")
+        )
+
+    def test_store_get(self):
+        """Test storing and retrieving responses."""
+        url = "https://example.org/get?id=1"
+        self.assertIsNone(self.cache.get(url))
+        handle = self.store(url, b"first")
+        self.assertEqual(b"first", handle.read())
+        self.assertEqual(url, handle.url)
+        handle = self.cache.get(url)
+        self.assertEqual(b"first", handle.read())
+        self.assertEqual(url, handle.url)
+        self.assertEqual("plain", handle.headers.get_content_subtype())
+        self.assertIsNone(self.cache.get("https://example.org/get?id=2"))
+        self.cache.clear()
+        self.assertIsNone(self.cache.get(url))
+
+    def test_ttl(self):
+        """Test expiry of the stored responses."""
+        url = "https://example.org/get?id=1"
+        self.store(url, b"old")
+        path = os.path.join(self.directory.name, self.cache.key(url)[:2])
+        # pretend the response was stored a minute ago
+        filename = os.path.join(path, os.listdir(path)[0])
+        with open(filename, "rb") as handle:
+            header = handle.readline()
+            content = handle.read()
+        info = json.loads(header)
+        info["time"] -= 60
+        with open(filename, "wb") as handle:
+            handle.write(json.dumps(info).encode() + b"\n" + content)
+        self.assertIsNotNone(self.cache.get(url, database="nucleotide"))
+        self.assertIsNone(self.cache.get(url, database="pubmed"))
+        self.assertFalse(os.path.exists(filename))
+
+    def test_eviction(self):
+        """Test removing the least recently used responses."""
+        urls = ["https://example.org/get?id=%d" % i for i in range(5)]
+        for url in urls[:3]:
+            self.store(url, b"x" * 200)
+            time.sleep(0.01)
+        # use the first response again
+        self.assertIsNotNone(self.cache.get(urls[0]))
+        for url in urls[3:]:
+            time.sleep(0.01)
+            self.store(url, b"x" * 200)
+        self.assertIsNotNone(self.cache.get(urls[0]))
+        self.assertIsNone(self.cache.get(urls[1]))
+        self.assertIsNone(self.cache.get(urls[2]))
+        self.assertIsNotNone(self.cache.get(urls[3]))
+        self.assertIsNotNone(self.cache.get(urls[4]))
+
+
+class WebClientTests(unittest.TestCase):
+    """Tests for the use of the cache by the web service modules."""
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.requests = []
+
+    def tearDown(self):
+        Entrez.urlopen = self.entrez_urlopen
+        Entrez.cache = None
+        ExPASy.urlopen = self.expasy_urlopen
+        ExPASy.cache = None
+        self.directory.cleanup()
+
+    def urlopen(self, url, data=None):
+        self.requests.append((url, data))
+        if "epost" in url:
+            with open("Entrez/epost1.xml", "rb") as handle:
+                return FakeResponse(url, handle.read())
+        if "esearch" in url:
+            with open("Entrez/esearch1.xml", "rb") as handle:
+                return FakeResponse(url, handle.read())
+        return FakeResponse(url, b"text\n", "text/plain")
+
+    entrez_urlopen = Entrez.urlopen
+    expasy_urlopen = ExPASy.urlopen
+
+    def test_entrez(self):
+        """Test caching Entrez responses."""
+        Entrez.urlopen = self.urlopen
+        Entrez.cache = WebCache(self.directory.name)
+        with warnings.catch_warnings():
+            # Ignore the warning about the missing email address
+            warnings.simplefilter("ignore", UserWarning)
+            for address in ("a@example.org", "b@example.org"):
+                handle = Entrez.esearch("pubmed", "biopython", email=address)
+                record = Entrez.read(handle)
+                self.assertEqual("biopython[All Fields]", record["QueryTranslation"])
+            self.assertEqual(1, len(self.requests))
+            for i in range(2):
+                handle = Entrez.efetch("pubmed", id="19304878", rettype="medline")
+                self.assertEqual("text\n", handle.read())
+            self.assertEqual(2, len(self.requests))
+            # not cached, as the results are only available for a limited time
+            for i in range(2):
+                Entrez.esearch("pubmed", "biopython", usehistory="y").close()
+                Entrez.epost("pubmed", id="19304878").close()
+            self.assertEqual(6, len(self.requests))
+
+    def test_expasy(self):
+        """Test caching ExPASy responses."""
+        ExPASy.urlopen = self.urlopen
+        ExPASy.cache = WebCache(self.directory.name)
+        for i in range(2):
+            handle = ExPASy.get_sprot_raw("O23729")
+            self.assertEqual("text\n", handle.read())
+        self.assertEqual(1, len(self.requests))
+
+
+if __name__ == "__main__":
+    runner = unittest.TextTestRunner(verbosity=2)
+    unittest.main(testRunner=runner)
@@ -20,12 +20,14 @@ import os
 import unittest
 from io import StringIO
 
+import numpy
+
 # biopython
 from Bio.Seq import Seq
 from Bio.SeqRecord import SeqRecord
 from Bio.Align import AlignInfo
 from Bio import AlignIO
-from Bio.Align import MultipleSeqAlignment
+from Bio.Align import ArrayAlignment, MultipleSeqAlignment
 
 
 opuntia_clustal = """\
@@ -197,6 +199,141 @@ class TestBasics(unittest.TestCase):
         self.assertEqual(alignment[::-1][2].id, "mixed")
 
 
+class TestArrayAlignment(unittest.TestCase):
+    def setUp(self):
+        records = [
+            SeqRecord(Seq("AAAACGT"), id="Alpha", annotations={"weight": 0.5}),
+            SeqRecord(Seq("AAA-CGT"), id="Beta"),
+            SeqRecord(Seq("AAAAGGT"), id="Gamma"),
+            SeqRecord(Seq("AAAACGT"), id="Delta"),
+            SeqRecord(Seq("AAA-GGT"), id="Epsilon"),
+        ]
+        self.msa = MultipleSeqAlignment(
+            records, column_annotations={"stats": "CCCXCCC"}
+        )
+        self.alignment = ArrayAlignment(self.msa)
+
+    def test_shape(self):
+        alignment = self.alignment
+        self.assertEqual(len(alignment), 5)
+        self.assertEqual(alignment.get_alignment_length(), 7)
+        self.assertEqual(alignment.array.shape, (5, 7))
+        self.assertEqual(alignment.letters, "-ACGT")
+
+    def test_indexing(self):
+        alignment = self.alignment
+        record = alignment[1]
+        self.assertEqual(record.id, "Beta")
+        self.assertEqual(record.seq, "AAA-CGT")
+        self.assertEqual(alignment[0].annotations, {"weight": 0.5})
+        self.assertEqual(alignment[-1].id, "Epsilon")
+        self.assertEqual(alignment[3, 4], "C")
+        self.assertEqual(alignment[:, 4], "CCGCG")
+        self.assertEqual(alignment[1:3, 4], "CG")
+        self.assertEqual(alignment[1, 2:5].seq, "A-C")
+        sub_alignment = alignment[1:5, 3:6]
+        self.assertIsInstance(sub_alignment, ArrayAlignment)
+        self.assertEqual(
+            [record.id for record in sub_alignment],
+            ["Beta", "Gamma", "Delta", "Epsilon"],
+        )
+        self.assertEqual(sub_alignment[:, 0], "-AA-")
+        self.assertEqual(alignment[:, 2:5].column_annotations, {"stats": "CXC"})
+        selected = alignment[[0, 4]]
+        self.assertEqual([record.id for record in selected], ["Alpha", "Epsilon"])
+        self.assertEqual(selected[:, 3], "A-")
+        mask = alignment.gap_mask().any(axis=1)
+        self.assertEqual([record.id for record in alignment[mask]], ["Beta", "Epsilon"])
+
+    def test_column_selection(self):
+        records = [
+            SeqRecord(
+                Seq("ACGT"),
+                id="Alpha",
+                letter_annotations={"quality": [1, 2, 3, 4], "marks": "abcd"},
+            ),
+            SeqRecord(
+                Seq("A-GT"),
+                id="Beta",
+                letter_annotations={"quality": [5, 6, 7, 8], "marks": "efgh"},
+            ),
+        ]
+        msa = MultipleSeqAlignment(records, column_annotations={"stats": "wxyz"})
+        alignment = ArrayAlignment(msa)
+        selected = alignment[:, numpy.array([0, 1])]
+        self.assertIsInstance(selected, ArrayAlignment)
+        self.assertEqual(selected[:, 1], "C-")
+        self.assertEqual(selected[1].letter_annotations["quality"], [5, 6])
+        self.assertEqual(selected.column_annotations, {"stats": "wx"})
+        selected = alignment[:, numpy.array([True, False, True, True])]
+        self.assertEqual([str(record.seq) for record in selected], ["AGT", "AGT"])
+        self.assertEqual(selected[0].letter_annotations["quality"], [1, 3, 4])
+        self.assertEqual(selected[0].letter_annotations["marks"], "acd")
+        self.assertEqual(selected.column_annotations, {"stats": "wyz"})
+        selected = alignment[1:, [3, 0]]
+        self.assertEqual(selected[0].seq, "TA")
+        self.assertEqual(selected[0].letter_annotations["quality"], [8, 5])
+        self.assertEqual(selected[0].letter_annotations["marks"], "he")
+
+    def test_str(self):
+        self.assertEqual(
+            str(self.alignment[::2]),
+            """\
+ArrayAlignment with 3 rows and 7 columns
+AAAACGT Alpha
+AAAAGGT Gamma
+AAA-GGT Epsilon""",
+        )
+
+    def test_conversion(self):
+        msa = self.alignment.to_multiple_seq_alignment()
+        self.assertIsInstance(msa, MultipleSeqAlignment)
+        self.assertEqual(len(msa), 5)
+        for old, new in zip(self.msa, msa):
+            self.assertEqual(old.id, new.id)
+            self.assertEqual(old.seq, new.seq)
+            self.assertEqual(old.annotations, new.annotations)
+        self.assertEqual(msa.column_annotations, {"stats": "CCCXCCC"})
+        self.assertEqual(format(msa, "fasta"), format(self.msa, "fasta"))
+
+    def test_gap_mask(self):
+        mask = self.alignment.gap_mask()
+        self.assertEqual(mask.sum(), 2)
+        self.assertEqual(list(mask[:, 3]), [False, True, False, False, True])
+        mask = self.alignment.gap_mask("-G")
+        self.assertEqual(mask.sum(), 9)
+
+    def test_column_counts(self):
+        counts = self.alignment.column_counts("ACGT-")
+        self.assertEqual(counts.shape, (7, 5))
+        self.assertEqual(list(counts[3]), [3, 0, 0, 0, 2])
+        self.assertEqual(list(counts[4]), [0, 3, 2, 0, 0])
+        counts = self.alignment.column_counts()
+        self.assertEqual(list(counts[3]), [2, 3, 0, 0, 0])
+        weights = [0.5, 1, 1, 1, 1]
+        counts = self.alignment.column_counts("ACGT-", weights=weights)
+        self.assertEqual(list(counts[3]), [2.5, 0, 0, 0, 2])
+        frequencies = self.alignment.column_frequencies("CG")
+        self.assertEqual(list(frequencies[0]), [0, 0])
+        self.assertEqual(list(frequencies[4]), [0.6, 0.4])
+
+    def test_from_array(self):
+        alignment = ArrayAlignment.from_array(["ACGT", "A-GT"], ["Alpha", "Beta"])
+        self.assertEqual(alignment[:, 1], "C-")
+        self.assertEqual(alignment[1].id, "Beta")
+        with self.assertRaisesRegex(
+            ValueError, "Sequences must all be the same length"
+        ):
+            ArrayAlignment.from_array(["ACGT", "A-G"])
+
+    def test_unequal_lengths(self):
+        records = [SeqRecord(Seq("ACGT"), id="Alpha"), SeqRecord(Seq("ACG"), id="Beta")]
+        with self.assertRaisesRegex(
+            ValueError, "Sequences must all be the same length"
+        ):
+            ArrayAlignment(records)
+
+
 class TestReading(unittest.TestCase):
     def test_read_clustal1(self):
         """Parse an alignment file and get an alignment object."""
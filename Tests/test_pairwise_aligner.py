@@ -10,6 +10,8 @@ import os
 import unittest
 
 from Bio import Align, SeqIO
+from Bio.Align import substitution_matrices
+from Bio.Seq import Seq
 
 
 class TestAlignerProperties(unittest.TestCase):
@@ -2183,6 +2185,71 @@ Gly Ala Ala Cys Thr
         self.assertAlmostEqual(alignments[1].score, 3.0)
 
 
+class TestEncodedSequences(unittest.TestCase):
+    """Check aligning sequences that were encoded by the aligner in advance."""
+
+    def test_encoded_default_alphabet(self):
+        aligner = Align.PairwiseAligner()
+        target = aligner.encode("GAACTx")
+        self.assertEqual(len(target), 6)
+        self.assertEqual(list(target.indices), [6, 0, 0, 2, 19, -1])
+        self.assertAlmostEqual(aligner.score(target, "GAACT"), 5.0)
+        self.assertAlmostEqual(aligner.score("GAACT", target), 5.0)
+        alignments = aligner.align(target, "GAACT")
+        self.assertEqual(len(alignments), 1)
+        self.assertEqual(
+            str(alignments[0]),
+            """\
+GAACTx
+|||||-
+GAACT-
+""",
+        )
+
+    def test_encoded_substitution_matrix(self):
+        aligner = Align.PairwiseAligner()
+        aligner.substitution_matrix = substitution_matrices.load("BLOSUM62")
+        target = aligner.encode(Seq("KEVLA"))
+        query = aligner.encode("EVL")
+        self.assertAlmostEqual(aligner.score(target, query), 13.0)
+        alignments = aligner.align(target, query)
+        self.assertEqual(len(alignments), 1)
+        self.assertEqual(
+            str(alignments[0]),
+            """\
+KEVLA
+-|||-
+-EVL-
+""",
+        )
+
+    def test_encoded_sequence_list(self):
+        aligner = Align.PairwiseAligner()
+        aligner.alphabet = ["Ala", "Cys", "Gly", "Thr"]
+        target = aligner.encode(["Gly", "Ala", "Ala", "Cys", "Thr"])
+        self.assertEqual(list(target.indices), [2, 0, 0, 1, 3])
+        self.assertAlmostEqual(aligner.score(["Gly", "Ala", "Thr"], target), 3.0)
+
+    def test_encoded_from_buffer(self):
+        aligner = Align.PairwiseAligner()
+        target = aligner.encode("TACCG")
+        shared = Align.EncodedSequence("TACCG", bytes(target.indices))
+        self.assertAlmostEqual(aligner.score(shared, "ACG"), 3.0)
+        self.assertEqual(aligner.encode(shared).sequence, "TACCG")
+        message = "^sequence and indices have different lengths \\(3 and 5\\)$"
+        with self.assertRaisesRegex(ValueError, message):
+            Align.EncodedSequence("TAC", target.indices)
+
+    def test_encoded_alphabet_mismatch(self):
+        aligner = Align.PairwiseAligner()
+        aligner.alphabet = "ACGT"
+        target = aligner.encode("TACCG")
+        aligner.alphabet = "TGCA"
+        message = "^sequence was encoded with a different alphabet"
+        with self.assertRaisesRegex(ValueError, message):
+            aligner.score(target, "ACG")
+
+
 class TestArgumentErrors(unittest.TestCase):
     def test_aligner_string_errors(self):
         aligner = Align.PairwiseAligner()